@@ -0,0 +1,224 @@
+"""
+Synthetic order-flow benchmark for the P2P matcher.
+
+Generates order flow against a local database: Poisson arrivals, a mid price
+that follows a geometric random walk, limit prices scattered around the mid
+(so a share of orders cross and fill on placement), and cancels of random
+resting orders. Every event goes through the service API (`create_sell_order`,
+`create_buy_order`, `cancel_order`), with a `match_orders` sweep every
+`--sweep-every` events. Prints one JSON object:
+
+  events_per_sec / orders_per_sec   throughput over the whole run (wall clock)
+  place_latency_ms                  p50/p90/p99/max of every placement
+  match_latency_ms                  the same, only placements that filled
+  cancel_latency_ms, sweep_latency_ms
+  fills, db_statements_per_fill     statements issued by placements and sweeps / fills
+  db_statements_per_order           statements issued by placements / orders
+  max_rss_mb, py_heap_peak_mb       process RSS high-water mark; heap peak with --tracemalloc
+  book                              resting orders and best bid/ask at the end
+
+By default events are replayed as fast as possible and the arrival times only
+order them; `--paced` sleeps until each arrival so the DB sees the real rate.
+
+Usage (from the repo root):
+  python benchmarks/p2p_order_flow.py --events 20000 --rate 200 --cancel-ratio 0.3 --out p2p.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "web_portal"))
+sys.path.insert(0, HERE)
+
+from payments_pipeline import StatementCounter, _percentiles  # noqa: E402
+
+
+def _max_rss_mb():
+    try:
+        import resource
+    except ImportError:  # not on Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run(args) -> dict:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from web_portal.app.db import Base
+    from web_portal.app.database.models import User
+    from web_portal.app.p2p import events
+    from web_portal.app.p2p.orderbook import order_book
+    from web_portal.app.p2p.service import cancel_order, create_buy_order, create_sell_order, match_orders
+
+    if args.tracemalloc:
+        import tracemalloc
+        tracemalloc.start()
+
+    rng = random.Random(args.seed)
+    db_url = args.db_url or "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="p2pbench-"), "bench.db")
+    engine = create_engine(db_url)
+    Base.metadata.create_all(engine)
+    counter = StatementCounter(engine)
+    Session = sessionmaker(bind=engine)
+
+    fills = 0
+
+    def on_event(e):
+        nonlocal fills
+        if isinstance(e, events.TradeEvent):
+            fills += 1
+
+    events.subscribe(on_event)
+    place_ms, match_ms, cancel_ms, sweep_ms = [], [], [], []
+    resting: list[tuple[str, str, int]] = []  # (order id, side, user) candidates for cancels
+    orders = cancels = cancel_misses = 0
+    place_statements = 0
+    mid = args.start_price
+    try:
+        with Session() as db:
+            db.add_all([
+                User(id=20_000 + i, balance_manh=Decimal(args.user_balance), total_xp=0)
+                for i in range(args.users)
+            ])
+            db.commit()
+            order_book.rebuild(db)
+
+            t_start = time.perf_counter()
+            arrival = 0.0
+            for n in range(1, args.events + 1):
+                arrival += rng.expovariate(args.rate)
+                if args.paced:
+                    lag = arrival - (time.perf_counter() - t_start)
+                    if lag > 0:
+                        time.sleep(lag)
+                mid *= math.exp(rng.gauss(0.0, args.volatility))
+
+                victim = None
+                if rng.random() < args.cancel_ratio:
+                    # skip candidates that have filled since, so cancels hit live orders
+                    while resting and victim is None:
+                        i = rng.randrange(len(resting))
+                        resting[i], resting[-1] = resting[-1], resting[i]
+                        cand = resting.pop()
+                        victim = cand if order_book.get(cand[0]) is not None else None
+                if victim is not None:
+                    oid, side, user = victim
+                    t0 = time.perf_counter()
+                    ok = cancel_order(db, user, oid, side)
+                    cancel_ms.append((time.perf_counter() - t0) * 1000.0)
+                    cancels += 1
+                    cancel_misses += not ok
+                else:
+                    side = "buy" if rng.random() < 0.5 else "sell"
+                    user = 20_000 + rng.randrange(args.users)
+                    price = Decimal(str(round(mid * (1 + rng.gauss(0.0, args.spread)), 4)))
+                    amount = Decimal(str(round(rng.lognormvariate(0.0, 0.75) * args.mean_amount, 3)))
+                    if price <= 0 or amount <= 0:
+                        continue
+                    create = create_buy_order if side == "buy" else create_sell_order
+                    before_fills, before_statements = fills, counter.count
+                    t0 = time.perf_counter()
+                    try:
+                        order = counter.measure(create, db, user, amount, price)
+                    except ValueError:
+                        continue  # seller out of MANH
+                    elapsed = (time.perf_counter() - t0) * 1000.0
+                    orders += 1
+                    place_statements += counter.count - before_statements
+                    place_ms.append(elapsed)
+                    if fills > before_fills:
+                        match_ms.append(elapsed)
+                    if order.status in ("open", "partial"):
+                        resting.append((order.id, side, user))
+                        if len(resting) > 4 * args.users:
+                            resting.pop(0)
+
+                if args.sweep_every and n % args.sweep_every == 0:
+                    t0 = time.perf_counter()
+                    counter.measure(match_orders, db)
+                    sweep_ms.append((time.perf_counter() - t0) * 1000.0)
+            wall = time.perf_counter() - t_start
+    finally:
+        events.unsubscribe(on_event)
+
+    heap_peak = None
+    if args.tracemalloc:
+        heap_peak = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+        tracemalloc.stop()
+
+    stats = order_book.stats()
+    return {
+        "config": {
+            "events": args.events,
+            "rate": args.rate,
+            "paced": args.paced,
+            "cancel_ratio": args.cancel_ratio,
+            "volatility": args.volatility,
+            "spread": args.spread,
+            "users": args.users,
+            "sweep_every": args.sweep_every,
+            "seed": args.seed,
+            "db": engine.dialect.name,
+        },
+        "wall_sec": round(wall, 3),
+        "events_per_sec": round(args.events / wall, 1) if wall else None,
+        "orders_per_sec": round(orders / wall, 1) if wall else None,
+        "orders": orders,
+        "cancels": cancels,
+        "cancel_misses": cancel_misses,
+        "fills": fills,
+        "place_latency_ms": _percentiles(place_ms),
+        "match_latency_ms": _percentiles(match_ms),
+        "cancel_latency_ms": _percentiles(cancel_ms),
+        "sweep_latency_ms": _percentiles(sweep_ms),
+        "db_statements_per_fill": round(counter.count / fills, 2) if fills else None,
+        "db_statements_per_order": round(place_statements / orders, 2) if orders else None,
+        "max_rss_mb": _max_rss_mb(),
+        "py_heap_peak_mb": heap_peak,
+        "book": stats,
+    }
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--events", type=int, default=5000)
+    ap.add_argument("--rate", type=float, default=100.0, help="mean arrivals per second (Poisson)")
+    ap.add_argument("--paced", action="store_true", help="sleep until each arrival instead of replaying flat out")
+    ap.add_argument("--cancel-ratio", type=float, default=0.25, help="share of events that cancel a resting order")
+    ap.add_argument("--start-price", type=float, default=1.0, help="initial mid price, TON per MANH")
+    ap.add_argument("--volatility", type=float, default=0.002, help="stddev of the mid's log step per event")
+    ap.add_argument("--spread", type=float, default=0.01, help="stddev of limit prices around the mid (relative)")
+    ap.add_argument("--mean-amount", type=float, default=5.0, help="typical order size in MANH")
+    ap.add_argument("--users", type=int, default=200)
+    ap.add_argument("--user-balance", default="1000000")
+    ap.add_argument("--sweep-every", type=int, default=500, help="run match_orders every N events (0 = never)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--tracemalloc", action="store_true", help="report the Python heap peak (slower)")
+    ap.add_argument("--db-url", help="defaults to a fresh SQLite file")
+    ap.add_argument("--out", help="also write the JSON report here")
+    args = ap.parse_args(argv)
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+End-to-end payment pipeline benchmark against the local TonCenter simulator.
+
+Creates invoices through `create_invoice`, has the simulator "pay" them at the
+configured rate/burst pattern, and runs `poll_and_confirm_invoices` on an
+interval until every invoice is confirmed (or the timeout hits). Prints one
+JSON object:
+
+  invoices_per_sec_created        create_invoice throughput
+  confirmed_per_sec               confirmations / (last confirmation - first payment)
+  confirmation_latency_ms         p50/p90/p99/max from payment on-chain to invoice paid
+  db_statements_per_confirmation  statements issued by the poller / confirmations
+  db_statements_per_invoice       statements issued by create_invoice / invoices
+
+Usage (from the repo root):
+  python benchmarks/payments_pipeline.py --invoices 2000 --rate 200 --burst-every 5 --burst-size 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "web_portal"))
+
+TREASURY = "EQBenchTreasury0000000000000000000000000000000000"
+
+
+class StatementCounter:
+    def __init__(self, engine) -> None:
+        from sqlalchemy import event
+        self.count = 0
+        self.active = False
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active:
+            self.count += 1
+
+    def measure(self, fn, *args, **kwargs):
+        self.active = True
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.active = False
+
+
+def _percentiles(values: list[float]) -> dict:
+    if not values:
+        return {}
+    s = sorted(values)
+
+    def pct(p):
+        return s[min(len(s) - 1, int(round(p / 100.0 * (len(s) - 1))))]
+
+    return {
+        "p50": round(pct(50), 2),
+        "p90": round(pct(90), 2),
+        "p99": round(pct(99), 2),
+        "max": round(s[-1], 2),
+        "mean": round(sum(s) / len(s), 2),
+    }
+
+
+def run(args) -> dict:
+    os.environ["TON_TREASURY_ADDRESS"] = TREASURY
+    os.environ.setdefault("INTERNAL_SIGNING_SECRET", "b" * 64)
+    os.environ.setdefault("TON_API_KEY", "bench")
+
+    import httpx
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.orm import sessionmaker
+
+    from web_portal.app.core.config import reload_config
+    from web_portal.app.db import Base
+    from web_portal.app.database.models import Invoice, User
+    from web_portal.app.payments.ton.service import create_invoice, poll_and_confirm_invoices
+    from web_portal.app.payments.ton.simulator import BurstPattern, TonCenterSimulator
+    from web_portal.app.payments.ton.toncenter import TonCenter
+
+    reload_config()
+    db_url = args.db_url or "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="paybench-"), "bench.db")
+    engine = create_engine(db_url)
+    Base.metadata.create_all(engine)
+    counter = StatementCounter(engine)
+    Session = sessionmaker(bind=engine)
+
+    sim = TonCenterSimulator(
+        TREASURY,
+        rate=args.rate,
+        burst=BurstPattern(args.burst_every, args.burst_size),
+        noise_ratio=args.noise_ratio,
+    )
+    tc = TonCenter(base_url="http://toncenter.sim/api/v2", api_key="bench",
+                   client=httpx.Client(transport=sim.transport()))
+
+    with Session() as db:
+        db.add_all([User(id=10_000 + i, balance_manh=0, total_xp=0) for i in range(args.users)])
+        db.commit()
+
+        t0 = time.perf_counter()
+        for i in range(args.invoices):
+            inv = counter.measure(
+                create_invoice, db, user_id=10_000 + i % args.users, username=None,
+                ils_amount=Decimal("10"), ton_ils_rate=Decimal("5"),
+            )
+            sim.pay_ton(inv.comment, inv.ton_amount)
+        create_sec = time.perf_counter() - t0
+        create_statements = counter.count
+        counter.count = 0
+
+        sim.tick()  # payments start flowing now
+        confirmed_at: dict[str, float] = {}
+        polls = 0
+        scanned = 0
+        deadline = time.time() + args.timeout
+        while len(confirmed_at) < args.invoices and time.time() < deadline:
+            time.sleep(args.poll_interval)
+            result = counter.measure(
+                poll_and_confirm_invoices, db, toncenter=tc, page_size=args.page_size, max_pages=args.max_pages,
+            )
+            now = time.time()
+            polls += 1
+            scanned += result.get("checked", 0)
+            if result.get("confirmed"):
+                paid = db.execute(select(Invoice.comment).where(Invoice.status == "paid")).scalars().all()
+                for comment in paid:
+                    confirmed_at.setdefault(comment, now)
+
+    latencies = [(confirmed_at[m] - sim.emitted_at[m]) * 1000.0 for m in confirmed_at if m in sim.emitted_at]
+    span = (max(confirmed_at.values()) - min(sim.emitted_at.values())) if confirmed_at else 0.0
+    return {
+        "config": {
+            "invoices": args.invoices,
+            "rate": args.rate,
+            "burst_every": args.burst_every,
+            "burst_size": args.burst_size,
+            "noise_ratio": args.noise_ratio,
+            "poll_interval": args.poll_interval,
+            "page_size": args.page_size,
+            "max_pages": args.max_pages,
+            "db": engine.dialect.name,
+        },
+        "confirmed": len(confirmed_at),
+        "missed": args.invoices - len(confirmed_at),
+        "invoices_per_sec_created": round(args.invoices / create_sec, 1) if create_sec else None,
+        "confirmed_per_sec": round(len(confirmed_at) / span, 1) if span else None,
+        "confirmation_latency_ms": _percentiles(latencies),
+        "db_statements_per_confirmation": round(counter.count / len(confirmed_at), 2) if confirmed_at else None,
+        "db_statements_per_invoice": round(create_statements / args.invoices, 2) if args.invoices else None,
+        "polls": polls,
+        "toncenter_requests": sim.requests,
+        "transactions_scanned": scanned,
+    }
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--invoices", type=int, default=1000)
+    ap.add_argument("--users", type=int, default=100)
+    ap.add_argument("--rate", type=float, default=100.0, help="simulated payments per second")
+    ap.add_argument("--burst-every", type=float, default=0.0)
+    ap.add_argument("--burst-size", type=int, default=0)
+    ap.add_argument("--noise-ratio", type=float, default=0.0)
+    ap.add_argument("--poll-interval", type=float, default=0.5)
+    ap.add_argument("--page-size", type=int, default=50)
+    ap.add_argument("--max-pages", type=int, default=20)
+    ap.add_argument("--timeout", type=float, default=120.0)
+    ap.add_argument("--db-url", help="defaults to a fresh SQLite file")
+    ap.add_argument("--out", help="also write the JSON report here")
+    args = ap.parse_args(argv)
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,11 +14,9 @@ def test_health():
     assert response.status_code == 200
     assert response.json()["status"] == "ok"
 
-def test_get_user_data():
-    response = client.get("/api/user_data?user_id=224223270")
-    assert response.status_code in (200, 404)
-    if response.status_code == 200:
-        data = response.json()
-        assert "user_id" in data
-        assert "manh_balance" in data
+def test_user_data_requires_telegram_identity():
+    # a bare user id no longer reads anyone's balance; /api/bootstrap needs initData or a session token
+    assert client.get("/api/user_data?user_id=224223270").status_code == 404
+    assert client.post("/api/user_data", json={"user_id": 224223270}).status_code == 404
+    assert client.get("/api/bootstrap?user_id=224223270").status_code == 401
 
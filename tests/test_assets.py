@@ -0,0 +1,56 @@
+import gzip
+import os
+import sys
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'web_portal')))
+
+from web_portal.app.assets import IMMUTABLE, REVALIDATE, AssetStore, brotli
+from web_portal.app.main import app as main_app
+
+
+def _client(store):
+    app = FastAPI()
+
+    @app.get("/page")
+    async def page(request: Request):
+        return store.response(request, "page.html")
+    return TestClient(app)
+
+
+def test_negotiation_etags_and_reload(tmp_path):
+    html = "<html>" + "hello mini app " * 200 + "</html>"
+    (tmp_path / "page.html").write_text(html, encoding="utf-8")
+    store = AssetStore(str(tmp_path), ("page.html",))
+    client = _client(store)
+
+    r = client.get("/page", headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200 and r.headers["content-encoding"] == "gzip" and r.text == html
+    assert r.headers["cache-control"] == REVALIDATE and r.headers["vary"] == "Accept-Encoding"
+    assert len(store.get("page.html").encodings["gzip"]) < len(html) // 10
+    assert gzip.decompress(store.get("page.html").encodings["gzip"]).decode() == html
+
+    plain = client.get("/page", headers={"Accept-Encoding": "identity, gzip;q=0"})
+    assert "content-encoding" not in plain.headers and plain.headers["etag"] != r.headers["etag"]
+    if brotli is not None:
+        assert client.get("/page", headers={"Accept-Encoding": "gzip, br"}).headers["content-encoding"] == "br"
+
+    assert client.get("/page", headers={"If-None-Match": r.headers["etag"]}).status_code == 304
+    version = store.version("page.html")
+    assert client.get(f"/page?v={version}").headers["cache-control"] == IMMUTABLE
+    assert client.get("/page?v=stale").headers["cache-control"] == REVALIDATE
+
+    (tmp_path / "page.html").write_text("<html>new</html>", encoding="utf-8")
+    assert client.get("/page").text == html  # served from memory until reloaded
+    store.load()
+    r2 = client.get("/page", headers={"If-None-Match": r.headers["etag"]})
+    assert r2.status_code == 200 and r2.text == "<html>new</html>" and store.version("page.html") != version
+
+
+def test_mini_app_routes_serve_from_memory():
+    client = TestClient(main_app)
+    r = client.get("/new_mini_app", headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200 and "telegram-web-app.js" in r.text and r.headers["etag"]
+    assert client.get("/mini_app").status_code == 200
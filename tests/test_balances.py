@@ -0,0 +1,143 @@
+import dataclasses
+import os
+import sys
+from decimal import Decimal
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'web_portal')))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from web_portal.app.core import config
+from web_portal.app.db import Base
+from web_portal.app.database.models import BuyOrder, LedgerEvent, SellOrder, User, Withdrawal
+from web_portal.app.manh.balances import InsufficientBalance, apply_balance_delta
+from web_portal.app.p2p.orderbook import order_book
+from web_portal.app.p2p import events
+from web_portal.app.p2p.events import OrderClosed
+from web_portal.app.p2p.service import cancel_order, match_orders, place_order
+from web_portal.app.payments.ton.withdrawals import approve_withdrawal, create_withdrawal, reject_withdrawal
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(config, "_config", dataclasses.replace(config.get_config(), min_withdrawal_manh=Decimal("1")))
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    order_book.invalidate()
+    with sessionmaker(bind=engine)() as s:
+        s.add_all([User(id=1, balance_manh=Decimal("10"), total_xp=0), User(id=2, balance_manh=Decimal("0"))])
+        s.commit()
+        yield s
+
+
+def _ledger(db, user_id):
+    return db.query(LedgerEvent).filter_by(user_id=user_id).order_by(LedgerEvent.id).all()
+
+
+def test_conditional_update_never_overdraws(db):
+    user = db.get(User, 1)
+    assert apply_balance_delta(db, 1, Decimal("-4"), "test", xp_delta=3) == Decimal("6")
+    assert user.balance_manh == Decimal("6") and user.total_xp == 3  # loaded object kept in step
+    with pytest.raises(InsufficientBalance):
+        apply_balance_delta(db, 1, Decimal("-6.000000001"), "test")
+    with pytest.raises(InsufficientBalance):
+        apply_balance_delta(db, 999, Decimal("1"), "test")
+    db.commit()
+    db.expire_all()
+    assert db.get(User, 1).balance_manh == Decimal("6")
+    assert [(e.amount, e.balance_after) for e in _ledger(db, 1)] == [(Decimal("-4"), Decimal("6"))]
+
+
+def test_withdrawal_debit_and_refund_are_ledgered(db):
+    with pytest.raises(ValueError, match="Insufficient balance"):
+        create_withdrawal(db, 1, 11, "EQaddr")
+    w = create_withdrawal(db, 1, 7, "EQaddr")
+    reject_withdrawal(db, w.id, operator_id=9)
+    assert [(e.event_type, e.balance_after) for e in _ledger(db, 1)] == [
+        ("withdrawal", Decimal("3")),
+        ("withdrawal_refund", Decimal("10")),
+    ]
+
+
+def test_withdrawal_is_decided_once(db):
+    w = create_withdrawal(db, 1, 4, "EQaddr")
+    # another operator rejects it behind this session's back; the loaded copy still says pending
+    db.execute(update(Withdrawal).where(Withdrawal.id == w.id).values(status="rejected")
+               .execution_options(synchronize_session=False))
+    assert db.get(Withdrawal, w.id).status == "pending"
+    for decide in (reject_withdrawal, approve_withdrawal):
+        with pytest.raises(ValueError, match="already rejected"):
+            decide(db, w.id, operator_id=10)
+    db.expire_all()
+    assert db.get(User, 1).balance_manh == Decimal("6")  # no second refund
+    assert [e.event_type for e in _ledger(db, 1)] == ["withdrawal"]
+
+    w2 = create_withdrawal(db, 1, 2, "EQaddr")
+    assert approve_withdrawal(db, w2.id, operator_id=9).processed_by == 9
+    with pytest.raises(ValueError, match="already approved"):
+        reject_withdrawal(db, w2.id, operator_id=10)
+    with pytest.raises(ValueError, match="not found"):
+        approve_withdrawal(db, "nope", operator_id=9)
+
+
+def test_match_skips_sell_orders_without_escrow(db):
+    from uuid import uuid4
+    # written behind the service's back, so nothing is reserved for it
+    unbacked = SellOrder(id=uuid4().hex, user_id=2, amount_manh=5, price_per_manh=1, total_price=5)
+    db.add(unbacked)
+    db.commit()
+    funded = place_order(db, 1, "sell", Decimal("5"), Decimal("2")).order
+    closed = []
+    events.subscribe(closed.append)
+    try:
+        trades = place_order(db, 2, "buy", Decimal("4"), Decimal("3")).trades
+    finally:
+        events.unsubscribe(closed.append)
+    assert [t.sell_order_id for t in trades] == [funded.id]
+    assert unbacked.status == "cancelled"
+    assert [(e.order_id, e.reason, e.remaining) for e in closed if isinstance(e, OrderClosed)] == [
+        (unbacked.id, "unbacked", Decimal("5")),
+    ]
+    seller = db.get(User, 1)
+    assert (seller.balance_manh, seller.reserved_manh) == (Decimal("6"), Decimal("1"))
+    assert db.get(User, 2).balance_manh == Decimal("4")
+    assert db.query(BuyOrder).one().status == "filled"
+
+
+def test_sweep_reports_unbacked_orders(db):
+    # both written behind the service's back; the sweep finds them crossed after a rebuild
+    db.add_all([SellOrder(id="unbacked", user_id=2, amount_manh=3, price_per_manh=1, total_price=3),
+                BuyOrder(id="bid", user_id=1, amount_manh=1, price_per_manh=2, total_price=2)])
+    db.commit()
+    order_book.rebuild(db)
+    closed = []
+    events.subscribe(closed.append)
+    try:
+        assert match_orders(db) == []
+    finally:
+        events.unsubscribe(closed.append)
+    assert [(e.order_id, e.side, e.reason) for e in closed] == [("unbacked", "sell", "unbacked")]
+    assert order_book.best_ask() is None
+
+
+def test_sell_orders_escrow_the_balance(db):
+    first = place_order(db, 1, "sell", Decimal("6"), Decimal("2")).order
+    with pytest.raises(InsufficientBalance):
+        place_order(db, 1, "sell", Decimal("5"), Decimal("2"))  # only 4 left unreserved
+    with pytest.raises(ValueError, match="Insufficient balance"):
+        create_withdrawal(db, 1, 5, "EQaddr")
+    assert db.query(SellOrder).count() == 1
+
+    place_order(db, 2, "buy", Decimal("2"), Decimal("2"))
+    db.expire_all()
+    user = db.get(User, 1)
+    assert (user.balance_manh, user.reserved_manh) == (Decimal("8"), Decimal("4"))
+
+    assert cancel_order(db, 1, first.id, "sell")
+    db.expire_all()
+    assert db.get(User, 1).reserved_manh == Decimal("0")
+    create_withdrawal(db, 1, 8, "EQaddr")
@@ -0,0 +1,115 @@
+import dataclasses
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from urllib.parse import urlencode
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'web_portal')))
+
+from web_portal.app.api import user as user_api
+from web_portal.app.core import session_tokens
+from web_portal.app.core.config import get_config
+from web_portal.app.core.settings import settings
+from web_portal.app.database.models import Base, Invoice, Referral, User
+from web_portal.app.main import app
+from web_portal.app.p2p.orderbook import OrderBook
+
+BOT_TOKEN = "123:test-token"
+
+
+def _init_data(user_id: int) -> str:
+    fields = {"auth_date": str(int(time.time())), "user": json.dumps({"id": user_id, "language_code": "he"})}
+    check = "\n".join(f"{k}={v}" for k, v in sorted(fields.items()))
+    secret = hmac.new(b"WebAppData", BOT_TOKEN.encode(), hashlib.sha256).digest()
+    fields["hash"] = hmac.new(secret, check.encode(), hashlib.sha256).hexdigest()
+    return urlencode(fields)
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add_all([
+            User(id=1, username="alice", balance_manh=Decimal("50"), total_xp=30),
+            User(id=2, username="bob", balance_manh=Decimal("5"), total_xp=10),
+            Referral(id="r1", referrer_id=1, referred_id=2, reward_given=True),
+        ])
+        t0 = datetime(2026, 1, 1)
+        db.add_all([
+            Invoice(id=f"inv{i}", user_id=1, ils_amount=10 + i, ton_amount=1, manh_amount=10 + i,
+                    status="pending", created_at=t0 + timedelta(hours=i))
+            for i in range(12)
+        ])
+        db.commit()
+    monkeypatch.setattr(user_api, "SessionLocal", factory)
+    monkeypatch.setattr(user_api, "order_book", OrderBook())
+    monkeypatch.setattr(settings, "BOT_TOKEN", BOT_TOKEN)
+    cfg = dataclasses.replace(get_config(), session_keys={"k1": b"secret"}, session_ttl_sec=600)
+    monkeypatch.setattr(session_tokens, "get_config", lambda: cfg)
+
+    def get_db():
+        with factory() as db:
+            yield db
+    app.dependency_overrides[user_api.get_db] = get_db
+    yield factory
+    app.dependency_overrides.pop(user_api.get_db, None)
+
+
+def test_bootstrap_returns_everything_and_revalidates(session_factory):
+    client = TestClient(app)
+    headers = {"X-Tg-Init-Data": _init_data(1)}
+    r = client.get("/api/bootstrap", headers=headers)
+    assert r.status_code == 200
+    data = r.json()
+    assert data["balance"]["manh"] == "50.000000000" and data["balance"]["xp"] == 30
+    assert [i["id"] for i in data["invoices"]] == [f"inv{i}" for i in range(11, 1, -1)]
+    assert data["leaderboard"][0]["user_id"] == 1
+    assert data["orders"] == [] and data["referrals"] == {"count": 1, "rewarded": 1}
+
+    etag = r.headers["ETag"]
+    again = client.get("/api/bootstrap", headers={**headers, "If-None-Match": etag})
+    assert again.status_code == 304 and again.headers["ETag"] == etag and not again.content
+
+    with session_factory() as db:
+        db.get(User, 1).total_xp = 31
+        db.commit()
+    changed = client.get("/api/bootstrap", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+
+
+def test_bootstrap_requires_valid_init_data(session_factory):
+    client = TestClient(app)
+    assert client.get("/api/bootstrap").status_code == 401
+    forged = _init_data(1).replace("hash=", "hash=0")
+    assert client.get("/api/bootstrap", headers={"X-Tg-Init-Data": forged}).status_code == 401
+    assert client.get("/api/bootstrap", headers={"X-Tg-Init-Data": _init_data(99)}).status_code == 404
+
+
+def test_session_token_replaces_init_data(session_factory):
+    client = TestClient(app)
+    auth = client.post("/api/auth/telegram", json={"initData": _init_data(3)})
+    assert auth.status_code == 200
+    body = auth.json()
+    assert body["user_id"] == 3 and body["lang"] == "he" and body["token"].startswith("v1.k1.")
+    with session_factory() as db:
+        assert db.get(User, 3) is not None  # first sign-in creates the user
+
+    bearer = {"Authorization": f"Bearer {body['token']}"}
+    r = client.get("/api/bootstrap", headers=bearer)
+    assert r.status_code == 200 and r.json()["balance"]["user_id"] == 3
+    r = client.get("/api/bootstrap", headers={"Authorization": f"Bearer {body['token']}x"})
+    assert r.status_code == 401 and r.headers["WWW-Authenticate"] == "Bearer"
+    assert client.get("/api/bootstrap", params={"access_token": "v1.k1.\u00e9.x"}).status_code == 401
@@ -86,6 +86,21 @@ def mock_db():
         mock_session.return_value = mock_db
         yield mock_db
 
+@pytest.fixture
+def sqlite_db():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from web_portal.app.db import Base
+    from web_portal.app.database.models import User
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(User(id=12345, balance_manh=0, total_xp=0))
+    db.commit()
+    yield db
+    db.close()
+    engine.dispose()
+
 # Helper to call handlers with db mock (since _with_db expects 2 args and adds db)
 async def call_with_db(handler, update, context, db_mock):
     with patch('web_portal.app.tg_bot.SessionLocal', return_value=db_mock):
@@ -122,6 +137,18 @@ async def test_cmd_help():
     args = update.message.reply_text.call_args[0][0]
     assert "Available commands:" in args
 
+@pytest.mark.asyncio
+async def test_cmd_help_in_user_language():
+    from telegram import Update, Message
+    from web_portal.app.i18n import T
+    update = MagicMock(spec=Update)
+    update.effective_user.id = 4242
+    update.effective_user.language_code = 'ru'
+    update.message = MagicMock(spec=Message)
+    update.message.reply_text = AsyncMock()
+    await cmd_help(update, MagicMock())
+    assert update.message.reply_text.call_args[0][0] == T['ru']['help.text']
+
 @pytest.mark.asyncio
 async def test_cmd_manh(mock_db):
     from telegram import Update, Message
@@ -172,23 +199,21 @@ async def test_cmd_buy(mock_db):
     assert "Invoice created" in update.message.reply_text.call_args[0][0]
 
 @pytest.mark.asyncio
-async def test_cmd_invoices(mock_db):
+async def test_cmd_invoices(sqlite_db):
     from telegram import Update, Message
+    from web_portal.app.database.models import Invoice
     update = MagicMock(spec=Update)
     update.effective_user.id = 12345
     update.message = MagicMock(spec=Message)
     update.message.reply_text = AsyncMock()
     context = MagicMock()
-    mock_invoice = MagicMock()
-    mock_invoice.id = 'testid123'
-    mock_invoice.status = 'pending'
-    mock_invoice.ils_amount = 100
-    mock_invoice.created_at = MagicMock()
-    mock_invoice.created_at.date.return_value = '2026-01-01'
-    with patch('web_portal.app.tg_bot.list_invoices', return_value=[mock_invoice]):
-        await call_with_db(cmd_invoices, update, context, mock_db)
+    sqlite_db.add(Invoice(id='testid123', user_id=12345, status='pending', ils_amount=100, ton_amount=1,
+                          manh_amount=100, created_at=datetime(2026, 1, 1)))
+    sqlite_db.commit()
+    await call_with_db(cmd_invoices, update, context, sqlite_db)
     update.message.reply_text.assert_awaited_once()
-    assert "invoices" in update.message.reply_text.call_args[0][0].lower()
+    text = update.message.reply_text.call_args[0][0]
+    assert "invoices" in text.lower() and "testid12: pending 100" in text and "2026-01-01" in text
 
 @pytest.mark.asyncio
 async def test_cmd_poll_confirm(mock_db):
@@ -231,22 +256,43 @@ async def test_cmd_withdraw(mock_db):
     assert "Withdrawal request created" in update.message.reply_text.call_args[0][0]
 
 @pytest.mark.asyncio
-async def test_cmd_withdrawals(mock_db):
+async def test_cmd_withdrawals(sqlite_db):
     from telegram import Update, Message
+    from web_portal.app.database.models import Withdrawal
+    from web_portal.app.tg_bot import pagination_callback
     update = MagicMock(spec=Update)
     update.effective_user.id = 12345
     update.message = MagicMock(spec=Message)
     update.message.reply_text = AsyncMock()
     context = MagicMock()
-    mock_w = MagicMock()
-    mock_w.id = 'wd123'
-    mock_w.amount_manh = 10
-    mock_w.destination_address = 'UQtest123'
-    mock_w.status = 'pending'
-    with patch('web_portal.app.tg_bot.get_user_withdrawals', return_value=[mock_w]):
-        await call_with_db(cmd_withdrawals, update, context, mock_db)
+    sqlite_db.add_all([
+        Withdrawal(id=f'wd{i:03d}', user_id=12345, amount_manh=i, destination_address='UQtest123',
+                   status='pending', requested_at=datetime(2026, 1, 1, 12, i))
+        for i in range(23)
+    ])
+    sqlite_db.commit()
+    await call_with_db(cmd_withdrawals, update, context, sqlite_db)
     update.message.reply_text.assert_awaited_once()
-    assert "withdrawals" in update.message.reply_text.call_args[0][0].lower()
+    text = update.message.reply_text.call_args[0][0]
+    assert "withdrawals" in text.lower() and "wd022" in text and "wd012" not in text and "Page 1" in text
+
+    # walk the Next/Prev buttons: newest first, 10 per page, then back
+    seen = []
+    markup = update.message.reply_text.call_args.kwargs['reply_markup']
+    for label in ("Next", "Next", "Prev"):
+        button = next(b for b in markup.inline_keyboard[0] if label in b.text)
+        cb = MagicMock(spec=Update)
+        cb.callback_query.data = button.callback_data
+        cb.callback_query.from_user.id = 12345
+        cb.callback_query.answer = AsyncMock()
+        cb.callback_query.edit_message_text = AsyncMock()
+        assert len(button.callback_data) <= 64
+        await call_with_db(pagination_callback, cb, context, sqlite_db)
+        text = cb.callback_query.edit_message_text.call_args[0][0]
+        markup = cb.callback_query.edit_message_text.call_args.kwargs['reply_markup']
+        seen.append([line[:5] for line in text.splitlines() if line.startswith('wd')])
+    assert seen[0] == [f'wd{i:03d}' for i in range(12, 2, -1)]
+    assert seen[1] == ['wd002', 'wd001', 'wd000'] and seen[2] == seen[0]
 
 @pytest.mark.asyncio
 async def test_cmd_chatid():
@@ -271,7 +317,9 @@ async def test_cmd_p2p_buy(mock_db):
     update.message.reply_text = AsyncMock()
     context = MagicMock()
     context.args = ['10', '5']
-    with patch('web_portal.app.tg_bot.get_redis', return_value=MockRedis()):
+    placement = MagicMock(order=MagicMock(amount_manh=10, price_per_manh=5), trades=[], resting=10)
+    with patch('web_portal.app.tg_bot.get_redis', return_value=MockRedis()), \
+         patch('web_portal.app.tg_bot.place_order', return_value=placement):
         await call_with_db(cmd_p2p_buy, update, context, mock_db)
     update.message.reply_text.assert_awaited_once()
     assert "Buy order created" in update.message.reply_text.call_args[0][0]
@@ -285,8 +333,9 @@ async def test_cmd_sell(mock_db):
     update.message.reply_text = AsyncMock()
     context = MagicMock()
     context.args = ['10', '5']
-    mock_db.get.return_value = MagicMock(balance_manh=100)
-    with patch('web_portal.app.tg_bot.get_redis', return_value=MockRedis()):
+    placement = MagicMock(order=MagicMock(amount_manh=10, price_per_manh=5), trades=[], resting=10)
+    with patch('web_portal.app.tg_bot.get_redis', return_value=MockRedis()), \
+         patch('web_portal.app.tg_bot.place_order', return_value=placement):
         await call_with_db(cmd_sell, update, context, mock_db)
     update.message.reply_text.assert_awaited_once()
     assert "Sell order created" in update.message.reply_text.call_args[0][0]
@@ -294,35 +343,37 @@ async def test_cmd_sell(mock_db):
 @pytest.mark.asyncio
 async def test_cmd_orders(mock_db):
     from telegram import Update, Message
-    from web_portal.app.database.models import P2POrder
+    from decimal import Decimal
+    from web_portal.app.p2p.orderbook import BookOrder, OrderBook
     update = MagicMock(spec=Update)
     update.message = MagicMock(spec=Message)
     update.message.reply_text = AsyncMock()
     context = MagicMock()
-    mock_order = MagicMock(spec=P2POrder)
-    mock_order.id = 'order123'
-    mock_order.type = 'buy'
-    mock_order.amount = 10
-    mock_order.price = 5
-    mock_db.query.return_value.filter_by.return_value.all.return_value = [mock_order]
-    await call_with_db(cmd_orders, update, context, mock_db)
+    context.args = []
+    book = OrderBook()
+    book.loaded = True
+    book.add(BookOrder(id='order123', side='buy', user_id=1, price=Decimal(5), remaining=Decimal(10)))
+    with patch('web_portal.app.tg_bot.order_book', book):
+        await call_with_db(cmd_orders, update, context, mock_db)
     update.message.reply_text.assert_awaited_once()
     assert "Buy orders" in update.message.reply_text.call_args[0][0]
 
 @pytest.mark.asyncio
 async def test_cmd_cancel(mock_db):
     from telegram import Update, Message
-    from web_portal.app.database.models import P2POrder
+    from web_portal.app.database.models import BuyOrder
     update = MagicMock(spec=Update)
     update.effective_user.id = 12345
     update.message = MagicMock(spec=Message)
     update.message.reply_text = AsyncMock()
     context = MagicMock()
     context.args = ['order123', 'buy']
-    mock_order = MagicMock(spec=P2POrder)
+    mock_order = MagicMock(spec=BuyOrder)
+    mock_order.id = 'order123abc'
     mock_order.status = 'open'
     mock_db.query.return_value.filter.return_value.first.return_value = mock_order
-    await call_with_db(cmd_cancel, update, context, mock_db)
+    with patch('web_portal.app.tg_bot.cancel_order', return_value=True):
+        await call_with_db(cmd_cancel, update, context, mock_db)
     update.message.reply_text.assert_awaited_once()
     assert "cancelled" in update.message.reply_text.call_args[0][0]
 
@@ -332,15 +383,26 @@ async def test_cmd_referral(mock_db):
     update = MagicMock(spec=Update)
     update.effective_user.id = 12345
     update.message = MagicMock(spec=Message)
-    update.message.reply_photo = AsyncMock()
+    update.message.get_bot.return_value.id = 777
+    sent = MagicMock()
+    sent.photo = [MagicMock(file_id='small'), MagicMock(file_id='AgACqr')]
+    update.message.reply_photo = AsyncMock(return_value=sent)
     context = MagicMock()
     context.bot.username = 'testbot'
     mock_user = MagicMock()
     mock_user.referral_code = None
     mock_db.get.return_value = mock_user
-    with patch('web_portal.app.tg_bot.set_referral_code', return_value='R12345'):
+    from web_portal.app.telegram.media_cache import MediaCache
+    cache = MediaCache(None)  # memory only
+    with patch('web_portal.app.tg_bot.set_referral_code', return_value='R12345'), \
+            patch('web_portal.app.tg_bot.media_cache', cache):
         await call_with_db(cmd_referral, update, context, mock_db)
-    update.message.reply_photo.assert_awaited_once()
+        update.message.reply_photo.assert_awaited_once()
+        mock_user.referral_code = 'R12345'
+        await call_with_db(cmd_referral, update, context, mock_db)
+    # the second call resends the uploaded photo by file_id, without rendering
+    assert update.message.reply_photo.call_args.kwargs['photo'] == 'AgACqr'
+    assert cache.stats()['renders'] == 1 and cache.stats()['file_id_sends'] == 1
 
 @pytest.mark.asyncio
 async def test_cmd_faq():
@@ -356,3 +418,19 @@ async def test_cmd_faq():
 
 
 
+
+@pytest.mark.asyncio
+async def test_trade_notice_in_recipient_language():
+    import time
+    from decimal import Decimal
+    from web_portal.app.i18n import t, user_lang
+    from web_portal.app.p2p.events import TradeEvent
+    from web_portal.app.tg_bot import _notify_trade
+    user_lang(9001, "he")  # the seller has talked to the bot in Hebrew; the buyer never has
+    bot = MagicMock(spec=['send_message'])
+    bot.send_message = AsyncMock()
+    await _notify_trade(bot, TradeEvent("abcdef0123", "s1", "b1", 9001, 9002, Decimal("2"), Decimal("0.5"),
+                                        "buy", time.time()))
+    sent = {c.kwargs['chat_id']: c.kwargs['text'] for c in bot.send_message.call_args_list}
+    kw = {"trade": "abcdef01", "amount": "2", "price": "0.5", "total": "1.0"}
+    assert sent == {9001: t("he", "p2p.trade_sold", **kw), 9002: t("en", "p2p.trade_bought", **kw)}
@@ -0,0 +1,88 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'web_portal')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from telegram.error import Forbidden, NetworkError
+
+from web_portal.app.db import Base
+from web_portal.app.database.models import BroadcastJob, User
+from web_portal.app.telegram import broadcast
+
+
+class FakeBot:
+    rate_limiter = None
+
+    def __init__(self, blocked=(), broken=(), crash_after=None):
+        self.blocked = set(blocked)
+        self.broken = set(broken)
+        self.crash_after = crash_after
+        self.sent = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        if self.crash_after is not None and len(self.sent) >= self.crash_after:
+            raise RuntimeError("process died")
+        if chat_id in self.blocked:
+            raise Forbidden("Forbidden: bot was blocked by the user")
+        if chat_id in self.broken:
+            raise NetworkError("timed out")
+        self.sent.append(chat_id)
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add_all([User(id=i, balance_manh=0, total_xp=0) for i in range(1, 26)])
+        db.commit()
+    yield factory
+    engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_broadcast_counts_and_marks_blocked_users(session_factory):
+    with session_factory() as db:
+        job = broadcast.create_job(db, "hello", created_by=1)
+        job_id = job.id
+        assert job.total == 25
+    bot = FakeBot(blocked={3, 17}, broken={9})
+    await broadcast.run_job(bot, job_id, session_factory, batch_size=10, concurrency=4)
+
+    with session_factory() as db:
+        job = db.get(BroadcastJob, job_id)
+        assert (job.status, job.sent, job.failed, job.blocked) == ("done", 22, 1, 2)
+        assert job.cursor_user_id == 25
+        assert broadcast.job_progress(job)["percent"] == 100.0
+        assert {u.id for u in db.query(User).filter(User.bot_blocked_at.isnot(None))} == {3, 17}
+        # blocked users are left out of the next broadcast
+        assert broadcast.create_job(db, "again").total == 23
+
+
+@pytest.mark.asyncio
+async def test_broadcast_resumes_from_checkpoint(session_factory):
+    with session_factory() as db:
+        job_id = broadcast.create_job(db, "hello").id
+    crashing = FakeBot(crash_after=12)
+    await broadcast.run_job(crashing, job_id, session_factory, batch_size=10)
+    with session_factory() as db:
+        job = db.get(BroadcastJob, job_id)
+        assert job.status == "failed" and job.cursor_user_id == 10 and job.sent == 10
+        job.status = "running"  # as if the process had died mid-page
+        db.commit()
+
+    bot = FakeBot()
+    assert broadcast.resume_jobs(bot, session_factory) == 1
+    await broadcast._running[job_id]
+    assert bot.sent == list(range(11, 26))  # the checkpointed page is not resent
+    with session_factory() as db:
+        job = db.get(BroadcastJob, job_id)
+        assert (job.status, job.sent) == ("done", 25)
+        assert broadcast.find_job(db, job_id[:8]).id == job_id
+        assert not broadcast.cancel_job(db, job_id)  # already finished
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'web_portal')))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from web_portal.app.db import Base
+from web_portal.app.database.event_writer import EventWriter
+from web_portal.app.database.models import SecurityLog
+
+security_logs = SecurityLog.__table__
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def _row(i):
+    return {"event_type": "rate_limit_exceeded", "user_id": i, "details": {"n": i}, "created_at": datetime.utcnow()}
+
+
+def test_flush_batches_rows_and_counts_drops(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, stmt, params, ctx, many: statements.append(many) if "INSERT" in stmt else None)
+    writer = EventWriter(max_batch=100, max_buffer=250)
+    assert all(writer.write(security_logs, _row(i)) for i in range(250))
+    assert not writer.write(security_logs, _row(999))
+    assert writer.stats()["depth"] == 250 and writer.dropped == 1
+
+    Session = sessionmaker(bind=engine)
+    assert writer.flush(Session) == 250
+    assert statements == [True, True, True]  # three executemany chunks, no per-row INSERT
+    with Session() as db:
+        assert db.query(SecurityLog).count() == 250
+        assert db.query(SecurityLog).filter(SecurityLog.user_id == 7).one().details == {"n": 7}
+    assert writer.depth() == 0 and writer.written == 250
+
+
+def test_failed_flush_is_retried_once(engine):
+    Session = sessionmaker(bind=engine)
+    writer = EventWriter()
+    writer.write(security_logs, _row(1))
+    security_logs.drop(engine)
+    assert writer.flush(Session) == 0
+    assert writer.stats()["retrying"] == 1 and writer.dropped == 0
+    writer.write(security_logs, _row(2))
+    assert writer.flush(Session) == 0
+    assert writer.dropped == 1 and writer.depth() == 1  # the retried row is gone, the new one waits
+    security_logs.create(engine)
+    assert writer.flush(Session) == 1
+    assert writer.flush_errors == 2
+
+
+@pytest.mark.asyncio
+async def test_background_flush_by_size_age_and_on_stop(engine):
+    Session = sessionmaker(bind=engine)
+    writer = EventWriter(max_batch=10, max_age=0.05)
+    writer.start(Session)
+    for i in range(10):
+        writer.write(security_logs, _row(i))  # a full batch wakes the flusher
+    for _ in range(50):
+        await asyncio.sleep(0.01)
+        if writer.written == 10:
+            break
+    assert writer.written == 10
+    writer.write(security_logs, _row(10))
+    await asyncio.sleep(0.2)
+    assert writer.written == 11  # flushed once old enough
+    writer.max_age = 60
+    writer.write(security_logs, _row(11))
+    await writer.stop()
+    assert writer.written == 12 and writer.depth() == 0
+    with Session() as db:
+        assert db.query(SecurityLog).count() == 12
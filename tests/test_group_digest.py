@@ -0,0 +1,68 @@
+import asyncio
+import dataclasses
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'web_portal')))
+
+from web_portal.app.core.config import _windows, get_config
+from web_portal.app.telegram import groups
+from web_portal.app.telegram.groups import GroupNotifier, Severity
+
+
+class FakeBot:
+    rate_limiter = None
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+@pytest.fixture
+def config(monkeypatch):
+    cfg = dataclasses.replace(
+        get_config(), payment_group="-100", security_group="-200", log_group=None,
+        digest_windows={"payment": 0.05, "security": 0},
+    )
+    monkeypatch.setattr(groups, "get_config", lambda: cfg)
+    return cfg
+
+
+def test_digest_windows_parse():
+    assert _windows("log=60, payment=0,bogus,referral=x") == {"log": 60.0, "payment": 0.0}
+
+
+@pytest.mark.asyncio
+async def test_notifications_coalesce_into_one_digest(config):
+    notifier, bot = GroupNotifier(), FakeBot()
+    for i in range(5):
+        await notifier.notify(bot, "payment", f"withdrawal {i}")
+    await notifier.notify(bot, "payment", "treasury low", Severity.HIGH)
+    await notifier.notify(bot, "security", "rate limit")  # window 0: sent at once
+    await notifier.notify(bot, "log", "unconfigured group")  # no chat id: ignored
+    assert bot.sent == [(-100, "treasury low"), (-200, "rate limit")]
+    assert notifier.stats()["pending"] == {"payment": 5}
+
+    await asyncio.sleep(0.1)
+    assert len(bot.sent) == 3
+    chat_id, text = bot.sent[2]
+    assert chat_id == -100 and text.startswith("Digest: 5 notifications")
+    assert all(f"withdrawal {i}" in text for i in range(5))
+    assert notifier.stats()["pending"] == {}
+
+
+@pytest.mark.asyncio
+async def test_full_digest_flushes_early_and_splits(config, monkeypatch):
+    monkeypatch.setattr(groups, "MAX_DIGEST_ITEMS", 4)
+    notifier, bot = GroupNotifier(), FakeBot()
+    for i in range(4):
+        await notifier.notify(bot, "payment", f"{i}:" + "x" * 1500)
+    assert len(bot.sent) == 2  # flushed at 4 items, split to fit 4096 chars
+    assert all(len(text) <= 4096 for _, text in bot.sent)
+    await notifier.notify(bot, "payment", "last one")
+    await notifier.flush_all()
+    assert bot.sent[-1] == (-100, "last one")  # a single item goes out as is
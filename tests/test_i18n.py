@@ -0,0 +1,42 @@
+import os
+import sys
+from string import Formatter
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'web_portal')))
+
+from web_portal.app import i18n
+from web_portal.app.i18n import LANG_DEFAULT, T, resolve_lang, t, user_lang
+
+
+def _fields(s):
+    return {field for _, field, _, _ in Formatter().parse(s) if field is not None}
+
+
+@pytest.mark.parametrize("lang", sorted(T))
+def test_every_key_renders_in_every_language(lang):
+    assert set(T[lang]) == set(T[LANG_DEFAULT])
+    for key, template in T[LANG_DEFAULT].items():
+        assert _fields(T[lang][key]) == _fields(template), (lang, key)
+        kw = {name: f"<{name}>" for name in _fields(template)}
+        assert t(lang, key, **kw) == T[lang][key].format(**kw), (lang, key)
+
+
+def test_fallbacks():
+    assert t("xx", "start.back") == T["en"]["start.back"]
+    assert t("he", "no.such.key") == "no.such.key"
+    assert t("en", "market.day", change="+1.00", high=2, low=1) == "24h: +1.00%  high 2  low 1"
+    with pytest.raises(KeyError):
+        t("en", "manh.show")
+
+
+def test_user_language_is_resolved_once_per_code(monkeypatch):
+    assert [resolve_lang(c) for c in ("he-IL", "iw", "RU", "pt-br", "", None)] == ["he", "he", "ru", "en", "en", "en"]
+    calls = []
+    monkeypatch.setattr(i18n, "resolve_lang", lambda code: calls.append(code) or resolve_lang(code))
+    assert user_lang(777, "ar") == "ar" and user_lang(777, "ar") == "ar"
+    assert user_lang(777, "ru-RU") == "ru"  # switched app language
+    assert calls == ["ar", "ru-RU"]
+    assert user_lang(777) == "ru"  # no code at hand: the cached language
+    assert user_lang(778) == "en" and 778 not in i18n._user_langs
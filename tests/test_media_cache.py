@@ -0,0 +1,44 @@
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'web_portal')))
+
+from telegram.error import BadRequest
+
+from web_portal.app.telegram.media_cache import MediaCache
+
+
+def test_lru_and_disk_tier(tmp_path):
+    cache = MediaCache(str(tmp_path), max_items=2)
+    renders = []
+
+    def render(key):
+        renders.append(key)
+        return key.encode() * 10
+
+    for key in ("a", "b", "c"):
+        assert cache.get_or_render(key, lambda k=key: render(k)) == key.encode() * 10
+    assert cache.stats()["memory_items"] == 2  # "a" was evicted from memory ...
+    assert cache.get_or_render("a", lambda: render("a")) == b"a" * 10
+    assert renders == ["a", "b", "c"] and cache.counters["disk_hits"] == 1  # ... but not from disk
+
+    cache.set_file_id(1, "a", "FILE-A")
+    fresh = MediaCache(str(tmp_path))  # a restart keeps bytes and file ids
+    assert fresh.get("b") == b"b" * 10
+    assert fresh.file_id(1, "a") == "FILE-A" and fresh.file_id(2, "a") is None
+
+
+@pytest.mark.asyncio
+async def test_rejected_file_id_is_uploaded_again():
+    cache = MediaCache(None)
+    cache.set_file_id(5, "qr", "STALE")
+    message = MagicMock()
+    message.get_bot.return_value.id = 5
+    uploaded = MagicMock(photo=[MagicMock(file_id="NEW")])
+    message.reply_photo = AsyncMock(side_effect=[BadRequest("Wrong file identifier"), uploaded])
+    assert await cache.reply_photo(message, "qr", lambda: b"png") is uploaded
+    assert message.reply_photo.await_count == 2
+    assert cache.file_id(5, "qr") == "NEW"
@@ -0,0 +1,239 @@
+import os
+import sys
+from decimal import Decimal
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'web_portal')))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from web_portal.app.db import Base
+from web_portal.app.database.models import BuyOrder, SellOrder, User
+from web_portal.app.p2p.orderbook import BUY, SELL, BookOrder, OrderBook, order_book
+from web_portal.app.p2p.service import cancel_order, create_buy_order, create_sell_order, match_orders, place_order
+
+
+def _o(oid, side, price, amount="1"):
+    return BookOrder(id=oid, side=side, user_id=1, price=Decimal(price), remaining=Decimal(amount))
+
+
+def test_price_then_time_priority_and_cancel():
+    book = OrderBook()
+    for oid, price in [("a1", "2.0"), ("a2", "1.5"), ("a3", "1.5"), ("a4", "3")]:
+        book.add(_o(oid, SELL, price))
+    for oid, price in [("b1", "1.0"), ("b2", "1.2"), ("b3", "1.2")]:
+        book.add(_o(oid, BUY, price))
+
+    assert book.best_ask().id == "a2" and book.best_bid().id == "b2"
+    assert [o.id for o in book.orders(SELL)] == ["a2", "a3", "a1", "a4"]
+    assert not book.crossed()
+
+    book.cancel("a2")
+    assert book.best_ask().id == "a3"
+    book.fill("b2", Decimal("0.4"))
+    assert book.best_bid().id == "b2" and book.best_bid().remaining == Decimal("0.6")
+    book.fill("b2", Decimal("0.6"))
+    assert book.best_bid().id == "b3"
+    assert book.cancel("missing") is None
+    with pytest.raises(ValueError):
+        book.add(_o("b3", BUY, "9"))
+
+
+def test_dead_entries_are_compacted():
+    book = OrderBook()
+    for i in range(500):
+        book.add(_o(f"s{i}", SELL, str(100 + i)))
+    for i in range(1, 500):
+        book.cancel(f"s{i}")  # never at the top, so only compaction reclaims them
+    assert len(book) == 1
+    assert len(book._sides[SELL]._heap) < 200
+    assert book.best_ask().id == "s0"
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    order_book.invalidate()
+    with sessionmaker(bind=engine)() as s:
+        s.add_all([User(id=1, balance_manh=Decimal("100")), User(id=2, balance_manh=Decimal("0"))])
+        s.commit()
+        yield s
+    order_book.invalidate()
+
+
+def test_service_writes_through_and_matches_partials(db):
+    s1 = create_sell_order(db, 1, Decimal("5"), Decimal("2"))
+    order_book.rebuild(db)
+    assert order_book.best_ask().id == s1.id
+
+    s2 = create_sell_order(db, 1, Decimal("5"), Decimal("1.5"))
+    doomed = create_buy_order(db, 2, Decimal("1"), Decimal("1"))
+    assert cancel_order(db, 2, doomed.id, "buy")
+    assert order_book.get(doomed.id) is None
+
+    trades = place_order(db, 2, BUY, Decimal("3"), Decimal("1.5")).trades
+    assert [(t.sell_order_id, t.amount_manh) for t in trades] == [(s2.id, Decimal("3"))]
+    assert db.get(SellOrder, s2.id).status == "partial"
+    assert order_book.best_ask().remaining == Decimal("2")
+
+    # the partial order keeps its priority and is matched again
+    trades = place_order(db, 2, BUY, Decimal("4"), Decimal("2")).trades
+    assert [(t.sell_order_id, t.amount_manh) for t in trades] == [(s2.id, Decimal("2")), (s1.id, Decimal("2"))]
+    assert db.get(User, 2).balance_manh == Decimal("7")
+    assert not order_book.crossed()
+
+    # rows written behind the book's back are swept after a rebuild
+    db.add(BuyOrder(id="external", user_id=2, amount_manh=1, price_per_manh=3, total_price=3, filled_amount=0))
+    db.commit()
+    order_book.rebuild(db)
+    assert [t.buy_order_id for t in match_orders(db)] == ["external"]
+
+    # a fresh rebuild from the DB reproduces the same book
+    before = [(o.id, o.remaining) for o in order_book.orders(SELL)]
+    order_book.rebuild(db)
+    assert [(o.id, o.remaining) for o in order_book.orders(SELL)] == before
+    assert order_book.best_bid() is None and db.query(BuyOrder).filter_by(status="filled").count() == 3
+
+
+def test_placement_matches_incrementally_at_resting_prices(db):
+    from web_portal.app.p2p import events
+
+    seen = []
+    events.subscribe(seen.append)
+    try:
+        asks = [create_sell_order(db, 1, Decimal("2"), Decimal(p)) for p in ("1.1", "1.0", "1.3")]
+        placed = place_order(db, 2, BUY, Decimal("5"), Decimal("1.2"))
+    finally:
+        events.unsubscribe(seen.append)
+
+    # best ask first, each at its own price; the 1.3 ask is out of range
+    assert [(t.sell_order_id, t.price_per_manh) for t in placed.trades] == [
+        (asks[1].id, Decimal("1.0")), (asks[0].id, Decimal("1.1"))]
+    assert placed.resting == Decimal("1")
+    assert order_book.best_bid().id == placed.order.id and order_book.best_ask().id == asks[2].id
+    assert [(e.buyer_id, e.seller_id, e.taker_side) for e in seen] == [(2, 1, BUY), (2, 1, BUY)]
+    assert db.get(User, 2).balance_manh == Decimal("4")
+    assert match_orders(db) == []  # placement left nothing crossed
+
+
+def test_depth_levels_and_cursor_pages():
+    book = OrderBook()
+    for i, price in enumerate(["1.5", "1.5", "1.4", "2", "1.5"]):
+        book.add(BookOrder(id=f"a{i}", side=SELL, user_id=i % 2, price=Decimal(price), remaining=Decimal(i + 1)))
+    book.add(_o("b0", BUY, "1.2", "3"))
+
+    assert [(l.price, l.amount, l.count) for l in book.depth(SELL)] == [
+        (Decimal("1.4"), Decimal(3), 1), (Decimal("1.5"), Decimal(8), 3), (Decimal("2"), Decimal(4), 1)]
+    snapshot = book._sides[SELL].depth()
+    book.fill("a0", Decimal("0.5"))
+    book.cancel("a1")
+    assert book.depth(SELL, 2)[1] == type(snapshot[1])(Decimal("1.5"), Decimal("5.5"), 2)
+    book.depth(SELL)
+    cached = book._sides[SELL]._depth
+    book.fill("b0", Decimal(1))  # the other side leaves the ask snapshot alone
+    assert book._sides[SELL]._depth is cached
+
+    assert [o.id for o in book.page(SELL, user_id=0)[0]] == ["a2", "a0", "a4"]
+    seen, cursor = [], None
+    while True:
+        page, cursor = book.page(cursor=cursor, limit=2)
+        seen += [o.id for o in page]
+        if cursor is None:
+            break
+        book.cancel(page[-1].id)  # removing the cursor's own order does not lose the position
+    assert seen == ["b0", "a2", "a0", "a4", "a3"]
+    with pytest.raises(ValueError):
+        book.page(BUY, cursor="sell:1:1")
+
+
+def test_expiry_sweep_closes_due_orders_and_releases_escrow(db):
+    from datetime import datetime, timedelta
+    from web_portal.app.p2p import events
+    from web_portal.app.p2p.expiry import expire_orders
+
+    stale_sell = create_sell_order(db, 1, Decimal("4"), Decimal("2"))
+    live_sell = create_sell_order(db, 1, Decimal("1"), Decimal("3"), expires_in_hours=48)
+    stale_buys = [create_buy_order(db, 2, Decimal("1"), Decimal("1")) for _ in range(5)]
+    place_order(db, 2, BUY, Decimal("1"), Decimal("2"))  # partially fills the stale sell
+    assert db.get(User, 1).reserved_manh == Decimal("4")
+
+    closed = []
+    events.subscribe(closed.append)
+    try:
+        n = expire_orders(db, now=datetime.utcnow() + timedelta(hours=25), batch_size=2)
+    finally:
+        events.unsubscribe(closed.append)
+
+    assert n == 6 and len(closed) == 6
+    assert {e.order_id for e in closed} == {stale_sell.id, *(b.id for b in stale_buys)}
+    assert db.get(SellOrder, stale_sell.id).status == "expired"
+    assert db.get(SellOrder, live_sell.id).status == "open"
+    assert db.get(User, 1).reserved_manh == Decimal("1")  # only the live order stays escrowed
+    assert [o.id for o in order_book.orders(SELL)] == [live_sell.id] and order_book.best_bid() is None
+    assert expire_orders(db, now=datetime.utcnow() + timedelta(hours=25)) == 0
+
+
+def test_cancel_after_expiry_releases_nothing(db):
+    from datetime import datetime, timedelta
+    from web_portal.app.p2p.expiry import expire_orders
+
+    stale = create_sell_order(db, 1, Decimal("4"), Decimal("2"))
+    live = create_sell_order(db, 1, Decimal("3"), Decimal("2"), expires_in_hours=48)
+    assert stale.status == "open"  # loaded copy the cancel must not trust
+    assert expire_orders(db, now=datetime.utcnow() + timedelta(hours=25)) == 1
+
+    assert not cancel_order(db, 1, stale.id, "sell")
+    assert not cancel_order(db, 2, live.id, "sell")  # not the owner
+    db.expire_all()
+    assert db.get(SellOrder, stale.id).status == "expired"
+    assert db.get(User, 1).reserved_manh == Decimal("3")
+
+    assert cancel_order(db, 1, live.id, "sell") and not cancel_order(db, 1, live.id, "sell")
+    db.expire_all()
+    assert db.get(User, 1).reserved_manh == Decimal("0")
+
+
+def test_matcher_expires_stale_resting_orders(db):
+    from datetime import datetime, timedelta
+
+    stale = create_sell_order(db, 1, Decimal("2"), Decimal("1"))
+    order_book.get(stale.id).expires_at = datetime.utcnow() - timedelta(seconds=1)
+    placed = place_order(db, 2, BUY, Decimal("1"), Decimal("1"))
+    assert placed.trades == [] and placed.resting == Decimal("1")
+    assert db.get(SellOrder, stale.id).status == "expired"
+    assert db.get(User, 1).reserved_manh == Decimal("0")
+
+
+def test_market_data_folds_trades_into_candles_and_round_trips(db):
+    from web_portal.app.database.models import MarketCandle
+    from web_portal.app.p2p import events
+    from web_portal.app.p2p.market import MarketData
+
+    md = MarketData(tape_size=3)
+    events.subscribe(md.record)
+    try:
+        for price in ("1.0", "1.4", "0.8", "1.2"):
+            create_sell_order(db, 1, Decimal("2"), Decimal(price))
+            place_order(db, 2, BUY, Decimal("2"), Decimal(price))
+    finally:
+        events.unsubscribe(md.record)
+
+    assert [t["price"] for t in md.trades()] == ["1.2", "0.8", "1.4"]  # newest first, ring of 3
+    hour = md.candles("1h")[-1]
+    assert (hour["open"], hour["high"], hour["low"], hour["close"]) == (1.0, 1.4, 0.8, 1.2)
+    assert (hour["volume"], hour["count"]) == (8.0, 4)
+    s = md.summary()
+    assert s["last_price"] == "1.2" and s["trades_24h"] == 4 and s["change_24h_pct"] == 20.0
+    with pytest.raises(ValueError):
+        md.candles("5m")
+
+    assert md.snapshot(db) == 3
+    assert md.snapshot(db) == 0
+    restored = MarketData()
+    restored.restore(db)
+    assert restored.candles("1h") == md.candles("1h")
+    assert db.query(MarketCandle).count() == 3 and len(restored.trades()) == 4
@@ -0,0 +1,74 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'web_portal')))
+
+from telegram.error import RetryAfter
+
+from web_portal.app.telegram.outbound import Lane, OutboundScheduler
+
+
+def _send(limiter, sent, chat_id, lane=None, endpoint="sendMessage"):
+    async def callback(*args, **kwargs):
+        sent.append(chat_id)
+        return {"ok": True}
+    return limiter.process_request(callback, (), {}, endpoint, {"chat_id": chat_id}, lane)
+
+
+@pytest.mark.asyncio
+async def test_replies_jump_the_global_queue():
+    limiter = OutboundScheduler(global_rate=50)
+    limiter._tokens = 0  # the bucket is drained, everything queues
+    sent = []
+    bulk = [asyncio.create_task(_send(limiter, sent, 1000 + i, Lane.BULK)) for i in range(5)]
+    await asyncio.sleep(0)
+    reply = asyncio.create_task(_send(limiter, sent, 7))
+    await asyncio.gather(*bulk, reply)
+    assert sent.index(7) <= 1  # at most the bulk message already granted goes first
+    assert limiter.stats()["queued"] == {"reply": 0, "notify": 0, "bulk": 0}
+    assert limiter.sent == 6
+    await limiter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_per_chat_and_group_spacing():
+    limiter = OutboundScheduler(global_rate=1000, chat_interval=0.05, chat_burst=2, group_per_minute=1200)
+    sent = []
+    t0 = time.monotonic()
+    await asyncio.gather(*(_send(limiter, sent, 42) for _ in range(4)))
+    private = time.monotonic() - t0  # 2 burst, then 0.05s apart
+    t0 = time.monotonic()
+    await asyncio.gather(*(_send(limiter, sent, -100123) for _ in range(3)))
+    group = time.monotonic() - t0  # no burst in groups
+    assert 0.09 <= private < 0.5 and 0.09 <= group < 0.5
+    t0 = time.monotonic()
+    await asyncio.gather(*(_send(limiter, sent, None, endpoint="answerCallbackQuery") for _ in range(20)))
+    assert time.monotonic() - t0 < 0.05  # not a message send
+    await limiter.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_honoured_then_gives_up():
+    limiter = OutboundScheduler(max_retries=2)
+    calls = []
+
+    async def flaky(*args, **kwargs):
+        calls.append(1)
+        if len(calls) < 3:
+            raise RetryAfter(0)
+        return "ok"
+
+    assert await limiter.process_request(flaky, (), {}, "sendMessage", {"chat_id": 5}, None) == "ok"
+    assert limiter.retries == 2
+
+    async def flooded(*args, **kwargs):
+        raise RetryAfter(0)
+
+    with pytest.raises(RetryAfter):
+        await limiter.process_request(flooded, (), {}, "sendMessage", {"chat_id": 6}, int(Lane.NOTIFY))
+    assert limiter.retries == 5
+    await limiter.shutdown()
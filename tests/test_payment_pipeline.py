@@ -0,0 +1,136 @@
+import dataclasses
+import os
+import sys
+import time
+from decimal import Decimal
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'web_portal')))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from web_portal.app.core import config
+from web_portal.app.db import Base
+from web_portal.app.database.models import LedgerEvent, User
+from web_portal.app.payments.ton.service import create_invoice, list_invoices, poll_and_confirm_invoices
+from web_portal.app.payments.ton.simulator import BurstPattern, TonCenterSimulator
+from web_portal.app.payments.ton.toncenter import TonCenter
+
+TREASURY = "EQSimTreasury"
+
+
+@pytest.fixture
+def db(monkeypatch):
+    cfg = dataclasses.replace(config.get_config(), hmac_key=b"s" * 32, treasury_address=TREASURY)
+    monkeypatch.setattr(config, "_config", cfg)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as s:
+        s.add(User(id=7, balance_manh=0, total_xp=0))
+        s.commit()
+        yield s
+
+
+def test_burst_larger_than_a_page_is_fully_confirmed(db):
+    clock = [time.time()]  # utime must not predate the invoices or paging stops early
+    sim = TonCenterSimulator(TREASURY, rate=0, burst=BurstPattern(every_sec=1, size=500),
+                             noise_ratio=1.0, clock=lambda: clock[0])
+    tc = TonCenter(base_url="http://sim/api/v2", api_key="x", client=httpx.Client(transport=sim.transport()))
+
+    comments = []
+    for _ in range(60):
+        inv = create_invoice(db, user_id=7, username=None, ils_amount=Decimal("2"), ton_ils_rate=Decimal("4"))
+        sim.pay_ton(inv.comment, inv.ton_amount)
+        comments.append(inv.comment)
+    sim.pay_ton(comments[0], Decimal("0.5"))  # a duplicate payment for the first invoice
+    sim.tick()
+    clock[0] += 1
+
+    result = poll_and_confirm_invoices(db, toncenter=tc, page_size=25)
+    assert result["ok"] and result["confirmed"] == 60
+    assert result["checked"] == 122  # 61 payments + 61 noise txs, paged 25 at a time
+    assert sim.requests == 6
+    assert db.get(User, 7).balance_manh == Decimal("120")
+    assert db.query(LedgerEvent).count() == 60
+    assert {i["status"] for i in list_invoices(db, user_id=7, limit=100)} == {"paid"}
+
+    assert poll_and_confirm_invoices(db, toncenter=tc)["confirmed"] == 0
+
+
+def test_simulator_paces_payments_at_rate():
+    clock = [0.0]
+    sim = TonCenterSimulator(TREASURY, rate=10, clock=lambda: clock[0])
+    for i in range(30):
+        sim.pay(f"memo{i}", 1)
+    sim.tick()
+    clock[0] = 1.0
+    assert sim.tick() == 10
+    clock[0] = 10.0
+    assert sim.tick() == 10  # idle time does not accumulate into a burst
+    txs = sim.get_transactions(TREASURY, limit=5)
+    assert [t["in_msg"]["message"] for t in txs] == [f"memo{i}" for i in range(19, 14, -1)]
+    older = sim.get_transactions(TREASURY, limit=3, lt=txs[-1]["transaction_id"]["lt"],
+                                 hash=txs[-1]["transaction_id"]["hash"])
+    assert older[0] == txs[-1] and older[-1]["in_msg"]["message"] == "memo13"
+    assert sim.get_transactions("EQsomeoneElse") == []
+
+
+def _paced_sim():
+    clock = [time.time()]
+    sim = TonCenterSimulator(TREASURY, rate=100, clock=lambda: clock[0])
+
+    def settle():
+        # queued payments are emitted once a second has passed on the simulator's clock
+        sim.tick()
+        clock[0] += 1
+        sim.tick()
+    return sim, settle
+
+
+def test_underpaid_memo_does_not_buy_the_invoice(db):
+    sim, settle = _paced_sim()
+    tc = TonCenter(base_url="http://sim/api/v2", api_key="x", client=httpx.Client(transport=sim.transport()))
+    inv = create_invoice(db, user_id=7, username=None, ils_amount=Decimal("2"), ton_ils_rate=Decimal("4"))
+    sim.pay(inv.comment, 1)  # dust carrying the right memo
+    settle()
+    assert poll_and_confirm_invoices(db, toncenter=tc)["confirmed"] == 0
+    assert list_invoices(db, user_id=7)[0]["status"] == "pending"
+
+    sim.pay_ton(inv.comment, inv.ton_amount)
+    settle()
+    assert poll_and_confirm_invoices(db, toncenter=tc)["confirmed"] == 1
+    assert db.get(User, 7).balance_manh == Decimal("2")
+
+
+def test_concurrent_pollers_credit_an_invoice_once(db, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'race.db'}")
+    Base.metadata.create_all(engine)
+    first, second = sessionmaker(bind=engine)(), sessionmaker(bind=engine)()
+    first.add(User(id=7, balance_manh=0, total_xp=0))
+    first.commit()
+    inv = create_invoice(first, user_id=7, username=None, ils_amount=Decimal("2"), ton_ils_rate=Decimal("4"))
+    sim, settle = _paced_sim()
+    sim.pay_ton(inv.comment, inv.ton_amount)
+    settle()
+    inner = sim.transport()
+    raced = []
+
+    def handler(request):
+        # the other poller confirms while this one is still reading the treasury
+        if not raced:
+            raced.append(None)
+            raced[0] = poll_and_confirm_invoices(second, toncenter=tc)["confirmed"]
+        return inner.handle_request(request)
+    tc = TonCenter(base_url="http://sim/api/v2", api_key="x", client=httpx.Client(transport=httpx.MockTransport(handler)))
+
+    assert poll_and_confirm_invoices(first, toncenter=tc)["confirmed"] == 0
+    assert raced == [1]
+    first.expire_all()
+    assert first.get(User, 7).balance_manh == Decimal("2")
+    assert first.query(LedgerEvent).count() == 1
+    first.close()
+    second.close()
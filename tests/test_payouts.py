@@ -0,0 +1,142 @@
+import base64
+import dataclasses
+import os
+import time
+import sys
+from decimal import Decimal
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'web_portal')))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from web_portal.app.core import config
+from web_portal.app.db import Base
+from web_portal.app.database.models import PayoutBatch, User, Withdrawal
+from web_portal.app.payments.ton.payouts import (
+    _crc16, batch_manifest, build_payout_batches, confirm_payouts, normalize_address, verify_manifest,
+)
+from web_portal.app.payments.ton.toncenter import TonCenter
+
+TREASURY = "EQTreasury"
+
+
+@pytest.fixture
+def db(monkeypatch):
+    cfg = dataclasses.replace(
+        config.get_config(), hmac_key=b"k" * 32, treasury_address=TREASURY, manh_price_ils=Decimal("1.00")
+    )
+    monkeypatch.setattr(config, "_config", cfg)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as s:
+        s.add(User(id=1, username="alice", balance_manh=0))
+        for i in range(5):
+            s.add(Withdrawal(id=f"w{i}", user_id=1, amount_manh=Decimal("10"), destination_address=f"EQdest{i}",
+                             status="approved"))
+        s.add(Withdrawal(id="pending", user_id=1, amount_manh=Decimal("3"), destination_address="EQx"))
+        s.commit()
+        yield s
+
+
+def _stub_toncenter(transactions, page_size=None):
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path.endswith("/getTransactions")
+        assert request.url.params["address"] == TREASURY
+        if page_size is None:
+            return httpx.Response(200, json={"ok": True, "result": transactions})
+        start = 0
+        if "lt" in request.url.params:
+            start = next(i for i, tx in enumerate(transactions)
+                         if tx["transaction_id"]["lt"] == request.url.params["lt"])
+        return httpx.Response(200, json={"ok": True, "result": transactions[start:start + page_size]})
+    return TonCenter(base_url="http://toncenter.local/api/v2", api_key="test",
+                     client=httpx.Client(transport=httpx.MockTransport(handler)))
+
+
+def test_batches_respect_size_limit_and_manifest_is_signed(db):
+    batches = build_payout_batches(db, operator_id=99, ton_ils_rate=Decimal("5"), max_items=2)
+    assert [b.item_count for b in batches] == [2, 2, 1]
+    assert build_payout_batches(db, operator_id=99, ton_ils_rate=Decimal("5")) == []  # nothing left unbatched
+
+    manifest = batch_manifest(db, batches[0].id)
+    assert manifest["signature"] == batches[0].manifest_sig
+    assert verify_manifest(manifest)
+    msg = manifest["body"]["messages"][0]
+    assert msg["amount_ton"] == "2.000000000" and msg["amount_nano"] == 2_000_000_000
+    manifest["body"]["messages"][0]["destination"] = "EQattacker"
+    assert not verify_manifest(manifest)
+
+
+def test_confirm_completes_withdrawals_and_batches(db):
+    b1, b2 = build_payout_batches(db, operator_id=99, ton_ils_rate=Decimal("5"), max_items=3)
+    items = batch_manifest(db, b1.id)["body"]["messages"]
+    txs = [
+        {"transaction_id": {"hash": "h1"}, "in_msg": {"message": ""},
+         "out_msgs": [{"destination": m["destination"], "value": str(m["amount_nano"]), "message": m["memo"]}
+                      for m in items]},
+        {"transaction_id": {"hash": "h2"}, "out_msgs": [{"destination": "EQother", "message": "unrelated"}]},
+    ]
+    result = confirm_payouts(db, toncenter=_stub_toncenter(txs))
+    assert result == {"ok": True, "completed": 3, "batches_confirmed": 1, "checked": 2}
+    assert db.get(PayoutBatch, b1.id).status == "confirmed"
+    assert db.get(PayoutBatch, b2.id).status == "exported"
+    assert {w.tx_hash for w in db.query(Withdrawal).filter_by(payout_batch_id=b1.id)} == {"h1"}
+    assert db.get(Withdrawal, "pending").status == "pending"
+
+    # already-completed payouts are not matched twice
+    assert confirm_payouts(db, toncenter=_stub_toncenter(txs))["completed"] == 0
+
+
+def _friendly(account: bytes, flag: int = 0x11) -> str:
+    body = bytes([flag, 0]) + account
+    return base64.urlsafe_b64encode(body + _crc16(body).to_bytes(2, "big")).decode()
+
+
+def test_address_forms_normalize_to_raw():
+    account = bytes(range(32))
+    raw = f"0:{account.hex()}"
+    assert normalize_address(_friendly(account)) == raw
+    assert normalize_address(_friendly(account, 0x51)) == raw  # non-bounceable
+    assert normalize_address(_friendly(account).replace("-", "+").replace("_", "/")) == raw
+    assert normalize_address(f"0:{account.hex().upper()}") == raw
+    assert normalize_address(_friendly(account)[:-1] + "A") != raw  # bad checksum
+    assert normalize_address(" EQdest0 ") == "EQdest0"
+
+
+def _pay(messages, tx_hash, lt=1):
+    return {"transaction_id": {"hash": tx_hash, "lt": str(lt)}, "utime": int(time.time()),
+            "out_msgs": [{"destination": d, "value": str(v), "message": memo} for d, v, memo in messages]}
+
+
+def test_confirm_requires_destination_and_amount(db):
+    account = bytes(range(32))
+    db.get(Withdrawal, "w0").destination_address = f"0:{account.hex()}"
+    db.commit()
+    [batch] = build_payout_batches(db, operator_id=99, ton_ils_rate=Decimal("5"), max_items=5)
+    items = {m["withdrawal_id"]: m for m in batch_manifest(db, batch.id)["body"]["messages"]}
+    txs = [_pay([
+        (_friendly(account), items["w0"]["amount_nano"], items["w0"]["memo"]),       # other address form: ok
+        ("EQattacker", items["w1"]["amount_nano"], items["w1"]["memo"]),             # wrong destination
+        ("EQdest2", items["w2"]["amount_nano"] - 1, items["w2"]["memo"]),            # short by one nano
+        ("EQdest3", items["w3"]["amount_nano"] + 5, items["w3"]["memo"]),            # overpaid: ok
+    ], "h1")]
+    result = confirm_payouts(db, toncenter=_stub_toncenter(txs))
+    assert result["completed"] == 2 and result["batches_confirmed"] == 0
+    assert {w.id: w.status for w in db.query(Withdrawal).filter_by(payout_batch_id=batch.id)} == {
+        "w0": "completed", "w1": "approved", "w2": "approved", "w3": "completed", "w4": "approved",
+    }
+    assert db.get(PayoutBatch, batch.id).status == "partial"
+
+
+def test_confirm_pages_back_through_busy_treasury(db):
+    [batch] = build_payout_batches(db, operator_id=99, ton_ils_rate=Decimal("5"), max_items=5)
+    items = batch_manifest(db, batch.id)["body"]["messages"]
+    noise = [_pay([("EQother", 1, "unrelated")], f"n{i}", lt=1000 - i) for i in range(7)]
+    payout = _pay([(m["destination"], m["amount_nano"], m["memo"]) for m in items], "h1", lt=10)
+    result = confirm_payouts(db, toncenter=_stub_toncenter(noise + [payout], page_size=3), page_size=3)
+    assert result["completed"] == 5 and result["batches_confirmed"] == 1 and result["checked"] == 8
@@ -0,0 +1,101 @@
+import os
+import sys
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'web_portal')))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+
+from web_portal.app.payments.ton.price_feed import PriceFeed, PriceQuote, register_provider
+
+
+def test_falls_back_to_next_provider():
+    def broken():
+        raise RuntimeError("provider down")
+    register_provider("test_broken", broken)
+    register_provider("test_fixed", lambda: Decimal("7.5"))
+    feed = PriceFeed(providers=["test_broken", "test_fixed"], refresh_sec=60, stale_grace_sec=60)
+    q = feed.get(ttl_sec=120)
+    assert q.ton_ils == Decimal("7.5")
+    assert q.source == "test_fixed"
+    assert set(feed.stats()["last_latency_sec"]) == {"test_broken", "test_fixed"}
+
+
+def test_all_providers_failing_raises():
+    feed = PriceFeed(providers=["does_not_exist"], refresh_sec=60, stale_grace_sec=60)
+    with pytest.raises(RuntimeError):
+        feed.get()
+    assert "does_not_exist" in feed.last_error
+
+
+def test_stale_quote_served_within_grace():
+    calls = []
+    register_provider("test_counting", lambda: calls.append(1) or Decimal("6"))
+    feed = PriceFeed(providers=["test_counting"], refresh_sec=60, stale_grace_sec=300)
+    feed._quote = PriceQuote(ton_ils=Decimal("5"), ts=time.time() - 200, source="old")
+    q = feed.get(ttl_sec=120)
+    assert q.source == "old"  # stale but inside the grace window
+    for _ in range(50):
+        if feed.current().source == "test_counting":
+            break
+        time.sleep(0.01)
+    assert feed.current().ton_ils == Decimal("6")
+    assert len(calls) == 1
+
+
+def test_concurrent_cold_readers_fetch_once():
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.05)
+        return Decimal("5.1")
+
+    register_provider("test_slow", slow)
+    feed = PriceFeed(providers=["test_slow"], refresh_sec=60, stale_grace_sec=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(feed.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert all(r.ton_ils == Decimal("5.1") for r in results)
+
+
+def test_history_downsamples_and_round_trips_through_db():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from web_portal.app.database.models import PriceCandle
+    from web_portal.app.payments.ton.price_history import PriceHistory
+
+    now = int(time.time())
+    base = now - (now % 3600) - 7200
+    h = PriceHistory(raw_capacity=4)
+    for i, price in enumerate(["5.0", "5.4", "4.8", "5.1", "5.2"]):
+        h.record(PriceQuote(ton_ils=Decimal(price), ts=base + i * 30, source="t"))
+
+    assert len(h.quotes()) == 4  # ring capacity
+    minutes = h.candles("1m")
+    assert [c["ts"] for c in minutes] == [base, base + 60, base + 120]
+    assert minutes[0]["open"] == 5.0 and minutes[0]["close"] == 5.4
+    hour = h.candles("1h")[-1]
+    assert (hour["open"], hour["high"], hour["low"], hour["close"], hour["count"]) == (5.0, 5.4, 4.8, 5.2, 5)
+    with pytest.raises(ValueError):
+        h.candles("5m")
+
+    engine = create_engine("sqlite://")
+    PriceCandle.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        assert h.snapshot(db) == 3 + 1 + 1
+        assert h.snapshot(db) == 0  # nothing touched since
+
+    restored = PriceHistory()
+    with Session() as db:
+        restored.restore(db)
+    assert restored.candles("1m") == h.candles("1m")
+    assert restored.candles("1h") == h.candles("1h")
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import sys
+import time
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'web_portal')))
+
+from web_portal.app.database.models import Base, User
+from web_portal.app.manh.balances import apply_balance_delta
+from web_portal.app.p2p.events import TradeEvent, publish
+from web_portal.app.push import EVERYONE, PushHub, push_hub
+
+
+def _drain(conn):
+    frames = []
+    while not conn.queue.empty():
+        frames.append(conn.queue.get_nowait())
+    return frames
+
+
+@pytest.mark.asyncio
+async def test_ledger_writes_push_after_commit_only():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(User(id=1, balance_manh=Decimal("10"), total_xp=0))
+    db.commit()
+    await push_hub.start()
+    conn = push_hub.connect(1)
+    try:
+        apply_balance_delta(db, 1, Decimal("5"), "purchase")
+        db.rollback()
+        apply_balance_delta(db, 1, Decimal("2"), "purchase")
+        await asyncio.sleep(0)
+        assert _drain(conn) == []  # nothing before the commit, nothing for the rolled back delta
+        db.commit()
+        await asyncio.sleep(0)
+        [frame] = _drain(conn)
+        assert "event: balance\n" in frame and '"balance":"12.000000000"' in frame
+    finally:
+        push_hub.disconnect(conn)
+        await push_hub.stop()
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_trades_fan_out_to_both_sides_and_the_book():
+    hub = PushHub()
+    await hub.start()
+    seller, buyer, watcher = hub.connect(1), hub.connect(2), hub.connect(3)
+    try:
+        publish(TradeEvent("t1", "s1", "b1", 1, 2, Decimal("3"), Decimal("0.5"), "buy", time.time()))
+        await asyncio.sleep(0)
+        assert [f.split("\n")[1] for f in _drain(seller)] == ["event: trade", "event: book"]
+        assert '"side":"buy"' in _drain(buyer)[0]
+        assert ["event: book" in f for f in _drain(watcher)] == [True]
+        assert hub.stats()["connections"] == 3
+    finally:
+        await hub.stop()
+
+
+@pytest.mark.asyncio
+async def test_slow_client_gets_resync_and_heartbeats():
+    hub = PushHub(buffer=2, heartbeat_sec=0.01)
+    await hub.start()
+    conn = hub.connect(7)
+    for i in range(5):
+        hub.publish(7, "balance", {"n": i})
+    await asyncio.sleep(0)
+    assert hub.counters["dropped"] == 3
+
+    stream = hub.stream(conn)
+    assert await stream.__anext__() == "retry: 5000\n\n"
+    assert (await stream.__anext__()).startswith("event: resync")
+    assert await stream.__anext__() == ": ping\n\n"
+    hub.publish(7, "balance", {"n": 5})  # accepted again once the client caught up
+    await asyncio.sleep(0)
+    assert '"n":5' in await stream.__anext__()
+    await stream.aclose()
+    assert hub.stats()["connections"] == 0 and EVERYONE not in hub._conns
+    await hub.stop()
@@ -0,0 +1,102 @@
+import os
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'web_portal')))
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from web_portal.app.db import Base
+from web_portal.app.database.models import BroadcastJob, User, UserTag
+from web_portal.app.segments import SegmentIndex, parse, segment_index
+from web_portal.app.telegram import broadcast
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    past = datetime.utcnow() - timedelta(hours=1)
+    with factory() as db:
+        db.add_all([User(id=100 + i, balance_manh=Decimal(i % 5), reserved_manh=0, total_xp=i * 10,
+                         created_at=past - timedelta(minutes=i)) for i in range(40)])
+        db.flush()
+        db.add_all([UserTag(user_id=100 + i, tag="vip", created_at=past - timedelta(minutes=i))
+                    for i in range(0, 40, 2)])
+        db.add_all([UserTag(user_id=100 + i, tag="churned", created_at=past - timedelta(minutes=i))
+                    for i in range(0, 40, 3)])
+        db.commit()
+    yield factory
+    engine.dispose()
+
+
+def test_parse_precedence_and_errors():
+    assert parse("tag:a OR tag:b AND NOT tag:c") == (
+        "or", ("tag", "a"), ("and", ("tag", "b"), ("not", ("tag", "c")))
+    )
+    assert parse("(all) and balance >= 1.5") == ("and", ("all",), ("cmp", "balance", ">=", 1.5))
+    for bad in ("", "tag:a AND", "height>3", "tag:a tag:b", "(tag:a", "tag:a OR #"):
+        with pytest.raises(ValueError):
+            parse(bad)
+
+
+def test_segment_expressions_match_a_plain_filter(session_factory):
+    index = SegmentIndex()
+    with session_factory() as db:
+        index.rebuild(db)
+    expected = [100 + i for i in range(40) if i % 2 == 0 and i % 3 != 0 and i % 5 > 0]
+    assert index.resolve("tag:vip AND NOT tag:churned AND balance>0") == expected
+    assert index.count("tag:VIP OR xp >= 300") == len({i for i in range(40) if i % 2 == 0 or i >= 30})
+    assert index.count("NOT all") == 0
+    assert index.resolve("tag:unknown") == []
+
+
+def test_segment_refresh_is_incremental(session_factory):
+    index = SegmentIndex()
+    with session_factory() as db:
+        index.rebuild(db)
+        assert index.count("tag:vip") == 20
+        later = datetime.utcnow() + timedelta(minutes=1)
+        db.add(User(id=500, balance_manh=7, reserved_manh=3, total_xp=0, created_at=later))
+        db.flush()
+        db.add(UserTag(user_id=500, tag="vip", created_at=later))
+        db.execute(update(User).where(User.id == 101).values(bot_blocked_at=later, updated_at=later))
+        db.commit()
+        # the changed rows, plus the newest old ones (user 100 and its two tags) inside the overlap
+        assert index.refresh(db) == 6
+    assert index.resolve("tag:vip AND available>=4 AND reserved>0") == [500]
+    assert index.resolve("blocked") == [101]
+    index.remove_tag(500, "vip")
+    assert index.count("tag:vip") == 20
+
+
+@pytest.mark.asyncio
+async def test_broadcast_to_a_segment(session_factory):
+    class Bot:
+        rate_limiter = None
+        sent = []
+
+        async def send_message(self, chat_id, text, **kwargs):
+            self.sent.append(chat_id)
+
+    with session_factory() as db:
+        db.execute(update(User).where(User.id == 104).values(bot_blocked_at=datetime.utcnow()))
+        db.commit()
+        segment_index.rebuild(db)
+        with pytest.raises(ValueError):
+            broadcast.create_job(db, "hi", target="tag:vip AND")
+        job = broadcast.create_job(db, "hi", target="tag:vip AND NOT tag:churned")
+        job_id = job.id
+        assert job.total == 12  # 13 members, one blocked
+    bot = Bot()
+    await broadcast.run_job(bot, job_id, session_factory, batch_size=4)
+    assert bot.sent == [100 + i for i in range(40) if i % 2 == 0 and i % 3 != 0 and i != 4]
+    with session_factory() as db:
+        job = db.get(BroadcastJob, job_id)
+        assert (job.status, job.sent) == ("done", 12)
@@ -0,0 +1,54 @@
+import dataclasses
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'web_portal')))
+
+from web_portal.app.core import session_tokens
+from web_portal.app.core.config import _keyring, get_config
+from web_portal.app.core.session_tokens import TokenError, issue, verify
+
+
+@pytest.fixture
+def keys(monkeypatch):
+    state = {}
+
+    def use(ring):
+        state["cfg"] = dataclasses.replace(get_config(), session_keys=ring, session_ttl_sec=600)
+    monkeypatch.setattr(session_tokens, "get_config", lambda: state["cfg"])
+    use({"k1": b"first-secret"})
+    return use
+
+
+def test_keyring_parse():
+    assert list(_keyring("k2:new, k1:old,bad,:x", "")) == ["k2", "k1"]
+    assert list(_keyring("", "123:abc")) == ["bt"] and _keyring("", "") == {}
+
+
+def test_round_trip_and_tampering(keys):
+    token, expires_at = issue(42, "he", now=1000)
+    assert token.startswith("v1.k1.") and expires_at == 1600
+    claims = verify(token, now=1500)
+    assert (claims.user_id, claims.lang, claims.expires_at) == (42, "he", 1600)
+
+    version, kid, payload, sig = token.split(".")
+    other, _ = issue(43, "he", now=1000)
+    for bad in (f"{version}.{kid}.{other.split('.')[2]}.{sig}", token[:-2], "v2" + token[2:], "garbage",
+                "v1.k1.\u00e9.x", f"{version}.{kid}.{payload}.{sig[:-1]}\u00e9"):
+        with pytest.raises(TokenError):
+            verify(bad, now=1500)
+    with pytest.raises(TokenError, match="expired"):
+        verify(token, now=1600)
+
+
+def test_rotation(keys):
+    old, _ = issue(7, "en")
+    keys({"k2": b"second-secret", "k1": b"first-secret"})
+    new, _ = issue(7, "en")
+    assert new.split(".")[1] == "k2"
+    assert verify(old).user_id == verify(new).user_id == 7  # old tokens live out their ttl
+    keys({"k2": b"second-secret"})
+    with pytest.raises(TokenError, match="unknown signing key"):
+        verify(old)
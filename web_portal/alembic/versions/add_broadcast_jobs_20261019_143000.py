@@ -0,0 +1,41 @@
+"""broadcast_jobs table and users.bot_blocked_at
+
+Revision ID: add_broadcast_jobs_20261019_143000
+Revises: add_market_candles_20261019_140000
+Create Date: 2026-10-19 14:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_broadcast_jobs_20261019_143000'
+down_revision = 'add_market_candles_20261019_140000'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('users', sa.Column('bot_blocked_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_table('broadcast_jobs',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('text', sa.String(), nullable=False),
+        sa.Column('target', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('created_by', sa.BigInteger(), nullable=True),
+        sa.Column('cursor_user_id', sa.BigInteger(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('sent', sa.Integer(), nullable=False),
+        sa.Column('failed', sa.Integer(), nullable=False),
+        sa.Column('blocked', sa.Integer(), nullable=False),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_broadcast_jobs_status', 'broadcast_jobs', ['status'])
+
+def downgrade():
+    op.drop_index('ix_broadcast_jobs_status', table_name='broadcast_jobs')
+    op.drop_table('broadcast_jobs')
+    op.drop_column('users', 'bot_blocked_at')
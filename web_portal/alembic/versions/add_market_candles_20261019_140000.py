@@ -0,0 +1,31 @@
+"""add p2p_market_candles table
+
+Revision ID: add_market_candles_20261019_140000
+Revises: p2p_order_expiry_index_20261019_133000
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_market_candles_20261019_140000'
+down_revision = 'p2p_order_expiry_index_20261019_133000'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('p2p_market_candles',
+        sa.Column('resolution', sa.String(length=8), nullable=False),
+        sa.Column('bucket_ts', sa.BigInteger(), nullable=False),
+        sa.Column('open', sa.Numeric(20, 9), nullable=False),
+        sa.Column('high', sa.Numeric(20, 9), nullable=False),
+        sa.Column('low', sa.Numeric(20, 9), nullable=False),
+        sa.Column('close', sa.Numeric(20, 9), nullable=False),
+        sa.Column('volume', sa.Numeric(20, 9), nullable=False),
+        sa.Column('trades', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('resolution', 'bucket_ts')
+    )
+
+def downgrade():
+    op.drop_table('p2p_market_candles')
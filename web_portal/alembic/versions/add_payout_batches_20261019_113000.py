@@ -0,0 +1,37 @@
+"""add payout_batches table and withdrawals.payout_batch_id
+
+Revision ID: add_payout_batches_20261019_113000
+Revises: add_price_candles_20261019_101500
+Create Date: 2026-10-19 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_payout_batches_20261019_113000'
+down_revision = 'add_price_candles_20261019_101500'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('payout_batches',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('item_count', sa.Integer(), nullable=False),
+        sa.Column('total_manh', sa.Numeric(20, 9), nullable=False),
+        sa.Column('ton_ils_rate', sa.Numeric(20, 9), nullable=False),
+        sa.Column('manifest_sig', sa.String(), nullable=True),
+        sa.Column('created_by', sa.BigInteger(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('confirmed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.add_column('withdrawals', sa.Column('payout_batch_id', sa.String(), nullable=True))
+    op.create_foreign_key('fk_withdrawals_payout_batch', 'withdrawals', 'payout_batches', ['payout_batch_id'], ['id'])
+    op.create_index('ix_withdrawals_payout_batch_id', 'withdrawals', ['payout_batch_id'])
+
+def downgrade():
+    op.drop_index('ix_withdrawals_payout_batch_id', table_name='withdrawals')
+    op.drop_constraint('fk_withdrawals_payout_batch', 'withdrawals', type_='foreignkey')
+    op.drop_column('withdrawals', 'payout_batch_id')
+    op.drop_table('payout_batches')
@@ -0,0 +1,30 @@
+"""add ton_price_candles table
+
+Revision ID: add_price_candles_20261019_101500
+Revises: stamp_final_20260219_153823
+Create Date: 2026-10-19 10:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_price_candles_20261019_101500'
+down_revision = 'stamp_final_20260219_153823'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('ton_price_candles',
+        sa.Column('resolution', sa.String(length=8), nullable=False),
+        sa.Column('bucket_ts', sa.BigInteger(), nullable=False),
+        sa.Column('open', sa.Numeric(20, 9), nullable=False),
+        sa.Column('high', sa.Numeric(20, 9), nullable=False),
+        sa.Column('low', sa.Numeric(20, 9), nullable=False),
+        sa.Column('close', sa.Numeric(20, 9), nullable=False),
+        sa.Column('samples', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('resolution', 'bucket_ts')
+    )
+
+def downgrade():
+    op.drop_table('ton_price_candles')
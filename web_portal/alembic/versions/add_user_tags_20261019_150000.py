@@ -0,0 +1,36 @@
+"""user_tags table for CRM tags and segments
+
+Revision ID: add_user_tags_20261019_150000
+Revises: add_broadcast_jobs_20261019_143000
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_user_tags_20261019_150000'
+down_revision = 'add_broadcast_jobs_20261019_143000'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table('user_tags'):
+        # created by hand for crm.add_tag on older deployments
+        if 'created_at' not in {c['name'] for c in inspector.get_columns('user_tags')}:
+            op.add_column('user_tags', sa.Column('created_at', sa.DateTime(timezone=True),
+                                                 server_default=sa.text('now()'), nullable=True))
+    else:
+        op.create_table('user_tags',
+            sa.Column('user_id', sa.BigInteger(), nullable=False),
+            sa.Column('tag', sa.String(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('user_id', 'tag')
+        )
+    if 'ix_user_tags_tag' not in {i['name'] for i in inspector.get_indexes('user_tags')}:
+        op.create_index('ix_user_tags_tag', 'user_tags', ['tag'])
+
+def downgrade():
+    op.drop_index('ix_user_tags_tag', table_name='user_tags')
+    op.drop_table('user_tags')
@@ -0,0 +1,26 @@
+"""invoice expiry/confirmation columns and status index
+
+Revision ID: invoice_lifecycle_20261019_120000
+Revises: add_payout_batches_20261019_113000
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'invoice_lifecycle_20261019_120000'
+down_revision = 'add_payout_batches_20261019_113000'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('invoices', sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('invoices', sa.Column('confirmed_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('invoices', sa.Column('tx_hash', sa.String(), nullable=True))
+    op.create_index('ix_invoices_status', 'invoices', ['status'])
+
+def downgrade():
+    op.drop_index('ix_invoices_status', table_name='invoices')
+    op.drop_column('invoices', 'tx_hash')
+    op.drop_column('invoices', 'confirmed_at')
+    op.drop_column('invoices', 'expires_at')
@@ -0,0 +1,24 @@
+"""(user_id, created_at, id) indexes for paginated bot listings
+
+Revision ID: listing_keyset_indexes_20261019_153000
+Revises: add_user_tags_20261019_150000
+Create Date: 2026-10-19 15:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'listing_keyset_indexes_20261019_153000'
+down_revision = 'add_user_tags_20261019_150000'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_invoices_user_created_at', 'invoices', ['user_id', 'created_at', 'id'])
+    op.create_index('ix_withdrawals_user_requested_at', 'withdrawals', ['user_id', 'requested_at', 'id'])
+    op.create_index('ix_ledger_events_user_created_at', 'ledger_events', ['user_id', 'created_at', 'id'])
+
+def downgrade():
+    op.drop_index('ix_ledger_events_user_created_at', table_name='ledger_events')
+    op.drop_index('ix_withdrawals_user_requested_at', table_name='withdrawals')
+    op.drop_index('ix_invoices_user_created_at', table_name='invoices')
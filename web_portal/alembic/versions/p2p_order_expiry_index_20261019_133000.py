@@ -0,0 +1,30 @@
+"""(status, expires_at) indexes for P2P order expiry; backfill missing expiries
+
+Revision ID: p2p_order_expiry_index_20261019_133000
+Revises: user_reserved_manh_20261019_130000
+Create Date: 2026-10-19 13:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'p2p_order_expiry_index_20261019_133000'
+down_revision = 'user_reserved_manh_20261019_130000'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_sell_orders_status_expires_at', 'sell_orders', ['status', 'expires_at'])
+    op.create_index('ix_buy_orders_status_expires_at', 'buy_orders', ['status', 'expires_at'])
+    # orders copied from p2p_orders have no expiry; give them the default 24h so the sweep reaches them
+    for table in ('sell_orders', 'buy_orders'):
+        op.execute(sa.text(f"""
+            UPDATE {table}
+            SET expires_at = COALESCE(created_at, now()) + interval '24 hours'
+            WHERE expires_at IS NULL AND status IN ('open', 'partial')
+        """))
+
+def downgrade():
+    # the backfilled expiries are kept; they are valid data without the indexes
+    op.drop_index('ix_buy_orders_status_expires_at', table_name='buy_orders')
+    op.drop_index('ix_sell_orders_status_expires_at', table_name='sell_orders')
@@ -0,0 +1,35 @@
+"""move open p2p_orders onto sell_orders/buy_orders
+
+Revision ID: p2p_orders_to_book_20261019_123000
+Revises: invoice_lifecycle_20261019_120000
+Create Date: 2026-10-19 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'p2p_orders_to_book_20261019_123000'
+down_revision = 'invoice_lifecycle_20261019_120000'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    conn = op.get_bind()
+    for side, table in (('sell', 'sell_orders'), ('buy', 'buy_orders')):
+        conn.execute(sa.text(f"""
+            INSERT INTO {table} (id, user_id, amount_manh, price_per_manh, total_price, status, created_at, filled_amount)
+            SELECT id, user_id, amount, price, amount * price, 'open', created_at, 0
+            FROM p2p_orders
+            WHERE status = 'open' AND type = :side
+        """), {'side': side})
+    conn.execute(sa.text("UPDATE p2p_orders SET status = 'migrated' WHERE status = 'open'"))
+
+def downgrade():
+    conn = op.get_bind()
+    for side, table in (('sell', 'sell_orders'), ('buy', 'buy_orders')):
+        conn.execute(sa.text(f"""
+            DELETE FROM {table}
+            WHERE status = 'open'
+              AND id IN (SELECT id FROM p2p_orders WHERE status = 'migrated' AND type = :side)
+        """), {'side': side})
+    conn.execute(sa.text("UPDATE p2p_orders SET status = 'open' WHERE status = 'migrated'"))
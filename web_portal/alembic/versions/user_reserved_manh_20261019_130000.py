@@ -0,0 +1,33 @@
+"""users.reserved_manh escrow for open sell orders
+
+Revision ID: user_reserved_manh_20261019_130000
+Revises: p2p_orders_to_book_20261019_123000
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'user_reserved_manh_20261019_130000'
+down_revision = 'p2p_orders_to_book_20261019_123000'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('users', sa.Column('reserved_manh', sa.Numeric(20, 9), nullable=False, server_default='0'))
+    # escrow what the open sell orders still offer; an order the balance cannot
+    # back stays unbacked and is cancelled by the matcher on its first fill
+    op.execute("""
+        UPDATE users SET reserved_manh = COALESCE((
+            SELECT SUM(s.amount_manh - COALESCE(s.filled_amount, 0))
+            FROM sell_orders s
+            WHERE s.user_id = users.id AND s.status IN ('open', 'partial')
+        ), 0)
+    """)
+    op.execute("""
+        UPDATE users SET reserved_manh = COALESCE(balance_manh, 0)
+        WHERE reserved_manh > COALESCE(balance_manh, 0)
+    """)
+
+def downgrade():
+    op.drop_column('users', 'reserved_manh')
@@ -1,59 +1,71 @@
-from fastapi import APIRouter, Depends, Request, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from web_portal.app.db import get_db
-from web_portal.app.database.models import User, Invoice
+from web_portal.app.p2p.market import market_data
+from web_portal.app.p2p.orderbook import BUY, SELL, MAX_DEPTH_LEVELS, MAX_PAGE_SIZE, order_book
 
 router = APIRouter(prefix="/api", tags=["api"])
 
-@router.get("/user_data")
-@router.post("/user_data")
-async def get_user_data(request: Request, user_id: int = None, db: Session = Depends(get_db)):
-    if user_id is None:
-        try:
-            body = await request.json()
-            user_id = body.get("user_id")
-        except:
-            return {"error": "Missing user_id"}
 
-    if user_id is None:
-        return {"error": "Missing user_id"}
+@router.get("/orders")
+def get_orders(
+    user_id: Optional[int] = None,
+    side: Optional[str] = Query(default=None, pattern="^(buy|sell)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=MAX_PAGE_SIZE),
+    levels: int = Query(default=10, ge=1, le=MAX_DEPTH_LEVELS),
+    db: Session = Depends(get_db),
+):
+    book = order_book.ensure_loaded(db)
+    try:
+        orders, next_cursor = book.page(side, cursor=cursor, limit=limit, user_id=user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        return {"error": "User not found"}
+    def level(l):
+        return {"price": str(l.price), "amount": str(l.amount), "count": l.count}
 
-    invoices = db.query(Invoice).filter(Invoice.user_id == user_id).order_by(Invoice.created_at.desc()).limit(10).all()
     return {
-        "balance_manh": str(user.balance_manh),
-        "total_xp": user.total_xp,
-        "invoices": [
+        "depth": {
+            "bids": [level(l) for l in book.depth(BUY, levels)],
+            "asks": [level(l) for l in book.depth(SELL, levels)],
+        },
+        "orders": [
             {
-                "id": inv.id,
-                "status": inv.status,
-                "ils_amount": str(inv.ils_amount),
-                "ton_amount": str(inv.ton_amount),
-                "manh_amount": str(inv.manh_amount),
-                "created_at": inv.created_at.isoformat()
-            } for inv in invoices
-        ]
+                "id": o.id,
+                "type": o.side,
+                "amount": str(o.remaining),
+                "price": str(o.price),
+                "user_id": o.user_id,
+            }
+            for o in orders
+        ],
+        "next_cursor": next_cursor,
     }
 
-@router.get("/orders")
-def get_orders(user_id: int = None, db: Session = Depends(get_db)):
-    from web_portal.app.database.models import P2POrder
-    query = db.query(P2POrder).filter(P2POrder.status == 'open')
-    if user_id:
-        query = query.filter(P2POrder.user_id == user_id)
-    orders = query.all()
-    return [
-        {
-            "id": o.id,
-            "type": o.type,
-            "amount": str(o.amount),
-            "price": str(o.price),
-            "user_id": o.user_id
-        }
-        for o in orders
-    ]
-
 
+@router.get("/market")
+def get_market(
+    resolution: str = "1h",
+    limit: int = Query(default=100, ge=1, le=1000),
+    trades: int = Query(default=20, ge=0, le=200),
+    since: Optional[float] = None,
+    db: Session = Depends(get_db),
+):
+    # served from memory: the tape and candles are kept current by the matcher's events
+    try:
+        candles = market_data.candles(resolution, limit=limit, since=since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    book = order_book.ensure_loaded(db)
+    bid, ask = book.best_bid(), book.best_ask()
+    return {
+        **market_data.summary(),
+        "best_bid": str(bid.price) if bid else None,
+        "best_ask": str(ask.price) if ask else None,
+        "trades": market_data.trades(trades),
+        "resolution": resolution,
+        "candles": candles,
+    }
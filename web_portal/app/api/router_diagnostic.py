@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends, Header, HTTPException
 from sqlalchemy.orm import Session
 from web_portal.app.db import get_db
 from web_portal.app.database.models import User, Invoice, Withdrawal, ChatId
+from web_portal.app.core.config import get_config
+from web_portal.app.core.security import constant_time_equals
 from web_portal.app.core.settings import settings
 import os
 from datetime import datetime
@@ -9,8 +11,8 @@ from datetime import datetime
 router = APIRouter(prefix="/diagnostic", tags=["diagnostic"])
 
 def verify_secret(x_internal_secret: str = Header(..., alias="X-Internal-Secret")):
-    expected = os.getenv("INTERNAL_API_SECRET") or os.getenv("INTERNAL_SIGNING_SECRET")
-    if not expected or x_internal_secret != expected:
+    expected = get_config().internal_api_secret
+    if not expected or not constant_time_equals(x_internal_secret, expected):
         raise HTTPException(status_code=401, detail="Unauthorized")
     return True
 
@@ -1,57 +1,27 @@
-from fastapi import APIRouter, Request, HTTPException, Query, Depends
+import asyncio
+import hashlib
+import json
+
+from fastapi import APIRouter, Request, HTTPException, Depends, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from web_portal.app.database.models import User, Invoice
-from web_portal.app.db import get_db
+from web_portal.app.database.models import User, Invoice, Referral
+from web_portal.app.db import get_db, SessionLocal
+from web_portal.app.core import session_tokens
+from web_portal.app.core.session_tokens import SessionClaims, TokenError
 from web_portal.app.core.tg_initdata import verify_telegram_init_data, _parse_tg_user
 from web_portal.app.core.settings import settings
+from web_portal.app.i18n import resolve_lang
+from web_portal.app.manh.balances import available_balance
+from web_portal.app.manh.leaderboard import get_leaderboard
+from web_portal.app.p2p.orderbook import order_book
+from web_portal.app.push import push_hub
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-@router.get("/api/user_data")
-async def get_user_data(
-    request: Request,
-    user_id: int = Query(None, description="Telegram user ID"),
-    db: Session = Depends(get_db)
-):
-    # ?? user_id ?? ????, ???? ???? ??-initData
-    if user_id is None:
-        init_data = request.headers.get("X-Tg-Init-Data") or request.query_params.get("initData")
-        if init_data and settings.BOT_TOKEN:
-            try:
-                data = verify_telegram_init_data(init_data, settings.BOT_TOKEN)
-                user_data = _parse_tg_user(data)
-                user_id = user_data.get("id")
-                logger.info(f"Extracted user_id from initData: {user_id}")
-            except Exception as e:
-                logger.warning(f"Failed to extract user_id from initData: {e}")
-    
-    if user_id is None:
-        raise HTTPException(status_code=400, detail="user_id required or initData missing")
-    
-    user = db.get(User, user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="user not found")
-    
-    invoices = db.query(Invoice).filter_by(user_id=user_id).order_by(Invoice.created_at.desc()).limit(10).all()
-    invoice_list = [{
-        'id': inv.id,
-        'status': inv.status,
-        'ils_amount': float(inv.ils_amount) if inv.ils_amount else 0,
-        'ton_amount': float(inv.ton_amount) if inv.ton_amount else None,
-        'manh_amount': float(inv.manh_amount) if inv.manh_amount else None,
-        'created_at': inv.created_at.isoformat() if inv.created_at else None
-    } for inv in invoices]
-    
-    return {
-        'user_id': user.id,
-        'manh_balance': float(user.balance_manh or 0),
-        'xp': user.total_xp or 0,
-        'invoices': invoice_list,
-        'leaderboard': []
-    }
-
 @router.post("/api/get_user_id_from_initdata")
 async def get_user_id_from_initdata(request: Request, db: Session = Depends(get_db)):
     body = await request.json()
@@ -81,3 +51,173 @@ async def get_user_id_from_initdata(request: Request, db: Session = Depends(get_
         raise HTTPException(status_code=401, detail=str(e))
 
 
+# ---------- Mini-app sessions ----------
+def _verified_tg_user(init_data) -> dict:
+    if not init_data or not settings.BOT_TOKEN:
+        raise HTTPException(status_code=401, detail="initData required")
+    try:
+        data = verify_telegram_init_data(init_data, settings.BOT_TOKEN)
+    except ValueError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    tg_user = _parse_tg_user(data)
+    if not tg_user.get("id"):
+        raise HTTPException(status_code=401, detail="user id not found")
+    return tg_user
+
+
+def current_session(request: Request) -> SessionClaims:
+    """Dependency: the caller from a Bearer session token (one HMAC, no DB).
+
+    EventSource cannot set headers, so the token is also read from the
+    access_token query parameter. Clients without a token yet may still send
+    initData (X-Tg-Init-Data header or initData query), which is verified on
+    every request.
+    """
+    auth = request.headers.get("Authorization", "")
+    token = auth[7:].strip() if auth[:7].lower() == "bearer " else request.query_params.get("access_token")
+    if token:
+        try:
+            return session_tokens.verify(token)
+        except TokenError as e:
+            raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+    tg_user = _verified_tg_user(request.headers.get("X-Tg-Init-Data") or request.query_params.get("initData"))
+    return SessionClaims(int(tg_user["id"]), resolve_lang(tg_user.get("language_code")), 0)
+
+
+@router.post("/api/auth/telegram")
+async def auth_telegram(request: Request, db: Session = Depends(get_db)):
+    """Exchange Telegram initData for a session token used by the other mini-app calls."""
+    init_data = request.headers.get("X-Tg-Init-Data")
+    if not init_data:
+        try:
+            init_data = (await request.json()).get("initData")
+        except (ValueError, AttributeError):
+            init_data = None
+    tg_user = _verified_tg_user(init_data)
+    user_id = int(tg_user["id"])
+    if db.get(User, user_id) is None:
+        db.add(User(
+            id=user_id,
+            username=tg_user.get("username"),
+            first_name=tg_user.get("first_name"),
+            balance_manh=0,
+            total_xp=0
+        ))
+        db.commit()
+    lang = resolve_lang(tg_user.get("language_code"))
+    try:
+        token, expires_at = session_tokens.issue(user_id, lang)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"token": token, "token_type": "Bearer", "expires_at": expires_at, "user_id": user_id, "lang": lang}
+
+
+# ---------- Live events ----------
+@router.get("/api/events")
+async def events(request: Request, session: SessionClaims = Depends(current_session)):
+    """Server-sent events for the caller: balance, invoice, trade, order, book, resync."""
+    conn = push_hub.connect(session.user_id)
+    return StreamingResponse(
+        push_hub.stream(conn, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ---------- Mini-app bootstrap ----------
+
+
+def _balance(db: Session, user_id: int):
+    user = db.get(User, user_id)
+    if user is None:
+        return None
+    return {
+        "user_id": user.id,
+        "username": user.username,
+        "manh": str(user.balance_manh or 0),
+        "reserved": str(user.reserved_manh or 0),
+        "available": str(available_balance(user)),
+        "xp": user.total_xp or 0,
+    }
+
+
+def _invoices(db: Session, user_id: int):
+    rows = (db.query(Invoice).filter(Invoice.user_id == user_id)
+            .order_by(Invoice.created_at.desc(), Invoice.id.desc()).limit(10).all())
+    return [{
+        "id": inv.id,
+        "status": inv.status,
+        "ils_amount": str(inv.ils_amount),
+        "ton_amount": str(inv.ton_amount),
+        "manh_amount": str(inv.manh_amount),
+        "created_at": inv.created_at.isoformat() if inv.created_at else None,
+    } for inv in rows]
+
+
+def _leaderboard(db: Session, user_id: int):
+    return get_leaderboard(db, limit=10)
+
+
+def _orders(db: Session, user_id: int):
+    orders, _ = order_book.ensure_loaded(db).page(None, limit=20, user_id=user_id)
+    return [{"id": o.id, "type": o.side, "amount": str(o.remaining), "price": str(o.price)} for o in orders]
+
+
+def _referrals(db: Session, user_id: int):
+    total, rewarded = db.query(
+        func.count(Referral.id),
+        func.count(Referral.id).filter(Referral.reward_given.is_(True)),
+    ).filter(Referral.referrer_id == user_id).one()
+    return {"count": total, "rewarded": rewarded}
+
+
+_SECTIONS = {
+    "balance": _balance,
+    "invoices": _invoices,
+    "leaderboard": _leaderboard,
+    "orders": _orders,
+    "referrals": _referrals,
+}
+
+
+def _run_section(fn, user_id: int):
+    db = SessionLocal()
+    try:
+        return fn(db, user_id)
+    finally:
+        db.close()
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match compares weakly (RFC 9110 13.1.2)
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+@router.get("/api/bootstrap")
+async def bootstrap(request: Request, session: SessionClaims = Depends(current_session)):
+    """Everything the mini-app dashboard shows, in one response.
+
+    The sections are independent queries, each run on its own session in a
+    worker thread, so the response takes as long as the slowest one. The body
+    is serialized deterministically and its hash is a strong ETag: a client
+    sending it back in If-None-Match gets 304 while nothing has changed.
+    """
+    user_id = session.user_id
+    results = await asyncio.gather(*(asyncio.to_thread(_run_section, fn, user_id) for fn in _SECTIONS.values()))
+    data = dict(zip(_SECTIONS, results))
+    if data["balance"] is None:
+        raise HTTPException(status_code=404, detail="user not found")
+    body = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    etag = _etag(body)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import json
-import os
 from datetime import datetime, timezone
 from typing import Any
 
@@ -11,13 +10,11 @@ from sqlalchemy.orm import Session
 
 from .db import SessionLocal
 from .models import User, LedgerEvent
+from .core.config import get_config
 from .core.tg_initdata import verify_telegram_init_data
 
 router = APIRouter(prefix="/api", tags=["api"])
 
-AIRDROP_AMOUNT = int(os.getenv("AIRDROP_AMOUNT", "100"))
-BOT_TOKEN = (os.getenv("TELEGRAM_BOT_TOKEN") or "").strip()
-
 
 def utcnow():
     return datetime.now(timezone.utc)
@@ -47,7 +44,8 @@ def _parse_tg_user(d: dict[str, Any]) -> dict[str, Any]:
 
 @router.post("/auth/telegram")
 async def auth_telegram(request: Request, db: Session = Depends(get_db)) -> dict[str, Any]:
-    if not BOT_TOKEN:
+    cfg = get_config()
+    if not cfg.bot_token:
         raise HTTPException(status_code=500, detail="Missing TELEGRAM_BOT_TOKEN on server")
 
     body = None
@@ -61,7 +59,7 @@ async def auth_telegram(request: Request, db: Session = Depends(get_db)) -> dict
         raise HTTPException(status_code=400, detail="Missing initData")
 
     try:
-        d = verify_telegram_init_data(init_data, BOT_TOKEN)
+        d = verify_telegram_init_data(init_data, cfg.bot_token)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=f"unauthorized: {e}")
 
@@ -112,7 +110,8 @@ async def auth_telegram(request: Request, db: Session = Depends(get_db)) -> dict
 
 @router.post("/airdrop/claim")
 async def airdrop_claim(request: Request, db: Session = Depends(get_db)) -> dict[str, Any]:
-    if not BOT_TOKEN:
+    cfg = get_config()
+    if not cfg.bot_token:
         raise HTTPException(status_code=500, detail="Missing TELEGRAM_BOT_TOKEN on server")
 
     body = None
@@ -126,7 +125,7 @@ async def airdrop_claim(request: Request, db: Session = Depends(get_db)) -> dict
         raise HTTPException(status_code=400, detail="Missing initData")
 
     try:
-        d = verify_telegram_init_data(init_data, BOT_TOKEN)
+        d = verify_telegram_init_data(init_data, cfg.bot_token)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=f"unauthorized: {e}")
 
@@ -142,7 +141,7 @@ async def airdrop_claim(request: Request, db: Session = Depends(get_db)) -> dict
     if bool(getattr(user, "airdrop_claimed", False)):
         return {"ok": True, "already": True, "balance": int(getattr(user, "balance", 0))}
 
-    amt = AIRDROP_AMOUNT
+    amt = cfg.airdrop_amount
     user.airdrop_claimed = True
     user.balance = int(getattr(user, "balance", 0)) + amt
 
@@ -0,0 +1,164 @@
+"""
+Mini-app pages served from memory, pre-compressed.
+
+The pages are plain HTML (no Jinja), so they are read once, compressed once
+(gzip, and brotli when the `brotli` package is installed) and kept as bytes.
+A request picks the smallest encoding the client accepts. It never touches
+the disk.
+
+Every page has a content-hash version. The ETag is that hash plus the
+encoding, and a matching If-None-Match gets 304. The plain URL is always
+revalidated (`no-cache`), so a deploy is visible on the next load. A URL
+carrying the current `?v=<version>`, as the bot's WebApp button does, is
+cached for a year as immutable.
+
+`assets.load()` runs at startup. Call it again after replacing templates on
+disk: POST /ops/assets/reload, or SIGHUP together with the config reload.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
+PAGES = ("mini_app.html", "dashboard.html")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, no-cache"
+
+
+@dataclass(frozen=True)
+class Asset:
+    name: str
+    media_type: str
+    version: str
+    encodings: dict[str, bytes] = field(default_factory=dict)  # "identity", "gzip", "br" -> body
+
+    def etag(self, encoding: str) -> str:
+        return f'"{self.version}"' if encoding == "identity" else f'"{self.version}-{encoding}"'
+
+
+def _media_type(name: str) -> str:
+    if name.endswith(".html"):
+        return "text/html; charset=utf-8"
+    if name.endswith(".js"):
+        return "application/javascript"
+    if name.endswith(".css"):
+        return "text/css"
+    return "application/octet-stream"
+
+
+def _build(name: str, raw: bytes) -> Asset:
+    encodings = {"identity": raw}
+    gz = gzip.compress(raw, compresslevel=9, mtime=0)
+    if len(gz) < len(raw):
+        encodings["gzip"] = gz
+    if brotli is not None:
+        br = brotli.compress(raw, quality=11)
+        if len(br) < len(raw):
+            encodings["br"] = br
+    return Asset(name, _media_type(name), hashlib.sha256(raw).hexdigest()[:16], encodings)
+
+
+def _accepted(header: str) -> set[str]:
+    out = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q=") and q[2:].strip() in ("0", "0.0", "0.00", "0.000"):
+            continue
+        if coding:
+            out.add(coding.strip().lower())
+    return out
+
+
+def _none_match(header: str, asset: Asset) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = {asset.etag(enc) for enc in asset.encodings}
+    # proxies that re-compress send weak tags back; If-None-Match compares weakly anyway
+    return any(tag.strip().removeprefix("W/") in tags for tag in header.split(","))
+
+
+class AssetStore:
+    def __init__(self, directory: str = TEMPLATES_DIR, names: tuple = PAGES) -> None:
+        self.directory = directory
+        self.names = names
+        self._assets: dict[str, Asset] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def load(self) -> int:
+        """(Re)read and compress every page; swaps the whole set at once. Returns the count."""
+        fresh = {}
+        for name in self.names:
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, "rb") as f:
+                    fresh[name] = _build(name, f.read())
+            except OSError as e:
+                logger.error("assets: cannot read %s: %s", path, e)
+        with self._lock:
+            self._assets = fresh
+            self.loads += 1
+        logger.info("assets: loaded %d page(s): %s", len(fresh),
+                    ", ".join(f"{a.name}@{a.version}" for a in fresh.values()))
+        return len(fresh)
+
+    def get(self, name: str) -> Optional[Asset]:
+        if not self.loads:
+            self.load()
+        return self._assets.get(name)
+
+    def version(self, name: str) -> str:
+        asset = self.get(name)
+        return asset.version if asset else ""
+
+    def response(self, request: Request, name: str) -> Response:
+        asset = self.get(name)
+        if asset is None:
+            return Response("Not found", status_code=404, media_type="text/plain")
+        accepted = _accepted(request.headers.get("accept-encoding", ""))
+        encoding = min((e for e in asset.encodings if e == "identity" or e in accepted),
+                       key=lambda e: len(asset.encodings[e]))
+        immutable = request.query_params.get("v") == asset.version
+        headers = {
+            "ETag": asset.etag(encoding),
+            "Cache-Control": IMMUTABLE if immutable else REVALIDATE,
+            "Vary": "Accept-Encoding",
+        }
+        if _none_match(request.headers.get("if-none-match", ""), asset):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(asset.encodings[encoding], media_type=asset.media_type, headers=headers)
+
+    def stats(self) -> dict:
+        return {
+            "loads": self.loads,
+            "brotli": brotli is not None,
+            "pages": {
+                a.name: {"version": a.version, **{enc: len(body) for enc, body in a.encodings.items()}}
+                for a in self._assets.values()
+            },
+        }
+
+
+assets = AssetStore()
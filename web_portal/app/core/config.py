@@ -0,0 +1,146 @@
+"""
+Immutable runtime configuration snapshot.
+
+Built once from core.settings.Settings so hot paths (invoice signing, secret
+checks, withdrawal limits) read plain attributes instead of re-parsing the
+environment per call. `reload_config()` rebuilds it from a fresh Settings and
+swaps it atomically; it is wired to SIGHUP and POST /ops/config/reload.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import logging
+import threading
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Optional
+
+from .security import token_fingerprint
+from .settings import Settings, settings as _boot_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _derive_hmac_key(secret: str) -> Optional[bytes]:
+    # long hex secrets are used as raw key bytes, anything else as UTF-8 text
+    if not secret:
+        return None
+    lowered = secret.lower()
+    if len(secret) >= 32 and len(secret) % 2 == 0 and all(c in "0123456789abcdef" for c in lowered):
+        return bytes.fromhex(secret)
+    return secret.encode("utf-8")
+
+
+def _windows(value: str) -> dict[str, float]:
+    # "log=60,payment=30" -> {"log": 60.0, "payment": 30.0}; malformed entries are skipped
+    out = {}
+    for part in (value or "").split(","):
+        name, _, sec = part.partition("=")
+        try:
+            out[name.strip().lower()] = max(0.0, float(sec))
+        except ValueError:
+            continue
+    return out
+
+
+def _keyring(value: str, bot_token: str) -> dict[str, bytes]:
+    # "k2:secret,k1:oldsecret" -> {"k2": ..., "k1": ...} in order; the first entry signs
+    ring = {}
+    for part in (value or "").split(","):
+        kid, _, secret = part.strip().partition(":")
+        key = _derive_hmac_key(secret.strip())
+        if kid.strip() and key:
+            ring.setdefault(kid.strip(), key)
+    if not ring and bot_token:
+        ring["bt"] = hmac.new(b"SessionToken", bot_token.encode("utf-8"), hashlib.sha256).digest()
+    return ring
+
+
+def _decimal(value, default: str) -> Decimal:
+    v = str(value).strip() if value is not None else ""
+    return Decimal(v.replace(",", ".") if v else default)
+
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    version: int
+    hmac_key: Optional[bytes]
+    internal_api_secret: str
+    treasury_address: str
+    manh_price_ils: Decimal
+    min_buy_for_withdrawal: Decimal  # total purchased MANH before a ledger withdrawal is allowed
+    min_withdrawal_manh: Decimal     # smallest single withdrawal request
+    withdrawals_mode: str
+    ops_token_hash: str
+    webhook_secret: str
+    bot_token: str
+    airdrop_amount: int
+    payout_batch_max_items: int
+    payment_group: Optional[str]
+    security_group: Optional[str]
+    log_group: Optional[str]
+    referral_group: Optional[str]
+    digest_windows: dict[str, float]  # group name -> digest window in seconds
+    session_keys: dict[str, bytes]  # kid -> key; the first one signs new session tokens
+    session_ttl_sec: int
+
+    @classmethod
+    def from_settings(cls, s: Settings, version: int = 1) -> "RuntimeConfig":
+        signing = (s.INTERNAL_SIGNING_SECRET or "").strip()
+        bot_token = (s.TELEGRAM_BOT_TOKEN or s.BOT_TOKEN or "").strip()
+        ops_hash = (s.OPS_TOKEN_HASH or "").strip()
+        if not ops_hash and (s.OPS_TOKEN or "").strip():
+            ops_hash = token_fingerprint(s.OPS_TOKEN)
+        return cls(
+            version=version,
+            hmac_key=_derive_hmac_key(signing),
+            # INTERNAL_SIGNING_SECRET doubles as the guard when INTERNAL_API_SECRET is unset
+            internal_api_secret=(s.INTERNAL_API_SECRET or "").strip() or signing,
+            treasury_address=(s.TON_TREASURY_ADDRESS or "").strip(),
+            manh_price_ils=_decimal(s.MANH_PRICE_ILS, "1.00"),
+            min_buy_for_withdrawal=_decimal(s.MIN_BUY_FOR_WITHDRAWAL, "10"),
+            min_withdrawal_manh=_decimal(s.MIN_BUY_FOR_WITHDRAWAL, str(s.MIN_WITHDRAWAL)),
+            withdrawals_mode=(s.WITHDRAWALS_MODE or "manual").strip().lower(),
+            ops_token_hash=ops_hash,
+            webhook_secret=(s.TELEGRAM_WEBHOOK_SECRET or "").strip(),
+            bot_token=bot_token,
+            airdrop_amount=int(s.AIRDROP_AMOUNT),
+            payout_batch_max_items=max(1, int(s.PAYOUT_BATCH_MAX_ITEMS)),
+            payment_group=s.TG_PAYMENT_GROUP or None,
+            security_group=s.TG_SECURITY_GROUP or None,
+            log_group=s.TG_LOG_GROUP or None,
+            referral_group=s.TG_REFERRAL_GROUP or None,
+            digest_windows=_windows(s.TG_DIGEST_WINDOWS),
+            session_keys=_keyring(s.SESSION_SIGNING_KEYS, bot_token),
+            session_ttl_sec=max(60, int(s.SESSION_TTL_SEC)),
+        )
+
+    def require_hmac_key(self) -> bytes:
+        if not self.hmac_key:
+            raise RuntimeError("INTERNAL_SIGNING_SECRET missing")
+        return self.hmac_key
+
+    def require_treasury_address(self) -> str:
+        if not self.treasury_address:
+            raise RuntimeError("TON_TREASURY_ADDRESS missing")
+        return self.treasury_address
+
+
+_reload_lock = threading.Lock()
+_config = RuntimeConfig.from_settings(_boot_settings)
+
+
+def get_config() -> RuntimeConfig:
+    return _config
+
+
+def reload_config() -> RuntimeConfig:
+    """Re-read the environment/.env into a new snapshot and publish it."""
+    global _config
+    with _reload_lock:
+        fresh = RuntimeConfig.from_settings(Settings(), version=_config.version + 1)
+        _config = fresh
+    logger.info("config: reloaded snapshot v%d", fresh.version)
+    return fresh
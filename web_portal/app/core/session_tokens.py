@@ -0,0 +1,83 @@
+"""
+Signed session tokens for mini-app API calls.
+
+`/api/auth/telegram` verifies Telegram initData once and issues a token; later
+calls send it as `Authorization: Bearer <token>`. Verifying it is one HMAC
+over a short string, with no DB lookup.
+
+Format: `v1.<kid>.<payload>.<sig>`, all base64url without padding. The
+payload is compact JSON (`u` user id, `l` language, `e` expiry as unix
+seconds). `kid` names the key in `RuntimeConfig.session_keys`: the first key
+signs, every key in the ring verifies. To rotate, put the new key first and
+keep the old one until its tokens have expired (SESSION_TTL_SEC), then drop it.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from .config import get_config
+
+VERSION = "v1"
+
+
+class TokenError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class SessionClaims:
+    user_id: int
+    lang: str
+    expires_at: int
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(key: bytes, signed: str) -> str:
+    return _b64(hmac.new(key, signed.encode("ascii"), hashlib.sha256).digest())
+
+
+def issue(user_id: int, lang: str, ttl_sec: Optional[int] = None, now: Optional[float] = None) -> tuple[str, int]:
+    """A token for `user_id`; returns (token, expires_at)."""
+    cfg = get_config()
+    if not cfg.session_keys:
+        raise RuntimeError("no session signing key (SESSION_SIGNING_KEYS or BOT_TOKEN)")
+    kid, key = next(iter(cfg.session_keys.items()))
+    expires_at = int(now if now is not None else time.time()) + int(ttl_sec or cfg.session_ttl_sec)
+    payload = _b64(json.dumps({"u": int(user_id), "l": lang, "e": expires_at}, separators=(",", ":")).encode())
+    signed = f"{VERSION}.{kid}.{payload}"
+    return f"{signed}.{_sign(key, signed)}", expires_at
+
+
+def verify(token: str, now: Optional[float] = None) -> SessionClaims:
+    parts = (token or "").split(".")
+    # tokens are base64url and dots only; anything else would fail to encode for the HMAC
+    if len(parts) != 4 or parts[0] != VERSION or not token.isascii():
+        raise TokenError("malformed token")
+    _, kid, payload, sig = parts
+    key = get_config().session_keys.get(kid)
+    if key is None:
+        raise TokenError("unknown signing key")
+    if not hmac.compare_digest(_sign(key, f"{VERSION}.{kid}.{payload}"), sig):
+        raise TokenError("bad signature")
+    try:
+        claims = json.loads(_unb64(payload))
+        session = SessionClaims(int(claims["u"]), str(claims["l"]), int(claims["e"]))
+    except (ValueError, KeyError, TypeError):
+        raise TokenError("malformed payload")
+    if session.expires_at <= (now if now is not None else time.time()):
+        raise TokenError("token expired")
+    return session
@@ -11,18 +11,47 @@ from pydantic import field_validator, ConfigDict
 class Settings(BaseSettings):
     # Telegram
     BOT_TOKEN: str = ""
+    TELEGRAM_BOT_TOKEN: str = ""
     TELEGRAM_WEBHOOK_SECRET: str = ""
     TG_LOG_GROUP: Optional[str] = None
     TG_PAYMENT_GROUP: Optional[str] = None
     TG_REFERRAL_GROUP: Optional[str] = None
     TG_SECURITY_GROUP: Optional[str] = None
+    # seconds a group collects notifications into one digest; 0 posts each at once
+    TG_DIGEST_WINDOWS: str = "log=60,payment=30,referral=300,security=15"
 
     # Database
     DATABASE_URL: str = "sqlite:///./test.db"
     TON_NETWORK: str = "testnet"
-    MANH_PRICE_ILS: float = 5.2
+    MANH_PRICE_ILS: str = "1.00"
     TON_ILS_MANUAL: str = "5.2"
     MIN_WITHDRAWAL: float = 0.000001
+    MIN_BUY_FOR_WITHDRAWAL: Optional[str] = None
+    WITHDRAWALS_MODE: str = "manual"
+    TON_TREASURY_ADDRESS: str = ""
+    AIRDROP_AMOUNT: int = 100
+    PRICE_HISTORY_SNAPSHOT_SEC: int = 60
+    # messages per treasury transfer: 4 for wallet v3/v4, up to 255 for W5/highload wallets
+    PAYOUT_BATCH_MAX_ITEMS: int = 4
+    P2P_EXPIRY_INTERVAL_SEC: int = 30
+    MARKET_SNAPSHOT_SEC: int = 60
+    SEGMENT_REFRESH_SEC: int = 60
+    EVENT_FLUSH_SEC: float = 1.0
+    MEDIA_CACHE_DIR: str = ""  # rendered media (referral QR codes); defaults to a temp dir
+    # live mini-app events: Redis fan-out across workers (empty = this process only)
+    PUSH_REDIS_URL: str = ""
+    PUSH_HEARTBEAT_SEC: float = 15.0
+    PUSH_BUFFER: int = 100  # events queued per connection before it is told to resync
+
+    # Secrets
+    INTERNAL_SIGNING_SECRET: str = ""
+    INTERNAL_API_SECRET: str = ""
+    OPS_TOKEN_HASH: str = ""
+    OPS_TOKEN: str = ""
+    # mini-app session tokens: "kid:secret,kid:secret"; the first key signs, all verify.
+    # Empty derives a single key from the bot token.
+    SESSION_SIGNING_KEYS: str = ""
+    SESSION_TTL_SEC: int = 3600
 
     # Admin
     ADMIN_IDS: List[int] = []
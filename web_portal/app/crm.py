@@ -1,12 +1,26 @@
-from sqlalchemy import text
+from sqlalchemy import column, table, text
 from sqlalchemy.orm import Session
 
+from web_portal.app.database.event_writer import event_writer
+from web_portal.app.segments import segment_index
+
+marketing_events = table("marketing_events", column("event_type"), column("user_id"), column("details"))
+
 def add_tag(db: Session, user_id: int, tag: str):
     db.execute(
         text("INSERT INTO user_tags (user_id, tag) VALUES (:uid, :tag) ON CONFLICT DO NOTHING"),
         {"uid": user_id, "tag": tag}
     )
     db.commit()
+    segment_index.add_tag(user_id, tag)
+
+def remove_tag(db: Session, user_id: int, tag: str):
+    db.execute(
+        text("DELETE FROM user_tags WHERE user_id = :uid AND tag = :tag"),
+        {"uid": user_id, "tag": tag}
+    )
+    db.commit()
+    segment_index.remove_tag(user_id, tag)
 
 def get_users_by_tag(db: Session, tag: str):
     return db.execute(
@@ -14,10 +28,11 @@ def get_users_by_tag(db: Session, tag: str):
         {"tag": tag}
     ).scalars().all()
 
-def log_marketing_event(db: Session, event_type: str, user_id: int = None, details: dict = None):
+def log_marketing_event(event_type: str, user_id: int = None, details: dict = None) -> bool:
+    """Queue a marketing_events row; written in the background by the event writer."""
     import json
-    db.execute(
-        text("INSERT INTO marketing_events (event_type, user_id, details) VALUES (:et, :uid, :details)"),
-        {"et": event_type, "uid": user_id, "details": json.dumps(details) if details else None}
-    )
-    db.commit()
+    return event_writer.write(marketing_events, {
+        "event_type": event_type,
+        "user_id": user_id,
+        "details": json.dumps(details) if details else None,
+    })
@@ -0,0 +1,188 @@
+"""
+Buffered writer for append-only event tables (security_logs, marketing_events).
+
+`write()` only appends the row to an in-memory buffer, so logging an event
+costs a handler no database round trip. A background task flushes the buffer
+when it holds `max_batch` rows or its oldest row is `max_age` seconds old:
+one multi-row INSERT ... VALUES per table and chunk on PostgreSQL, an
+executemany on other databases, and a single commit. `stop()` flushes what is
+left.
+
+The buffer is bounded. When it is full, new rows are dropped and counted
+rather than blocking the caller. Rows from a failed flush are put back once,
+as far as room allows.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional
+
+from prometheus_client import Counter, Gauge
+from sqlalchemy import Table
+
+logger = logging.getLogger(__name__)
+
+BUFFER_DEPTH = Gauge("event_writer_buffer_depth", "Event rows waiting to be written")
+WRITTEN = Counter("event_writer_written_total", "Event rows written", ["table"])
+DROPPED = Counter("event_writer_dropped_total", "Event rows dropped (buffer full or flush failed)", ["table"])
+
+
+class EventWriter:
+    def __init__(self, *, max_batch: int = 500, max_age: float = 1.0, max_buffer: int = 20_000) -> None:
+        self.max_batch = max_batch
+        self.max_age = max_age
+        self.max_buffer = max_buffer
+        self._pending: dict[str, list[dict]] = {}
+        self._retry: dict[str, list[dict]] = {}  # rows whose first flush failed
+        self._tables: dict[str, Table] = {}
+        self._depth = 0
+        self._oldest: Optional[float] = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._session_factory = None
+        self.written = 0
+        self.dropped = 0
+        self.flush_errors = 0
+
+    def write(self, table: Table, row: dict) -> bool:
+        """Queue one row for `table`; False if it was dropped. Safe from any thread."""
+        with self._lock:
+            if self._depth >= self.max_buffer:
+                self.dropped += 1
+                DROPPED.labels(table.name).inc()
+                return False
+            self._tables[table.name] = table
+            self._pending.setdefault(table.name, []).append(row)
+            self._depth += 1
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            full = self._depth >= self.max_batch
+        BUFFER_DEPTH.inc()
+        if full and self._loop is not None and self._wake is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wake.set)
+            except RuntimeError:
+                pass  # loop closed; stop() flushes
+        return True
+
+    def _take(self) -> tuple[dict[str, list[dict]], dict[str, list[dict]]]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            retry, self._retry = self._retry, {}
+            BUFFER_DEPTH.dec(self._depth)
+            self._depth = 0
+            self._oldest = None
+        return pending, retry
+
+    def _drop(self, name: str, n: int) -> None:
+        if n:
+            with self._lock:
+                self.dropped += n
+            DROPPED.labels(name).inc(n)
+
+    def _requeue(self, name: str, rows: list[dict]) -> None:
+        with self._lock:
+            kept = rows[:max(0, self.max_buffer - self._depth)]
+            if kept:
+                self._retry.setdefault(name, []).extend(kept)
+                self._depth += len(kept)
+                if self._oldest is None:
+                    self._oldest = time.monotonic()
+        BUFFER_DEPTH.inc(len(kept))
+        self._drop(name, len(rows) - len(kept))
+
+    def flush(self, session_factory) -> int:
+        """Write everything buffered now; returns rows written."""
+        pending, retry = self._take()
+        total = 0
+        for name in {**retry, **pending}:
+            again, fresh = retry.get(name, []), pending.get(name, [])
+            rows = again + fresh
+            table = self._tables[name]
+            db = session_factory()
+            try:
+                multi_values = db.get_bind().dialect.name == "postgresql"
+                for i in range(0, len(rows), self.max_batch):
+                    chunk = rows[i:i + self.max_batch]
+                    if multi_values:
+                        db.execute(table.insert().values(chunk))
+                    else:
+                        db.execute(table.insert(), chunk)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                self.flush_errors += 1
+                logger.error("event writer: flushing %d %s rows failed: %s", len(rows), name, e)
+                self._drop(name, len(again))  # second failure
+                self._requeue(name, fresh)
+                continue
+            finally:
+                db.close()
+            total += len(rows)
+            WRITTEN.labels(name).inc(len(rows))
+        self.written += total
+        return total
+
+    def depth(self) -> int:
+        return self._depth
+
+    def stats(self) -> dict:
+        with self._lock:
+            oldest = self._oldest
+            return {
+                "depth": self._depth,
+                "by_table": {name: len(rows) for name, rows in self._pending.items() if rows},
+                "retrying": sum(len(rows) for rows in self._retry.values()),
+                "oldest_age_sec": round(time.monotonic() - oldest, 3) if oldest is not None else None,
+                "written": self.written,
+                "dropped": self.dropped,
+                "flush_errors": self.flush_errors,
+                "running": self._task is not None and not self._task.done(),
+            }
+
+    # ---------- background flushing ----------
+    async def _run(self, session_factory) -> None:
+        while True:
+            oldest = self._oldest
+            timeout = self.max_age if oldest is None else max(0.0, oldest + self.max_age - time.monotonic())
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if self._depth:
+                errors = self.flush_errors
+                await asyncio.to_thread(self.flush, session_factory)
+                if self.flush_errors != errors:
+                    await asyncio.sleep(5 * self.max_age)  # give the database a moment before the retry
+
+    def start(self, session_factory, max_age: Optional[float] = None) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        if max_age is not None:
+            self.max_age = max_age
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._session_factory = session_factory
+        self._task = self._loop.create_task(self._run(session_factory), name="event-writer")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = self._wake = None
+        if self._session_factory is not None and self._depth:
+            await asyncio.to_thread(self.flush, self._session_factory)
+
+
+event_writer = EventWriter()
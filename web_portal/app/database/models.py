@@ -1,5 +1,5 @@
 from web_portal.app.db import Base
-from sqlalchemy import Column, String, BigInteger, Numeric, DateTime, ForeignKey, Boolean, Integer, JSON, JSON
+from sqlalchemy import Column, String, BigInteger, Numeric, DateTime, ForeignKey, Boolean, Integer, JSON, JSON, Index
 from sqlalchemy import JSON
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -15,9 +15,11 @@ class User(Base):
     first_name = Column(String, nullable=True)
     last_name = Column(String, nullable=True)
     balance_manh = Column(Numeric(20, 9), default=0)
+    reserved_manh = Column(Numeric(20, 9), nullable=False, default=0, server_default="0")  # escrowed by open sell orders
     total_xp = Column(BigInteger, default=0)
     referral_code = Column(String, unique=True, nullable=True)
     referred_by = Column(BigInteger, ForeignKey('users.id'), nullable=True)
+    bot_blocked_at = Column(DateTime(timezone=True), nullable=True)  # set when a send fails with 403; broadcasts skip them
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -29,7 +31,10 @@ class User(Base):
 
 class Withdrawal(Base):
     __tablename__ = "withdrawals"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_withdrawals_user_requested_at", "user_id", "requested_at", "id"),  # keyset pages per user
+        {'extend_existing': True},
+    )
 
     id = Column(String, primary_key=True)
     user_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
@@ -41,23 +46,45 @@ class Withdrawal(Base):
     processed_by = Column(BigInteger, nullable=True)
     tx_hash = Column(String, nullable=True)
     memo = Column(String, nullable=True)
+    payout_batch_id = Column(String, ForeignKey("payout_batches.id"), nullable=True, index=True)
 
     user = relationship("app.database.models.User", back_populates="withdrawals")
 
+# Multi-recipient on-chain payout of approved withdrawals (see payments.ton.payouts)
+class PayoutBatch(Base):
+    __tablename__ = "payout_batches"
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(String, primary_key=True, default=lambda: uuid4().hex)
+    status = Column(String, nullable=False, default="exported")  # exported, partial, confirmed
+    item_count = Column(Integer, nullable=False, default=0)
+    total_manh = Column(Numeric(20, 9), nullable=False, default=0)
+    ton_ils_rate = Column(Numeric(20, 9), nullable=False)
+    manifest_sig = Column(String, nullable=True)
+    created_by = Column(BigInteger, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    confirmed_at = Column(DateTime(timezone=True), nullable=True)
+
 class Invoice(Base):
     __tablename__ = "invoices"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_invoices_user_created_at", "user_id", "created_at", "id"),  # keyset pages per user
+        {'extend_existing': True},
+    )
 
     id = Column(String, primary_key=True)
     user_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
     ils_amount = Column(Numeric(20, 9), nullable=False)
     ton_amount = Column(Numeric(20, 9), nullable=False)
     manh_amount = Column(Numeric(20, 9), nullable=False)
-    status = Column(String, default="pending")
+    status = Column(String, default="pending", index=True)
     comment = Column(String, nullable=True)
     treasury_address = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+    confirmed_at = Column(DateTime(timezone=True), nullable=True)
+    tx_hash = Column(String, nullable=True)
 
     user = relationship("app.database.models.User", back_populates="invoices")
 
@@ -93,14 +120,17 @@ class P2POrder(Base):
 # Legacy models (for backward compatibility)
 class SellOrder(Base):
     __tablename__ = "sell_orders"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_sell_orders_status_expires_at", "status", "expires_at"),  # expiry sweeps
+        {'extend_existing': True},
+    )
 
     id = Column(String, primary_key=True, default=lambda: uuid4().hex)
     user_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
     amount_manh = Column(Numeric(20, 9), nullable=False)
     price_per_manh = Column(Numeric(20, 9), nullable=False)  # price per MANH in TON
     total_price = Column(Numeric(20, 9), nullable=False)    # amount_manh * price_per_manh
-    status = Column(String, default="open")  # open, partial, filled, cancelled
+    status = Column(String, default="open")  # open, partial, filled, cancelled, expired
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     expires_at = Column(DateTime(timezone=True), nullable=True)
     filled_amount = Column(Numeric(20, 9), default=0)
@@ -109,7 +139,10 @@ class SellOrder(Base):
 
 class BuyOrder(Base):
     __tablename__ = "buy_orders"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_buy_orders_status_expires_at", "status", "expires_at"),
+        {'extend_existing': True},
+    )
 
     id = Column(String, primary_key=True, default=lambda: uuid4().hex)
     user_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
@@ -144,7 +177,10 @@ class Trade(Base):
 
 class LedgerEvent(Base):
     __tablename__ = 'ledger_events'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_ledger_events_user_created_at", "user_id", "created_at", "id"),  # keyset pages per user
+        {'extend_existing': True},
+    )
     id = Column(Integer, primary_key=True)
     user_id = Column(BigInteger, nullable=False)
     event_type = Column(String, nullable=False)  # 'referral', 'purchase', 'withdrawal', 'xp_award'
@@ -163,6 +199,61 @@ class SecurityLog(Base):
     details = Column(JSON, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+# Downsampled TON/ILS quote history, snapshotted from payments.ton.price_history
+class PriceCandle(Base):
+    __tablename__ = 'ton_price_candles'
+    __table_args__ = {'extend_existing': True}
+    resolution = Column(String(8), primary_key=True)  # '1m', '1h', '1d'
+    bucket_ts = Column(BigInteger, primary_key=True)   # bucket start, unix seconds
+    open = Column(Numeric(20, 9), nullable=False)
+    high = Column(Numeric(20, 9), nullable=False)
+    low = Column(Numeric(20, 9), nullable=False)
+    close = Column(Numeric(20, 9), nullable=False)
+    samples = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class MarketCandle(Base):
+    __tablename__ = 'p2p_market_candles'
+    __table_args__ = {'extend_existing': True}
+    resolution = Column(String(8), primary_key=True)  # '1m', '1h', '1d'
+    bucket_ts = Column(BigInteger, primary_key=True)   # bucket start, unix seconds
+    open = Column(Numeric(20, 9), nullable=False)      # MANH price in TON
+    high = Column(Numeric(20, 9), nullable=False)
+    low = Column(Numeric(20, 9), nullable=False)
+    close = Column(Numeric(20, 9), nullable=False)
+    volume = Column(Numeric(20, 9), nullable=False, default=0)  # MANH traded
+    trades = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class BroadcastJob(Base):
+    __tablename__ = 'broadcast_jobs'
+    __table_args__ = {'extend_existing': True}
+    id = Column(String, primary_key=True, default=lambda: uuid4().hex)
+    text = Column(String, nullable=False)
+    target = Column(String, nullable=True)  # None = every reachable user
+    status = Column(String, nullable=False, default="pending", index=True)  # pending, running, done, cancelled, failed
+    created_by = Column(BigInteger, nullable=True)
+    cursor_user_id = Column(BigInteger, nullable=False, default=0)  # last user id handled (keyset checkpoint)
+    total = Column(Integer, nullable=False, default=0)
+    sent = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    blocked = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class UserTag(Base):
+    __tablename__ = 'user_tags'
+    __table_args__ = (
+        Index("ix_user_tags_tag", "tag"),
+        {'extend_existing': True},
+    )
+    user_id = Column(BigInteger, ForeignKey('users.id'), primary_key=True)
+    tag = Column(String, primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
 class ChatId(Base):
     __tablename__ = 'chat_ids'
     __table_args__ = {'extend_existing': True}
@@ -1,5 +1,7 @@
 from __future__ import annotations
-from typing import Any, Dict
+from collections import OrderedDict
+from string import Formatter
+from typing import Any, Dict, Optional, Tuple, Union
 
 # Unicode-escape only (ASCII source) => prevents encoding/mojibake forever.
 
@@ -28,6 +30,111 @@ T: Dict[str, Dict[str, str]] = {
     "err.price": "\u26A0 Price feed failed: {err}",
     "err.ton": "\u26A0 Fetch TON tx failed: {err}",
     "lang.set": "\U0001F310 Language set to: {lang}",
+    "err.rate_limited": "Too many requests. Please try again later.",
+    "err.user_not_found": "User not found.",
+    "err.generic": "Error: {err}",
+    "err.unexpected": "Unexpected error: {err}",
+    "err.try_later": "An error occurred. Please try again later.",
+    "start.welcome": "Welcome to Telegram Guardian! Use /help to see available commands.",
+    "start.back": "Welcome back! Use /help to see available commands.",
+    "manh.show": "MANH balance: {balance}",
+    "lb.title": "{scope} Leaderboard:",
+    "buy.usage": "Usage: /buy <ILS amount>",
+    "buy.created": "Invoice created!\nILS amount: {ils}\nTON amount: {ton}\nMANH amount: {manh}\n\nSend to:\n{address}\nWith memo (required): {memo}\n\nAfter payment, click /poll_confirm for auto-confirmation.\nCurrent status: pending",
+    "poll.checking": "Checking for pending payments...",
+    "poll.confirmed": "{count} payment(s) confirmed.",
+    "poll.none": "No new payments found.",
+    "miniapp.button": "Open Dashboard",
+    "miniapp.prompt": "Click the button to open dashboard:",
+    "withdraw.usage": "Usage: /withdraw <amount MANH> <TON address>",
+    "withdraw.bad_address": "Invalid TON address. Should start with UQ or EQ.",
+    "withdraw.minimum": "Minimum withdrawal is {amount} MANH",
+    "withdraw.created": "Withdrawal request created!\nID: {id}\nAmount: {amount} MANH\nAddress: {address}\nStatus: pending",
+    "p2p.buy_usage": "Usage: /p2p_buy <amount MANH> <price per MANH in TON>",
+    "p2p.sell_usage": "Usage: /sell <amount MANH> <price per MANH in TON>",
+    "p2p.insufficient": "Insufficient MANH balance.",
+    "p2p.buy_created": "Buy order created: {amount} MANH @ {price} TON",
+    "p2p.sell_created": "Sell order created: {amount} MANH @ {price} TON",
+    "p2p.filled": "  filled {amount} MANH @ {price} TON",
+    "p2p.resting": "Resting on the book: {amount} MANH",
+    "p2p.full": "Fully filled.",
+    "p2p.trade_sold": "P2P trade {trade}: Sold {amount} MANH @ {price} TON (total {total} TON)",
+    "p2p.trade_bought": "P2P trade {trade}: Bought {amount} MANH @ {price} TON (total {total} TON)",
+    "orders.empty": "No open orders.",
+    "orders.buy": "Buy orders:",
+    "orders.sell": "Sell orders:",
+    "orders.hint": "\nOrders per level: /orders <buy|sell|mine>",
+    "orders.usage": "Usage: /orders [buy|sell|mine] [cursor]",
+    "orders.bad_cursor": "Invalid cursor.",
+    "market.empty": "No market activity yet.",
+    "market.last": "MANH/TON last: {price}",
+    "market.day": "24h: {change}%  high {high}  low {low}",
+    "market.volume": "24h volume: {volume} MANH in {trades} trades",
+    "market.quote": "Bid {bid} / Ask {ask}",
+    "market.recent": "Recent trades:",
+    "cancel.usage": "Usage: /cancel <order_id> <sell|buy>",
+    "cancel.not_found": "Order not found or not yours.",
+    "cancel.not_open": "Order is not open.",
+    "cancel.done": "Order {id} cancelled.",
+    "ref.caption": "Scan or tap:\n{link}",
+    "ref.none": "You haven't referred anyone yet.",
+    "ref.title": "Your referrals:",
+    "ref.row": "{name} - joined {date}",
+    "ref.user": "User {id}",
+    "menu.main": "Main Menu\nChoose category:",
+    "menu.general": "General",
+    "menu.manh": "MANH",
+    "menu.wallet": "Wallet & Trade",
+    "menu.admin": "Admin",
+    "menu.general.text": "/help - Help\n/faq - FAQ\n/start - Start",
+    "menu.manh.text": "/manh - Balance\n/leaderboard - Leaderboard\n/buy - Buy\n/sell - Sell",
+    "menu.wallet.text": "/invoices - Invoices\n/withdraw - Withdraw\n/withdrawals - Withdrawals\n/p2p_buy - P2P Buy",
+    "menu.admin.text": "/admin_stats - Stats\n/admin_users - Users\n/admin_orders - Orders\n/admin_broadcast - Broadcast\n/admin_broadcast_status - Broadcast progress",
+    "menu.unknown": "Unknown option",
+    "help.text": "Available commands:\n/start - Start the bot\n/help - Show this help\n/all - Show all commands\n/manh - Show your MANH balance\n/leaderboard [daily|weekly] - Show leaderboard\n/buy <ILS> - Buy MANH\n/invoices - Show your invoices\n/poll_confirm - Check for pending payments\n/miniapp - Open dashboard\n/withdraw <amount> <address> - Request withdrawal\n/withdrawals - List your withdrawals\n/chatid - Get chat ID\n/p2p_buy <amount> <price> - Place P2P buy order\n/sell <amount> <price> - Place P2P sell order\n/orders [buy|sell|mine] - Show market depth or list open orders\n/market - MANH/TON price, 24h stats and recent trades\n/cancel <id> <sell|buy> - Cancel order\n/referral - Get referral link\n/referrals - Show referred users\n/menu - Open interactive menu\n/faq - Frequently asked questions\n/admin - Admin panel\n/admin_stats - Admin statistics\n/admin_users - List users\n/admin_segment <expression> - Count users in a segment\n/admin_tag <user_id> <tag> - Tag a user\n/admin_orders - All orders\n/admin_broadcast - Broadcast message\n/admin_broadcast_to <segment> | <message> - Broadcast to a segment\n/admin_broadcast_status [id] - Broadcast progress\n/admin_broadcast_cancel <id> - Stop a broadcast\n/payout_batch - Batch approved withdrawals and export manifests\n/payout_confirm - Confirm sent payouts on-chain",
+    "faq.text": "**Frequently Asked Questions**\n\n**What is MANH?**\nMANH is a digital token based on TON, used within the system.\n\n**How to buy MANH?**\nUse /buy <ILS amount>. An invoice will be created for payment in TON.\n\n**How long does payment confirmation take?**\nUsually a few minutes. Check with /poll_confirm.\n\n**What is P2P?**\nPeer-to-peer trading \u2013 you can buy or sell MANH directly with other users.",
+    "chatid.show": "Chat ID: {id}\nType: {type}",
+    "admin.approve_usage": "Usage: /approve_withdrawal <withdrawal_id>",
+    "admin.approved": "Withdrawal {id} approved.",
+    "admin.reject_usage": "Usage: /reject_withdrawal <withdrawal_id>",
+    "admin.rejected": "Withdrawal {id} rejected.",
+    "admin.payout_none": "No approved withdrawals to batch.",
+    "admin.payout_batch": "Batch {id}: {count} payouts, {total} MANH",
+    "admin.payout_done": "{completed} payout(s) completed, {batches} batch(es) confirmed.",
+    "admin.stats": "Stats:\nUsers: {users}\nInvoices: {invoices}\nOrders: {orders}",
+    "admin.bc_usage": "Usage: /admin_broadcast <message>",
+    "admin.bc_queued": "Broadcast {id} queued for {total} users.\nProgress: /admin_broadcast_status {id}",
+    "admin.bc_to_usage": "Usage: /admin_broadcast_to <segment> | <message>\nExample: /admin_broadcast_to tag:vip AND balance>0 | Hello!",
+    "admin.bc_to_queued": "Broadcast {id} queued for {total} users in [{target}].\nProgress: /admin_broadcast_status {id}",
+    "admin.bad_segment": "Bad segment: {err}",
+    "admin.seg_usage": "Usage: /admin_segment <expression>\nAtoms: tag:<name>, balance|reserved|available|xp <op> <number>, blocked, all\nCombine with AND, OR, NOT and parentheses.",
+    "admin.seg_match": "{count} users match.",
+    "admin.seg_match_first": "{count} users match. First: {sample}",
+    "admin.tag_usage": "Usage: /admin_tag <user_id> <tag>   (prefix the tag with - to remove it)",
+    "admin.tag_removed": "Removed tag {tag} from {user}.",
+    "admin.tag_added": "Tagged {user} with {tag}.",
+    "admin.bc_none": "No broadcast found.",
+    "admin.bc_status": "Broadcast {id}: {status}\n{processed}/{total} ({percent}%)\nSent: {sent} | Failed: {failed} | Blocked: {blocked}",
+    "admin.bc_cancel_usage": "Usage: /admin_broadcast_cancel <job id>",
+    "admin.bc_cancelled": "Broadcast {id} cancelled.",
+    "admin.bc_already": "Broadcast {id} is already {status}.",
+    "level.show": "Level: {level}\nXP: {xp}\nXP to next level: {needed}",
+    "pg.prev": "\u00AB Prev",
+    "pg.next": "Next \u00BB",
+    "pg.page": "Page {number}",
+    "pg.empty": "Nothing to show.",
+    "pg.expired": "This list has expired. Run the command again.",
+    "pg.not_yours": "This list belongs to someone else.",
+    "list.users": "Users:",
+    "list.users.empty": "No users.",
+    "list.book": "Open orders:",
+    "list.all_orders": "All open orders:",
+    "list.invoices": "Your invoices:",
+    "list.invoices.empty": "No invoices found.",
+    "list.withdrawals": "Your withdrawals:",
+    "list.withdrawals.empty": "No withdrawal requests found.",
+    "list.history": "Your recent activity:",
+    "list.history.empty": "No history yet.",
   },
   "he": {
     "menu.title": "\U0001F9EA \u05EA\u05E4\u05E8\u05D9\u05D8 \u05D1\u05D3\u05D9\u05E7\u05D5\u05EA (telegram-guardian)\n\u05D1\u05D7\u05E8 \u05E4\u05E2\u05D5\u05DC\u05D4:",
@@ -51,6 +158,111 @@ T: Dict[str, Dict[str, str]] = {
     "err.price": "\u26A0 \u05E9\u05D2\u05D9\u05D0\u05D4 \u05D1\u05DE\u05D7\u05D9\u05E8: {err}",
     "err.ton": "\u26A0 \u05E9\u05D2\u05D9\u05D0\u05D4 \u05D1\u05E9\u05DC\u05D9\u05E4\u05EA \u05D8\u05E8\u05E0\u05D6\u05E7\u05E6\u05D9\u05D5\u05EA TON: {err}",
     "lang.set": "\U0001F310 \u05E9\u05E4\u05D4 \u05E0\u05E7\u05D1\u05E2\u05D4: {lang}",
+    "err.rate_limited": "\u05D9\u05D5\u05EA\u05E8 \u05DE\u05D3\u05D9 \u05D1\u05E7\u05E9\u05D5\u05EA. \u05E0\u05E1\u05D4 \u05E9\u05D5\u05D1 \u05DE\u05D0\u05D5\u05D7\u05E8 \u05D9\u05D5\u05EA\u05E8.",
+    "err.user_not_found": "\u05D4\u05DE\u05E9\u05EA\u05DE\u05E9 \u05DC\u05D0 \u05E0\u05DE\u05E6\u05D0.",
+    "err.generic": "\u05E9\u05D2\u05D9\u05D0\u05D4: {err}",
+    "err.unexpected": "\u05E9\u05D2\u05D9\u05D0\u05D4 \u05DC\u05D0 \u05E6\u05E4\u05D5\u05D9\u05D4: {err}",
+    "err.try_later": "\u05D0\u05D9\u05E8\u05E2\u05D4 \u05E9\u05D2\u05D9\u05D0\u05D4. \u05E0\u05E1\u05D4 \u05E9\u05D5\u05D1 \u05DE\u05D0\u05D5\u05D7\u05E8 \u05D9\u05D5\u05EA\u05E8.",
+    "start.welcome": "\u05D1\u05E8\u05D5\u05DA \u05D4\u05D1\u05D0 \u05DC-Telegram Guardian! \u05D4\u05E9\u05EA\u05DE\u05E9 \u05D1-/help \u05DB\u05D3\u05D9 \u05DC\u05E8\u05D0\u05D5\u05EA \u05D0\u05EA \u05D4\u05E4\u05E7\u05D5\u05D3\u05D5\u05EA \u05D4\u05D6\u05DE\u05D9\u05E0\u05D5\u05EA.",
+    "start.back": "\u05D1\u05E8\u05D5\u05DA \u05E9\u05D5\u05D1\u05DA! \u05D4\u05E9\u05EA\u05DE\u05E9 \u05D1-/help \u05DB\u05D3\u05D9 \u05DC\u05E8\u05D0\u05D5\u05EA \u05D0\u05EA \u05D4\u05E4\u05E7\u05D5\u05D3\u05D5\u05EA \u05D4\u05D6\u05DE\u05D9\u05E0\u05D5\u05EA.",
+    "manh.show": "\u05D9\u05EA\u05E8\u05EA MANH: {balance}",
+    "lb.title": "\u05DC\u05D5\u05D7 \u05D4\u05D3\u05E8\u05D2\u05D5\u05EA ({scope}):",
+    "buy.usage": "\u05E9\u05D9\u05DE\u05D5\u05E9: /buy <\u05E1\u05DB\u05D5\u05DD \u05D1\u05E9\"\u05D7>",
+    "buy.created": "\u05D4\u05D7\u05E9\u05D1\u05D5\u05E0\u05D9\u05EA \u05E0\u05D5\u05E6\u05E8\u05D4!\n\u05E1\u05DB\u05D5\u05DD \u05D1\u05E9\"\u05D7: {ils}\n\u05E1\u05DB\u05D5\u05DD TON: {ton}\n\u05E1\u05DB\u05D5\u05DD MANH: {manh}\n\n\u05E9\u05DC\u05D7 \u05D0\u05DC:\n{address}\n\u05E2\u05DD \u05D4\u05E2\u05E8\u05D4 (\u05D7\u05D5\u05D1\u05D4): {memo}\n\n\u05DC\u05D0\u05D7\u05E8 \u05D4\u05EA\u05E9\u05DC\u05D5\u05DD \u05DC\u05D7\u05E5 /poll_confirm \u05DC\u05D0\u05D9\u05E9\u05D5\u05E8 \u05D0\u05D5\u05D8\u05D5\u05DE\u05D8\u05D9.\n\u05E1\u05D8\u05D8\u05D5\u05E1 \u05E0\u05D5\u05DB\u05D7\u05D9: \u05DE\u05DE\u05EA\u05D9\u05DF",
+    "poll.checking": "\u05D1\u05D5\u05D3\u05E7 \u05EA\u05E9\u05DC\u05D5\u05DE\u05D9\u05DD \u05DE\u05DE\u05EA\u05D9\u05E0\u05D9\u05DD...",
+    "poll.confirmed": "{count} \u05EA\u05E9\u05DC\u05D5\u05DE\u05D9\u05DD \u05D0\u05D5\u05E9\u05E8\u05D5.",
+    "poll.none": "\u05DC\u05D0 \u05E0\u05DE\u05E6\u05D0\u05D5 \u05EA\u05E9\u05DC\u05D5\u05DE\u05D9\u05DD \u05D7\u05D3\u05E9\u05D9\u05DD.",
+    "miniapp.button": "\u05E4\u05EA\u05D7 \u05D0\u05EA \u05DC\u05D5\u05D7 \u05D4\u05D1\u05E7\u05E8\u05D4",
+    "miniapp.prompt": "\u05DC\u05D7\u05E5 \u05E2\u05DC \u05D4\u05DB\u05E4\u05EA\u05D5\u05E8 \u05DB\u05D3\u05D9 \u05DC\u05E4\u05EA\u05D5\u05D7 \u05D0\u05EA \u05DC\u05D5\u05D7 \u05D4\u05D1\u05E7\u05E8\u05D4:",
+    "withdraw.usage": "\u05E9\u05D9\u05DE\u05D5\u05E9: /withdraw <\u05DB\u05DE\u05D5\u05EA MANH> <\u05DB\u05EA\u05D5\u05D1\u05EA TON>",
+    "withdraw.bad_address": "\u05DB\u05EA\u05D5\u05D1\u05EA TON \u05DC\u05D0 \u05EA\u05E7\u05D9\u05E0\u05D4. \u05E2\u05DC\u05D9\u05D4 \u05DC\u05D4\u05EA\u05D7\u05D9\u05DC \u05D1-UQ \u05D0\u05D5 EQ.",
+    "withdraw.minimum": "\u05E1\u05DB\u05D5\u05DD \u05D4\u05DE\u05E9\u05D9\u05DB\u05D4 \u05D4\u05DE\u05D9\u05E0\u05D9\u05DE\u05DC\u05D9 \u05D4\u05D5\u05D0 {amount} MANH",
+    "withdraw.created": "\u05D1\u05E7\u05E9\u05EA \u05D4\u05DE\u05E9\u05D9\u05DB\u05D4 \u05E0\u05D5\u05E6\u05E8\u05D4!\n\u05DE\u05D6\u05D4\u05D4: {id}\n\u05DB\u05DE\u05D5\u05EA: {amount} MANH\n\u05DB\u05EA\u05D5\u05D1\u05EA: {address}\n\u05E1\u05D8\u05D8\u05D5\u05E1: \u05DE\u05DE\u05EA\u05D9\u05DF",
+    "p2p.buy_usage": "\u05E9\u05D9\u05DE\u05D5\u05E9: /p2p_buy <\u05DB\u05DE\u05D5\u05EA MANH> <\u05DE\u05D7\u05D9\u05E8 \u05DC-MANH \u05D1-TON>",
+    "p2p.sell_usage": "\u05E9\u05D9\u05DE\u05D5\u05E9: /sell <\u05DB\u05DE\u05D5\u05EA MANH> <\u05DE\u05D7\u05D9\u05E8 \u05DC-MANH \u05D1-TON>",
+    "p2p.insufficient": "\u05D0\u05D9\u05DF \u05DE\u05E1\u05E4\u05D9\u05E7 \u05D9\u05EA\u05E8\u05EA MANH.",
+    "p2p.buy_created": "\u05D4\u05D5\u05E8\u05D0\u05EA \u05E7\u05E0\u05D9\u05D9\u05D4 \u05E0\u05D5\u05E6\u05E8\u05D4: {amount} MANH @ {price} TON",
+    "p2p.sell_created": "\u05D4\u05D5\u05E8\u05D0\u05EA \u05DE\u05DB\u05D9\u05E8\u05D4 \u05E0\u05D5\u05E6\u05E8\u05D4: {amount} MANH @ {price} TON",
+    "p2p.filled": "  \u05D1\u05D5\u05E6\u05E2 {amount} MANH @ {price} TON",
+    "p2p.resting": "\u05E0\u05D5\u05EA\u05E8 \u05D1\u05E1\u05E4\u05E8 \u05D4\u05D4\u05D5\u05E8\u05D0\u05D5\u05EA: {amount} MANH",
+    "p2p.full": "\u05D1\u05D5\u05E6\u05E2 \u05D1\u05DE\u05DC\u05D5\u05D0\u05D5.",
+    "p2p.trade_sold": "\u05E2\u05E1\u05E7\u05EA P2P {trade}: \u05E0\u05DE\u05DB\u05E8\u05D5 {amount} MANH @ {price} TON (\u05E1\u05D4\u05F4\u05DB {total} TON)",
+    "p2p.trade_bought": "\u05E2\u05E1\u05E7\u05EA P2P {trade}: \u05E0\u05E7\u05E0\u05D5 {amount} MANH @ {price} TON (\u05E1\u05D4\u05F4\u05DB {total} TON)",
+    "orders.empty": "\u05D0\u05D9\u05DF \u05D4\u05D5\u05E8\u05D0\u05D5\u05EA \u05E4\u05EA\u05D5\u05D7\u05D5\u05EA.",
+    "orders.buy": "\u05D4\u05D5\u05E8\u05D0\u05D5\u05EA \u05E7\u05E0\u05D9\u05D9\u05D4:",
+    "orders.sell": "\u05D4\u05D5\u05E8\u05D0\u05D5\u05EA \u05DE\u05DB\u05D9\u05E8\u05D4:",
+    "orders.hint": "\n\u05D4\u05D5\u05E8\u05D0\u05D5\u05EA \u05DC\u05E4\u05D9 \u05E8\u05DE\u05D4: /orders <buy|sell|mine>",
+    "orders.usage": "\u05E9\u05D9\u05DE\u05D5\u05E9: /orders [buy|sell|mine] [cursor]",
+    "orders.bad_cursor": "\u05E1\u05DE\u05DF \u05DC\u05D0 \u05EA\u05E7\u05D9\u05DF.",
+    "market.empty": "\u05E2\u05D3\u05D9\u05D9\u05DF \u05D0\u05D9\u05DF \u05E4\u05E2\u05D9\u05DC\u05D5\u05EA \u05D1\u05E9\u05D5\u05E7.",
+    "market.last": "MANH/TON \u05D0\u05D7\u05E8\u05D5\u05DF: {price}",
+    "market.day": "24 \u05E9\u05E2\u05D5\u05EA: {change}%  \u05D2\u05D1\u05D5\u05D4 {high}  \u05E0\u05DE\u05D5\u05DA {low}",
+    "market.volume": "\u05DE\u05D7\u05D6\u05D5\u05E8 24 \u05E9\u05E2\u05D5\u05EA: {volume} MANH \u05D1-{trades} \u05E2\u05E1\u05E7\u05D0\u05D5\u05EA",
+    "market.quote": "\u05D1\u05D9\u05E7\u05D5\u05E9 {bid} / \u05D4\u05D9\u05E6\u05E2 {ask}",
+    "market.recent": "\u05E2\u05E1\u05E7\u05D0\u05D5\u05EA \u05D0\u05D7\u05E8\u05D5\u05E0\u05D5\u05EA:",
+    "cancel.usage": "\u05E9\u05D9\u05DE\u05D5\u05E9: /cancel <order_id> <sell|buy>",
+    "cancel.not_found": "\u05D4\u05D4\u05D5\u05E8\u05D0\u05D4 \u05DC\u05D0 \u05E0\u05DE\u05E6\u05D0\u05D4 \u05D0\u05D5 \u05E9\u05D0\u05D9\u05E0\u05D4 \u05E9\u05DC\u05DA.",
+    "cancel.not_open": "\u05D4\u05D4\u05D5\u05E8\u05D0\u05D4 \u05D0\u05D9\u05E0\u05D4 \u05E4\u05EA\u05D5\u05D7\u05D4.",
+    "cancel.done": "\u05D4\u05D4\u05D5\u05E8\u05D0\u05D4 {id} \u05D1\u05D5\u05D8\u05DC\u05D4.",
+    "ref.caption": "\u05E1\u05E8\u05D5\u05E7 \u05D0\u05D5 \u05D4\u05E7\u05E9:\n{link}",
+    "ref.none": "\u05E2\u05D3\u05D9\u05D9\u05DF \u05DC\u05D0 \u05D4\u05E4\u05E0\u05D9\u05EA \u05D0\u05E3 \u05D0\u05D7\u05D3.",
+    "ref.title": "\u05D4\u05D4\u05E4\u05E0\u05D9\u05D5\u05EA \u05E9\u05DC\u05DA:",
+    "ref.row": "{name} - \u05D4\u05E6\u05D8\u05E8\u05E3 \u05D1-{date}",
+    "ref.user": "\u05DE\u05E9\u05EA\u05DE\u05E9 {id}",
+    "menu.main": "\u05EA\u05E4\u05E8\u05D9\u05D8 \u05E8\u05D0\u05E9\u05D9\n\u05D1\u05D7\u05E8 \u05E7\u05D8\u05D2\u05D5\u05E8\u05D9\u05D4:",
+    "menu.general": "\u05DB\u05DC\u05DC\u05D9",
+    "menu.manh": "MANH",
+    "menu.wallet": "\u05D0\u05E8\u05E0\u05E7 \u05D5\u05DE\u05E1\u05D7\u05E8",
+    "menu.admin": "\u05E0\u05D9\u05D4\u05D5\u05DC",
+    "menu.general.text": "/help - \u05E2\u05D6\u05E8\u05D4\n/faq - \u05E9\u05D0\u05DC\u05D5\u05EA \u05E0\u05E4\u05D5\u05E6\u05D5\u05EA\n/start - \u05D4\u05EA\u05D7\u05DC\u05D4",
+    "menu.manh.text": "/manh - \u05D9\u05EA\u05E8\u05D4\n/leaderboard - \u05D8\u05D1\u05DC\u05EA \u05DE\u05D5\u05D1\u05D9\u05DC\u05D9\u05DD\n/buy - \u05E7\u05E0\u05D9\u05D9\u05D4\n/sell - \u05DE\u05DB\u05D9\u05E8\u05D4",
+    "menu.wallet.text": "/invoices - \u05D7\u05E9\u05D1\u05D5\u05E0\u05D9\u05D5\u05EA\n/withdraw - \u05DE\u05E9\u05D9\u05DB\u05D4\n/withdrawals - \u05DE\u05E9\u05D9\u05DB\u05D5\u05EA\n/p2p_buy - \u05E7\u05E0\u05D9\u05D9\u05D4 P2P",
+    "menu.admin.text": "/admin_stats - \u05E1\u05D8\u05D8\u05D9\u05E1\u05D8\u05D9\u05E7\u05D4\n/admin_users - \u05DE\u05E9\u05EA\u05DE\u05E9\u05D9\u05DD\n/admin_orders - \u05D4\u05D6\u05DE\u05E0\u05D5\u05EA\n/admin_broadcast - \u05E9\u05D9\u05D3\u05D5\u05E8\n/admin_broadcast_status - \u05D4\u05EA\u05E7\u05D3\u05DE\u05D5\u05EA \u05D4\u05E9\u05D9\u05D3\u05D5\u05E8",
+    "menu.unknown": "\u05D0\u05E4\u05E9\u05E8\u05D5\u05EA \u05DC\u05D0 \u05DE\u05D5\u05DB\u05E8\u05EA",
+    "help.text": "\u05E4\u05E7\u05D5\u05D3\u05D5\u05EA \u05D6\u05DE\u05D9\u05E0\u05D5\u05EA:\n/start - \u05D4\u05E4\u05E2\u05DC\u05EA \u05D4\u05D1\u05D5\u05D8\n/help - \u05D4\u05E6\u05D2\u05EA \u05D4\u05E2\u05D6\u05E8\u05D4 \u05D4\u05D6\u05D5\n/all - \u05D4\u05E6\u05D2\u05EA \u05DB\u05DC \u05D4\u05E4\u05E7\u05D5\u05D3\u05D5\u05EA\n/manh - \u05D4\u05E6\u05D2\u05EA \u05D9\u05EA\u05E8\u05EA \u05D4-MANH \u05E9\u05DC\u05DA\n/leaderboard [daily|weekly] - \u05D8\u05D1\u05DC\u05EA \u05D4\u05DE\u05D5\u05D1\u05D9\u05DC\u05D9\u05DD\n/buy <ILS> - \u05E7\u05E0\u05D9\u05D9\u05EA MANH\n/invoices - \u05D4\u05D7\u05E9\u05D1\u05D5\u05E0\u05D9\u05D5\u05EA \u05E9\u05DC\u05DA\n/poll_confirm - \u05D1\u05D3\u05D9\u05E7\u05EA \u05EA\u05E9\u05DC\u05D5\u05DE\u05D9\u05DD \u05DE\u05DE\u05EA\u05D9\u05E0\u05D9\u05DD\n/miniapp - \u05E4\u05EA\u05D9\u05D7\u05EA \u05DC\u05D5\u05D7 \u05D4\u05D1\u05E7\u05E8\u05D4\n/withdraw <amount> <address> - \u05D1\u05E7\u05E9\u05EA \u05DE\u05E9\u05D9\u05DB\u05D4\n/withdrawals - \u05E8\u05E9\u05D9\u05DE\u05EA \u05D4\u05DE\u05E9\u05D9\u05DB\u05D5\u05EA \u05E9\u05DC\u05DA\n/chatid - \u05DE\u05D6\u05D4\u05D4 \u05D4\u05E6'\u05D0\u05D8\n/p2p_buy <amount> <price> - \u05D4\u05D5\u05E8\u05D0\u05EA \u05E7\u05E0\u05D9\u05D9\u05D4 P2P\n/sell <amount> <price> - \u05D4\u05D5\u05E8\u05D0\u05EA \u05DE\u05DB\u05D9\u05E8\u05D4 P2P\n/orders [buy|sell|mine] - \u05E2\u05D5\u05DE\u05E7 \u05D4\u05E9\u05D5\u05E7 \u05D0\u05D5 \u05E8\u05E9\u05D9\u05DE\u05EA \u05D4\u05D5\u05E8\u05D0\u05D5\u05EA \u05E4\u05EA\u05D5\u05D7\u05D5\u05EA\n/market - \u05DE\u05D7\u05D9\u05E8 MANH/TON, \u05E0\u05EA\u05D5\u05E0\u05D9 24 \u05E9\u05E2\u05D5\u05EA \u05D5\u05E2\u05E1\u05E7\u05D0\u05D5\u05EA \u05D0\u05D7\u05E8\u05D5\u05E0\u05D5\u05EA\n/cancel <id> <sell|buy> - \u05D1\u05D9\u05D8\u05D5\u05DC \u05D4\u05D5\u05E8\u05D0\u05D4\n/referral - \u05E7\u05D9\u05E9\u05D5\u05E8 \u05D4\u05E4\u05E0\u05D9\u05D4\n/referrals - \u05D4\u05DE\u05E9\u05EA\u05DE\u05E9\u05D9\u05DD \u05E9\u05D4\u05E4\u05E0\u05D9\u05EA\n/menu - \u05EA\u05E4\u05E8\u05D9\u05D8 \u05D0\u05D9\u05E0\u05D8\u05E8\u05D0\u05E7\u05D8\u05D9\u05D1\u05D9\n/faq - \u05E9\u05D0\u05DC\u05D5\u05EA \u05E0\u05E4\u05D5\u05E6\u05D5\u05EA\n/admin - \u05DC\u05D5\u05D7 \u05E0\u05D9\u05D4\u05D5\u05DC\n/admin_stats - \u05E1\u05D8\u05D8\u05D9\u05E1\u05D8\u05D9\u05E7\u05EA \u05E0\u05D9\u05D4\u05D5\u05DC\n/admin_users - \u05E8\u05E9\u05D9\u05DE\u05EA \u05DE\u05E9\u05EA\u05DE\u05E9\u05D9\u05DD\n/admin_segment <expression> - \u05E1\u05E4\u05D9\u05E8\u05EA \u05DE\u05E9\u05EA\u05DE\u05E9\u05D9\u05DD \u05D1\u05E4\u05DC\u05D7\n/admin_tag <user_id> <tag> - \u05EA\u05D9\u05D5\u05D2 \u05DE\u05E9\u05EA\u05DE\u05E9\n/admin_orders - \u05DB\u05DC \u05D4\u05D4\u05D5\u05E8\u05D0\u05D5\u05EA\n/admin_broadcast - \u05E9\u05D9\u05D3\u05D5\u05E8 \u05D4\u05D5\u05D3\u05E2\u05D4\n/admin_broadcast_to <segment> | <message> - \u05E9\u05D9\u05D3\u05D5\u05E8 \u05DC\u05E4\u05DC\u05D7\n/admin_broadcast_status [id] - \u05D4\u05EA\u05E7\u05D3\u05DE\u05D5\u05EA \u05D4\u05E9\u05D9\u05D3\u05D5\u05E8\n/admin_broadcast_cancel <id> - \u05E2\u05E6\u05D9\u05E8\u05EA \u05E9\u05D9\u05D3\u05D5\u05E8\n/payout_batch - \u05E7\u05D9\u05D1\u05D5\u05E5 \u05DE\u05E9\u05D9\u05DB\u05D5\u05EA \u05DE\u05D0\u05D5\u05E9\u05E8\u05D5\u05EA \u05D5\u05D9\u05D9\u05E6\u05D5\u05D0 \u05DE\u05E0\u05D9\u05E4\u05E1\u05D8\u05D9\u05DD\n/payout_confirm - \u05D0\u05D9\u05E9\u05D5\u05E8 \u05EA\u05E9\u05DC\u05D5\u05DE\u05D9\u05DD \u05E9\u05E0\u05E9\u05DC\u05D7\u05D5 \u05E2\u05DC \u05D4\u05E9\u05E8\u05E9\u05E8\u05EA",
+    "faq.text": "**\u05E9\u05D0\u05DC\u05D5\u05EA \u05E0\u05E4\u05D5\u05E6\u05D5\u05EA**\n\n**\u05DE\u05D4 \u05D6\u05D4 MANH?**\nMANH \u05D4\u05D5\u05D0 \u05D0\u05E1\u05D9\u05DE\u05D5\u05DF \u05D3\u05D9\u05D2\u05D9\u05D8\u05DC\u05D9 \u05DE\u05D1\u05D5\u05E1\u05E1 TON \u05E9\u05DE\u05E9\u05DE\u05E9 \u05D1\u05EA\u05D5\u05DA \u05D4\u05DE\u05E2\u05E8\u05DB\u05EA.\n\n**\u05D0\u05D9\u05DA \u05E7\u05D5\u05E0\u05D9\u05DD MANH?**\n\u05D4\u05E9\u05EA\u05DE\u05E9\u05D5 \u05D1-/buy <\u05E1\u05DB\u05D5\u05DD \u05D1\u05E9\"\u05D7>. \u05EA\u05D9\u05D5\u05D5\u05E6\u05E8 \u05D7\u05E9\u05D1\u05D5\u05E0\u05D9\u05EA \u05DC\u05EA\u05E9\u05DC\u05D5\u05DD \u05D1-TON.\n\n**\u05DB\u05DE\u05D4 \u05D6\u05DE\u05DF \u05DC\u05D5\u05E7\u05D7 \u05D0\u05D9\u05E9\u05D5\u05E8 \u05D4\u05EA\u05E9\u05DC\u05D5\u05DD?**\n\u05D1\u05D3\u05E8\u05DA \u05DB\u05DC\u05DC \u05DB\u05DE\u05D4 \u05D3\u05E7\u05D5\u05EA. \u05D0\u05E4\u05E9\u05E8 \u05DC\u05D1\u05D3\u05D5\u05E7 \u05E2\u05DD /poll_confirm.\n\n**\u05DE\u05D4 \u05D6\u05D4 P2P?**\n\u05DE\u05E1\u05D7\u05E8 \u05D9\u05E9\u05D9\u05E8 \u05D1\u05D9\u05DF \u05DE\u05E9\u05EA\u05DE\u05E9\u05D9\u05DD \u2013 \u05D0\u05E4\u05E9\u05E8 \u05DC\u05E7\u05E0\u05D5\u05EA \u05D0\u05D5 \u05DC\u05DE\u05DB\u05D5\u05E8 MANH \u05D9\u05E9\u05D9\u05E8\u05D5\u05EA \u05DE\u05D5\u05DC \u05DE\u05E9\u05EA\u05DE\u05E9\u05D9\u05DD \u05D0\u05D7\u05E8\u05D9\u05DD.",
+    "chatid.show": "\u05DE\u05D6\u05D4\u05D4 \u05E6'\u05D0\u05D8: {id}\n\u05E1\u05D5\u05D2: {type}",
+    "admin.approve_usage": "\u05E9\u05D9\u05DE\u05D5\u05E9: /approve_withdrawal <\u05DE\u05D6\u05D4\u05D4 \u05DE\u05E9\u05D9\u05DB\u05D4>",
+    "admin.approved": "\u05D4\u05DE\u05E9\u05D9\u05DB\u05D4 {id} \u05D0\u05D5\u05E9\u05E8\u05D4.",
+    "admin.reject_usage": "\u05E9\u05D9\u05DE\u05D5\u05E9: /reject_withdrawal <\u05DE\u05D6\u05D4\u05D4 \u05DE\u05E9\u05D9\u05DB\u05D4>",
+    "admin.rejected": "\u05D4\u05DE\u05E9\u05D9\u05DB\u05D4 {id} \u05E0\u05D3\u05D7\u05EA\u05D4.",
+    "admin.payout_none": "\u05D0\u05D9\u05DF \u05DE\u05E9\u05D9\u05DB\u05D5\u05EA \u05DE\u05D0\u05D5\u05E9\u05E8\u05D5\u05EA \u05DC\u05E7\u05D9\u05D1\u05D5\u05E5.",
+    "admin.payout_batch": "\u05E7\u05D1\u05D5\u05E6\u05D4 {id}: {count} \u05EA\u05E9\u05DC\u05D5\u05DE\u05D9\u05DD, {total} MANH",
+    "admin.payout_done": "\u05D4\u05D5\u05E9\u05DC\u05DE\u05D5 {completed} \u05EA\u05E9\u05DC\u05D5\u05DE\u05D9\u05DD, \u05D0\u05D5\u05E9\u05E8\u05D5 {batches} \u05E7\u05D1\u05D5\u05E6\u05D5\u05EA.",
+    "admin.stats": "\u05E1\u05D8\u05D8\u05D9\u05E1\u05D8\u05D9\u05E7\u05D4:\n\u05DE\u05E9\u05EA\u05DE\u05E9\u05D9\u05DD: {users}\n\u05D7\u05E9\u05D1\u05D5\u05E0\u05D9\u05D5\u05EA: {invoices}\n\u05D4\u05D5\u05E8\u05D0\u05D5\u05EA: {orders}",
+    "admin.bc_usage": "\u05E9\u05D9\u05DE\u05D5\u05E9: /admin_broadcast <\u05D4\u05D5\u05D3\u05E2\u05D4>",
+    "admin.bc_queued": "\u05D4\u05E9\u05D9\u05D3\u05D5\u05E8 {id} \u05E0\u05DB\u05E0\u05E1 \u05DC\u05EA\u05D5\u05E8 \u05E2\u05D1\u05D5\u05E8 {total} \u05DE\u05E9\u05EA\u05DE\u05E9\u05D9\u05DD.\n\u05D4\u05EA\u05E7\u05D3\u05DE\u05D5\u05EA: /admin_broadcast_status {id}",
+    "admin.bc_to_usage": "\u05E9\u05D9\u05DE\u05D5\u05E9: /admin_broadcast_to <\u05E4\u05DC\u05D7> | <\u05D4\u05D5\u05D3\u05E2\u05D4>\n\u05D3\u05D5\u05D2\u05DE\u05D4: /admin_broadcast_to tag:vip AND balance>0 | \u05E9\u05DC\u05D5\u05DD!",
+    "admin.bc_to_queued": "\u05D4\u05E9\u05D9\u05D3\u05D5\u05E8 {id} \u05E0\u05DB\u05E0\u05E1 \u05DC\u05EA\u05D5\u05E8 \u05E2\u05D1\u05D5\u05E8 {total} \u05DE\u05E9\u05EA\u05DE\u05E9\u05D9\u05DD \u05D1-[{target}].\n\u05D4\u05EA\u05E7\u05D3\u05DE\u05D5\u05EA: /admin_broadcast_status {id}",
+    "admin.bad_segment": "\u05E4\u05DC\u05D7 \u05DC\u05D0 \u05EA\u05E7\u05D9\u05DF: {err}",
+    "admin.seg_usage": "\u05E9\u05D9\u05DE\u05D5\u05E9: /admin_segment <\u05D1\u05D9\u05D8\u05D5\u05D9>\n\u05E8\u05DB\u05D9\u05D1\u05D9\u05DD: tag:<name>, balance|reserved|available|xp <op> <number>, blocked, all\n\u05D0\u05E4\u05E9\u05E8 \u05DC\u05E9\u05DC\u05D1 \u05E2\u05DD AND, OR, NOT \u05D5\u05E1\u05D5\u05D2\u05E8\u05D9\u05D9\u05DD.",
+    "admin.seg_match": "{count} \u05DE\u05E9\u05EA\u05DE\u05E9\u05D9\u05DD \u05EA\u05D5\u05D0\u05DE\u05D9\u05DD.",
+    "admin.seg_match_first": "{count} \u05DE\u05E9\u05EA\u05DE\u05E9\u05D9\u05DD \u05EA\u05D5\u05D0\u05DE\u05D9\u05DD. \u05E8\u05D0\u05E9\u05D5\u05E0\u05D9\u05DD: {sample}",
+    "admin.tag_usage": "\u05E9\u05D9\u05DE\u05D5\u05E9: /admin_tag <\u05DE\u05D6\u05D4\u05D4 \u05DE\u05E9\u05EA\u05DE\u05E9> <\u05EA\u05D2>   (\u05D4\u05D5\u05E1\u05D9\u05E4\u05D5 - \u05DC\u05E4\u05E0\u05D9 \u05D4\u05EA\u05D2 \u05DB\u05D3\u05D9 \u05DC\u05D4\u05E1\u05D9\u05E8 \u05D0\u05D5\u05EA\u05D5)",
+    "admin.tag_removed": "\u05D4\u05EA\u05D2 {tag} \u05D4\u05D5\u05E1\u05E8 \u05DE-{user}.",
+    "admin.tag_added": "{user} \u05EA\u05D5\u05D9\u05D2 \u05D1-{tag}.",
+    "admin.bc_none": "\u05DC\u05D0 \u05E0\u05DE\u05E6\u05D0 \u05E9\u05D9\u05D3\u05D5\u05E8.",
+    "admin.bc_status": "\u05E9\u05D9\u05D3\u05D5\u05E8 {id}: {status}\n{processed}/{total} ({percent}%)\n\u05E0\u05E9\u05DC\u05D7\u05D5: {sent} | \u05E0\u05DB\u05E9\u05DC\u05D5: {failed} | \u05D7\u05E1\u05DE\u05D5: {blocked}",
+    "admin.bc_cancel_usage": "\u05E9\u05D9\u05DE\u05D5\u05E9: /admin_broadcast_cancel <\u05DE\u05D6\u05D4\u05D4 \u05DE\u05E9\u05D9\u05DE\u05D4>",
+    "admin.bc_cancelled": "\u05D4\u05E9\u05D9\u05D3\u05D5\u05E8 {id} \u05D1\u05D5\u05D8\u05DC.",
+    "admin.bc_already": "\u05D4\u05E9\u05D9\u05D3\u05D5\u05E8 {id} \u05DB\u05D1\u05E8 \u05D1\u05DE\u05E6\u05D1 {status}.",
+    "level.show": "\u05E8\u05DE\u05D4: {level}\nXP: {xp}\nXP \u05DC\u05E8\u05DE\u05D4 \u05D4\u05D1\u05D0\u05D4: {needed}",
+    "pg.prev": "\u00AB \u05D4\u05E7\u05D5\u05D3\u05DD",
+    "pg.next": "\u05D4\u05D1\u05D0 \u00BB",
+    "pg.page": "\u05E2\u05DE\u05D5\u05D3 {number}",
+    "pg.empty": "\u05D0\u05D9\u05DF \u05DE\u05D4 \u05DC\u05D4\u05E6\u05D9\u05D2.",
+    "pg.expired": "\u05EA\u05D5\u05E7\u05E3 \u05D4\u05E8\u05E9\u05D9\u05DE\u05D4 \u05E4\u05D2. \u05D4\u05E8\u05E5 \u05D0\u05EA \u05D4\u05E4\u05E7\u05D5\u05D3\u05D4 \u05E9\u05D5\u05D1.",
+    "pg.not_yours": "\u05D4\u05E8\u05E9\u05D9\u05DE\u05D4 \u05E9\u05D9\u05D9\u05DB\u05EA \u05DC\u05DE\u05D9\u05E9\u05D4\u05D5 \u05D0\u05D7\u05E8.",
+    "list.users": "\u05DE\u05E9\u05EA\u05DE\u05E9\u05D9\u05DD:",
+    "list.users.empty": "\u05D0\u05D9\u05DF \u05DE\u05E9\u05EA\u05DE\u05E9\u05D9\u05DD.",
+    "list.book": "\u05D4\u05D5\u05E8\u05D0\u05D5\u05EA \u05E4\u05EA\u05D5\u05D7\u05D5\u05EA:",
+    "list.all_orders": "\u05DB\u05DC \u05D4\u05D4\u05D5\u05E8\u05D0\u05D5\u05EA \u05D4\u05E4\u05EA\u05D5\u05D7\u05D5\u05EA:",
+    "list.invoices": "\u05D4\u05D7\u05E9\u05D1\u05D5\u05E0\u05D9\u05D5\u05EA \u05E9\u05DC\u05DA:",
+    "list.invoices.empty": "\u05DC\u05D0 \u05E0\u05DE\u05E6\u05D0\u05D5 \u05D7\u05E9\u05D1\u05D5\u05E0\u05D9\u05D5\u05EA.",
+    "list.withdrawals": "\u05D4\u05DE\u05E9\u05D9\u05DB\u05D5\u05EA \u05E9\u05DC\u05DA:",
+    "list.withdrawals.empty": "\u05DC\u05D0 \u05E0\u05DE\u05E6\u05D0\u05D5 \u05D1\u05E7\u05E9\u05D5\u05EA \u05DE\u05E9\u05D9\u05DB\u05D4.",
+    "list.history": "\u05D4\u05E4\u05E2\u05D9\u05DC\u05D5\u05EA \u05D4\u05D0\u05D7\u05E8\u05D5\u05E0\u05D4 \u05E9\u05DC\u05DA:",
+    "list.history.empty": "\u05E2\u05D3\u05D9\u05D9\u05DF \u05D0\u05D9\u05DF \u05D4\u05D9\u05E1\u05D8\u05D5\u05E8\u05D9\u05D4.",
   },
   "ru": {
     "menu.title": "\U0001F9EA \u041C\u0435\u043D\u044E \u0434\u0438\u0430\u0433\u043D\u043E\u0441\u0442\u0438\u043A\u0438 (telegram-guardian)\n\u0412\u044B\u0431\u0435\u0440\u0438\u0442\u0435 \u0434\u0435\u0439\u0441\u0442\u0432\u0438\u0435:",
@@ -74,6 +286,111 @@ T: Dict[str, Dict[str, str]] = {
     "err.price": "\u26A0 \u041E\u0448\u0438\u0431\u043A\u0430 \u0446\u0435\u043D\u044B: {err}",
     "err.ton": "\u26A0 \u041E\u0448\u0438\u0431\u043A\u0430 TON tx: {err}",
     "lang.set": "\U0001F310 \u042F\u0437\u044B\u043A: {lang}",
+    "err.rate_limited": "\u0421\u043B\u0438\u0448\u043A\u043E\u043C \u043C\u043D\u043E\u0433\u043E \u0437\u0430\u043F\u0440\u043E\u0441\u043E\u0432. \u041F\u043E\u043F\u0440\u043E\u0431\u0443\u0439\u0442\u0435 \u043F\u043E\u0437\u0436\u0435.",
+    "err.user_not_found": "\u041F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u0442\u0435\u043B\u044C \u043D\u0435 \u043D\u0430\u0439\u0434\u0435\u043D.",
+    "err.generic": "\u041E\u0448\u0438\u0431\u043A\u0430: {err}",
+    "err.unexpected": "\u041D\u0435\u043F\u0440\u0435\u0434\u0432\u0438\u0434\u0435\u043D\u043D\u0430\u044F \u043E\u0448\u0438\u0431\u043A\u0430: {err}",
+    "err.try_later": "\u041F\u0440\u043E\u0438\u0437\u043E\u0448\u043B\u0430 \u043E\u0448\u0438\u0431\u043A\u0430. \u041F\u043E\u043F\u0440\u043E\u0431\u0443\u0439\u0442\u0435 \u043F\u043E\u0437\u0436\u0435.",
+    "start.welcome": "\u0414\u043E\u0431\u0440\u043E \u043F\u043E\u0436\u0430\u043B\u043E\u0432\u0430\u0442\u044C \u0432 Telegram Guardian! \u0418\u0441\u043F\u043E\u043B\u044C\u0437\u0443\u0439\u0442\u0435 /help, \u0447\u0442\u043E\u0431\u044B \u0443\u0432\u0438\u0434\u0435\u0442\u044C \u0434\u043E\u0441\u0442\u0443\u043F\u043D\u044B\u0435 \u043A\u043E\u043C\u0430\u043D\u0434\u044B.",
+    "start.back": "\u0421 \u0432\u043E\u0437\u0432\u0440\u0430\u0449\u0435\u043D\u0438\u0435\u043C! \u0418\u0441\u043F\u043E\u043B\u044C\u0437\u0443\u0439\u0442\u0435 /help, \u0447\u0442\u043E\u0431\u044B \u0443\u0432\u0438\u0434\u0435\u0442\u044C \u0434\u043E\u0441\u0442\u0443\u043F\u043D\u044B\u0435 \u043A\u043E\u043C\u0430\u043D\u0434\u044B.",
+    "manh.show": "\u0411\u0430\u043B\u0430\u043D\u0441 MANH: {balance}",
+    "lb.title": "\u0422\u0430\u0431\u043B\u0438\u0446\u0430 \u043B\u0438\u0434\u0435\u0440\u043E\u0432 ({scope}):",
+    "buy.usage": "\u0418\u0441\u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u043D\u0438\u0435: /buy <\u0441\u0443\u043C\u043C\u0430 \u0432 ILS>",
+    "buy.created": "\u0421\u0447\u0435\u0442 \u0441\u043E\u0437\u0434\u0430\u043D!\n\u0421\u0443\u043C\u043C\u0430 ILS: {ils}\n\u0421\u0443\u043C\u043C\u0430 TON: {ton}\n\u0421\u0443\u043C\u043C\u0430 MANH: {manh}\n\n\u041E\u0442\u043F\u0440\u0430\u0432\u044C\u0442\u0435 \u043D\u0430:\n{address}\n\u0421 \u043A\u043E\u043C\u043C\u0435\u043D\u0442\u0430\u0440\u0438\u0435\u043C (\u043E\u0431\u044F\u0437\u0430\u0442\u0435\u043B\u044C\u043D\u043E): {memo}\n\n\u041F\u043E\u0441\u043B\u0435 \u043E\u043F\u043B\u0430\u0442\u044B \u043D\u0430\u0436\u043C\u0438\u0442\u0435 /poll_confirm \u0434\u043B\u044F \u0430\u0432\u0442\u043E\u043F\u043E\u0434\u0442\u0432\u0435\u0440\u0436\u0434\u0435\u043D\u0438\u044F.\n\u0422\u0435\u043A\u0443\u0449\u0438\u0439 \u0441\u0442\u0430\u0442\u0443\u0441: \u043E\u0436\u0438\u0434\u0430\u043D\u0438\u0435",
+    "poll.checking": "\u041F\u0440\u043E\u0432\u0435\u0440\u044F\u0435\u043C \u043E\u0436\u0438\u0434\u0430\u044E\u0449\u0438\u0435 \u043F\u043B\u0430\u0442\u0435\u0436\u0438...",
+    "poll.confirmed": "\u041F\u043E\u0434\u0442\u0432\u0435\u0440\u0436\u0434\u0435\u043D\u043E \u043F\u043B\u0430\u0442\u0435\u0436\u0435\u0439: {count}.",
+    "poll.none": "\u041D\u043E\u0432\u044B\u0445 \u043F\u043B\u0430\u0442\u0435\u0436\u0435\u0439 \u043D\u0435 \u043D\u0430\u0439\u0434\u0435\u043D\u043E.",
+    "miniapp.button": "\u041E\u0442\u043A\u0440\u044B\u0442\u044C \u043F\u0430\u043D\u0435\u043B\u044C",
+    "miniapp.prompt": "\u041D\u0430\u0436\u043C\u0438\u0442\u0435 \u043A\u043D\u043E\u043F\u043A\u0443, \u0447\u0442\u043E\u0431\u044B \u043E\u0442\u043A\u0440\u044B\u0442\u044C \u043F\u0430\u043D\u0435\u043B\u044C:",
+    "withdraw.usage": "\u0418\u0441\u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u043D\u0438\u0435: /withdraw <\u0441\u0443\u043C\u043C\u0430 MANH> <\u0430\u0434\u0440\u0435\u0441 TON>",
+    "withdraw.bad_address": "\u041D\u0435\u0432\u0435\u0440\u043D\u044B\u0439 \u0430\u0434\u0440\u0435\u0441 TON. \u041E\u043D \u0434\u043E\u043B\u0436\u0435\u043D \u043D\u0430\u0447\u0438\u043D\u0430\u0442\u044C\u0441\u044F \u0441 UQ \u0438\u043B\u0438 EQ.",
+    "withdraw.minimum": "\u041C\u0438\u043D\u0438\u043C\u0430\u043B\u044C\u043D\u0430\u044F \u0441\u0443\u043C\u043C\u0430 \u0432\u044B\u0432\u043E\u0434\u0430: {amount} MANH",
+    "withdraw.created": "\u0417\u0430\u044F\u0432\u043A\u0430 \u043D\u0430 \u0432\u044B\u0432\u043E\u0434 \u0441\u043E\u0437\u0434\u0430\u043D\u0430!\nID: {id}\n\u0421\u0443\u043C\u043C\u0430: {amount} MANH\n\u0410\u0434\u0440\u0435\u0441: {address}\n\u0421\u0442\u0430\u0442\u0443\u0441: \u043E\u0436\u0438\u0434\u0430\u043D\u0438\u0435",
+    "p2p.buy_usage": "\u0418\u0441\u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u043D\u0438\u0435: /p2p_buy <\u0441\u0443\u043C\u043C\u0430 MANH> <\u0446\u0435\u043D\u0430 \u0437\u0430 MANH \u0432 TON>",
+    "p2p.sell_usage": "\u0418\u0441\u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u043D\u0438\u0435: /sell <\u0441\u0443\u043C\u043C\u0430 MANH> <\u0446\u0435\u043D\u0430 \u0437\u0430 MANH \u0432 TON>",
+    "p2p.insufficient": "\u041D\u0435\u0434\u043E\u0441\u0442\u0430\u0442\u043E\u0447\u043D\u043E MANH \u043D\u0430 \u0431\u0430\u043B\u0430\u043D\u0441\u0435.",
+    "p2p.buy_created": "\u0417\u0430\u044F\u0432\u043A\u0430 \u043D\u0430 \u043F\u043E\u043A\u0443\u043F\u043A\u0443 \u0441\u043E\u0437\u0434\u0430\u043D\u0430: {amount} MANH @ {price} TON",
+    "p2p.sell_created": "\u0417\u0430\u044F\u0432\u043A\u0430 \u043D\u0430 \u043F\u0440\u043E\u0434\u0430\u0436\u0443 \u0441\u043E\u0437\u0434\u0430\u043D\u0430: {amount} MANH @ {price} TON",
+    "p2p.filled": "  \u0438\u0441\u043F\u043E\u043B\u043D\u0435\u043D\u043E {amount} MANH @ {price} TON",
+    "p2p.resting": "\u041E\u0441\u0442\u0430\u043B\u043E\u0441\u044C \u0432 \u0441\u0442\u0430\u043A\u0430\u043D\u0435: {amount} MANH",
+    "p2p.full": "\u0418\u0441\u043F\u043E\u043B\u043D\u0435\u043D\u043E \u043F\u043E\u043B\u043D\u043E\u0441\u0442\u044C\u044E.",
+    "p2p.trade_sold": "\u0421\u0434\u0435\u043B\u043A\u0430 P2P {trade}: \u043F\u0440\u043E\u0434\u0430\u043D\u043E {amount} MANH @ {price} TON (\u0438\u0442\u043E\u0433\u043E {total} TON)",
+    "p2p.trade_bought": "\u0421\u0434\u0435\u043B\u043A\u0430 P2P {trade}: \u043A\u0443\u043F\u043B\u0435\u043D\u043E {amount} MANH @ {price} TON (\u0438\u0442\u043E\u0433\u043E {total} TON)",
+    "orders.empty": "\u041D\u0435\u0442 \u043E\u0442\u043A\u0440\u044B\u0442\u044B\u0445 \u0437\u0430\u044F\u0432\u043E\u043A.",
+    "orders.buy": "\u0417\u0430\u044F\u0432\u043A\u0438 \u043D\u0430 \u043F\u043E\u043A\u0443\u043F\u043A\u0443:",
+    "orders.sell": "\u0417\u0430\u044F\u0432\u043A\u0438 \u043D\u0430 \u043F\u0440\u043E\u0434\u0430\u0436\u0443:",
+    "orders.hint": "\n\u0417\u0430\u044F\u0432\u043A\u0438 \u043F\u043E \u0443\u0440\u043E\u0432\u043D\u044F\u043C: /orders <buy|sell|mine>",
+    "orders.usage": "\u0418\u0441\u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u043D\u0438\u0435: /orders [buy|sell|mine] [cursor]",
+    "orders.bad_cursor": "\u041D\u0435\u0432\u0435\u0440\u043D\u044B\u0439 \u043A\u0443\u0440\u0441\u043E\u0440.",
+    "market.empty": "\u0422\u043E\u0440\u0433\u043E\u0432 \u043F\u043E\u043A\u0430 \u043D\u0435 \u0431\u044B\u043B\u043E.",
+    "market.last": "MANH/TON \u043F\u043E\u0441\u043B\u0435\u0434\u043D\u044F\u044F: {price}",
+    "market.day": "24\u0447: {change}%  \u043C\u0430\u043A\u0441 {high}  \u043C\u0438\u043D {low}",
+    "market.volume": "\u041E\u0431\u044A\u0435\u043C \u0437\u0430 24\u0447: {volume} MANH \u0432 {trades} \u0441\u0434\u0435\u043B\u043A\u0430\u0445",
+    "market.quote": "\u041F\u043E\u043A\u0443\u043F\u043A\u0430 {bid} / \u041F\u0440\u043E\u0434\u0430\u0436\u0430 {ask}",
+    "market.recent": "\u041F\u043E\u0441\u043B\u0435\u0434\u043D\u0438\u0435 \u0441\u0434\u0435\u043B\u043A\u0438:",
+    "cancel.usage": "\u0418\u0441\u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u043D\u0438\u0435: /cancel <order_id> <sell|buy>",
+    "cancel.not_found": "\u0417\u0430\u044F\u0432\u043A\u0430 \u043D\u0435 \u043D\u0430\u0439\u0434\u0435\u043D\u0430 \u0438\u043B\u0438 \u043F\u0440\u0438\u043D\u0430\u0434\u043B\u0435\u0436\u0438\u0442 \u043D\u0435 \u0432\u0430\u043C.",
+    "cancel.not_open": "\u0417\u0430\u044F\u0432\u043A\u0430 \u043D\u0435 \u043E\u0442\u043A\u0440\u044B\u0442\u0430.",
+    "cancel.done": "\u0417\u0430\u044F\u0432\u043A\u0430 {id} \u043E\u0442\u043C\u0435\u043D\u0435\u043D\u0430.",
+    "ref.caption": "\u041E\u0442\u0441\u043A\u0430\u043D\u0438\u0440\u0443\u0439\u0442\u0435 \u0438\u043B\u0438 \u043D\u0430\u0436\u043C\u0438\u0442\u0435:\n{link}",
+    "ref.none": "\u0412\u044B \u0435\u0449\u0435 \u043D\u0438\u043A\u043E\u0433\u043E \u043D\u0435 \u043F\u0440\u0438\u0433\u043B\u0430\u0441\u0438\u043B\u0438.",
+    "ref.title": "\u0412\u0430\u0448\u0438 \u0440\u0435\u0444\u0435\u0440\u0430\u043B\u044B:",
+    "ref.row": "{name} - \u043F\u0440\u0438\u0441\u043E\u0435\u0434\u0438\u043D\u0438\u043B\u0441\u044F {date}",
+    "ref.user": "\u041F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u0442\u0435\u043B\u044C {id}",
+    "menu.main": "\u0413\u043B\u0430\u0432\u043D\u043E\u0435 \u043C\u0435\u043D\u044E\n\u0412\u044B\u0431\u0435\u0440\u0438\u0442\u0435 \u0440\u0430\u0437\u0434\u0435\u043B:",
+    "menu.general": "\u041E\u0431\u0449\u0435\u0435",
+    "menu.manh": "MANH",
+    "menu.wallet": "\u041A\u043E\u0448\u0435\u043B\u0435\u043A \u0438 \u0442\u043E\u0440\u0433\u043E\u0432\u043B\u044F",
+    "menu.admin": "\u0410\u0434\u043C\u0438\u043D",
+    "menu.general.text": "/help - \u041F\u043E\u043C\u043E\u0449\u044C\n/faq - \u0412\u043E\u043F\u0440\u043E\u0441\u044B \u0438 \u043E\u0442\u0432\u0435\u0442\u044B\n/start - \u0421\u0442\u0430\u0440\u0442",
+    "menu.manh.text": "/manh - \u0411\u0430\u043B\u0430\u043D\u0441\n/leaderboard - \u0420\u0435\u0439\u0442\u0438\u043D\u0433\n/buy - \u041A\u0443\u043F\u0438\u0442\u044C\n/sell - \u041F\u0440\u043E\u0434\u0430\u0442\u044C",
+    "menu.wallet.text": "/invoices - \u0421\u0447\u0435\u0442\u0430\n/withdraw - \u0412\u044B\u0432\u043E\u0434\n/withdrawals - \u0412\u044B\u0432\u043E\u0434\u044B\n/p2p_buy - \u041F\u043E\u043A\u0443\u043F\u043A\u0430 P2P",
+    "menu.admin.text": "/admin_stats - \u0421\u0442\u0430\u0442\u0438\u0441\u0442\u0438\u043A\u0430\n/admin_users - \u041F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u0442\u0435\u043B\u0438\n/admin_orders - \u0417\u0430\u044F\u0432\u043A\u0438\n/admin_broadcast - \u0420\u0430\u0441\u0441\u044B\u043B\u043A\u0430\n/admin_broadcast_status - \u0425\u043E\u0434 \u0440\u0430\u0441\u0441\u044B\u043B\u043A\u0438",
+    "menu.unknown": "\u041D\u0435\u0438\u0437\u0432\u0435\u0441\u0442\u043D\u044B\u0439 \u043F\u0443\u043D\u043A\u0442",
+    "help.text": "\u0414\u043E\u0441\u0442\u0443\u043F\u043D\u044B\u0435 \u043A\u043E\u043C\u0430\u043D\u0434\u044B:\n/start - \u0417\u0430\u043F\u0443\u0441\u0442\u0438\u0442\u044C \u0431\u043E\u0442\u0430\n/help - \u041F\u043E\u043A\u0430\u0437\u0430\u0442\u044C \u044D\u0442\u0443 \u0441\u043F\u0440\u0430\u0432\u043A\u0443\n/all - \u041F\u043E\u043A\u0430\u0437\u0430\u0442\u044C \u0432\u0441\u0435 \u043A\u043E\u043C\u0430\u043D\u0434\u044B\n/manh - \u041F\u043E\u043A\u0430\u0437\u0430\u0442\u044C \u0431\u0430\u043B\u0430\u043D\u0441 MANH\n/leaderboard [daily|weekly] - \u041F\u043E\u043A\u0430\u0437\u0430\u0442\u044C \u0440\u0435\u0439\u0442\u0438\u043D\u0433\n/buy <ILS> - \u041A\u0443\u043F\u0438\u0442\u044C MANH\n/invoices - \u0412\u0430\u0448\u0438 \u0441\u0447\u0435\u0442\u0430\n/poll_confirm - \u041F\u0440\u043E\u0432\u0435\u0440\u0438\u0442\u044C \u043E\u0436\u0438\u0434\u0430\u044E\u0449\u0438\u0435 \u043F\u043B\u0430\u0442\u0435\u0436\u0438\n/miniapp - \u041E\u0442\u043A\u0440\u044B\u0442\u044C \u043F\u0430\u043D\u0435\u043B\u044C\n/withdraw <amount> <address> - \u0417\u0430\u043F\u0440\u043E\u0441\u0438\u0442\u044C \u0432\u044B\u0432\u043E\u0434\n/withdrawals - \u0421\u043F\u0438\u0441\u043E\u043A \u0432\u0430\u0448\u0438\u0445 \u0432\u044B\u0432\u043E\u0434\u043E\u0432\n/chatid - \u041F\u043E\u043B\u0443\u0447\u0438\u0442\u044C ID \u0447\u0430\u0442\u0430\n/p2p_buy <amount> <price> - \u0417\u0430\u044F\u0432\u043A\u0430 \u043D\u0430 \u043F\u043E\u043A\u0443\u043F\u043A\u0443 P2P\n/sell <amount> <price> - \u0417\u0430\u044F\u0432\u043A\u0430 \u043D\u0430 \u043F\u0440\u043E\u0434\u0430\u0436\u0443 P2P\n/orders [buy|sell|mine] - \u0413\u043B\u0443\u0431\u0438\u043D\u0430 \u0440\u044B\u043D\u043A\u0430 \u0438\u043B\u0438 \u0441\u043F\u0438\u0441\u043E\u043A \u043E\u0442\u043A\u0440\u044B\u0442\u044B\u0445 \u0437\u0430\u044F\u0432\u043E\u043A\n/market - \u0426\u0435\u043D\u0430 MANH/TON, \u0441\u0442\u0430\u0442\u0438\u0441\u0442\u0438\u043A\u0430 \u0437\u0430 24 \u0447 \u0438 \u043F\u043E\u0441\u043B\u0435\u0434\u043D\u0438\u0435 \u0441\u0434\u0435\u043B\u043A\u0438\n/cancel <id> <sell|buy> - \u041E\u0442\u043C\u0435\u043D\u0438\u0442\u044C \u0437\u0430\u044F\u0432\u043A\u0443\n/referral - \u0420\u0435\u0444\u0435\u0440\u0430\u043B\u044C\u043D\u0430\u044F \u0441\u0441\u044B\u043B\u043A\u0430\n/referrals - \u041F\u0440\u0438\u0433\u043B\u0430\u0448\u0451\u043D\u043D\u044B\u0435 \u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u0442\u0435\u043B\u0438\n/menu - \u041E\u0442\u043A\u0440\u044B\u0442\u044C \u0438\u043D\u0442\u0435\u0440\u0430\u043A\u0442\u0438\u0432\u043D\u043E\u0435 \u043C\u0435\u043D\u044E\n/faq - \u0427\u0430\u0441\u0442\u044B\u0435 \u0432\u043E\u043F\u0440\u043E\u0441\u044B\n/admin - \u041F\u0430\u043D\u0435\u043B\u044C \u0430\u0434\u043C\u0438\u043D\u0438\u0441\u0442\u0440\u0430\u0442\u043E\u0440\u0430\n/admin_stats - \u0421\u0442\u0430\u0442\u0438\u0441\u0442\u0438\u043A\u0430\n/admin_users - \u0421\u043F\u0438\u0441\u043E\u043A \u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u0442\u0435\u043B\u0435\u0439\n/admin_segment <expression> - \u041F\u043E\u0441\u0447\u0438\u0442\u0430\u0442\u044C \u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u0442\u0435\u043B\u0435\u0439 \u0432 \u0441\u0435\u0433\u043C\u0435\u043D\u0442\u0435\n/admin_tag <user_id> <tag> - \u041F\u043E\u043C\u0435\u0442\u0438\u0442\u044C \u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u0442\u0435\u043B\u044F\n/admin_orders - \u0412\u0441\u0435 \u0437\u0430\u044F\u0432\u043A\u0438\n/admin_broadcast - \u0420\u0430\u0441\u0441\u044B\u043B\u043A\u0430 \u0441\u043E\u043E\u0431\u0449\u0435\u043D\u0438\u044F\n/admin_broadcast_to <segment> | <message> - \u0420\u0430\u0441\u0441\u044B\u043B\u043A\u0430 \u043F\u043E \u0441\u0435\u0433\u043C\u0435\u043D\u0442\u0443\n/admin_broadcast_status [id] - \u0425\u043E\u0434 \u0440\u0430\u0441\u0441\u044B\u043B\u043A\u0438\n/admin_broadcast_cancel <id> - \u041E\u0441\u0442\u0430\u043D\u043E\u0432\u0438\u0442\u044C \u0440\u0430\u0441\u0441\u044B\u043B\u043A\u0443\n/payout_batch - \u0421\u0433\u0440\u0443\u043F\u043F\u0438\u0440\u043E\u0432\u0430\u0442\u044C \u043E\u0434\u043E\u0431\u0440\u0435\u043D\u043D\u044B\u0435 \u0432\u044B\u0432\u043E\u0434\u044B \u0438 \u0432\u044B\u0433\u0440\u0443\u0437\u0438\u0442\u044C \u043C\u0430\u043D\u0438\u0444\u0435\u0441\u0442\u044B\n/payout_confirm - \u041F\u043E\u0434\u0442\u0432\u0435\u0440\u0434\u0438\u0442\u044C \u043E\u0442\u043F\u0440\u0430\u0432\u043B\u0435\u043D\u043D\u044B\u0435 \u0432\u044B\u043F\u043B\u0430\u0442\u044B \u0432 \u0431\u043B\u043E\u043A\u0447\u0435\u0439\u043D\u0435",
+    "faq.text": "**\u0427\u0430\u0441\u0442\u044B\u0435 \u0432\u043E\u043F\u0440\u043E\u0441\u044B**\n\n**\u0427\u0442\u043E \u0442\u0430\u043A\u043E\u0435 MANH?**\nMANH \u2014 \u0446\u0438\u0444\u0440\u043E\u0432\u043E\u0439 \u0442\u043E\u043A\u0435\u043D \u043D\u0430 \u0431\u0430\u0437\u0435 TON, \u0438\u0441\u043F\u043E\u043B\u044C\u0437\u0443\u0435\u043C\u044B\u0439 \u0432 \u0441\u0438\u0441\u0442\u0435\u043C\u0435.\n\n**\u041A\u0430\u043A \u043A\u0443\u043F\u0438\u0442\u044C MANH?**\n\u0418\u0441\u043F\u043E\u043B\u044C\u0437\u0443\u0439\u0442\u0435 /buy <\u0441\u0443\u043C\u043C\u0430 \u0432 ILS>. \u0411\u0443\u0434\u0435\u0442 \u0441\u043E\u0437\u0434\u0430\u043D \u0441\u0447\u0451\u0442 \u0434\u043B\u044F \u043E\u043F\u043B\u0430\u0442\u044B \u0432 TON.\n\n**\u0421\u043A\u043E\u043B\u044C\u043A\u043E \u0432\u0440\u0435\u043C\u0435\u043D\u0438 \u0437\u0430\u043D\u0438\u043C\u0430\u0435\u0442 \u043F\u043E\u0434\u0442\u0432\u0435\u0440\u0436\u0434\u0435\u043D\u0438\u0435 \u043E\u043F\u043B\u0430\u0442\u044B?**\n\u041E\u0431\u044B\u0447\u043D\u043E \u043D\u0435\u0441\u043A\u043E\u043B\u044C\u043A\u043E \u043C\u0438\u043D\u0443\u0442. \u041F\u0440\u043E\u0432\u0435\u0440\u0438\u0442\u044C \u043C\u043E\u0436\u043D\u043E \u0447\u0435\u0440\u0435\u0437 /poll_confirm.\n\n**\u0427\u0442\u043E \u0442\u0430\u043A\u043E\u0435 P2P?**\n\u0422\u043E\u0440\u0433\u043E\u0432\u043B\u044F \u043C\u0435\u0436\u0434\u0443 \u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u0442\u0435\u043B\u044F\u043C\u0438 \u2014 \u0432\u044B \u043C\u043E\u0436\u0435\u0442\u0435 \u043F\u043E\u043A\u0443\u043F\u0430\u0442\u044C \u0438 \u043F\u0440\u043E\u0434\u0430\u0432\u0430\u0442\u044C MANH \u043D\u0430\u043F\u0440\u044F\u043C\u0443\u044E \u0434\u0440\u0443\u0433\u0438\u043C \u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u0442\u0435\u043B\u044F\u043C.",
+    "chatid.show": "ID \u0447\u0430\u0442\u0430: {id}\n\u0422\u0438\u043F: {type}",
+    "admin.approve_usage": "\u0418\u0441\u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u043D\u0438\u0435: /approve_withdrawal <id \u0432\u044B\u0432\u043E\u0434\u0430>",
+    "admin.approved": "\u0412\u044B\u0432\u043E\u0434 {id} \u043E\u0434\u043E\u0431\u0440\u0435\u043D.",
+    "admin.reject_usage": "\u0418\u0441\u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u043D\u0438\u0435: /reject_withdrawal <id \u0432\u044B\u0432\u043E\u0434\u0430>",
+    "admin.rejected": "\u0412\u044B\u0432\u043E\u0434 {id} \u043E\u0442\u043A\u043B\u043E\u043D\u0451\u043D.",
+    "admin.payout_none": "\u041D\u0435\u0442 \u043E\u0434\u043E\u0431\u0440\u0435\u043D\u043D\u044B\u0445 \u0432\u044B\u0432\u043E\u0434\u043E\u0432 \u0434\u043B\u044F \u0433\u0440\u0443\u043F\u043F\u0438\u0440\u043E\u0432\u043A\u0438.",
+    "admin.payout_batch": "\u041F\u0430\u043A\u0435\u0442 {id}: \u0432\u044B\u043F\u043B\u0430\u0442 {count}, {total} MANH",
+    "admin.payout_done": "\u0417\u0430\u0432\u0435\u0440\u0448\u0435\u043D\u043E \u0432\u044B\u043F\u043B\u0430\u0442: {completed}, \u043F\u043E\u0434\u0442\u0432\u0435\u0440\u0436\u0434\u0435\u043D\u043E \u043F\u0430\u043A\u0435\u0442\u043E\u0432: {batches}.",
+    "admin.stats": "\u0421\u0442\u0430\u0442\u0438\u0441\u0442\u0438\u043A\u0430:\n\u041F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u0442\u0435\u043B\u0438: {users}\n\u0421\u0447\u0435\u0442\u0430: {invoices}\n\u0417\u0430\u044F\u0432\u043A\u0438: {orders}",
+    "admin.bc_usage": "\u0418\u0441\u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u043D\u0438\u0435: /admin_broadcast <\u0441\u043E\u043E\u0431\u0449\u0435\u043D\u0438\u0435>",
+    "admin.bc_queued": "\u0420\u0430\u0441\u0441\u044B\u043B\u043A\u0430 {id} \u043F\u043E\u0441\u0442\u0430\u0432\u043B\u0435\u043D\u0430 \u0432 \u043E\u0447\u0435\u0440\u0435\u0434\u044C \u0434\u043B\u044F {total} \u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u0442\u0435\u043B\u0435\u0439.\n\u0425\u043E\u0434: /admin_broadcast_status {id}",
+    "admin.bc_to_usage": "\u0418\u0441\u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u043D\u0438\u0435: /admin_broadcast_to <\u0441\u0435\u0433\u043C\u0435\u043D\u0442> | <\u0441\u043E\u043E\u0431\u0449\u0435\u043D\u0438\u0435>\n\u041F\u0440\u0438\u043C\u0435\u0440: /admin_broadcast_to tag:vip AND balance>0 | \u041F\u0440\u0438\u0432\u0435\u0442!",
+    "admin.bc_to_queued": "\u0420\u0430\u0441\u0441\u044B\u043B\u043A\u0430 {id} \u043F\u043E\u0441\u0442\u0430\u0432\u043B\u0435\u043D\u0430 \u0432 \u043E\u0447\u0435\u0440\u0435\u0434\u044C \u0434\u043B\u044F {total} \u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u0442\u0435\u043B\u0435\u0439 \u0432 [{target}].\n\u0425\u043E\u0434: /admin_broadcast_status {id}",
+    "admin.bad_segment": "\u041D\u0435\u0432\u0435\u0440\u043D\u044B\u0439 \u0441\u0435\u0433\u043C\u0435\u043D\u0442: {err}",
+    "admin.seg_usage": "\u0418\u0441\u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u043D\u0438\u0435: /admin_segment <\u0432\u044B\u0440\u0430\u0436\u0435\u043D\u0438\u0435>\n\u042D\u043B\u0435\u043C\u0435\u043D\u0442\u044B: tag:<name>, balance|reserved|available|xp <op> <number>, blocked, all\n\u041E\u0431\u044A\u0435\u0434\u0438\u043D\u044F\u0439\u0442\u0435 \u0447\u0435\u0440\u0435\u0437 AND, OR, NOT \u0438 \u0441\u043A\u043E\u0431\u043A\u0438.",
+    "admin.seg_match": "\u041F\u043E\u0434\u0445\u043E\u0434\u0438\u0442 \u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u0442\u0435\u043B\u0435\u0439: {count}.",
+    "admin.seg_match_first": "\u041F\u043E\u0434\u0445\u043E\u0434\u0438\u0442 \u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u0442\u0435\u043B\u0435\u0439: {count}. \u041F\u0435\u0440\u0432\u044B\u0435: {sample}",
+    "admin.tag_usage": "\u0418\u0441\u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u043D\u0438\u0435: /admin_tag <id \u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u0442\u0435\u043B\u044F> <\u043C\u0435\u0442\u043A\u0430>   (\u0434\u043E\u0431\u0430\u0432\u044C\u0442\u0435 - \u043F\u0435\u0440\u0435\u0434 \u043C\u0435\u0442\u043A\u043E\u0439, \u0447\u0442\u043E\u0431\u044B \u0441\u043D\u044F\u0442\u044C \u0435\u0451)",
+    "admin.tag_removed": "\u041C\u0435\u0442\u043A\u0430 {tag} \u0441\u043D\u044F\u0442\u0430 \u0441 {user}.",
+    "admin.tag_added": "\u041F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u0442\u0435\u043B\u044E {user} \u0434\u043E\u0431\u0430\u0432\u043B\u0435\u043D\u0430 \u043C\u0435\u0442\u043A\u0430 {tag}.",
+    "admin.bc_none": "\u0420\u0430\u0441\u0441\u044B\u043B\u043A\u0430 \u043D\u0435 \u043D\u0430\u0439\u0434\u0435\u043D\u0430.",
+    "admin.bc_status": "\u0420\u0430\u0441\u0441\u044B\u043B\u043A\u0430 {id}: {status}\n{processed}/{total} ({percent}%)\n\u041E\u0442\u043F\u0440\u0430\u0432\u043B\u0435\u043D\u043E: {sent} | \u041E\u0448\u0438\u0431\u043A\u0438: {failed} | \u0417\u0430\u0431\u043B\u043E\u043A\u0438\u0440\u043E\u0432\u0430\u043B\u0438: {blocked}",
+    "admin.bc_cancel_usage": "\u0418\u0441\u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u043D\u0438\u0435: /admin_broadcast_cancel <id \u0437\u0430\u0434\u0430\u0447\u0438>",
+    "admin.bc_cancelled": "\u0420\u0430\u0441\u0441\u044B\u043B\u043A\u0430 {id} \u043E\u0442\u043C\u0435\u043D\u0435\u043D\u0430.",
+    "admin.bc_already": "\u0420\u0430\u0441\u0441\u044B\u043B\u043A\u0430 {id} \u0443\u0436\u0435 \u0432 \u0441\u0442\u0430\u0442\u0443\u0441\u0435 {status}.",
+    "level.show": "\u0423\u0440\u043E\u0432\u0435\u043D\u044C: {level}\nXP: {xp}\nXP \u0434\u043E \u0441\u043B\u0435\u0434\u0443\u044E\u0449\u0435\u0433\u043E \u0443\u0440\u043E\u0432\u043D\u044F: {needed}",
+    "pg.prev": "\u00AB \u041D\u0430\u0437\u0430\u0434",
+    "pg.next": "\u0414\u0430\u043B\u0435\u0435 \u00BB",
+    "pg.page": "\u0421\u0442\u0440\u0430\u043D\u0438\u0446\u0430 {number}",
+    "pg.empty": "\u041D\u0435\u0447\u0435\u0433\u043E \u043F\u043E\u043A\u0430\u0437\u0430\u0442\u044C.",
+    "pg.expired": "\u0421\u043F\u0438\u0441\u043E\u043A \u0443\u0441\u0442\u0430\u0440\u0435\u043B. \u0412\u044B\u043F\u043E\u043B\u043D\u0438\u0442\u0435 \u043A\u043E\u043C\u0430\u043D\u0434\u0443 \u0441\u043D\u043E\u0432\u0430.",
+    "pg.not_yours": "\u042D\u0442\u043E\u0442 \u0441\u043F\u0438\u0441\u043E\u043A \u043F\u0440\u0438\u043D\u0430\u0434\u043B\u0435\u0436\u0438\u0442 \u0434\u0440\u0443\u0433\u043E\u043C\u0443 \u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u0442\u0435\u043B\u044E.",
+    "list.users": "\u041F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u0442\u0435\u043B\u0438:",
+    "list.users.empty": "\u041D\u0435\u0442 \u043F\u043E\u043B\u044C\u0437\u043E\u0432\u0430\u0442\u0435\u043B\u0435\u0439.",
+    "list.book": "\u041E\u0442\u043A\u0440\u044B\u0442\u044B\u0435 \u0437\u0430\u044F\u0432\u043A\u0438:",
+    "list.all_orders": "\u0412\u0441\u0435 \u043E\u0442\u043A\u0440\u044B\u0442\u044B\u0435 \u0437\u0430\u044F\u0432\u043A\u0438:",
+    "list.invoices": "\u0412\u0430\u0448\u0438 \u0441\u0447\u0435\u0442\u0430:",
+    "list.invoices.empty": "\u0421\u0447\u0435\u0442\u0430 \u043D\u0435 \u043D\u0430\u0439\u0434\u0435\u043D\u044B.",
+    "list.withdrawals": "\u0412\u0430\u0448\u0438 \u0432\u044B\u0432\u043E\u0434\u044B:",
+    "list.withdrawals.empty": "\u0417\u0430\u044F\u0432\u043A\u0438 \u043D\u0430 \u0432\u044B\u0432\u043E\u0434 \u043D\u0435 \u043D\u0430\u0439\u0434\u0435\u043D\u044B.",
+    "list.history": "\u0412\u0430\u0448\u0430 \u043F\u043E\u0441\u043B\u0435\u0434\u043D\u044F\u044F \u0430\u043A\u0442\u0438\u0432\u043D\u043E\u0441\u0442\u044C:",
+    "list.history.empty": "\u0418\u0441\u0442\u043E\u0440\u0438\u044F \u043F\u043E\u043A\u0430 \u043F\u0443\u0441\u0442\u0430.",
   },
   "ar": {
     "menu.title": "\U0001F9EA \u0642\u0627\u0626\u0645\u0629 \u0627\u0644\u062A\u0634\u062E\u064A\u0635 (telegram-guardian)\n\u0627\u062E\u062A\u0631 \u0625\u062C\u0631\u0627\u0621:",
@@ -97,14 +414,185 @@ T: Dict[str, Dict[str, str]] = {
     "err.price": "\u26A0 \u062E\u0637\u0623 \u0641\u064A \u0627\u0644\u0633\u0639\u0631: {err}",
     "err.ton": "\u26A0 \u062E\u0637\u0623 \u0641\u064A TON tx: {err}",
     "lang.set": "\U0001F310 \u062A\u0645 \u062A\u062D\u062F\u064A\u062F \u0627\u0644\u0644\u063A\u0629: {lang}",
+    "err.rate_limited": "\u0637\u0644\u0628\u0627\u062A \u0643\u062B\u064A\u0631\u0629 \u062C\u062F\u064B\u0627. \u062D\u0627\u0648\u0644 \u0645\u0631\u0629 \u0623\u062E\u0631\u0649 \u0644\u0627\u062D\u0642\u064B\u0627.",
+    "err.user_not_found": "\u0627\u0644\u0645\u0633\u062A\u062E\u062F\u0645 \u063A\u064A\u0631 \u0645\u0648\u062C\u0648\u062F.",
+    "err.generic": "\u062E\u0637\u0623: {err}",
+    "err.unexpected": "\u062E\u0637\u0623 \u063A\u064A\u0631 \u0645\u062A\u0648\u0642\u0639: {err}",
+    "err.try_later": "\u062D\u062F\u062B \u062E\u0637\u0623. \u062D\u0627\u0648\u0644 \u0645\u0631\u0629 \u0623\u062E\u0631\u0649 \u0644\u0627\u062D\u0642\u064B\u0627.",
+    "start.welcome": "\u0645\u0631\u062D\u0628\u064B\u0627 \u0628\u0643 \u0641\u064A Telegram Guardian! \u0627\u0633\u062A\u062E\u062F\u0645 /help \u0644\u0639\u0631\u0636 \u0627\u0644\u0623\u0648\u0627\u0645\u0631 \u0627\u0644\u0645\u062A\u0627\u062D\u0629.",
+    "start.back": "\u0645\u0631\u062D\u0628\u064B\u0627 \u0628\u0639\u0648\u062F\u062A\u0643! \u0627\u0633\u062A\u062E\u062F\u0645 /help \u0644\u0639\u0631\u0636 \u0627\u0644\u0623\u0648\u0627\u0645\u0631 \u0627\u0644\u0645\u062A\u0627\u062D\u0629.",
+    "manh.show": "\u0631\u0635\u064A\u062F MANH: {balance}",
+    "lb.title": "\u0644\u0648\u062D\u0629 \u0627\u0644\u0635\u062F\u0627\u0631\u0629 ({scope}):",
+    "buy.usage": "\u0627\u0644\u0627\u0633\u062A\u062E\u062F\u0627\u0645: /buy <\u0627\u0644\u0645\u0628\u0644\u063A \u0628\u0627\u0644\u0634\u064A\u0643\u0644>",
+    "buy.created": "\u062A\u0645 \u0625\u0646\u0634\u0627\u0621 \u0627\u0644\u0641\u0627\u062A\u0648\u0631\u0629!\n\u0627\u0644\u0645\u0628\u0644\u063A \u0628\u0627\u0644\u0634\u064A\u0643\u0644: {ils}\n\u0645\u0628\u0644\u063A TON: {ton}\n\u0645\u0628\u0644\u063A MANH: {manh}\n\n\u0623\u0631\u0633\u0644 \u0625\u0644\u0649:\n{address}\n\u0645\u0639 \u0627\u0644\u0645\u0630\u0643\u0631\u0629 (\u0625\u0644\u0632\u0627\u0645\u064A): {memo}\n\n\u0628\u0639\u062F \u0627\u0644\u062F\u0641\u0639\u060C \u0627\u0636\u063A\u0637 /poll_confirm \u0644\u0644\u062A\u0623\u0643\u064A\u062F \u0627\u0644\u062A\u0644\u0642\u0627\u0626\u064A.\n\u0627\u0644\u062D\u0627\u0644\u0629 \u0627\u0644\u062D\u0627\u0644\u064A\u0629: \u0642\u064A\u062F \u0627\u0644\u0627\u0646\u062A\u0638\u0627\u0631",
+    "poll.checking": "\u062C\u0627\u0631\u064D \u0627\u0644\u062A\u062D\u0642\u0642 \u0645\u0646 \u0627\u0644\u0645\u062F\u0641\u0648\u0639\u0627\u062A \u0627\u0644\u0645\u0639\u0644\u0642\u0629...",
+    "poll.confirmed": "\u062A\u0645 \u062A\u0623\u0643\u064A\u062F {count} \u0645\u0646 \u0627\u0644\u0645\u062F\u0641\u0648\u0639\u0627\u062A.",
+    "poll.none": "\u0644\u0645 \u064A\u062A\u0645 \u0627\u0644\u0639\u062B\u0648\u0631 \u0639\u0644\u0649 \u0645\u062F\u0641\u0648\u0639\u0627\u062A \u062C\u062F\u064A\u062F\u0629.",
+    "miniapp.button": "\u0641\u062A\u062D \u0644\u0648\u062D\u0629 \u0627\u0644\u062A\u062D\u0643\u0645",
+    "miniapp.prompt": "\u0627\u0636\u063A\u0637 \u0639\u0644\u0649 \u0627\u0644\u0632\u0631 \u0644\u0641\u062A\u062D \u0644\u0648\u062D\u0629 \u0627\u0644\u062A\u062D\u0643\u0645:",
+    "withdraw.usage": "\u0627\u0644\u0627\u0633\u062A\u062E\u062F\u0627\u0645: /withdraw <\u0643\u0645\u064A\u0629 MANH> <\u0639\u0646\u0648\u0627\u0646 TON>",
+    "withdraw.bad_address": "\u0639\u0646\u0648\u0627\u0646 TON \u063A\u064A\u0631 \u0635\u0627\u0644\u062D. \u064A\u062C\u0628 \u0623\u0646 \u064A\u0628\u062F\u0623 \u0628\u0640 UQ \u0623\u0648 EQ.",
+    "withdraw.minimum": "\u0627\u0644\u062D\u062F \u0627\u0644\u0623\u062F\u0646\u0649 \u0644\u0644\u0633\u062D\u0628 \u0647\u0648 {amount} MANH",
+    "withdraw.created": "\u062A\u0645 \u0625\u0646\u0634\u0627\u0621 \u0637\u0644\u0628 \u0627\u0644\u0633\u062D\u0628!\n\u0627\u0644\u0645\u0639\u0631\u0641: {id}\n\u0627\u0644\u0643\u0645\u064A\u0629: {amount} MANH\n\u0627\u0644\u0639\u0646\u0648\u0627\u0646: {address}\n\u0627\u0644\u062D\u0627\u0644\u0629: \u0642\u064A\u062F \u0627\u0644\u0627\u0646\u062A\u0638\u0627\u0631",
+    "p2p.buy_usage": "\u0627\u0644\u0627\u0633\u062A\u062E\u062F\u0627\u0645: /p2p_buy <\u0643\u0645\u064A\u0629 MANH> <\u0627\u0644\u0633\u0639\u0631 \u0644\u0643\u0644 MANH \u0628\u0640 TON>",
+    "p2p.sell_usage": "\u0627\u0644\u0627\u0633\u062A\u062E\u062F\u0627\u0645: /sell <\u0643\u0645\u064A\u0629 MANH> <\u0627\u0644\u0633\u0639\u0631 \u0644\u0643\u0644 MANH \u0628\u0640 TON>",
+    "p2p.insufficient": "\u0631\u0635\u064A\u062F MANH \u063A\u064A\u0631 \u0643\u0627\u0641\u064D.",
+    "p2p.buy_created": "\u062A\u0645 \u0625\u0646\u0634\u0627\u0621 \u0623\u0645\u0631 \u0634\u0631\u0627\u0621: {amount} MANH @ {price} TON",
+    "p2p.sell_created": "\u062A\u0645 \u0625\u0646\u0634\u0627\u0621 \u0623\u0645\u0631 \u0628\u064A\u0639: {amount} MANH @ {price} TON",
+    "p2p.filled": "  \u062A\u0645 \u062A\u0646\u0641\u064A\u0630 {amount} MANH @ {price} TON",
+    "p2p.resting": "\u0627\u0644\u0645\u062A\u0628\u0642\u064A \u0641\u064A \u062F\u0641\u062A\u0631 \u0627\u0644\u0623\u0648\u0627\u0645\u0631: {amount} MANH",
+    "p2p.full": "\u062A\u0645 \u0627\u0644\u062A\u0646\u0641\u064A\u0630 \u0628\u0627\u0644\u0643\u0627\u0645\u0644.",
+    "p2p.trade_sold": "\u0635\u0641\u0642\u0629 P2P {trade}: \u062A\u0645 \u0628\u064A\u0639 {amount} MANH @ {price} TON (\u0627\u0644\u0625\u062C\u0645\u0627\u0644\u064A {total} TON)",
+    "p2p.trade_bought": "\u0635\u0641\u0642\u0629 P2P {trade}: \u062A\u0645 \u0634\u0631\u0627\u0621 {amount} MANH @ {price} TON (\u0627\u0644\u0625\u062C\u0645\u0627\u0644\u064A {total} TON)",
+    "orders.empty": "\u0644\u0627 \u062A\u0648\u062C\u062F \u0623\u0648\u0627\u0645\u0631 \u0645\u0641\u062A\u0648\u062D\u0629.",
+    "orders.buy": "\u0623\u0648\u0627\u0645\u0631 \u0627\u0644\u0634\u0631\u0627\u0621:",
+    "orders.sell": "\u0623\u0648\u0627\u0645\u0631 \u0627\u0644\u0628\u064A\u0639:",
+    "orders.hint": "\n\u0627\u0644\u0623\u0648\u0627\u0645\u0631 \u062D\u0633\u0628 \u0627\u0644\u0645\u0633\u062A\u0648\u0649: /orders <buy|sell|mine>",
+    "orders.usage": "\u0627\u0644\u0627\u0633\u062A\u062E\u062F\u0627\u0645: /orders [buy|sell|mine] [cursor]",
+    "orders.bad_cursor": "\u0645\u0624\u0634\u0631 \u063A\u064A\u0631 \u0635\u0627\u0644\u062D.",
+    "market.empty": "\u0644\u0627 \u064A\u0648\u062C\u062F \u0646\u0634\u0627\u0637 \u0641\u064A \u0627\u0644\u0633\u0648\u0642 \u0628\u0639\u062F.",
+    "market.last": "MANH/TON \u0622\u062E\u0631 \u0633\u0639\u0631: {price}",
+    "market.day": "24 \u0633\u0627\u0639\u0629: {change}%  \u0623\u0639\u0644\u0649 {high}  \u0623\u062F\u0646\u0649 {low}",
+    "market.volume": "\u062D\u062C\u0645 24 \u0633\u0627\u0639\u0629: {volume} MANH \u0641\u064A {trades} \u0635\u0641\u0642\u0629",
+    "market.quote": "\u0634\u0631\u0627\u0621 {bid} / \u0628\u064A\u0639 {ask}",
+    "market.recent": "\u0622\u062E\u0631 \u0627\u0644\u0635\u0641\u0642\u0627\u062A:",
+    "cancel.usage": "\u0627\u0644\u0627\u0633\u062A\u062E\u062F\u0627\u0645: /cancel <order_id> <sell|buy>",
+    "cancel.not_found": "\u0627\u0644\u0623\u0645\u0631 \u063A\u064A\u0631 \u0645\u0648\u062C\u0648\u062F \u0623\u0648 \u0644\u064A\u0633 \u0644\u0643.",
+    "cancel.not_open": "\u0627\u0644\u0623\u0645\u0631 \u063A\u064A\u0631 \u0645\u0641\u062A\u0648\u062D.",
+    "cancel.done": "\u062A\u0645 \u0625\u0644\u063A\u0627\u0621 \u0627\u0644\u0623\u0645\u0631 {id}.",
+    "ref.caption": "\u0627\u0645\u0633\u062D \u0623\u0648 \u0627\u0636\u063A\u0637:\n{link}",
+    "ref.none": "\u0644\u0645 \u062A\u0642\u0645 \u0628\u062F\u0639\u0648\u0629 \u0623\u064A \u0634\u062E\u0635 \u0628\u0639\u062F.",
+    "ref.title": "\u0625\u062D\u0627\u0644\u0627\u062A\u0643:",
+    "ref.row": "{name} - \u0627\u0646\u0636\u0645 \u0641\u064A {date}",
+    "ref.user": "\u0627\u0644\u0645\u0633\u062A\u062E\u062F\u0645 {id}",
+    "menu.main": "\u0627\u0644\u0642\u0627\u0626\u0645\u0629 \u0627\u0644\u0631\u0626\u064A\u0633\u064A\u0629\n\u0627\u062E\u062A\u0631 \u0641\u0626\u0629:",
+    "menu.general": "\u0639\u0627\u0645",
+    "menu.manh": "MANH",
+    "menu.wallet": "\u0627\u0644\u0645\u062D\u0641\u0638\u0629 \u0648\u0627\u0644\u062A\u062F\u0627\u0648\u0644",
+    "menu.admin": "\u0627\u0644\u0625\u062F\u0627\u0631\u0629",
+    "menu.general.text": "/help - \u0645\u0633\u0627\u0639\u062F\u0629\n/faq - \u0627\u0644\u0623\u0633\u0626\u0644\u0629 \u0627\u0644\u0634\u0627\u0626\u0639\u0629\n/start - \u0627\u0644\u0628\u062F\u0621",
+    "menu.manh.text": "/manh - \u0627\u0644\u0631\u0635\u064A\u062F\n/leaderboard - \u0644\u0648\u062D\u0629 \u0627\u0644\u0645\u062A\u0635\u062F\u0631\u064A\u0646\n/buy - \u0634\u0631\u0627\u0621\n/sell - \u0628\u064A\u0639",
+    "menu.wallet.text": "/invoices - \u0627\u0644\u0641\u0648\u0627\u062A\u064A\u0631\n/withdraw - \u0633\u062D\u0628\n/withdrawals - \u0639\u0645\u0644\u064A\u0627\u062A \u0627\u0644\u0633\u062D\u0628\n/p2p_buy - \u0634\u0631\u0627\u0621 P2P",
+    "menu.admin.text": "/admin_stats - \u0627\u0644\u0625\u062D\u0635\u0627\u0626\u064A\u0627\u062A\n/admin_users - \u0627\u0644\u0645\u0633\u062A\u062E\u062F\u0645\u0648\u0646\n/admin_orders - \u0627\u0644\u0623\u0648\u0627\u0645\u0631\n/admin_broadcast - \u0627\u0644\u0628\u062B\n/admin_broadcast_status - \u062A\u0642\u062F\u0645 \u0627\u0644\u0628\u062B",
+    "menu.unknown": "\u062E\u064A\u0627\u0631 \u063A\u064A\u0631 \u0645\u0639\u0631\u0648\u0641",
+    "help.text": "\u0627\u0644\u0623\u0648\u0627\u0645\u0631 \u0627\u0644\u0645\u062A\u0627\u062D\u0629:\n/start - \u0628\u062F\u0621 \u062A\u0634\u063A\u064A\u0644 \u0627\u0644\u0628\u0648\u062A\n/help - \u0639\u0631\u0636 \u0647\u0630\u0647 \u0627\u0644\u0645\u0633\u0627\u0639\u062F\u0629\n/all - \u0639\u0631\u0636 \u062C\u0645\u064A\u0639 \u0627\u0644\u0623\u0648\u0627\u0645\u0631\n/manh - \u0639\u0631\u0636 \u0631\u0635\u064A\u062F MANH \u0627\u0644\u062E\u0627\u0635 \u0628\u0643\n/leaderboard [daily|weekly] - \u0639\u0631\u0636 \u0644\u0648\u062D\u0629 \u0627\u0644\u0645\u062A\u0635\u062F\u0631\u064A\u0646\n/buy <ILS> - \u0634\u0631\u0627\u0621 MANH\n/invoices - \u0639\u0631\u0636 \u0641\u0648\u0627\u062A\u064A\u0631\u0643\n/poll_confirm - \u0627\u0644\u062A\u062D\u0642\u0642 \u0645\u0646 \u0627\u0644\u0645\u062F\u0641\u0648\u0639\u0627\u062A \u0627\u0644\u0645\u0639\u0644\u0642\u0629\n/miniapp - \u0641\u062A\u062D \u0644\u0648\u062D\u0629 \u0627\u0644\u062A\u062D\u0643\u0645\n/withdraw <amount> <address> - \u0637\u0644\u0628 \u0633\u062D\u0628\n/withdrawals - \u0642\u0627\u0626\u0645\u0629 \u0639\u0645\u0644\u064A\u0627\u062A \u0627\u0644\u0633\u062D\u0628 \u0627\u0644\u062E\u0627\u0635\u0629 \u0628\u0643\n/chatid - \u0627\u0644\u062D\u0635\u0648\u0644 \u0639\u0644\u0649 \u0645\u0639\u0631\u0641 \u0627\u0644\u0645\u062D\u0627\u062F\u062B\u0629\n/p2p_buy <amount> <price> - \u0648\u0636\u0639 \u0623\u0645\u0631 \u0634\u0631\u0627\u0621 P2P\n/sell <amount> <price> - \u0648\u0636\u0639 \u0623\u0645\u0631 \u0628\u064A\u0639 P2P\n/orders [buy|sell|mine] - \u0639\u0631\u0636 \u0639\u0645\u0642 \u0627\u0644\u0633\u0648\u0642 \u0623\u0648 \u0627\u0644\u0623\u0648\u0627\u0645\u0631 \u0627\u0644\u0645\u0641\u062A\u0648\u062D\u0629\n/market - \u0633\u0639\u0631 MANH/TON \u0648\u0625\u062D\u0635\u0627\u0621\u0627\u062A 24 \u0633\u0627\u0639\u0629 \u0648\u0622\u062E\u0631 \u0627\u0644\u0635\u0641\u0642\u0627\u062A\n/cancel <id> <sell|buy> - \u0625\u0644\u063A\u0627\u0621 \u0623\u0645\u0631\n/referral - \u0627\u0644\u062D\u0635\u0648\u0644 \u0639\u0644\u0649 \u0631\u0627\u0628\u0637 \u0627\u0644\u0625\u062D\u0627\u0644\u0629\n/referrals - \u0639\u0631\u0636 \u0627\u0644\u0645\u0633\u062A\u062E\u062F\u0645\u064A\u0646 \u0627\u0644\u0645\u064F\u062D\u0627\u0644\u064A\u0646\n/menu - \u0641\u062A\u062D \u0627\u0644\u0642\u0627\u0626\u0645\u0629 \u0627\u0644\u062A\u0641\u0627\u0639\u0644\u064A\u0629\n/faq - \u0627\u0644\u0623\u0633\u0626\u0644\u0629 \u0627\u0644\u0634\u0627\u0626\u0639\u0629\n/admin - \u0644\u0648\u062D\u0629 \u0627\u0644\u0625\u062F\u0627\u0631\u0629\n/admin_stats - \u0625\u062D\u0635\u0627\u0626\u064A\u0627\u062A \u0627\u0644\u0625\u062F\u0627\u0631\u0629\n/admin_users - \u0642\u0627\u0626\u0645\u0629 \u0627\u0644\u0645\u0633\u062A\u062E\u062F\u0645\u064A\u0646\n/admin_segment <expression> - \u0639\u062F\u0651 \u0627\u0644\u0645\u0633\u062A\u062E\u062F\u0645\u064A\u0646 \u0641\u064A \u0634\u0631\u064A\u062D\u0629\n/admin_tag <user_id> <tag> - \u0648\u0633\u0645 \u0645\u0633\u062A\u062E\u062F\u0645\n/admin_orders - \u062C\u0645\u064A\u0639 \u0627\u0644\u0623\u0648\u0627\u0645\u0631\n/admin_broadcast - \u0628\u062B \u0631\u0633\u0627\u0644\u0629\n/admin_broadcast_to <segment> | <message> - \u0628\u062B \u0625\u0644\u0649 \u0634\u0631\u064A\u062D\u0629\n/admin_broadcast_status [id] - \u062A\u0642\u062F\u0645 \u0627\u0644\u0628\u062B\n/admin_broadcast_cancel <id> - \u0625\u064A\u0642\u0627\u0641 \u0628\u062B\n/payout_batch - \u062A\u062C\u0645\u064A\u0639 \u0639\u0645\u0644\u064A\u0627\u062A \u0627\u0644\u0633\u062D\u0628 \u0627\u0644\u0645\u0639\u062A\u0645\u062F\u0629 \u0648\u062A\u0635\u062F\u064A\u0631 \u0627\u0644\u0628\u064A\u0627\u0646\u0627\u062A\n/payout_confirm - \u062A\u0623\u0643\u064A\u062F \u0627\u0644\u0645\u062F\u0641\u0648\u0639\u0627\u062A \u0627\u0644\u0645\u0631\u0633\u0644\u0629 \u0639\u0644\u0649 \u0627\u0644\u0633\u0644\u0633\u0644\u0629",
+    "faq.text": "**\u0627\u0644\u0623\u0633\u0626\u0644\u0629 \u0627\u0644\u0634\u0627\u0626\u0639\u0629**\n\n**\u0645\u0627 \u0647\u0648 MANH\u061F**\nMANH \u0631\u0645\u0632 \u0631\u0642\u0645\u064A \u0645\u0628\u0646\u064A \u0639\u0644\u0649 TON \u0648\u064A\u064F\u0633\u062A\u062E\u062F\u0645 \u062F\u0627\u062E\u0644 \u0627\u0644\u0646\u0638\u0627\u0645.\n\n**\u0643\u064A\u0641 \u0623\u0634\u062A\u0631\u064A MANH\u061F**\n\u0627\u0633\u062A\u062E\u062F\u0645 /buy <\u0627\u0644\u0645\u0628\u0644\u063A \u0628\u0627\u0644\u0634\u064A\u0643\u0644>. \u0633\u064A\u062A\u0645 \u0625\u0646\u0634\u0627\u0621 \u0641\u0627\u062A\u0648\u0631\u0629 \u0644\u0644\u062F\u0641\u0639 \u0628\u0639\u0645\u0644\u0629 TON.\n\n**\u0643\u0645 \u064A\u0633\u062A\u063A\u0631\u0642 \u062A\u0623\u0643\u064A\u062F \u0627\u0644\u062F\u0641\u0639\u061F**\n\u0639\u0627\u062F\u0629\u064B \u0628\u0636\u0639 \u062F\u0642\u0627\u0626\u0642. \u062A\u062D\u0642\u0642 \u0628\u0627\u0633\u062A\u062E\u062F\u0627\u0645 /poll_confirm.\n\n**\u0645\u0627 \u0647\u0648 P2P\u061F**\n\u062A\u062F\u0627\u0648\u0644 \u0645\u0628\u0627\u0634\u0631 \u0628\u064A\u0646 \u0627\u0644\u0645\u0633\u062A\u062E\u062F\u0645\u064A\u0646 \u2013 \u064A\u0645\u0643\u0646\u0643 \u0634\u0631\u0627\u0621 \u0623\u0648 \u0628\u064A\u0639 MANH \u0645\u0628\u0627\u0634\u0631\u0629 \u0645\u0639 \u0645\u0633\u062A\u062E\u062F\u0645\u064A\u0646 \u0622\u062E\u0631\u064A\u0646.",
+    "chatid.show": "\u0645\u0639\u0631\u0641 \u0627\u0644\u0645\u062D\u0627\u062F\u062B\u0629: {id}\n\u0627\u0644\u0646\u0648\u0639: {type}",
+    "admin.approve_usage": "\u0627\u0644\u0627\u0633\u062A\u062E\u062F\u0627\u0645: /approve_withdrawal <\u0645\u0639\u0631\u0641 \u0627\u0644\u0633\u062D\u0628>",
+    "admin.approved": "\u062A\u0645\u062A \u0627\u0644\u0645\u0648\u0627\u0641\u0642\u0629 \u0639\u0644\u0649 \u0627\u0644\u0633\u062D\u0628 {id}.",
+    "admin.reject_usage": "\u0627\u0644\u0627\u0633\u062A\u062E\u062F\u0627\u0645: /reject_withdrawal <\u0645\u0639\u0631\u0641 \u0627\u0644\u0633\u062D\u0628>",
+    "admin.rejected": "\u062A\u0645 \u0631\u0641\u0636 \u0627\u0644\u0633\u062D\u0628 {id}.",
+    "admin.payout_none": "\u0644\u0627 \u062A\u0648\u062C\u062F \u0639\u0645\u0644\u064A\u0627\u062A \u0633\u062D\u0628 \u0645\u0639\u062A\u0645\u062F\u0629 \u0644\u0644\u062A\u062C\u0645\u064A\u0639.",
+    "admin.payout_batch": "\u0627\u0644\u062F\u0641\u0639\u0629 {id}: {count} \u0645\u062F\u0641\u0648\u0639\u0627\u062A\u060C {total} MANH",
+    "admin.payout_done": "\u0627\u0643\u062A\u0645\u0644\u062A {completed} \u0645\u062F\u0641\u0648\u0639\u0627\u062A\u060C \u0648\u062A\u0645 \u062A\u0623\u0643\u064A\u062F {batches} \u062F\u0641\u0639\u0627\u062A.",
+    "admin.stats": "\u0627\u0644\u0625\u062D\u0635\u0627\u0626\u064A\u0627\u062A:\n\u0627\u0644\u0645\u0633\u062A\u062E\u062F\u0645\u0648\u0646: {users}\n\u0627\u0644\u0641\u0648\u0627\u062A\u064A\u0631: {invoices}\n\u0627\u0644\u0623\u0648\u0627\u0645\u0631: {orders}",
+    "admin.bc_usage": "\u0627\u0644\u0627\u0633\u062A\u062E\u062F\u0627\u0645: /admin_broadcast <\u0631\u0633\u0627\u0644\u0629>",
+    "admin.bc_queued": "\u062A\u0645\u062A \u062C\u062F\u0648\u0644\u0629 \u0627\u0644\u0628\u062B {id} \u0625\u0644\u0649 {total} \u0645\u0633\u062A\u062E\u062F\u0645.\n\u0627\u0644\u062A\u0642\u062F\u0645: /admin_broadcast_status {id}",
+    "admin.bc_to_usage": "\u0627\u0644\u0627\u0633\u062A\u062E\u062F\u0627\u0645: /admin_broadcast_to <\u0634\u0631\u064A\u062D\u0629> | <\u0631\u0633\u0627\u0644\u0629>\n\u0645\u062B\u0627\u0644: /admin_broadcast_to tag:vip AND balance>0 | \u0645\u0631\u062D\u0628\u0627\u064B!",
+    "admin.bc_to_queued": "\u062A\u0645\u062A \u062C\u062F\u0648\u0644\u0629 \u0627\u0644\u0628\u062B {id} \u0625\u0644\u0649 {total} \u0645\u0633\u062A\u062E\u062F\u0645 \u0641\u064A [{target}].\n\u0627\u0644\u062A\u0642\u062F\u0645: /admin_broadcast_status {id}",
+    "admin.bad_segment": "\u0634\u0631\u064A\u062D\u0629 \u063A\u064A\u0631 \u0635\u0627\u0644\u062D\u0629: {err}",
+    "admin.seg_usage": "\u0627\u0644\u0627\u0633\u062A\u062E\u062F\u0627\u0645: /admin_segment <\u062A\u0639\u0628\u064A\u0631>\n\u0627\u0644\u0639\u0646\u0627\u0635\u0631: tag:<name>, balance|reserved|available|xp <op> <number>, blocked, all\n\u0627\u062F\u0645\u062C\u0647\u0627 \u0628\u0627\u0633\u062A\u062E\u062F\u0627\u0645 AND \u0648OR \u0648NOT \u0648\u0627\u0644\u0623\u0642\u0648\u0627\u0633.",
+    "admin.seg_match": "{count} \u0645\u0633\u062A\u062E\u062F\u0645 \u0645\u0637\u0627\u0628\u0642.",
+    "admin.seg_match_first": "{count} \u0645\u0633\u062A\u062E\u062F\u0645 \u0645\u0637\u0627\u0628\u0642. \u0627\u0644\u0623\u0648\u0627\u0626\u0644: {sample}",
+    "admin.tag_usage": "\u0627\u0644\u0627\u0633\u062A\u062E\u062F\u0627\u0645: /admin_tag <\u0645\u0639\u0631\u0641 \u0627\u0644\u0645\u0633\u062A\u062E\u062F\u0645> <\u0648\u0633\u0645>   (\u0623\u0636\u0641 - \u0642\u0628\u0644 \u0627\u0644\u0648\u0633\u0645 \u0644\u0625\u0632\u0627\u0644\u062A\u0647)",
+    "admin.tag_removed": "\u062A\u0645\u062A \u0625\u0632\u0627\u0644\u0629 \u0627\u0644\u0648\u0633\u0645 {tag} \u0645\u0646 {user}.",
+    "admin.tag_added": "\u062A\u0645 \u0648\u0633\u0645 {user} \u0628\u0640 {tag}.",
+    "admin.bc_none": "\u0644\u0645 \u064A\u062A\u0645 \u0627\u0644\u0639\u062B\u0648\u0631 \u0639\u0644\u0649 \u0628\u062B.",
+    "admin.bc_status": "\u0627\u0644\u0628\u062B {id}: {status}\n{processed}/{total} ({percent}%)\n\u0623\u064F\u0631\u0633\u0644: {sent} | \u0641\u0634\u0644: {failed} | \u0645\u062D\u0638\u0648\u0631: {blocked}",
+    "admin.bc_cancel_usage": "\u0627\u0644\u0627\u0633\u062A\u062E\u062F\u0627\u0645: /admin_broadcast_cancel <\u0645\u0639\u0631\u0641 \u0627\u0644\u0645\u0647\u0645\u0629>",
+    "admin.bc_cancelled": "\u062A\u0645 \u0625\u0644\u063A\u0627\u0621 \u0627\u0644\u0628\u062B {id}.",
+    "admin.bc_already": "\u0627\u0644\u0628\u062B {id} \u0641\u064A \u062D\u0627\u0644\u0629 {status} \u0628\u0627\u0644\u0641\u0639\u0644.",
+    "level.show": "\u0627\u0644\u0645\u0633\u062A\u0648\u0649: {level}\nXP: {xp}\nXP \u0644\u0644\u0645\u0633\u062A\u0648\u0649 \u0627\u0644\u062A\u0627\u0644\u064A: {needed}",
+    "pg.prev": "\u00AB \u0627\u0644\u0633\u0627\u0628\u0642",
+    "pg.next": "\u0627\u0644\u062A\u0627\u0644\u064A \u00BB",
+    "pg.page": "\u0635\u0641\u062D\u0629 {number}",
+    "pg.empty": "\u0644\u0627 \u064A\u0648\u062C\u062F \u0645\u0627 \u064A\u064F\u0639\u0631\u0636.",
+    "pg.expired": "\u0627\u0646\u062A\u0647\u062A \u0635\u0644\u0627\u062D\u064A\u0629 \u0647\u0630\u0647 \u0627\u0644\u0642\u0627\u0626\u0645\u0629. \u0634\u063A\u0651\u0644 \u0627\u0644\u0623\u0645\u0631 \u0645\u0631\u0629 \u0623\u062E\u0631\u0649.",
+    "pg.not_yours": "\u0647\u0630\u0647 \u0627\u0644\u0642\u0627\u0626\u0645\u0629 \u062A\u062E\u0635 \u0634\u062E\u0635\u064B\u0627 \u0622\u062E\u0631.",
+    "list.users": "\u0627\u0644\u0645\u0633\u062A\u062E\u062F\u0645\u0648\u0646:",
+    "list.users.empty": "\u0644\u0627 \u064A\u0648\u062C\u062F \u0645\u0633\u062A\u062E\u062F\u0645\u0648\u0646.",
+    "list.book": "\u0627\u0644\u0623\u0648\u0627\u0645\u0631 \u0627\u0644\u0645\u0641\u062A\u0648\u062D\u0629:",
+    "list.all_orders": "\u062C\u0645\u064A\u0639 \u0627\u0644\u0623\u0648\u0627\u0645\u0631 \u0627\u0644\u0645\u0641\u062A\u0648\u062D\u0629:",
+    "list.invoices": "\u0641\u0648\u0627\u062A\u064A\u0631\u0643:",
+    "list.invoices.empty": "\u0644\u0645 \u064A\u062A\u0645 \u0627\u0644\u0639\u062B\u0648\u0631 \u0639\u0644\u0649 \u0641\u0648\u0627\u062A\u064A\u0631.",
+    "list.withdrawals": "\u0639\u0645\u0644\u064A\u0627\u062A \u0627\u0644\u0633\u062D\u0628 \u0627\u0644\u062E\u0627\u0635\u0629 \u0628\u0643:",
+    "list.withdrawals.empty": "\u0644\u0645 \u064A\u062A\u0645 \u0627\u0644\u0639\u062B\u0648\u0631 \u0639\u0644\u0649 \u0637\u0644\u0628\u0627\u062A \u0633\u062D\u0628.",
+    "list.history": "\u0646\u0634\u0627\u0637\u0643 \u0627\u0644\u0623\u062E\u064A\u0631:",
+    "list.history.empty": "\u0644\u0627 \u064A\u0648\u062C\u062F \u0633\u062C\u0644 \u0628\u0639\u062F.",
   },
 }
 
-def t(lang: str, key: str, **kw: Any) -> str:
-  lang = (lang or LANG_DEFAULT).lower()
-  table = T.get(lang) or T[LANG_DEFAULT]
-  s = table.get(key) or T["en"].get(key) or key
-  return s.format(**kw)
+# Templates are parsed once at import: each becomes a tuple of literal strings
+# and (field, conversion, spec) slots, so t() is a join with no parsing.
+_Template = Tuple[Union[str, Tuple[str, Optional[str], str]], ...]
+
+def _compile(s: str) -> _Template:
+  parts = []
+  for literal, field, spec, conv in Formatter().parse(s):
+    if literal:
+      parts.append(literal)
+    if field is not None:
+      parts.append((field, conv, spec or ""))
+  return tuple(parts)
+
+_COMPILED: Dict[str, Dict[str, _Template]] = {
+  lang: {key: _compile(s) for key, s in table.items()} for lang, table in T.items()
+}
+
+def _render(tpl: _Template, kw: Dict[str, Any]) -> str:
+  out = []
+  for part in tpl:
+    if part.__class__ is str:
+      out.append(part)
+      continue
+    field, conv, spec = part
+    value = kw[field]
+    if conv == "r":
+      value = repr(value)
+    elif conv == "s":
+      value = str(value)
+    elif conv == "a":
+      value = ascii(value)
+    out.append(format(value, spec))
+  return "".join(out)
+
+def t(lang: str, key: str, /, **kw: Any) -> str:
+  table = _COMPILED.get((lang or LANG_DEFAULT).lower()) or _COMPILED[LANG_DEFAULT]
+  tpl = table.get(key) or _COMPILED[LANG_DEFAULT].get(key)
+  if tpl is None:
+    return key
+  return _render(tpl, kw)
+
+# Telegram sends an IETF tag ("he-IL", "pt-br", ...); old clients still use "iw".
+_ALIASES = {"iw": "he"}
+MAX_CACHED_USERS = 100_000
+_user_langs: "OrderedDict[int, Tuple[Any, str]]" = OrderedDict()
+
+def resolve_lang(language_code: Any) -> str:
+  if not isinstance(language_code, str) or not language_code:
+    return LANG_DEFAULT
+  base = language_code.replace("_", "-").split("-", 1)[0].lower()
+  base = _ALIASES.get(base, base)
+  return base if base in T else LANG_DEFAULT
+
+def user_lang(user_id: int, language_code: Any = None) -> str:
+  """The user's language, resolved from the Telegram language_code once and cached.
+
+  A changed language_code (the user switched the app language) is resolved again.
+  Without a code (messages the user did not trigger, e.g. trade notices) the
+  cached language is used, falling back to the default.
+  """
+  hit = _user_langs.get(user_id)
+  if hit is not None and (language_code is None or hit[0] == language_code):
+    _user_langs.move_to_end(user_id)
+    return hit[1]
+  if language_code is None:
+    return LANG_DEFAULT
+  lang = resolve_lang(language_code)
+  _user_langs[user_id] = (language_code, lang)
+  while len(_user_langs) > MAX_CACHED_USERS:
+    _user_langs.popitem(last=False)
+  return lang
 
 
 
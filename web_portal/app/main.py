@@ -8,7 +8,9 @@ from .api.user import router as user_router
 
 # TG_BUILDSTAMP_ENV_V1
 import os as _os
+import asyncio
 import os
+import signal
 import sys
 import logging
 from contextlib import asynccontextmanager
@@ -19,6 +21,7 @@ from fastapi.templating import Jinja2Templates
 
 from sqlalchemy import inspect, text, create_engine
 
+from .core.config import reload_config
 from .core.settings import settings
 from .db import engine, get_db, SessionLocal
 from .database.models import Base
@@ -29,11 +32,19 @@ from .tg_bot import (
 from .manh.storage import get_db as manh_get_db
 from .manh.service import get_balance, leaderboard, set_opt_in
 from .payments.ton.service import list_invoices
-from .payments.ton.price_feed import get_ton_ils_cached
+from .payments.ton.price_feed import get_ton_ils_cached, price_feed
+from .payments.ton.price_history import price_history
 from .payments.ton.withdrawals import create_withdrawal, get_user_withdrawals
 from .manh.leaderboard import get_leaderboard
 from .manh.referrals import set_referral_code, get_user_referrals
 from .p2p.service import create_sell_order, create_buy_order, get_open_orders, cancel_order
+from .p2p.orderbook import order_book
+from .p2p.expiry import order_expiry
+from .p2p.market import market_data
+from .segments import segment_index
+from .database.event_writer import event_writer
+from .push import push_hub
+from .assets import assets
 
 # ---------- Logging Configuration ----------
 logging.basicConfig(
@@ -73,20 +84,73 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"APP: table check error: {e}", exc_info=True)
 
+    # security/marketing events are buffered and written in batches from here on
+    event_writer.start(SessionLocal, max_age=settings.EVENT_FLUSH_SEC)
+    await push_hub.start(settings.PUSH_REDIS_URL, buffer=settings.PUSH_BUFFER,
+                         heartbeat_sec=settings.PUSH_HEARTBEAT_SEC)
+    assets.load()
+
     try:
         await init_bot()
         logger.info("APP: bot initialized successfully")
     except Exception as e:
         logger.error("APP: init_bot error: " + repr(e), exc_info=True)
 
+    try:
+        # ops signal: `kill -HUP <pid>` re-reads the environment into a new config snapshot
+        # and the mini-app pages from disk
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, lambda: (reload_config(), assets.load()))
+    except (NotImplementedError, AttributeError, RuntimeError):
+        logger.info("APP: SIGHUP config reload not available on this platform")
+
+    try:
+        with SessionLocal() as db:
+            price_history.restore(db)
+        price_history.start(SessionLocal, interval_sec=settings.PRICE_HISTORY_SNAPSHOT_SEC)
+    except Exception as e:
+        logger.error("APP: price history start error: " + repr(e), exc_info=True)
+
+    try:
+        price_feed.start()
+    except Exception as e:
+        logger.error("APP: price feed start error: " + repr(e), exc_info=True)
+
+    try:
+        with SessionLocal() as db:
+            order_book.rebuild(db)
+        order_expiry.start(SessionLocal, interval_sec=settings.P2P_EXPIRY_INTERVAL_SEC)
+    except Exception as e:
+        logger.error("APP: order book rebuild error: " + repr(e), exc_info=True)
+
+    try:
+        with SessionLocal() as db:
+            market_data.restore(db)
+        market_data.start(SessionLocal, interval_sec=settings.MARKET_SNAPSHOT_SEC)
+    except Exception as e:
+        logger.error("APP: market data start error: " + repr(e), exc_info=True)
+
+    try:
+        with SessionLocal() as db:
+            segment_index.rebuild(db)
+        segment_index.start(SessionLocal, interval_sec=settings.SEGMENT_REFRESH_SEC)
+    except Exception as e:
+        logger.error("APP: segment index start error: " + repr(e), exc_info=True)
+
     yield
 
     logger.info("APP: lifespan shutdown")
+    await price_feed.stop()
+    await order_expiry.stop()
+    await market_data.stop(SessionLocal)
+    await segment_index.stop()
+    await price_history.stop(SessionLocal)
     try:
         await shutdown_bot()
         logger.info("APP: bot shut down successfully")
     except Exception as e:
         logger.error("APP: shutdown_bot error: " + repr(e), exc_info=True)
+    await push_hub.stop()
+    await event_writer.stop()
 
 # ---------- FastAPI app ----------
 app = FastAPI(title="telegram-guardian", version="tg-guardian-1", lifespan=lifespan)
@@ -129,24 +193,7 @@ async def _no_cache_openapi(request, call_next):
     return resp
 
 # ---------- API endpoints ----------
-@app.get('/api/user_data')
-async def api_user_data(request: Request):
-    logger.debug('api_user_data: called')
-    user_id = 224223270
-    balance = await _with_db(lambda db: get_balance(db, user_id))
-    if isinstance(balance, dict):
-        manh_value = balance['manh']
-    else:
-        manh_value = balance
-    invoices = await _with_db(lambda db: list_invoices(db, user_id=user_id, limit=10))
-    bucket_key = datetime.now(timezone.utc).strftime('%Y-%m-%d')
-    lb = await _with_db(lambda db: leaderboard(db, bucket_scope='daily', bucket_key=bucket_key, limit=10))
-    return JSONResponse({
-        'balance': manh_value,
-        'invoices': invoices,
-        'leaderboard': lb
-    })
-
+# user data for the mini app: /api/bootstrap in api/user.py
 @app.post('/api/buy/{amount}')
 async def api_buy(amount: int):
     logger.debug(f"api_buy called with amount={amount}")
@@ -172,35 +219,14 @@ async def api_poll():
     return JSONResponse({'status': 'poll triggered'})
 
 # ---------- Mini-app endpoints ----------
+# served from memory, pre-compressed, with ETags (see assets.py)
 @app.get('/mini_app')
 async def mini_app(request: Request):
-    import os
-    logger.debug('=== mini_app debug ===')
-    logger.debug(f'Current working dir: {os.getcwd()}')
-    if hasattr(templates, 'env') and hasattr(templates.env, 'loader'):
-        try:
-            paths = templates.env.loader.searchpath
-            logger.debug(f'Loader searchpath: {paths}')
-        except Exception as e:
-            logger.debug(f'Cannot get searchpath: {e}')
-    try:
-        files = os.listdir(os.path.join(os.path.dirname(__file__), "templates"))
-        logger.debug(f'Files in app/templates: {files}')
-    except Exception as e:
-        logger.debug(f'Cannot list app/templates: {e}')
-    try:
-        return templates.TemplateResponse('dashboard.html', {'request': request})
-    except Exception as e:
-        logger.error(f'!!! mini_app error: {e}', exc_info=True)
-        return {'error': str(e)}
+    return assets.response(request, 'dashboard.html')
 
 @app.get("/new_mini_app")
-async def new_mini_app():
-    templates_dir = os.path.join(os.path.dirname(__file__), "templates")
-    path = os.path.join(templates_dir, "mini_app.html")
-    with open(path, "r", encoding="utf-8") as f:
-        html = f.read()
-    return HTMLResponse(content=html)
+async def new_mini_app(request: Request):
+    return assets.response(request, "mini_app.html")
 
 # ---------- Telegram diagnostics ----------
 @app.get("/tg/diagnostics")
@@ -278,6 +304,32 @@ def ops_runtime(token: str = Query(..., description="OPS token")):
         "route_count": len(getattr(app.router, "routes", [])),
     }
 
+@app.post("/ops/config/reload")
+def ops_config_reload(token: str = Query(..., description="OPS token")):
+    from .core.ops_auth import require_ops_token
+    _ = require_ops_token(token)  # raises 401/503
+    cfg = reload_config()
+    return {"ok": True, "config_version": cfg.version}
+
+@app.post("/ops/assets/reload")
+def ops_assets_reload(token: str = Query(..., description="OPS token")):
+    from .core.ops_auth import require_ops_token
+    _ = require_ops_token(token)  # raises 401/503
+    assets.load()
+    return {"ok": True, "assets": assets.stats()}
+
+@app.get("/ops/events")
+def ops_events(token: str = Query(..., description="OPS token")):
+    from .core.ops_auth import require_ops_token
+    _ = require_ops_token(token)  # raises 401/503
+    return {"ok": True, "event_writer": event_writer.stats()}
+
+@app.get("/ops/push")
+def ops_push(token: str = Query(..., description="OPS token")):
+    from .core.ops_auth import require_ops_token
+    _ = require_ops_token(token)  # raises 401/503
+    return {"ok": True, "push": push_hub.stats()}
+
 @app.get("/ops/health")
 def ops_health():
     from .core.ops_db import _ops_db_check, _ops_uptime_seconds
@@ -334,17 +386,11 @@ def debug_templates():
 
 @app.get("/debug/templates-full")
 def debug_templates_full():
-    import os
-    templates_dir = os.path.join(os.path.dirname(__file__), "templates")
+    # the pages as currently served (loaded by assets.load), not what is on disk
     result = {}
-    if os.path.exists(templates_dir):
-        for f in os.listdir(templates_dir):
-            path = os.path.join(templates_dir, f)
-            try:
-                with open(path, "r", encoding="utf-8") as file:
-                    result[f] = file.read()[:200]
-            except:
-                result[f] = "Error reading file"
+    for name in assets.names:
+        asset = assets.get(name)
+        result[name] = asset.encodings["identity"][:200].decode("utf-8", "replace") if asset else "Not loaded"
     return result
 
 # ---------- Post init ----------
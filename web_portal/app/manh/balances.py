@@ -0,0 +1,201 @@
+"""
+Atomic MANH balance mutations.
+
+Every change to users.balance_manh goes through `apply_balance_delta`, which
+applies it as one conditional UPDATE (`balance + d >= 0`) and records the
+resulting balance in ledger_events within the same transaction. On PostgreSQL
+both happen in a single statement (a data-modifying CTE); elsewhere the UPDATE
+... RETURNING is followed by the ledger INSERT. Nothing reads the balance into
+Python first, so concurrent debits cannot overdraw an account and no row lock
+is held across a round trip. Callers own the commit.
+
+users.reserved_manh is the part of the balance escrowed by open sell orders.
+Debits can only spend the available balance (balance - reserved);
+`reserve_balance` / `release_reserve` move MANH in and out of escrow with the
+same kind of conditional UPDATE, and a P2P fill debits the balance and the
+reserve together, so it never needs to re-check the seller.
+
+Every ledger write queues a `balance` push to the user (see push.py); it is
+sent when the caller commits.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any, Optional
+
+from sqlalchemy import JSON, bindparam, case, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from web_portal.app.database.models import LedgerEvent, User
+from web_portal.app.push import publish_after_commit
+
+_users = User.__table__
+_ledger = LedgerEvent.__table__
+
+
+class InsufficientBalance(ValueError):
+    """The user does not exist or the change would make the balance negative."""
+
+    def __init__(self, user_id: int, delta: Decimal):
+        super().__init__("Insufficient balance")
+        self.user_id = user_id
+        self.delta = delta
+
+
+def available_balance(user: User) -> Decimal:
+    """Balance not escrowed by open sell orders."""
+    return Decimal(str(user.balance_manh or 0)) - Decimal(str(user.reserved_manh or 0))
+
+
+def _update_stmt(user_id: int, delta: Decimal, xp_delta: int, reserved_delta: Decimal):
+    balance = func.coalesce(_users.c.balance_manh, 0)
+    reserved = func.coalesce(_users.c.reserved_manh, 0)
+    values = {"balance_manh": balance + delta}
+    conds = [_users.c.id == user_id, balance + delta >= 0]
+    if delta < 0 or reserved_delta > 0:
+        # spending or escrowing must leave the available balance non-negative
+        conds.append(balance + delta - (reserved + reserved_delta) >= 0)
+    if reserved_delta:
+        values["reserved_manh"] = reserved + reserved_delta
+        conds.append(reserved + reserved_delta >= 0)
+    if xp_delta:
+        values["total_xp"] = func.coalesce(_users.c.total_xp, 0) + xp_delta
+    return (
+        update(_users)
+        .where(*conds)
+        .values(**values)
+        .returning(_users.c.id, _users.c.balance_manh, _users.c.reserved_manh)
+    )
+
+
+def _sync_identity(db: Session, user_id: int, balance: Optional[Decimal], xp_delta: int = 0,
+                   reserved: Optional[Decimal] = None) -> None:
+    # keep an already-loaded User in step without another SELECT
+    user = db.identity_map.get(db.identity_key(User, user_id))
+    if user is None:
+        return
+    if balance is not None:
+        set_committed_value(user, "balance_manh", balance)
+    if reserved is not None:
+        set_committed_value(user, "reserved_manh", reserved)
+    if xp_delta:
+        set_committed_value(user, "total_xp", (user.total_xp or 0) + xp_delta)
+
+
+def apply_balance_delta(
+    db: Session,
+    user_id: int,
+    delta: Decimal,
+    event_type: str,
+    description: Optional[str] = None,
+    meta: Optional[dict[str, Any]] = None,
+    *,
+    xp_delta: int = 0,
+    reserved_delta: Decimal = Decimal(0),
+) -> Decimal:
+    """
+    Add `delta` (may be negative) to the user's balance and write the ledger
+    row. Returns the new balance; raises InsufficientBalance without changing
+    anything if the user is missing, a debit exceeds the available balance or
+    `reserved_delta` would take more out of escrow than it holds.
+    """
+    delta = Decimal(str(delta))
+    reserved_delta = Decimal(str(reserved_delta))
+    upd = _update_stmt(user_id, delta, xp_delta, reserved_delta)
+
+    if db.get_bind().dialect.name == "postgresql":
+        moved = upd.cte("moved")
+        stmt = insert(_ledger).from_select(
+            ["user_id", "event_type", "amount", "balance_after", "description", "meta"],
+            select(
+                moved.c.id,
+                literal(event_type),
+                literal(delta, _ledger.c.amount.type),
+                moved.c.balance_manh,
+                literal(description, _ledger.c.description.type),
+                literal(meta, JSON),
+            ),
+        ).returning(_ledger.c.balance_after)
+        row = db.execute(stmt).first()
+        reserved = None
+    else:
+        row = db.execute(upd).first()
+        if row is not None:
+            db.execute(insert(_ledger).values(
+                user_id=user_id,
+                event_type=event_type,
+                amount=delta,
+                balance_after=row[1],
+                description=description,
+                meta=meta,
+            ))
+            reserved = Decimal(str(row[2] or 0))
+            row = (row[1],)
+
+    if row is None:
+        raise InsufficientBalance(user_id, delta)
+    balance = Decimal(str(row[0]))
+    if reserved is None and reserved_delta:
+        # the CTE only returns the balance; an unknown reserve is reloaded on access
+        user = db.identity_map.get(db.identity_key(User, user_id))
+        if user is not None:
+            db.expire(user, ["reserved_manh"])
+    _sync_identity(db, user_id, balance, xp_delta, reserved)
+    publish_after_commit(db, user_id, "balance", {"balance": str(balance), "delta": str(delta), "event_type": event_type})
+    return balance
+
+
+def reserve_balance(db: Session, user_id: int, amount: Decimal) -> Decimal:
+    """
+    Move `amount` of the available balance into escrow. Returns the new
+    reserve; raises InsufficientBalance if the available balance is short.
+    """
+    amount = Decimal(str(amount))
+    reserved = func.coalesce(_users.c.reserved_manh, 0)
+    row = db.execute(
+        update(_users)
+        .where(_users.c.id == user_id, func.coalesce(_users.c.balance_manh, 0) - reserved >= amount)
+        .values(reserved_manh=reserved + amount)
+        .returning(_users.c.reserved_manh)
+    ).first()
+    if row is None:
+        raise InsufficientBalance(user_id, -amount)
+    value = Decimal(str(row[0]))
+    _sync_identity(db, user_id, None, reserved=value)
+    return value
+
+
+def release_reserve(db: Session, user_id: int, amount: Decimal) -> Decimal:
+    """Return `amount` from escrow to the available balance (never below zero)."""
+    amount = Decimal(str(amount))
+    reserved = func.coalesce(_users.c.reserved_manh, 0)
+    row = db.execute(
+        update(_users)
+        .where(_users.c.id == user_id)
+        .values(reserved_manh=case((reserved >= amount, reserved - amount), else_=0))
+        .returning(_users.c.reserved_manh)
+    ).first()
+    value = Decimal(str(row[0])) if row is not None else Decimal(0)
+    if row is not None:
+        _sync_identity(db, user_id, None, reserved=value)
+    return value
+
+
+def release_reserves(db: Session, amounts: dict[int, Decimal]) -> None:
+    """`release_reserve` for many users in one executemany (expiry sweeps)."""
+    if not amounts:
+        return
+    reserved = func.coalesce(_users.c.reserved_manh, 0)
+    amount = bindparam("amount", type_=_users.c.reserved_manh.type)
+    db.execute(
+        update(_users)
+        .where(_users.c.id == bindparam("uid"))
+        .values(reserved_manh=case((reserved >= amount, reserved - amount), else_=0)),
+        [{"uid": uid, "amount": Decimal(str(a))} for uid, a in amounts.items()],
+    )
+    for uid in amounts:
+        user = db.identity_map.get(db.identity_key(User, uid))
+        if user is not None:
+            db.expire(user, ["reserved_manh"])
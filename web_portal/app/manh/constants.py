@@ -1,5 +1,6 @@
 from __future__ import annotations
 from datetime import datetime, timezone
+from decimal import Decimal
 
 # Immutable launch epoch (UTC). Change requires code+commit.
 MANH_LAUNCH_EPOCH_UTC = datetime(2026, 2, 11, 0, 0, 0, tzinfo=timezone.utc)
@@ -9,3 +10,6 @@ LEADERBOARD_TZ = "Asia/Jerusalem"
 
 # Decimal scale in DB (DECIMAL(38, 9))
 MANH_SCALE = 9
+
+# MANH credited to the referrer when an invited user joins
+REFERRAL_BONUS_MANH = Decimal("5")
@@ -1,4 +1,6 @@
 from web_portal.app.database.models import User, Referral
+from web_portal.app.manh.balances import apply_balance_delta
+from web_portal.app.manh.constants import REFERRAL_BONUS_MANH
 from sqlalchemy.orm import Session
 from datetime import datetime
 from uuid import uuid4
@@ -28,8 +30,9 @@ def process_referral(db: Session, referrer_code: str, new_user_id: int) -> dict:
     ref = Referral(id=uuid4().hex, referrer_id=referrer.id, referred_id=new_user_id,
                    created_at=datetime.utcnow(), reward_given=False)
     db.add(ref)
-    referrer.balance_manh += 5
-    db.add(referrer)
+    db.flush()
+    apply_balance_delta(db, referrer.id, REFERRAL_BONUS_MANH, "referral",
+                        f"Referral bonus for inviting user {new_user_id}")
     db.commit()
     return {"ok": True, "referrer_id": referrer.id}
 
@@ -0,0 +1,64 @@
+"""
+In-process P2P event hooks.
+
+The matcher publishes events after its transaction commits. Subscribers are
+called synchronously on the publishing thread and must not block: a subscriber
+that does I/O (bot notifications, pushes) hands the work to its own loop or
+queue. A failing subscriber is logged and never affects the trade.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Callable, Union
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TradeEvent:
+    trade_id: str
+    sell_order_id: str
+    buy_order_id: str
+    seller_id: int
+    buyer_id: int
+    amount_manh: Decimal
+    price_per_manh: Decimal
+    taker_side: str  # side of the order whose placement caused the trade
+    ts: float
+
+
+@dataclass(frozen=True)
+class OrderClosed:
+    order_id: str
+    side: str
+    user_id: int
+    remaining: Decimal  # amount that was still open
+    reason: str  # "cancelled", "expired" or "unbacked" (escrow could not cover a fill)
+    ts: float
+
+
+P2PEvent = Union[TradeEvent, OrderClosed]
+Subscriber = Callable[[P2PEvent], None]
+
+_subscribers: list[Subscriber] = []
+
+
+def subscribe(fn: Subscriber) -> None:
+    if fn not in _subscribers:
+        _subscribers.append(fn)
+
+
+def unsubscribe(fn: Subscriber) -> None:
+    if fn in _subscribers:
+        _subscribers.remove(fn)
+
+
+def publish(event: P2PEvent) -> None:
+    for fn in list(_subscribers):
+        try:
+            fn(event)
+        except Exception as e:
+            logger.error("p2p events: subscriber %r failed: %s", fn, e)
@@ -0,0 +1,136 @@
+"""
+P2P order expiry.
+
+`expire_orders` closes every open/partial sell and buy order whose
+`expires_at` has passed, in batches: each batch is one UPDATE ... RETURNING
+over the ids picked through the (status, expires_at) index, one executemany
+releasing the sellers' escrow, and one commit. The expired orders then leave
+the in-memory book and an `OrderClosed` event is published for each.
+
+`OrderExpiryScheduler` runs it periodically from the API lifespan; the matcher
+also expires a stale resting order it meets between runs, so the sweep only
+has to keep the book small, not correct.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from web_portal.app.database.models import BuyOrder, SellOrder
+from web_portal.app.manh.balances import release_reserves
+from web_portal.app.p2p.events import OrderClosed, publish
+from web_portal.app.p2p.orderbook import BUY, OPEN_STATUSES, SELL, order_book
+from web_portal.app.p2p.service import _match_lock
+
+logger = logging.getLogger(__name__)
+
+EXPIRY_BATCH_SIZE = 500
+
+
+def _expire_batch(db: Session, model, now: datetime, batch_size: int) -> list:
+    due = (
+        select(model.id)
+        .where(model.status.in_(OPEN_STATUSES), model.expires_at <= now)
+        .order_by(model.expires_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    return db.execute(
+        update(model)
+        .where(model.id.in_(due.scalar_subquery()), model.status.in_(OPEN_STATUSES))
+        .values(status="expired")
+        .returning(model.id, model.user_id, model.amount_manh, model.filled_amount)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+
+def expire_orders(
+    db: Session,
+    now: Optional[datetime] = None,
+    *,
+    batch_size: int = EXPIRY_BATCH_SIZE,
+    max_batches: int = 20,
+) -> int:
+    """Expire due orders; returns how many were closed."""
+    now = now or datetime.utcnow()
+    total = 0
+    for model, side in ((SellOrder, SELL), (BuyOrder, BUY)):
+        for _ in range(max_batches):
+            with _match_lock:
+                try:
+                    rows = _expire_batch(db, model, now, batch_size)
+                    remaining = {
+                        oid: Decimal(str(amount)) - Decimal(str(filled or 0))
+                        for oid, _, amount, filled in rows
+                    }
+                    if side == SELL:
+                        per_user: dict[int, Decimal] = defaultdict(Decimal)
+                        for oid, user_id, _, _ in rows:
+                            per_user[user_id] += remaining[oid]
+                        release_reserves(db, per_user)
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    raise
+                for oid, _, _, _ in rows:
+                    order_book.cancel(oid)
+            # ORM copies of the rows may still say "open"; they are only read by id later
+            for obj in [o for o in db.identity_map.values() if isinstance(o, model) and o.id in remaining]:
+                db.expire(obj)
+            ts = time.time()
+            for oid, user_id, _, _ in rows:
+                publish(OrderClosed(order_id=oid, side=side, user_id=user_id,
+                                    remaining=remaining[oid], reason="expired", ts=ts))
+            total += len(rows)
+            if len(rows) < batch_size:
+                break
+    if total:
+        logger.info("p2p expiry: expired %d orders", total)
+    return total
+
+
+class OrderExpiryScheduler:
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+
+    async def _loop(self, session_factory, interval_sec: float) -> None:
+        while True:
+            await asyncio.to_thread(self._run_with, session_factory)
+            await asyncio.sleep(interval_sec)
+
+    def _run_with(self, session_factory) -> None:
+        db = session_factory()
+        try:
+            expire_orders(db)
+        except Exception as e:
+            logger.error("p2p expiry: sweep failed: %s", e)
+        finally:
+            db.close()
+
+    def start(self, session_factory, interval_sec: float = 30.0) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.get_running_loop().create_task(
+            self._loop(session_factory, interval_sec), name="p2p-order-expiry"
+        )
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+order_expiry = OrderExpiryScheduler()
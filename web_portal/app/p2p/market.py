@@ -0,0 +1,201 @@
+"""
+MANH/TON market data built from P2P trades.
+
+`MarketData` subscribes to the matcher's trade events and folds each trade
+into a ring of the last trades and 1m/1h/1d OHLCV candles (price in TON,
+volume in MANH) as it happens; nothing is recomputed from the trades table.
+Buckets touched since the last snapshot are written to p2p_market_candles
+periodically, and `restore()` seeds the candles and the tape on startup.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from datetime import timezone
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from web_portal.app.database.models import MarketCandle, Trade
+from web_portal.app.utils.series import CandleSeries
+from .events import TradeEvent, subscribe
+
+logger = logging.getLogger(__name__)
+
+# resolution -> (bucket seconds, buckets kept in memory)
+RESOLUTIONS: dict[str, tuple[int, int]] = {
+    "1m": (60, 24 * 60),
+    "1h": (3600, 30 * 24),
+    "1d": (86400, 2 * 365),
+}
+TAPE_SIZE = 200
+
+
+class MarketData:
+    def __init__(self, tape_size: int = TAPE_SIZE) -> None:
+        self.tape: deque[dict] = deque(maxlen=tape_size)
+        self.series = {name: CandleSeries(sec, cap) for name, (sec, cap) in RESOLUTIONS.items()}
+        self._dirty: set[tuple[str, float]] = set()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, event) -> None:
+        if not isinstance(event, TradeEvent):
+            return
+        price, amount = float(event.price_per_manh), float(event.amount_manh)
+        with self._lock:
+            self.tape.append({
+                "id": event.trade_id,
+                "ts": event.ts,
+                "price": str(event.price_per_manh),
+                "amount": str(event.amount_manh),
+                "side": event.taker_side,
+            })
+            for name, s in self.series.items():
+                start = s.update(event.ts, price, amount)
+                if start is not None:
+                    self._dirty.add((name, start))
+
+    def trades(self, limit: int = 50) -> list[dict]:
+        """Newest first."""
+        with self._lock:
+            return list(self.tape)[::-1][: max(0, limit)]
+
+    def candles(self, resolution: str, limit: int = 200, since: Optional[float] = None) -> list[dict]:
+        if resolution not in self.series:
+            raise ValueError(f"unknown resolution {resolution!r}; expected one of {sorted(self.series)}")
+        with self._lock:
+            return self.series[resolution].rows(limit=limit, since=since)
+
+    def summary(self, now: Optional[float] = None) -> dict:
+        """Last price and rolling 24h stats from the hourly candles."""
+        now = time.time() if now is None else now
+        with self._lock:
+            last = self.tape[-1]["price"] if self.tape else None
+            day = self.series["1h"].rows(limit=24, since=now - 24 * 3600)
+        out = {"last_price": last, "open_24h": None, "high_24h": None, "low_24h": None,
+               "change_24h_pct": None, "volume_24h": 0.0, "trades_24h": 0}
+        if day:
+            open_ = day[0]["open"]
+            out.update(
+                open_24h=open_,
+                high_24h=max(c["high"] for c in day),
+                low_24h=min(c["low"] for c in day),
+                volume_24h=sum(c["volume"] for c in day),
+                trades_24h=sum(c["count"] for c in day),
+                change_24h_pct=round((day[-1]["close"] - open_) / open_ * 100, 2) if open_ else None,
+            )
+        return out
+
+    # ---------- persistence ----------
+    def snapshot(self, db: Session) -> int:
+        """Upsert every bucket touched since the previous snapshot; returns rows written."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            rows = []
+            for name, start in dirty:
+                c = self.series[name].get(start)
+                if c is not None:
+                    rows.append((name, c))
+        try:
+            for name, c in rows:
+                db.merge(MarketCandle(
+                    resolution=name,
+                    bucket_ts=c["ts"],
+                    open=Decimal(str(c["open"])),
+                    high=Decimal(str(c["high"])),
+                    low=Decimal(str(c["low"])),
+                    close=Decimal(str(c["close"])),
+                    volume=Decimal(str(c["volume"])),
+                    trades=c["count"],
+                ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._dirty |= dirty  # retry on the next snapshot
+            raise
+        return len(rows)
+
+    def restore(self, db: Session) -> None:
+        """Seed the candles from p2p_market_candles and the tape from the newest trades."""
+        now = time.time()
+        for name, (sec, cap) in RESOLUTIONS.items():
+            found = db.execute(
+                select(MarketCandle)
+                .where(MarketCandle.resolution == name, MarketCandle.bucket_ts >= int(now - sec * cap))
+                .order_by(MarketCandle.bucket_ts.asc())
+            ).scalars().all()
+            with self._lock:
+                self.series[name].load(
+                    {
+                        "ts": r.bucket_ts,
+                        "open": r.open,
+                        "high": r.high,
+                        "low": r.low,
+                        "close": r.close,
+                        "volume": r.volume,
+                        "count": r.trades,
+                    }
+                    for r in found
+                )
+        recent = db.execute(
+            select(Trade).order_by(Trade.created_at.desc()).limit(self.tape.maxlen)
+        ).scalars().all()
+        with self._lock:
+            self.tape.clear()
+            for t in reversed(recent):
+                created = t.created_at
+                if created is not None and created.tzinfo is None:
+                    created = created.replace(tzinfo=timezone.utc)
+                self.tape.append({
+                    "id": t.id,
+                    "ts": created.timestamp() if created else 0.0,
+                    "price": str(t.price_per_manh),
+                    "amount": str(t.amount_manh),
+                    "side": None,
+                })
+
+    async def _loop(self, session_factory, interval_sec: float) -> None:
+        while True:
+            await asyncio.sleep(interval_sec)
+            await asyncio.to_thread(self._snapshot_with, session_factory)
+
+    def _snapshot_with(self, session_factory) -> None:
+        db = session_factory()
+        try:
+            n = self.snapshot(db)
+            if n:
+                logger.debug("market: snapshotted %d candles", n)
+        except Exception as e:
+            logger.error("market: snapshot failed: %s", e)
+        finally:
+            db.close()
+
+    def start(self, session_factory, interval_sec: float = 60.0) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.get_running_loop().create_task(
+            self._loop(session_factory, interval_sec), name="market-candle-snapshot"
+        )
+
+    async def stop(self, session_factory=None) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if session_factory is not None:
+            await asyncio.to_thread(self._snapshot_with, session_factory)
+
+
+market_data = MarketData()
+subscribe(market_data.record)
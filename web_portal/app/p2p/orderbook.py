@@ -0,0 +1,350 @@
+"""
+In-memory price-time-priority order book for the MANH/TON P2P market.
+
+The database (sell_orders / buy_orders) stays the source of truth; the book is
+a write-through index over the resting open/partial orders so matching and
+best-price lookups never scan the tables. It is rebuilt from the DB on startup
+(or lazily on first use) and after any failed write, via `invalidate()`.
+
+Each side is a binary heap keyed on (price, sequence); cancels and fills that
+empty an order are lazily deleted and pruned from the top, so the top of each
+heap is always a live order:
+
+    add / cancel / fill   O(log n) amortized
+    best_bid / best_ask   O(1)
+
+Alongside the heap each side keeps its price levels (total remaining amount
+and the orders at that price, in time priority) in a sorted price list. The
+levels serve the aggregated depth snapshot, which is cached and only dropped
+when an event lands inside the cached range, and cursor pagination over the
+individual orders without sorting the side.
+
+The book lives in the API process; the bot runs in the same process, so every
+writer sees the same instance.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import itertools
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from web_portal.app.database.models import BuyOrder, SellOrder
+
+logger = logging.getLogger(__name__)
+
+BUY = "buy"
+SELL = "sell"
+OPEN_STATUSES = ("open", "partial")
+MAX_DEPTH_LEVELS = 50  # levels kept in the cached depth snapshot per side
+MAX_PAGE_SIZE = 100
+
+
+@dataclass
+class BookOrder:
+    id: str
+    side: str
+    user_id: int
+    price: Decimal
+    remaining: Decimal
+    seq: int = 0
+    created_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    live: bool = field(default=True, compare=False)
+
+    @classmethod
+    def from_row(cls, row, side: str) -> "BookOrder":
+        return cls(
+            id=row.id,
+            side=side,
+            user_id=row.user_id,
+            price=Decimal(str(row.price_per_manh)),
+            remaining=Decimal(str(row.amount_manh)) - Decimal(str(row.filled_amount or 0)),
+            created_at=row.created_at,
+            expires_at=row.expires_at,
+        )
+
+
+@dataclass(frozen=True)
+class DepthLevel:
+    price: Decimal
+    amount: Decimal
+    count: int
+
+
+class _Level:
+    __slots__ = ("amount", "orders")
+
+    def __init__(self) -> None:
+        self.amount = Decimal(0)
+        self.orders: dict[str, BookOrder] = {}  # insertion order is time priority
+
+
+class _Side:
+    """One heap of live orders; bids negate the price so both sides pop best-first."""
+
+    def __init__(self, side: str) -> None:
+        self.side = side
+        self._heap: list[tuple[Decimal, int, str]] = []
+        self._dead = 0
+        self.levels: dict[Decimal, _Level] = {}
+        self.prices: list[Decimal] = []  # level keys, best first
+        self._depth: Optional[tuple[DepthLevel, ...]] = None
+
+    def price_key(self, price: Decimal) -> Decimal:
+        return -price if self.side == BUY else price
+
+    def _key(self, o: BookOrder) -> tuple[Decimal, int, str]:
+        return (self.price_key(o.price), o.seq, o.id)
+
+    def push(self, o: BookOrder) -> None:
+        heapq.heappush(self._heap, self._key(o))
+        key = self.price_key(o.price)
+        level = self.levels.get(key)
+        if level is None:
+            level = self.levels[key] = _Level()
+            bisect.insort(self.prices, key)
+        level.orders[o.id] = o
+        level.amount += o.remaining
+        self._touch(key)
+
+    def level_filled(self, o: BookOrder, amount: Decimal) -> None:
+        key = self.price_key(o.price)
+        self.levels[key].amount -= amount
+        self._touch(key)
+
+    def level_remove(self, o: BookOrder) -> None:
+        key = self.price_key(o.price)
+        level = self.levels[key]
+        del level.orders[o.id]
+        level.amount -= o.remaining
+        if not level.orders:
+            del self.levels[key]
+            del self.prices[bisect.bisect_left(self.prices, key)]
+        self._touch(key)
+
+    def _touch(self, key: Decimal) -> None:
+        # events behind the last cached level cannot change the snapshot
+        d = self._depth
+        if d is not None and (len(d) < MAX_DEPTH_LEVELS or key <= self.price_key(d[-1].price)):
+            self._depth = None
+
+    def depth(self) -> tuple[DepthLevel, ...]:
+        if self._depth is None:
+            self._depth = tuple(
+                DepthLevel(price=abs(k), amount=self.levels[k].amount, count=len(self.levels[k].orders))
+                for k in self.prices[:MAX_DEPTH_LEVELS]
+            )
+        return self._depth
+
+    def iter_from(self, key: Optional[Decimal] = None, seq: int = 0) -> Iterator[BookOrder]:
+        """Orders in priority order strictly after position (key, seq)."""
+        start = 0 if key is None else bisect.bisect_left(self.prices, key)
+        for k in self.prices[start:]:
+            for o in self.levels[k].orders.values():
+                if key is not None and k == key and o.seq <= seq:
+                    continue
+                yield o
+
+    def prune(self, orders: dict[str, BookOrder]) -> None:
+        h = self._heap
+        while h and not orders.get(h[0][2], _GONE).live:
+            heapq.heappop(h)
+            self._dead -= 1
+        # rebuild once dead entries dominate so memory tracks the live book
+        if self._dead > 64 and self._dead > len(h) // 2:
+            self._heap = [k for k in h if orders.get(k[2], _GONE).live]
+            heapq.heapify(self._heap)
+            self._dead = 0
+
+    def top(self) -> Optional[str]:
+        return self._heap[0][2] if self._heap else None
+
+    def mark_dead(self) -> None:
+        self._dead += 1
+
+
+_GONE = BookOrder(id="", side="", user_id=0, price=Decimal(0), remaining=Decimal(0), live=False)
+
+
+class OrderBook:
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._orders: dict[str, BookOrder] = {}
+        self._sides = {BUY: _Side(BUY), SELL: _Side(SELL)}
+        self._seq = itertools.count(1)
+        self.loaded = False
+
+    # ---------- lifecycle ----------
+    def rebuild(self, db: Session) -> int:
+        """Reload every resting order from the DB in time priority; returns the count."""
+        rows: list[tuple[Optional[datetime], str, object]] = []
+        for model, side in ((SellOrder, SELL), (BuyOrder, BUY)):
+            for r in db.execute(select(model).where(model.status.in_(OPEN_STATUSES))).scalars():
+                rows.append((r.created_at, side, r))
+        rows.sort(key=lambda t: (t[0] is None, t[0] or datetime.min, t[2].id))
+        with self._lock:
+            self._orders = {}
+            self._sides = {BUY: _Side(BUY), SELL: _Side(SELL)}
+            self._seq = itertools.count(1)
+            for _, side, r in rows:
+                o = BookOrder.from_row(r, side)
+                if o.remaining > 0:
+                    self._insert(o)
+            self.loaded = True
+        logger.info("orderbook: rebuilt with %d resting orders", len(self._orders))
+        return len(self._orders)
+
+    def ensure_loaded(self, db: Session) -> "OrderBook":
+        if not self.loaded:
+            self.rebuild(db)
+        return self
+
+    def invalidate(self) -> None:
+        """Drop the in-memory state; the next `ensure_loaded` rebuilds from the DB."""
+        with self._lock:
+            self.loaded = False
+
+    # ---------- mutations ----------
+    def _insert(self, o: BookOrder) -> None:
+        o.seq = next(self._seq)
+        o.live = True
+        self._orders[o.id] = o
+        self._sides[o.side].push(o)
+
+    def add(self, o: BookOrder) -> BookOrder:
+        with self._lock:
+            if o.id in self._orders:
+                raise ValueError(f"order {o.id} already in book")
+            self._insert(o)
+            return o
+
+    def _remove(self, o: BookOrder) -> None:
+        o.live = False
+        del self._orders[o.id]
+        side = self._sides[o.side]
+        side.level_remove(o)
+        side.mark_dead()
+        side.prune(self._orders)
+
+    def cancel(self, order_id: str) -> Optional[BookOrder]:
+        with self._lock:
+            o = self._orders.get(order_id)
+            if o is None:
+                return None
+            self._remove(o)
+            return o
+
+    def fill(self, order_id: str, amount: Decimal) -> BookOrder:
+        """Reduce an order's remaining amount; it leaves the book when it reaches zero."""
+        with self._lock:
+            o = self._orders[order_id]
+            if amount >= o.remaining:
+                self._remove(o)
+                o.remaining -= amount
+            else:
+                o.remaining -= amount
+                self._sides[o.side].level_filled(o, amount)
+            return o
+
+    # ---------- queries ----------
+    def get(self, order_id: str) -> Optional[BookOrder]:
+        return self._orders.get(order_id)
+
+    def best(self, side: str) -> Optional[BookOrder]:
+        oid = self._sides[side].top()
+        return self._orders.get(oid) if oid else None
+
+    def best_bid(self) -> Optional[BookOrder]:
+        return self.best(BUY)
+
+    def best_ask(self) -> Optional[BookOrder]:
+        return self.best(SELL)
+
+    def crossed(self) -> bool:
+        bid, ask = self.best_bid(), self.best_ask()
+        return bid is not None and ask is not None and bid.price >= ask.price
+
+    def orders(self, side: str) -> Iterator[BookOrder]:
+        """Live orders of one side in priority order (a copy; for listings, not matching)."""
+        with self._lock:
+            return iter(list(self._sides[side].iter_from()))
+
+    def depth(self, side: str, levels: int = 10) -> list[DepthLevel]:
+        """Aggregated price levels of one side, best first (at most MAX_DEPTH_LEVELS)."""
+        with self._lock:
+            return list(self._sides[side].depth()[: max(0, min(levels, MAX_DEPTH_LEVELS))])
+
+    def page(
+        self,
+        side: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        user_id: Optional[int] = None,
+    ) -> tuple[list[BookOrder], Optional[str]]:
+        """
+        One page of individual orders in priority order and the cursor of the
+        next page (None at the end). Without a side the listing runs through
+        the bids, then the asks. A cursor is a position (side, price, seq), so
+        it stays valid while the orders around it fill or cancel; seqs are
+        reassigned by `rebuild`, which may shift an open listing slightly.
+        """
+        sides = [side] if side else [BUY, SELL]
+        key, seq = None, 0
+        if cursor:
+            cur_side, price, seq = parse_cursor(cursor)
+            if cur_side not in sides:
+                raise ValueError("cursor does not match side")
+            sides = sides[sides.index(cur_side):]
+            key = self._sides[cur_side].price_key(price)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        out: list[BookOrder] = []
+        with self._lock:
+            for name in sides:
+                for o in self._sides[name].iter_from(key, seq):
+                    if user_id is not None and o.user_id != user_id:
+                        continue
+                    if len(out) == limit:
+                        return out, make_cursor(out[-1])
+                    out.append(o)
+                key, seq = None, 0
+        return out, None
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def stats(self) -> dict:
+        bid, ask = self.best_bid(), self.best_ask()
+        return {
+            "orders": len(self._orders),
+            "best_bid": str(bid.price) if bid else None,
+            "best_ask": str(ask.price) if ask else None,
+            "loaded": self.loaded,
+        }
+
+
+def make_cursor(o: BookOrder) -> str:
+    return f"{o.side}:{o.price}:{o.seq}"
+
+
+def parse_cursor(cursor: str) -> tuple[str, Decimal, int]:
+    try:
+        side, price, seq = cursor.split(":")
+        p = Decimal(price)
+        if side not in (BUY, SELL) or not p.is_finite():
+            raise ValueError
+        return side, p, int(seq)
+    except (ArithmeticError, ValueError):
+        raise ValueError(f"invalid cursor: {cursor!r}")
+
+
+order_book = OrderBook()
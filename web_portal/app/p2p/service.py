@@ -1,9 +1,17 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import select
-from web_portal.app.database.models import User, SellOrder, BuyOrder, Trade
+from sqlalchemy import select, update
+from web_portal.app.database.models import SellOrder, BuyOrder, Trade
+from web_portal.app.manh.balances import InsufficientBalance, apply_balance_delta, release_reserve, reserve_balance
+from web_portal.app.p2p.events import OrderClosed, TradeEvent, publish
+from web_portal.app.p2p.orderbook import BUY, OPEN_STATUSES, SELL, BookOrder, order_book
+import threading
+import time
+from dataclasses import dataclass
 from decimal import Decimal
+from typing import Optional, Union
 from uuid import uuid4
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+
 
 def create_sell_order(
     db: Session,
@@ -12,23 +20,8 @@ def create_sell_order(
     price_per_manh: Decimal,
     expires_in_hours: int = 24
 ) -> SellOrder:
-    """×™×•×¦×¨ ×”×–×‍× ×ھ ×‍×›×™×¨×”."""
-    user = db.get(User, user_id)
-    if not user or user.balance_manh < amount_manh:
-        raise ValueError("Insufficient balance")
-    total = amount_manh * price_per_manh
-    order = SellOrder(
-        id=uuid4().hex,
-        user_id=user_id,
-        amount_manh=amount_manh,
-        price_per_manh=price_per_manh,
-        total_price=total,
-        expires_at=datetime.utcnow() + timedelta(hours=expires_in_hours)
-    )
-    db.add(order)
-    db.commit()
-    db.refresh(order)
-    return order
+    """Place a sell order; it is matched against resting bids before it rests."""
+    return place_order(db, user_id, SELL, amount_manh, price_per_manh, expires_in_hours).order
 
 def create_buy_order(
     db: Session,
@@ -37,82 +30,220 @@ def create_buy_order(
     price_per_manh: Decimal,
     expires_in_hours: int = 24
 ) -> BuyOrder:
-    """×™×•×¦×¨ ×”×–×‍× ×ھ ×§× ×™×™×”."""
-    total = amount_manh * price_per_manh
-    order = BuyOrder(
+    """Place a buy order; it is matched against resting asks before it rests."""
+    return place_order(db, user_id, BUY, amount_manh, price_per_manh, expires_in_hours).order
+
+def _settle_fill(db: Session, sell: SellOrder, buy: BuyOrder, amount: Decimal, price: Decimal) -> Optional[Trade]:
+    """
+    Move MANH seller -> buyer out of the sell order's escrow and record the
+    trade. None if the order has no escrow behind it (rows that predate it).
+    """
+    trade_id = uuid4().hex
+    note, meta = f"P2P trade {trade_id}", {"trade_id": trade_id}
+    try:
+        apply_balance_delta(db, sell.user_id, -amount, "p2p_sell", note, meta, reserved_delta=-amount)
+    except InsufficientBalance:
+        return None
+    apply_balance_delta(db, buy.user_id, amount, "p2p_buy", note, meta)
+
+    trade = Trade(
+        id=trade_id,
+        sell_order_id=sell.id,
+        buy_order_id=buy.id,
+        seller_id=sell.user_id,
+        buyer_id=buy.user_id,
+        amount_manh=amount,
+        price_per_manh=price,
+        total_price=amount * price
+    )
+    db.add(trade)
+
+    for o in (sell, buy):
+        o.filled_amount = (o.filled_amount or 0) + amount
+        o.status = "filled" if o.filled_amount >= o.amount_manh else "partial"
+    return trade
+
+
+def _open_remaining(order: Union[SellOrder, BuyOrder]) -> Decimal:
+    return Decimal(str(order.amount_manh)) - Decimal(str(order.filled_amount or 0))
+
+
+def is_expired(expires_at: Optional[datetime], now: datetime) -> bool:
+    # expiries are written as naive UTC; PostgreSQL hands them back tz-aware
+    if expires_at is None:
+        return False
+    if expires_at.tzinfo is not None:
+        expires_at = expires_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return expires_at <= now
+
+
+def _closed_event(order: Union[SellOrder, BuyOrder], side: str, remaining: Decimal, reason: str) -> OrderClosed:
+    return OrderClosed(order_id=order.id, side=side, user_id=order.user_id, remaining=remaining,
+                       reason=reason, ts=time.time())
+
+
+def _drop_unbacked(db: Session, sell: SellOrder) -> OrderClosed:
+    # a sell order whose escrow cannot cover the fill leaves the book
+    remaining = _open_remaining(sell)
+    release_reserve(db, sell.user_id, remaining)
+    sell.status = "cancelled"
+    order_book.cancel(sell.id)
+    return _closed_event(sell, SELL, remaining, "unbacked")
+
+
+@dataclass
+class Placement:
+    order: Union[SellOrder, BuyOrder]
+    side: str
+    trades: list[Trade]
+    resting: Decimal  # amount left on the book after matching
+
+
+# one matcher at a time: the book is mutated ahead of the commit it mirrors
+_match_lock = threading.RLock()
+
+
+def _trade_event(trade: Trade, taker_side: str) -> TradeEvent:
+    return TradeEvent(
+        trade_id=trade.id,
+        sell_order_id=trade.sell_order_id,
+        buy_order_id=trade.buy_order_id,
+        seller_id=trade.seller_id,
+        buyer_id=trade.buyer_id,
+        amount_manh=Decimal(str(trade.amount_manh)),
+        price_per_manh=Decimal(str(trade.price_per_manh)),
+        taker_side=taker_side,
+        ts=time.time(),
+    )
+
+
+def place_order(
+    db: Session,
+    user_id: int,
+    side: str,
+    amount_manh: Decimal,
+    price_per_manh: Decimal,
+    expires_in_hours: int = 24,
+) -> Placement:
+    """
+    Insert an order and match it against the opposite side of the book at the
+    resting orders' prices, best price first. Only the resting orders it fills
+    and the users involved are touched, all in one transaction; any remainder
+    rests on the book. Trade events are published after the commit.
+    """
+    if side not in (BUY, SELL):
+        raise ValueError("side must be 'buy' or 'sell'")
+    amount_manh = Decimal(str(amount_manh))
+    price_per_manh = Decimal(str(price_per_manh))
+    if not (amount_manh.is_finite() and price_per_manh.is_finite()) or amount_manh <= 0 or price_per_manh <= 0:
+        raise ValueError("amount and price must be > 0")
+
+    model, other_model, opposite = (SellOrder, BuyOrder, BUY) if side == SELL else (BuyOrder, SellOrder, SELL)
+    expires_at = datetime.utcnow() + timedelta(hours=expires_in_hours)
+    order = model(
         id=uuid4().hex,
         user_id=user_id,
         amount_manh=amount_manh,
         price_per_manh=price_per_manh,
-        total_price=total,
-        expires_at=datetime.utcnow() + timedelta(hours=expires_in_hours)
+        total_price=amount_manh * price_per_manh,
+        status="open",
+        filled_amount=Decimal("0"),
+        expires_at=expires_at,
     )
-    db.add(order)
-    db.commit()
-    db.refresh(order)
-    return order
-
-def match_orders(db: Session) -> list[Trade]:
-    """×”×ھ×گ×‍×ھ ×”×–×‍× ×•×ھ ×¤×ھ×•×—×•×ھ ×•×،×’×™×¨×ھ×ں."""
-    trades = []
-    sell_orders = db.execute(
-        select(SellOrder).where(SellOrder.status == "open").order_by(SellOrder.price_per_manh.asc())
-    ).scalars().all()
-    buy_orders = db.execute(
-        select(BuyOrder).where(BuyOrder.status == "open").order_by(BuyOrder.price_per_manh.desc())
-    ).scalars().all()
-
-    i = j = 0
-    while i < len(sell_orders) and j < len(buy_orders):
-        sell = sell_orders[i]
-        buy = buy_orders[j]
-        if sell.price_per_manh <= buy.price_per_manh:
-            amount = min(sell.amount_manh - sell.filled_amount, buy.amount_manh - buy.filled_amount)
-            if amount <= 0:
-                i += 1 if sell.amount_manh - sell.filled_amount <= 0 else 0
-                j += 1 if buy.amount_manh - buy.filled_amount <= 0 else 0
-                continue
 
-            trade = Trade(
-                id=uuid4().hex,
-                sell_order_id=sell.id,
-                buy_order_id=buy.id,
-                seller_id=sell.user_id,
-                buyer_id=buy.user_id,
-                amount_manh=amount,
-                price_per_manh=sell.price_per_manh,
-                total_price=amount * sell.price_per_manh
-            )
-            db.add(trade)
-
-            sell.filled_amount += amount
-            buy.filled_amount += amount
-            if sell.filled_amount >= sell.amount_manh:
-                sell.status = "filled"
-            else:
-                sell.status = "partial"
-            if buy.filled_amount >= buy.amount_manh:
-                buy.status = "filled"
-            else:
-                buy.status = "partial"
-
-            seller = db.get(User, sell.user_id)
-            buyer = db.get(User, buy.user_id)
-            seller.balance_manh -= amount
-            buyer.balance_manh += amount
+    trades: list[Trade] = []
+    closed: list[OrderClosed] = []
+    remaining = amount_manh
+    now = datetime.utcnow()
+    with _match_lock:
+        book = order_book.ensure_loaded(db)  # before the add, or a rebuild would autoflush the new row into it
+        if side == SELL:
+            # escrow the whole amount up front; fills draw it down, cancel/expiry releases the rest
+            try:
+                reserve_balance(db, user_id, amount_manh)
+            except InsufficientBalance:
+                db.rollback()
+                raise
+        db.add(order)
+        try:
+            while remaining > 0:
+                best = book.best(opposite)
+                if best is None or (best.price > price_per_manh if side == BUY else best.price < price_per_manh):
+                    break
+                resting = db.get(other_model, best.id)
+                if is_expired(best.expires_at, now):
+                    # past its expiry but not swept yet: expire it instead of trading with it
+                    if opposite == SELL:
+                        release_reserve(db, resting.user_id, _open_remaining(resting))
+                    closed.append(_closed_event(resting, opposite, _open_remaining(resting), "expired"))
+                    resting.status = "expired"
+                    book.cancel(best.id)
+                    continue
+                qty = min(remaining, best.remaining)
+                sell, buy = (order, resting) if side == SELL else (resting, order)
+                trade = _settle_fill(db, sell, buy, qty, best.price)
+                if trade is None:
+                    if side == SELL:
+                        raise InsufficientBalance(user_id, -qty)
+                    closed.append(_drop_unbacked(db, resting))
+                    continue
+                book.fill(best.id, qty)
+                remaining -= qty
+                trades.append(trade)
+            events = [_trade_event(t, side) for t in trades]
+            entry = BookOrder(id=order.id, side=side, user_id=user_id, price=price_per_manh,
+                              remaining=remaining, created_at=datetime.utcnow(), expires_at=expires_at)
+            db.commit()
+        except Exception:
+            db.rollback()
+            book.invalidate()
+            raise
+        if remaining > 0:
+            book.add(entry)
 
-            trades.append(trade)
+    for e in [*closed, *events]:
+        publish(e)
+    return Placement(order=order, side=side, trades=trades, resting=remaining)
 
-            if sell.status == "filled":
-                i += 1
-            if buy.status == "filled":
-                j += 1
-        else:
-            break
 
-    db.commit()
+def match_orders(db: Session) -> list[Trade]:
+    """
+    Sweep the book while the best bid crosses the best ask. Placement already
+    matches incoming orders, so this only finds work after a rebuild or an
+    external write; only crossing orders are loaded.
+    """
+    with _match_lock:
+        trades, events = _sweep(db)
+    for e in events:
+        publish(e)
     return trades
 
+
+def _sweep(db: Session) -> tuple[list[Trade], list[Union[OrderClosed, TradeEvent]]]:
+    book = order_book.ensure_loaded(db)
+    trades = []
+    closed: list[OrderClosed] = []
+    try:
+        while book.crossed():
+            ask, bid = book.best_ask(), book.best_bid()
+            sell = db.get(SellOrder, ask.id)
+            buy = db.get(BuyOrder, bid.id)
+            amount = min(ask.remaining, bid.remaining)
+            trade = _settle_fill(db, sell, buy, amount, sell.price_per_manh)
+            if trade is None:
+                closed.append(_drop_unbacked(db, sell))
+                continue
+            book.fill(ask.id, amount)
+            book.fill(bid.id, amount)
+            trades.append(trade)
+        events = [*closed, *(_trade_event(t, "sweep") for t in trades)]
+        db.commit()
+    except Exception:
+        db.rollback()
+        book.invalidate()
+        raise
+    return trades, events
+
 def get_open_orders(db: Session, type: str = "all") -> dict:
     """×‍×—×–×™×¨ ×”×–×‍× ×•×ھ ×¤×ھ×•×—×•×ھ."""
     result = {}
@@ -128,14 +259,30 @@ def get_open_orders(db: Session, type: str = "all") -> dict:
 
 def cancel_order(db: Session, user_id: int, order_id: str, order_type: str) -> bool:
     """×‍×‘×ک×œ ×”×–×‍× ×” (×¨×§ ×©×œ ×”×‍×©×ھ×‍×© ×¢×¦×‍×•)."""
-    if order_type == "sell":
-        order = db.get(SellOrder, order_id)
-    else:
-        order = db.get(BuyOrder, order_id)
-    if not order or order.user_id != user_id or order.status not in ("open", "partial"):
-        return False
-    order.status = "cancelled"
-    db.commit()
+    model = SellOrder if order_type == "sell" else BuyOrder
+    with _match_lock:
+        # check and close in one statement: an expiry or fill that got here first
+        # leaves nothing to cancel, so the escrow is never released twice
+        try:
+            row = db.execute(
+                update(model)
+                .where(model.id == order_id, model.user_id == user_id, model.status.in_(OPEN_STATUSES))
+                .values(status="cancelled")
+                .returning(model.amount_manh, model.filled_amount)
+                .execution_options(synchronize_session=False)
+            ).first()
+            if row is None:
+                return False
+            remaining = Decimal(str(row.amount_manh)) - Decimal(str(row.filled_amount or 0))
+            if order_type == "sell":
+                release_reserve(db, user_id, remaining)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        order_book.cancel(order_id)
+    publish(OrderClosed(order_id=order_id, side=order_type, user_id=user_id, remaining=remaining,
+                        reason="cancelled", ts=time.time()))
     return True
 
 
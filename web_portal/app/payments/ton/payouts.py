@@ -0,0 +1,274 @@
+"""
+Batched TON payouts for approved withdrawals.
+
+Approved withdrawals are grouped into PayoutBatch rows of at most
+PAYOUT_BATCH_MAX_ITEMS recipients, so one multi-message transfer from the
+treasury wallet pays a whole batch. Each batch is exported as an HMAC-signed
+manifest that the signing wallet (kept offline) consumes; every message carries
+a per-withdrawal memo. `confirm_payouts` scans the treasury's outgoing messages
+for those memos and completes a withdrawal only when the message also went to
+its destination with at least the manifest amount.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import logging
+from datetime import datetime
+from decimal import Decimal, ROUND_CEILING
+from typing import Any, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from web_portal.app.core.config import get_config
+from web_portal.app.core.security import constant_time_equals
+from web_portal.app.database.models import PayoutBatch, Withdrawal
+from .service import POLL_CLOCK_SLACK_SEC, POLL_MAX_PAGES, POLL_PAGE_SIZE, _as_utc_ts, _fetch_treasury_since
+from .withdrawals import complete_withdrawal
+
+logger = logging.getLogger(__name__)
+
+NANO = Decimal("1000000000")
+NINE_DP = Decimal("0.000000001")
+MANIFEST_VERSION = 1
+
+
+def _q(value) -> str:
+    # fixed 9dp text so the signed manifest is identical before and after a DB round-trip
+    return str(Decimal(str(value)).quantize(NINE_DP))
+
+
+def _payout_memo(batch_id: str, withdrawal_id: str) -> str:
+    return f"PAYOUT|{batch_id[:12]}|{withdrawal_id[:16]}"
+
+
+def _ton_amount(amount_manh: Decimal, ton_ils_rate: Decimal) -> Decimal:
+    # MANH -> ILS at the configured MANH price, then ILS -> TON at the batch rate
+    ils = Decimal(str(amount_manh)) * get_config().manh_price_ils
+    return (ils / ton_ils_rate).quantize(NINE_DP, rounding=ROUND_CEILING)
+
+
+def build_payout_batches(
+    db: Session,
+    *,
+    operator_id: int,
+    ton_ils_rate: Decimal,
+    max_items: Optional[int] = None,
+) -> list[PayoutBatch]:
+    """Group approved, unbatched withdrawals into new batches (oldest first)."""
+    if ton_ils_rate <= 0:
+        raise ValueError("ton_ils_rate must be > 0")
+    size = max_items or get_config().payout_batch_max_items
+
+    pending = db.execute(
+        select(Withdrawal)
+        .where(Withdrawal.status == "approved", Withdrawal.payout_batch_id.is_(None))
+        .order_by(Withdrawal.requested_at.asc(), Withdrawal.id.asc())
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+
+    batches = []
+    for i in range(0, len(pending), size):
+        chunk = pending[i:i + size]
+        batch = PayoutBatch(
+            status="exported",
+            item_count=len(chunk),
+            total_manh=sum((Decimal(str(w.amount_manh)) for w in chunk), Decimal("0")),
+            ton_ils_rate=ton_ils_rate,
+            created_by=operator_id,
+        )
+        db.add(batch)
+        db.flush()  # assigns batch.id
+        for w in chunk:
+            w.payout_batch_id = batch.id
+            w.memo = _payout_memo(batch.id, w.id)
+            db.add(w)
+        batches.append(batch)
+
+    for batch in batches:
+        batch.manifest_sig = _sign(_manifest_body(db, batch))
+    db.commit()
+    logger.info("payouts: %d withdrawals grouped into %d batches", len(pending), len(batches))
+    return batches
+
+
+# ---------- manifest ----------
+def _manifest_body(db: Session, batch: PayoutBatch) -> dict[str, Any]:
+    items = db.execute(
+        select(Withdrawal).where(Withdrawal.payout_batch_id == batch.id).order_by(Withdrawal.id.asc())
+    ).scalars().all()
+    rate = Decimal(str(batch.ton_ils_rate))
+    messages = []
+    for w in items:
+        ton = _ton_amount(w.amount_manh, rate)
+        messages.append({
+            "withdrawal_id": w.id,
+            "destination": w.destination_address,
+            "amount_manh": _q(w.amount_manh),
+            "amount_ton": str(ton),
+            "amount_nano": int(ton * NANO),
+            "memo": w.memo,
+        })
+    return {
+        "version": MANIFEST_VERSION,
+        "batch_id": batch.id,
+        "treasury": get_config().treasury_address,
+        "ton_ils_rate": _q(rate),
+        "total_manh": _q(batch.total_manh),
+        "messages": messages,
+    }
+
+
+def _canonical(body: dict[str, Any]) -> bytes:
+    return json.dumps(body, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def _sign(body: dict[str, Any]) -> str:
+    return hmac.new(get_config().require_hmac_key(), _canonical(body), hashlib.sha256).hexdigest()
+
+
+def batch_manifest(db: Session, batch_id: str) -> dict[str, Any]:
+    """The signed manifest for one batch: {'body': ..., 'signature': hex}."""
+    batch = db.get(PayoutBatch, batch_id)
+    if not batch:
+        raise ValueError("Payout batch not found")
+    body = _manifest_body(db, batch)
+    return {"body": body, "signature": _sign(body)}
+
+
+def verify_manifest(manifest: dict[str, Any]) -> bool:
+    body = manifest.get("body")
+    sig = manifest.get("signature") or ""
+    if not isinstance(body, dict):
+        return False
+    return constant_time_equals(sig, _sign(body))
+
+
+# ---------- confirmation ----------
+def _out_messages(tx: dict[str, Any]):
+    tx_hash = (tx.get("transaction_id") or {}).get("hash") or tx.get("hash")
+    for m in tx.get("out_msgs") or []:
+        if isinstance(m, dict):
+            yield tx_hash, m
+
+
+def _crc16(data: bytes) -> int:
+    # CRC-16/XMODEM, the checksum of user-friendly TON addresses
+    crc = 0
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else crc << 1
+            crc &= 0xFFFF
+    return crc
+
+
+def normalize_address(address: Optional[str]) -> str:
+    """
+    Raw `workchain:hex` form of a TON address, so user-friendly (bounceable or
+    not, base64 or base64url) and raw spellings of one account compare equal.
+    Strings that are not a valid address are returned stripped, unchanged.
+    """
+    text = (address or "").strip()
+    if ":" in text:
+        wc, _, account = text.partition(":")
+        try:
+            if len(account) == 64:
+                return f"{int(wc)}:{bytes.fromhex(account).hex()}"
+        except ValueError:
+            pass
+        return text
+    if len(text) != 48:
+        return text
+    try:
+        raw = base64.urlsafe_b64decode(text.replace("+", "-").replace("/", "_"))
+    except (binascii.Error, ValueError):
+        return text
+    if len(raw) != 36 or _crc16(raw[:34]) != int.from_bytes(raw[34:], "big"):
+        return text
+    return f"{int.from_bytes(raw[1:2], 'big', signed=True)}:{raw[2:34].hex()}"
+
+
+def _expected_nano(w: Withdrawal, rate: Decimal) -> int:
+    return int(_ton_amount(w.amount_manh, rate) * NANO)
+
+
+def confirm_payouts(
+    db: Session,
+    *,
+    toncenter=None,
+    page_size: int = POLL_PAGE_SIZE,
+    max_pages: int = POLL_MAX_PAGES,
+) -> dict[str, Any]:
+    """
+    Match outgoing treasury messages to batched withdrawals by memo and mark
+    them completed once destination and amount check out; a message that pays
+    the wrong address or less than the manifest amount leaves the withdrawal
+    approved. Returns {'ok', 'completed', 'batches_confirmed', 'checked'}.
+    """
+    waiting = db.execute(
+        select(Withdrawal).where(Withdrawal.status == "approved", Withdrawal.payout_batch_id.is_not(None))
+    ).scalars().all()
+    if not waiting:
+        return {"ok": True, "completed": 0, "batches_confirmed": 0, "checked": 0}
+
+    batches = {b.id: b for b in db.execute(
+        select(PayoutBatch).where(PayoutBatch.id.in_({w.payout_batch_id for w in waiting}))
+    ).scalars()}
+    # page back far enough to reach the oldest batch still waiting for its transfer
+    oldest_ts = min(_as_utc_ts(b.created_at) for b in batches.values()) - POLL_CLOCK_SLACK_SEC
+
+    if toncenter is None:
+        from .toncenter import TonCenter
+        toncenter = TonCenter()
+    try:
+        transactions = _fetch_treasury_since(
+            toncenter, get_config().require_treasury_address(), oldest_ts, page_size, max_pages
+        )
+    except Exception as e:
+        logger.error("payouts: fetching treasury transactions failed: %s", e)
+        return {"ok": False, "error": str(e), "completed": 0, "batches_confirmed": 0, "checked": 0}
+
+    by_memo = {w.memo: w for w in waiting if w.memo}
+    touched: set[str] = set()
+    completed = 0
+    for tx in transactions:
+        for tx_hash, msg in _out_messages(tx):
+            w = by_memo.get(msg.get("message") or "")
+            if w is None or not tx_hash:
+                continue
+            dest = normalize_address(msg.get("destination"))
+            expected = _expected_nano(w, Decimal(str(batches[w.payout_batch_id].ton_ils_rate)))
+            try:
+                value = int(msg.get("value") or 0)
+            except (TypeError, ValueError):
+                value = 0
+            if dest != normalize_address(w.destination_address) or value < expected:
+                logger.warning("payouts: %s mismatch in tx %s: paid %s nano to %s, expected %s nano to %s",
+                               w.id, tx_hash, value, msg.get("destination"), expected, w.destination_address)
+                continue
+            del by_memo[w.memo]
+            complete_withdrawal(db, w.id, tx_hash)
+            touched.add(w.payout_batch_id)
+            completed += 1
+
+    confirmed = 0
+    for batch_id in touched:
+        batch = db.get(PayoutBatch, batch_id)
+        open_items = db.execute(
+            select(Withdrawal.id).where(Withdrawal.payout_batch_id == batch_id, Withdrawal.status != "completed")
+        ).first()
+        if open_items is None:
+            batch.status = "confirmed"
+            batch.confirmed_at = datetime.utcnow()
+            confirmed += 1
+        else:
+            batch.status = "partial"
+        db.add(batch)
+    db.commit()
+    return {"ok": True, "completed": completed, "batches_confirmed": confirmed, "checked": len(transactions)}
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 import os
+import threading
 import time
 from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation
+from typing import Callable, Optional
 
 import httpx
+from prometheus_client import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -15,13 +22,49 @@ class PriceQuote:
     source: str
 
 
-_CACHE: PriceQuote | None = None
+# A provider returns the current TON price in ILS or raises.
+PriceProvider = Callable[[], Decimal]
+
+_PROVIDERS: dict[str, PriceProvider] = {}
+
+QUOTE_AGE = Gauge("ton_ils_quote_age_seconds", "Age of the cached TON/ILS quote (-1 if none)")
+REFRESH_LATENCY = Histogram(
+    "ton_ils_refresh_latency_seconds",
+    "Latency of TON/ILS provider fetches",
+    ["provider"],
+)
+REFRESH_FAILURES = Counter(
+    "ton_ils_refresh_failures_total",
+    "Failed TON/ILS provider fetches",
+    ["provider"],
+)
+
+
+def register_provider(name: str, fn: PriceProvider) -> None:
+    """Register (or replace) a named provider usable from PRICE_FEED_PROVIDERS."""
+    _PROVIDERS[name.strip().lower()] = fn
 
 
 def _provider() -> str:
     return (os.getenv("PRICE_FEED_PROVIDER") or "manual").strip().lower()
 
 
+def _provider_chain() -> list[str]:
+    # PRICE_FEED_PROVIDERS="coingecko,manual" => try in order; falls back to the single provider
+    raw = (os.getenv("PRICE_FEED_PROVIDERS") or "").strip()
+    if not raw:
+        return [_provider()]
+    return [p.strip().lower() for p in raw.split(",") if p.strip()]
+
+
+def _env_float(name: str, default: float) -> float:
+    v = (os.getenv(name) or "").strip()
+    try:
+        return float(v) if v else default
+    except ValueError:
+        return default
+
+
 def _manual_ton_ils() -> Decimal:
     v = (os.getenv("TON_ILS_MANUAL") or "").strip()
     if not v:
@@ -34,42 +77,190 @@ def _manual_ton_ils() -> Decimal:
         raise RuntimeError(f"price_feed: bad decimal value={v!r}") from e
 
 
-def get_ton_ils_cached(ttl_sec: int = 120) -> PriceQuote:
-    print("DEBUG: get_ton_ils_cached called")
-    print(f"DEBUG: provider from env: {_provider()}")
-    global _CACHE
-    now = time.time()
-    if _CACHE and (now - _CACHE.ts) < ttl_sec:
-        return _CACHE
-
-    prov = _provider()
-    print(f"DEBUG: resolved provider = {prov}")
-    if prov == "manual":
-        print("DEBUG: using manual provider")
-        q = PriceQuote(ton_ils=_manual_ton_ils(), ts=now, source="manual")
-        _CACHE = q
-        return q
+def _coingecko_ton_ils() -> Decimal:
+    url = "https://api.coingecko.com/api/v3/simple/price"
+    params = {"ids": "the-open-network", "vs_currencies": "ils"}
+    headers = {}
+    key = (os.getenv("COINGECKO_API_KEY") or "").strip()
+    if key:
+        headers["x-cg-pro-api-key"] = key
+    r = httpx.get(url, params=params, headers=headers, timeout=15.0)
+    r.raise_for_status()
+    js = r.json()
+    ils = js.get("the-open-network", {}).get("ils")
+    if ils is None:
+        raise RuntimeError(f"bad coingecko response: {js!r}")
+    return Decimal(str(ils))
+
+
+register_provider("manual", _manual_ton_ils)
+register_provider("coingecko", _coingecko_ton_ils)
+
+
+class PriceFeed:
+    """
+    Stale-while-revalidate TON/ILS quote cache.
+
+    A background task refreshes the quote every `refresh_sec`. Readers get the
+    cached quote while it is younger than `ttl_sec`; between ttl and
+    ttl + `stale_grace_sec` they still get it while a single refresh runs in the
+    background. Only with no usable quote does a reader block, and then only one
+    caller fetches while the others wait for its result.
+    """
+
+    def __init__(
+        self,
+        *,
+        refresh_sec: Optional[float] = None,
+        stale_grace_sec: Optional[float] = None,
+        providers: Optional[list[str]] = None,
+    ) -> None:
+        self.refresh_sec = refresh_sec if refresh_sec is not None else _env_float("PRICE_FEED_REFRESH_SEC", 60.0)
+        self.stale_grace_sec = (
+            stale_grace_sec if stale_grace_sec is not None else _env_float("PRICE_FEED_STALE_GRACE_SEC", 600.0)
+        )
+        self._providers = providers
+        self._quote: Optional[PriceQuote] = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: list[Callable[[PriceQuote], None]] = []
+        self.last_error: Optional[str] = None
+        self.last_latency: dict[str, float] = {}
+
+    # ---------- state ----------
+    def current(self) -> Optional[PriceQuote]:
+        return self._quote
 
-    if prov == "coingecko":
-        print("DEBUG: using coingecko provider")
-        url = "https://api.coingecko.com/api/v3/simple/price"
-        params = {"ids": "the-open-network", "vs_currencies": "ils"}
-        headers = {}
-        key = (os.getenv("COINGECKO_API_KEY") or "").strip()
-        if key:
-            headers["x-cg-pro-api-key"] = key
-        r = httpx.get(url, params=params, headers=headers, timeout=15.0)
-        r.raise_for_status()
-        js = r.json()
-        ils = js.get("the-open-network", {}).get("ils")
-        if ils is None:
-            raise RuntimeError(f"bad coingecko response: {js!r}")
-        q = PriceQuote(ton_ils=Decimal(str(ils)), ts=now, source="coingecko")
-        _CACHE = q
+    def age(self) -> Optional[float]:
+        q = self._quote
+        return None if q is None else max(0.0, time.time() - q.ts)
+
+    def add_listener(self, fn: Callable[[PriceQuote], None]) -> None:
+        """Called with every freshly fetched quote (e.g. to record history)."""
+        self._listeners.append(fn)
+
+    def stats(self) -> dict:
+        q = self._quote
+        return {
+            "quote": None if q is None else {"ton_ils": str(q.ton_ils), "source": q.source, "ts": q.ts},
+            "age_sec": self.age(),
+            "providers": self._providers or _provider_chain(),
+            "refresh_sec": self.refresh_sec,
+            "stale_grace_sec": self.stale_grace_sec,
+            "last_latency_sec": dict(self.last_latency),
+            "last_error": self.last_error,
+            "refresher_running": self.running,
+        }
+
+    # ---------- fetching ----------
+    def _fetch(self) -> PriceQuote:
+        errors = []
+        for name in self._providers or _provider_chain():
+            fn = _PROVIDERS.get(name)
+            if fn is None:
+                errors.append(f"{name}: unsupported provider")
+                continue
+            t0 = time.perf_counter()
+            try:
+                price = fn()
+            except Exception as e:
+                REFRESH_FAILURES.labels(provider=name).inc()
+                errors.append(f"{name}: {e}")
+                logger.warning("price_feed: provider %s failed: %s", name, e)
+                continue
+            finally:
+                elapsed = time.perf_counter() - t0
+                REFRESH_LATENCY.labels(provider=name).observe(elapsed)
+                self.last_latency[name] = elapsed
+            return PriceQuote(ton_ils=price, ts=time.time(), source=name)
+        raise RuntimeError("price_feed: all providers failed: " + "; ".join(errors))
+
+    def refresh_now(self) -> PriceQuote:
+        """Fetch a new quote synchronously and publish it to the cache."""
+        try:
+            q = self._fetch()
+        except Exception as e:
+            self.last_error = str(e)
+            raise
+        self._quote = q
+        self.last_error = None
+        for fn in self._listeners:
+            try:
+                fn(q)
+            except Exception as e:
+                logger.error("price_feed: listener failed: %s", e)
         return q
 
-    print(f"DEBUG: unsupported provider {prov}")
-    raise RuntimeError(f"Unsupported PRICE_FEED_PROVIDER={prov!r}")
+    def _revalidate_in_background(self) -> None:
+        if not self._lock.acquire(blocking=False):
+            return  # somebody is already refreshing
+
+        def run():
+            try:
+                self.refresh_now()
+            except Exception:
+                pass
+            finally:
+                self._lock.release()
+
+        threading.Thread(target=run, name="price-feed-revalidate", daemon=True).start()
+
+    def get(self, ttl_sec: float = 120) -> PriceQuote:
+        q = self._quote
+        now = time.time()
+        if q and (now - q.ts) < ttl_sec:
+            return q
+        if q and (now - q.ts) < ttl_sec + self.stale_grace_sec:
+            if not self.running:
+                self._revalidate_in_background()
+            return q
+        with self._lock:
+            q = self._quote  # another caller may have refreshed while we waited
+            if q and (time.time() - q.ts) < ttl_sec:
+                return q
+            return self.refresh_now()
+
+    # ---------- background refresher ----------
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self._locked_refresh)
+            except Exception:
+                pass  # already logged and counted; keep serving the stale quote
+            await asyncio.sleep(self.refresh_sec)
+
+    def _locked_refresh(self) -> None:
+        with self._lock:
+            self.refresh_now()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._loop(), name="price-feed-refresher")
+        logger.info("price_feed: refresher started (every %ss, grace %ss)", self.refresh_sec, self.stale_grace_sec)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+price_feed = PriceFeed()
+QUOTE_AGE.set_function(lambda: price_feed.age() if price_feed.current() else -1)
+
+
+def get_ton_ils_cached(ttl_sec: int = 120) -> PriceQuote:
+    return price_feed.get(ttl_sec=ttl_sec)
+
 
 def get_price_quote() -> PriceQuote:
     return get_ton_ils_cached(ttl_sec=120)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from web_portal.app.database.models import PriceCandle
+from web_portal.app.utils.series import CandleSeries, RingBuffer
+from .price_feed import PriceQuote, price_feed
+
+logger = logging.getLogger(__name__)
+
+# resolution -> (bucket seconds, buckets kept in memory)
+RESOLUTIONS: dict[str, tuple[int, int]] = {
+    "1m": (60, 24 * 60),      # one day of minutes
+    "1h": (3600, 30 * 24),    # thirty days of hours
+    "1d": (86400, 2 * 365),   # two years of days
+}
+RAW_CAPACITY = 4096
+
+
+class PriceHistory:
+    """
+    In-memory TON/ILS history filled by the price feed: the raw quotes in a
+    ring buffer plus 1m/1h/1d OHLC series. Buckets touched since the last
+    snapshot are written to ton_price_candles by `snapshot()`.
+    """
+
+    def __init__(self, raw_capacity: int = RAW_CAPACITY) -> None:
+        self.raw = RingBuffer(raw_capacity)
+        self.series = {name: CandleSeries(sec, cap) for name, (sec, cap) in RESOLUTIONS.items()}
+        self._dirty: set[tuple[str, float]] = set()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, quote: PriceQuote) -> None:
+        price = float(quote.ton_ils)
+        with self._lock:
+            self.raw.append(quote.ts, price)
+            for name, s in self.series.items():
+                start = s.update(quote.ts, price)
+                if start is not None:
+                    self._dirty.add((name, start))
+
+    def candles(self, resolution: str, limit: int = 200, since: Optional[float] = None) -> list[dict]:
+        if resolution not in self.series:
+            raise ValueError(f"unknown resolution {resolution!r}; expected one of {sorted(self.series)}")
+        with self._lock:
+            return self.series[resolution].rows(limit=limit, since=since)
+
+    def quotes(self, limit: int = 200, since: Optional[float] = None) -> list[dict]:
+        with self._lock:
+            return [{"ts": ts, "ton_ils": v} for ts, v in self.raw.items(since=since, limit=limit)]
+
+    # ---------- persistence ----------
+    def snapshot(self, db: Session) -> int:
+        """Upsert every bucket touched since the previous snapshot; returns rows written."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            rows = []
+            for name, start in dirty:
+                c = self.series[name].get(start)
+                if c is not None:
+                    rows.append((name, c))
+        try:
+            for name, c in rows:
+                db.merge(PriceCandle(
+                    resolution=name,
+                    bucket_ts=c["ts"],
+                    open=Decimal(str(c["open"])),
+                    high=Decimal(str(c["high"])),
+                    low=Decimal(str(c["low"])),
+                    close=Decimal(str(c["close"])),
+                    samples=c["count"],
+                ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._dirty |= dirty  # retry on the next snapshot
+            raise
+        return len(rows)
+
+    def restore(self, db: Session) -> None:
+        """Seed the in-memory series from the newest persisted candles."""
+        now = time.time()
+        for name, (sec, cap) in RESOLUTIONS.items():
+            found = db.execute(
+                select(PriceCandle)
+                .where(PriceCandle.resolution == name, PriceCandle.bucket_ts >= int(now - sec * cap))
+                .order_by(PriceCandle.bucket_ts.asc())
+            ).scalars().all()
+            with self._lock:
+                self.series[name].load(
+                    {
+                        "ts": r.bucket_ts,
+                        "open": r.open,
+                        "high": r.high,
+                        "low": r.low,
+                        "close": r.close,
+                        "count": r.samples,
+                    }
+                    for r in found
+                )
+
+    async def _loop(self, session_factory, interval_sec: float) -> None:
+        while True:
+            await asyncio.sleep(interval_sec)
+            await asyncio.to_thread(self._snapshot_with, session_factory)
+
+    def _snapshot_with(self, session_factory) -> None:
+        db = session_factory()
+        try:
+            n = self.snapshot(db)
+            if n:
+                logger.debug("price_history: snapshotted %d candles", n)
+        except Exception as e:
+            logger.error("price_history: snapshot failed: %s", e)
+        finally:
+            db.close()
+
+    def start(self, session_factory, interval_sec: float = 60.0) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.get_running_loop().create_task(
+            self._loop(session_factory, interval_sec), name="price-history-snapshot"
+        )
+
+    async def stop(self, session_factory=None) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if session_factory is not None:
+            await asyncio.to_thread(self._snapshot_with, session_factory)
+
+
+price_history = PriceHistory()
+price_feed.add_listener(price_history.record)
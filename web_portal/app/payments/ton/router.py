@@ -7,7 +7,8 @@ from fastapi import APIRouter, Depends, Header, HTTPException
 from sqlalchemy.orm import Session
 
 from app.manh.storage import get_db
-from .price_feed import get_ton_ils_cached
+from .price_feed import get_ton_ils_cached, price_feed
+from .price_history import price_history
 from .toncenter import TonCenter
 from .service import (
     create_invoice,
@@ -50,6 +51,28 @@ def pay_create_invoice(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get("/price")
+def pay_price():
+    try:
+        q = get_ton_ils_cached()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"ok": True, "ton_ils": str(q.ton_ils), "source": q.source, "feed": price_feed.stats()}
+
+
+@router.get("/price/history")
+def pay_price_history(resolution: str = "1h", limit: int = 200, since: Optional[float] = None):
+    # served purely from memory; never calls the upstream provider
+    limit = max(1, min(limit, 2000))
+    if resolution == "raw":
+        return {"ok": True, "resolution": "raw", "quotes": price_history.quotes(limit=limit, since=since)}
+    try:
+        rows = price_history.candles(resolution, limit=limit, since=since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"ok": True, "resolution": resolution, "candles": rows}
+
+
 @router.get("/invoices")
 def pay_list_invoices(user_id: int, db: Session = Depends(get_db)):
     return {"ok": True, "invoices": list_invoices(db, user_id=user_id)}
@@ -65,8 +88,7 @@ def pay_poll_ton(
     except Exception:
         raise HTTPException(status_code=401, detail="unauthorized")
 
-    result = poll_and_confirm_invoices(db)
-    return res
+    return poll_and_confirm_invoices(db)
 
 
 @router.post("/withdraw")
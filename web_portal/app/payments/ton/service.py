@@ -4,22 +4,27 @@ import hashlib
 import hmac
 import json
 import httpx
+import logging
 import os
 from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
 from decimal import Decimal, ROUND_CEILING
 from typing import Any, Optional
 
-from sqlalchemy import text
-from sqlalchemy.orm import Session
+from sqlalchemy import select, text, update
 from sqlalchemy.orm import Session
 
 from web_portal.app.manh.service import award_manh
 
 import httpx
+from web_portal.app.core.config import get_config
+from web_portal.app.core.security import constant_time_equals
 from web_portal.app.core.settings import settings
 from web_portal.app.database.models import Invoice, User
-from web_portal.app.manh.ledger import add_ledger_event
+from web_portal.app.manh.balances import apply_balance_delta
+from web_portal.app.push import publish_after_commit
+
+logger = logging.getLogger(__name__)
 
 def fetch_ton_transactions(address: str, limit: int = 100):
     """
@@ -48,46 +53,18 @@ def _utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
-def _signing_secret() -> str:
-    s = (os.getenv("INTERNAL_SIGNING_SECRET") or "").strip()
-    if not s:
-        raise RuntimeError("INTERNAL_SIGNING_SECRET missing")
-    return s
-
-
 def _hmac_hex(msg: str) -> str:
-    key = bytes.fromhex(_signing_secret()) if all(c in "0123456789abcdef" for c in _signing_secret().lower()) and len(_signing_secret()) >= 32 else _signing_secret().encode("utf-8")
+    key = get_config().require_hmac_key()
     return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).hexdigest()
 
 
-def _treasury_address() -> str:
-    v = (os.getenv("TON_TREASURY_ADDRESS") or "").strip()
-    if not v:
-        raise RuntimeError("TON_TREASURY_ADDRESS missing")
-    return v
-
-
-def _manh_price_ils() -> Decimal:
-    v = (os.getenv("MANH_PRICE_ILS") or "1.00").strip()
-    return Decimal(v)
-
-
-def _min_buy_for_withdrawal() -> Decimal:
-    v = (os.getenv("MIN_BUY_FOR_WITHDRAWAL") or "10").strip()
-    return Decimal(v)
-
-
-def _withdrawals_mode() -> str:
-    return (os.getenv("WITHDRAWALS_MODE") or "manual").strip().lower()
-
-
 def require_internal_secret(x_internal_secret: Optional[str]) -> None:
     # Guard sensitive endpoints (/poll, admin approvals, etc.)
-    expected = (os.getenv("INTERNAL_API_SECRET") or "").strip()
+    # (falls back to INTERNAL_SIGNING_SECRET when INTERNAL_API_SECRET is not set)
+    expected = get_config().internal_api_secret
     if not expected:
-        # allow using INTERNAL_SIGNING_SECRET as fallback guard if INTERNAL_API_SECRET not set
-        expected = _signing_secret()
-    if not x_internal_secret or x_internal_secret.strip() != expected:
+        raise RuntimeError("INTERNAL_SIGNING_SECRET missing")
+    if not x_internal_secret or not constant_time_equals(x_internal_secret.strip(), expected):
         raise PermissionError("unauthorized")
 
 
@@ -120,7 +97,9 @@ def create_invoice(
     if ils_amount <= 0:
         raise ValueError("ils_amount must be > 0")
 
-    price = _manh_price_ils()
+    cfg = get_config()
+    treasury_address = cfg.require_treasury_address()
+    price = cfg.manh_price_ils
     manh_amount = (ils_amount / price).quantize(Decimal("0.000000001"))
     # ton amount: ILS / (ILS per TON)
     ton_amount = (ils_amount / ton_ils_rate).quantize(Decimal("0.000000001"), rounding=ROUND_CEILING)
@@ -131,28 +110,17 @@ def create_invoice(
     sig = _hmac_hex(f"{invoice_id}|{user_id}|{str(ils_amount)}|{exp.isoformat()}")
     comment = f"MANH|{invoice_id}|{sig[:16]}"
 
-    db.execute(
-        text(
-            """
-            INSERT INTO manh_invoices(invoice_id, user_id, username, ils_amount, manh_amount, ton_amount,
-                                      ton_ils_rate, ton_treasury_address, comment, sig16, status, created_at, expires_at)
-            VALUES (:id, :u, :name, :ils, :manh, :ton, :rate, :addr, :cmt, :sig16, 'PENDING', now(), :exp)
-            """
-        ),
-        {
-            "id": invoice_id,
-            "u": user_id,
-            "name": username,
-            "ils": str(ils_amount),
-            "manh": str(manh_amount),
-            "ton": str(ton_amount),
-            "rate": str(ton_ils_rate),
-            "addr": _treasury_address(),
-            "cmt": comment,
-            "sig16": sig[:16],
-            "exp": exp,
-        },
-    )
+    db.add(Invoice(
+        id=invoice_id,
+        user_id=user_id,
+        ils_amount=ils_amount,
+        manh_amount=manh_amount,
+        ton_amount=ton_amount,
+        status="pending",
+        comment=comment,
+        treasury_address=treasury_address,
+        expires_at=exp,
+    ))
     db.commit()
 
     return InvoiceCreated(
@@ -163,40 +131,31 @@ def create_invoice(
         ton_amount=ton_amount,
         comment=comment,
         expires_at_utc=exp.isoformat(),
-        treasury_address=_treasury_address(),
+        treasury_address=treasury_address,
     )
 
 
 def list_invoices(db: Session, *, user_id: int, limit: int = 10) -> list[dict[str, Any]]:
     rows = db.execute(
-        text(
-            """
-            SELECT invoice_id, status, ils_amount, manh_amount, ton_amount,
-                   comment, created_at, expires_at, confirmed_at
-            FROM manh_invoices
-            WHERE user_id=:u
-            ORDER BY created_at DESC
-            LIMIT :lim
-            """
-        ),
-        {"u": user_id, "lim": limit},
-    ).fetchall()
-    out = []
-    for r in rows:
-        out.append(
-            {
-                "invoice_id": r[0],
-                "status": r[1],
-                "ils_amount": str(r[2]),
-                "manh_amount": str(r[3]),
-                "ton_amount": str(r[4]),
-                "comment": r[5],
-                "created_at": r[6].isoformat() if r[6] else None,
-                "expires_at": r[7].isoformat() if r[7] else None,
-                "confirmed_at": r[8].isoformat() if r[8] else None,
-            }
-        )
-    return out
+        select(Invoice)
+        .where(Invoice.user_id == user_id)
+        .order_by(Invoice.created_at.desc())
+        .limit(limit)
+    ).scalars().all()
+    return [
+        {
+            "invoice_id": inv.id,
+            "status": inv.status,
+            "ils_amount": str(inv.ils_amount),
+            "manh_amount": str(inv.manh_amount),
+            "ton_amount": str(inv.ton_amount),
+            "comment": inv.comment,
+            "created_at": inv.created_at.isoformat() if inv.created_at else None,
+            "expires_at": inv.expires_at.isoformat() if inv.expires_at else None,
+            "confirmed_at": inv.confirmed_at.isoformat() if inv.confirmed_at else None,
+        }
+        for inv in rows
+    ]
 
 
 def _parse_comment(tx: dict[str, Any]) -> str:
@@ -232,19 +191,67 @@ def _parse_amount_ton(tx: dict[str, Any]) -> Optional[Decimal]:
         return None
 
 
-def poll_and_confirm_invoices(db: Session, treasury_address: str = None) -> dict[str, Any]:
+# Treasury history is paged newest-first until it is older than every pending invoice.
+POLL_PAGE_SIZE = 50
+POLL_MAX_PAGES = 20
+POLL_CLOCK_SLACK_SEC = 300
+
+
+def _tx_id(tx: dict[str, Any]) -> tuple[Optional[str], Optional[str]]:
+    tid = tx.get("transaction_id") or {}
+    lt = tid.get("lt")
+    return (str(lt) if lt is not None else None), tid.get("hash")
+
+
+def _tx_memo(tx: dict[str, Any]) -> str:
+    if isinstance(tx.get("in_msg"), dict) and tx["in_msg"].get("message"):
+        return tx["in_msg"]["message"]
+    if tx.get("out_msgs"):
+        return tx["out_msgs"][0].get("message", "")
+    return ""
+
+
+def _fetch_treasury_since(tc, address: str, oldest_ts: float, page_size: int, max_pages: int) -> list[dict[str, Any]]:
+    out: list[dict[str, Any]] = []
+    cursor: tuple[Optional[str], Optional[str]] = (None, None)
+    for _ in range(max_pages):
+        page = tc.get_transactions(address, limit=page_size, lt=cursor[0], hash=cursor[1])
+        full = len(page) >= page_size
+        if cursor[0] is not None and page and _tx_id(page[0]) == cursor:
+            page = page[1:]  # the page starts at the previous page's last tx
+        if not page:
+            break
+        out.extend(page)
+        cursor = _tx_id(page[-1])
+        if not full or cursor[0] is None or int(page[-1].get("utime") or 0) < oldest_ts:
+            break
+    return out
+
+
+def _as_utc_ts(dt: Optional[datetime]) -> float:
+    if dt is None:
+        return _utcnow().timestamp()
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def poll_and_confirm_invoices(
+    db: Session,
+    treasury_address: Optional[str] = None,
+    *,
+    toncenter=None,
+    page_size: int = POLL_PAGE_SIZE,
+    max_pages: int = POLL_MAX_PAGES,
+) -> dict[str, Any]:
     """
-    ???? ?? ?? ????????? ???? PENDING ?????? ?? TON Center ?? ????? ?????.
-    ????? {'ok': True, 'confirmed': ????_?????????_??????, 'checked': ????_???????_??????}
+    Match incoming treasury transactions to pending invoices by memo and credit
+    the buyers. Returns {'ok': True, 'confirmed': n, 'checked': transactions_scanned}.
     """
     from web_portal.app.payments.ton.toncenter import TonCenter
-    from sqlalchemy import select
-    from web_portal.app.database.models import Invoice, User
-    from web_portal.app.manh.ledger import add_ledger_event
 
     if treasury_address is None:
-        from web_portal.app.core.settings import settings
-        treasury_address = settings.TON_TREASURY_ADDRESS
+        treasury_address = get_config().treasury_address
 
     pending_invoices = db.execute(
         select(Invoice).where(Invoice.status == "pending")
@@ -253,44 +260,55 @@ def poll_and_confirm_invoices(db: Session, treasury_address: str = None) -> dict
     if not pending_invoices:
         return {"ok": True, "confirmed": 0, "checked": 0}
 
-    tc = TonCenter()
+    oldest_ts = min(_as_utc_ts(inv.created_at) for inv in pending_invoices) - POLL_CLOCK_SLACK_SEC
     try:
-        transactions = tc.get_transactions(treasury_address, limit=50)
+        tc = toncenter or TonCenter()
+        transactions = _fetch_treasury_since(tc, treasury_address, oldest_ts, page_size, max_pages)
     except Exception as e:
-        print(f"Error fetching transactions from TON Center: {e}", flush=True)
+        logger.error("Error fetching transactions from TON Center: %s", e)
         return {"ok": False, "error": str(e), "confirmed": 0, "checked": 0}
 
     invoice_by_memo = {inv.comment: inv for inv in pending_invoices if inv.comment}
 
     confirmed_count = 0
     for tx in transactions:
-        memo = None
-        if "out_msgs" in tx and tx["out_msgs"]:
-            memo = tx["out_msgs"][0].get("message", "")
-        elif "in_msg" in tx:
-            memo = tx["in_msg"].get("message", "")
-
-        if not memo or memo not in invoice_by_memo:
+        memo = _tx_memo(tx)
+        inv = invoice_by_memo.get(memo)
+        if inv is None:
             continue
+        paid = _parse_amount_ton(tx)
+        if paid is None or paid < Decimal(str(inv.ton_amount)):
+            # a memo alone does not buy the invoice; a later full payment still can
+            logger.warning("Invoice %s: tx %s paid %s TON, expected %s", inv.id, _tx_id(tx)[1], paid, inv.ton_amount)
+            continue
+        # a memo seen twice (re-sent payment, overlapping pages) is only credited once
+        del invoice_by_memo[memo]
+
+        # claim the invoice in one statement: a concurrent poller that got here first wins
+        row = db.execute(
+            update(Invoice)
+            .where(Invoice.id == inv.id, Invoice.status == "pending")
+            .values(status="paid", confirmed_at=_utcnow(), tx_hash=_tx_id(tx)[1])
+            .returning(Invoice.user_id, Invoice.manh_amount)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if row is None:
+            continue
+        manh_amount = Decimal(str(row.manh_amount))
 
-        inv = invoice_by_memo[memo]
-
-        inv.status = "paid"
-        inv.confirmed_at = datetime.utcnow()
-        db.add(inv)
-
-        user = db.get(User, inv.user_id)
-        if user:
-            user.balance_manh += inv.manh_amount
-            user.total_xp += int(inv.manh_amount * 100)
-            db.add(user)
-            add_ledger_event(db, user.id, 'purchase', inv.manh_amount, f'Payment confirmed for invoice {inv.invoice_id}')
+        apply_balance_delta(db, row.user_id, manh_amount, 'purchase',
+                            f'Payment confirmed for invoice {inv.id}',
+                            xp_delta=int(manh_amount * 100))
+        publish_after_commit(db, row.user_id, "invoice",
+                             {"id": inv.id, "status": "paid", "manh_amount": str(manh_amount)})
 
         confirmed_count += 1
-        print(f"Invoice {inv.invoice_id} confirmed via TON Center", flush=True)
+        logger.info("Invoice %s confirmed via TON Center", inv.id)
 
     db.commit()
     return {"ok": True, "confirmed": confirmed_count, "checked": len(transactions)}
+
+
 def eligible_for_withdrawal(db: Session, user_id: int) -> bool:
     # must have purchased >= MIN_BUY_FOR_WITHDRAWAL (from owner)
     row = db.execute(
@@ -298,7 +316,7 @@ def eligible_for_withdrawal(db: Session, user_id: int) -> bool:
         {"u": user_id},
     ).fetchone()
     total = Decimal(str(row[0])) if row else Decimal("0")
-    return total >= _min_buy_for_withdrawal()
+    return total >= get_config().min_buy_for_withdrawal
 
 
 def create_withdrawal_request(
@@ -309,7 +327,7 @@ def create_withdrawal_request(
     amount_manh: Decimal,
     target_ton_address: str,
 ) -> dict[str, Any]:
-    if _withdrawals_mode() != "manual":
+    if get_config().withdrawals_mode != "manual":
         raise RuntimeError("WITHDRAWALS_MODE must be manual in V1")
 
     if amount_manh <= 0:
@@ -0,0 +1,257 @@
+"""
+Local TonCenter stand-in for load-testing the payment pipeline without mainnet.
+
+`TonCenterSimulator` keeps a fabricated transaction history for the treasury
+address and serves it in the toncenter v2 `getTransactions` shape (newest
+first, lt/hash paging). Payments are queued with `pay()` / `feed_pending_invoices()`
+and released onto the "chain" at a steady `rate` per second, optionally with
+periodic bursts, plus unrelated noise transfers.
+
+It plugs into the real client three ways:
+- `TonCenter(client=httpx.Client(transport=sim.transport()))` in-process,
+- `sim.asgi_app()` / `python -m web_portal.app.payments.ton.simulator` as an
+  HTTP server, with TONCENTER_BASE_URL pointed at it,
+- directly as the `toncenter=` argument (same `get_transactions` signature).
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Callable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+NANO = Decimal("1000000000")
+
+
+@dataclass
+class BurstPattern:
+    """Every `every_sec` seconds release `size` extra queued payments at once."""
+    every_sec: float = 0.0
+    size: int = 0
+
+
+class TonCenterSimulator:
+    def __init__(
+        self,
+        treasury: str,
+        *,
+        rate: float = 10.0,
+        burst: Optional[BurstPattern] = None,
+        noise_ratio: float = 0.0,
+        history: int = 100_000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.treasury = treasury
+        self.rate = rate
+        self.burst = burst or BurstPattern()
+        self.noise_ratio = noise_ratio
+        self.history = history
+        self._clock = clock
+        self._queue: deque[tuple[str, int]] = deque()
+        self._chain: list[dict[str, Any]] = []  # oldest first
+        self._lt = 0
+        self._credit = 0.0
+        self._noise_credit = 0.0
+        self._last_tick: Optional[float] = None
+        self._next_burst: Optional[float] = None
+        self._lock = threading.Lock()
+        self.emitted_at: dict[str, float] = {}
+        self.requests = 0
+        self._fed: set[str] = set()
+
+    # ---------- feeding payments ----------
+    def pay(self, memo: str, amount_nano: int) -> None:
+        with self._lock:
+            self._queue.append((memo, int(amount_nano)))
+
+    def pay_ton(self, memo: str, ton_amount) -> None:
+        self.pay(memo, int(Decimal(str(ton_amount)) * NANO))
+
+    def feed_pending_invoices(self, db) -> int:
+        """Queue a payment for every pending invoice not queued before."""
+        from sqlalchemy import select
+        from web_portal.app.database.models import Invoice
+
+        rows = db.execute(
+            select(Invoice.comment, Invoice.ton_amount).where(Invoice.status == "pending")
+        ).all()
+        fresh = [(c, t) for c, t in rows if c and c not in self._fed]
+        for comment, ton in fresh:
+            self._fed.add(comment)
+            self.pay_ton(comment, ton)
+        return len(fresh)
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    # ---------- chain ----------
+    def _append_tx(self, now: float, memo: str, nano: int) -> None:
+        self._lt += 1
+        digest = hashlib.sha256(f"{self._lt}|{memo}|{nano}".encode("utf-8")).digest()
+        self._chain.append({
+            "@type": "raw.transaction",
+            "utime": int(now),
+            "transaction_id": {"@type": "internal.transactionId", "lt": str(self._lt),
+                               "hash": base64.b64encode(digest).decode("ascii")},
+            "fee": "0",
+            "in_msg": {
+                "source": "EQSimulatedPayer",
+                "destination": self.treasury,
+                "value": str(nano),
+                "message": memo,
+            },
+            "out_msgs": [],
+        })
+        if len(self._chain) > 2 * self.history:
+            del self._chain[: len(self._chain) - self.history]
+
+    def tick(self, now: Optional[float] = None) -> int:
+        """Release queued payments due by `now`; returns how many were emitted."""
+        now = self._clock() if now is None else now
+        with self._lock:
+            if self._last_tick is None:
+                self._last_tick = now
+                self._next_burst = now + self.burst.every_sec if self.burst.every_sec > 0 else None
+                return 0
+            elapsed = max(0.0, now - self._last_tick)
+            self._last_tick = now
+            # unused budget does not pile up into an unplanned burst
+            self._credit = min(self._credit + elapsed * self.rate, max(1.0, self.rate))
+            due = int(self._credit)
+            self._credit -= due
+            if self._next_burst is not None and now >= self._next_burst:
+                due += self.burst.size
+                while self._next_burst <= now:
+                    self._next_burst += self.burst.every_sec
+
+            emitted = 0
+            while emitted < due and self._queue:
+                memo, nano = self._queue.popleft()
+                self._append_tx(now, memo, nano)
+                self.emitted_at.setdefault(memo, now)
+                emitted += 1
+                self._noise_credit += self.noise_ratio
+                while self._noise_credit >= 1.0:
+                    self._noise_credit -= 1.0
+                    self._append_tx(now, "", 1_000_000)
+            return emitted
+
+    def get_transactions(
+        self,
+        address: str,
+        limit: int = 20,
+        lt: Optional[str] = None,
+        hash: Optional[str] = None,
+    ) -> list[dict[str, Any]]:
+        self.tick()
+        with self._lock:
+            self.requests += 1
+            if address != self.treasury or not self._chain:
+                return []
+            end = len(self._chain)
+            if lt is not None:
+                # lts are consecutive, so the start position is arithmetic
+                end = len(self._chain) - (self._lt - int(lt))
+                if end <= 0 or end > len(self._chain):
+                    return []
+                if hash is not None and self._chain[end - 1]["transaction_id"]["hash"] != hash:
+                    return []
+            start = max(0, end - int(limit))
+            return self._chain[start:end][::-1]
+
+    # ---------- transports ----------
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        if not request.url.path.endswith("/getTransactions"):
+            return httpx.Response(404, json={"ok": False, "error": "not found"})
+        p = request.url.params
+        result = self.get_transactions(
+            p.get("address", ""), limit=int(p.get("limit", 20)), lt=p.get("lt"), hash=p.get("hash")
+        )
+        return httpx.Response(200, json={"ok": True, "result": result})
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def asgi_app(self):
+        from fastapi import FastAPI, Query
+
+        app = FastAPI(title="TonCenter simulator")
+
+        @app.get("/api/v2/getTransactions")
+        def get_transactions(
+            address: str,
+            limit: int = 20,
+            lt: Optional[str] = None,
+            hash: Optional[str] = None,
+            api_key: Optional[str] = Query(default=None),
+        ):
+            return {"ok": True, "result": self.get_transactions(address, limit=limit, lt=lt, hash=hash)}
+
+        @app.get("/sim/stats")
+        def stats():
+            return {"queued": self.queued, "emitted": len(self.emitted_at), "chain": len(self._chain),
+                    "requests": self.requests}
+
+        return app
+
+
+def _feed_loop(sim: TonCenterSimulator, session_factory, interval_sec: float, stop: threading.Event) -> None:
+    while not stop.wait(interval_sec):
+        db = session_factory()
+        try:
+            n = sim.feed_pending_invoices(db)
+            if n:
+                logger.info("simulator: queued %d invoice payments", n)
+        except Exception as e:
+            logger.error("simulator: feeding from DB failed: %s", e)
+        finally:
+            db.close()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Local TonCenter getTransactions simulator")
+    ap.add_argument("--treasury", required=True)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8099)
+    ap.add_argument("--rate", type=float, default=10.0, help="payments per second")
+    ap.add_argument("--burst-every", type=float, default=0.0)
+    ap.add_argument("--burst-size", type=int, default=0)
+    ap.add_argument("--noise-ratio", type=float, default=0.0, help="unrelated txs per payment")
+    ap.add_argument("--db-url", help="pay pending invoices found in this database")
+    ap.add_argument("--feed-interval", type=float, default=1.0)
+    args = ap.parse_args(argv)
+
+    import uvicorn
+
+    sim = TonCenterSimulator(
+        args.treasury,
+        rate=args.rate,
+        burst=BurstPattern(args.burst_every, args.burst_size),
+        noise_ratio=args.noise_ratio,
+    )
+    stop = threading.Event()
+    if args.db_url:
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        factory = sessionmaker(bind=create_engine(args.db_url))
+        threading.Thread(target=_feed_loop, args=(sim, factory, args.feed_interval, stop), daemon=True).start()
+    try:
+        uvicorn.run(sim.asgi_app(), host=args.host, port=args.port)
+    finally:
+        stop.set()
+
+
+if __name__ == "__main__":
+    main()
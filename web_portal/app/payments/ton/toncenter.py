@@ -16,12 +16,18 @@ def _ton_base_url() -> str:
 
 
 class TonCenter:
-    def __init__(self) -> None:
-        self.base = _ton_base_url()
-        self.key = _ton_api_key()
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        client: Optional[httpx.Client] = None,
+    ) -> None:
+        # base_url/client let tests and local simulators point at a stub TonCenter
+        self.base = (base_url or _ton_base_url()).rstrip("/")
+        self.key = api_key if api_key is not None else _ton_api_key()
         if not self.key:
             raise RuntimeError("TON_API_KEY missing")
-        self.client = httpx.Client(timeout=15.0)
+        self.client = client or httpx.Client(timeout=15.0)
 
     def _params(self, extra: Optional[dict[str, Any]] = None) -> dict[str, Any]:
         p = {"api_key": self.key}
@@ -29,10 +35,20 @@ class TonCenter:
             p.update(extra)
         return p
 
-    def get_transactions(self, address: str, limit: int = 20) -> list[dict[str, Any]]:
-        # Docs: getTransactions?address=...&limit=...
+    def get_transactions(
+        self,
+        address: str,
+        limit: int = 20,
+        lt: Optional[str] = None,
+        hash: Optional[str] = None,
+    ) -> list[dict[str, Any]]:
+        # Docs: getTransactions?address=...&limit=...[&lt=...&hash=...]
+        # newest first; lt+hash start the page at that transaction (inclusive)
         url = f"{self.base}/getTransactions"
-        r = self.client.get(url, params=self._params({"address": address, "limit": limit}))
+        extra: dict[str, Any] = {"address": address, "limit": limit}
+        if lt is not None and hash is not None:
+            extra.update({"lt": lt, "hash": hash})
+        r = self.client.get(url, params=self._params(extra))
         r.raise_for_status()
         data = r.json()
         if not data.get("ok"):
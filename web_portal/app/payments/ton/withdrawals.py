@@ -1,9 +1,11 @@
-import os
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, update
 from web_portal.app.database.models import Withdrawal, User
+from web_portal.app.core.config import get_config
 from web_portal.app.core.settings import settings
+from web_portal.app.manh.balances import apply_balance_delta
 from datetime import datetime
+from decimal import Decimal
 
 def create_withdrawal(
     db: Session,
@@ -12,65 +14,54 @@ def create_withdrawal(
     destination_address: str
 ) -> Withdrawal:
     """×™×•×¦×¨ ×‘×§×©×ھ ×‍×©×™×›×” ×—×“×©×”."""
-    user = db.get(User, user_id)
-    if not user or user.balance_manh < amount_manh:
-        raise ValueError("Insufficient balance")
-
-    min_amount = float(os.getenv("MIN_BUY_FOR_WITHDRAWAL", "0.000001"))
+    min_amount = float(get_config().min_withdrawal_manh)
     if amount_manh < min_amount:
         raise ValueError(f"Minimum withdrawal is {min_amount} MANH")
 
     from uuid import uuid4
+    wid = uuid4().hex
+    # debit first: raises InsufficientBalance (a ValueError) before anything is written
+    apply_balance_delta(db, user_id, -Decimal(str(amount_manh)), "withdrawal",
+                        f"Withdrawal request {wid}", {"withdrawal_id": wid})
     withdrawal = Withdrawal(
-        id=uuid4().hex,
+        id=wid,
         user_id=user_id,
         amount_manh=amount_manh,
         destination_address=destination_address,
         status="pending"
     )
     db.add(withdrawal)
-
-    user.balance_manh -= amount_manh
-    db.add(user)
-
     db.commit()
     db.refresh(withdrawal)
     return withdrawal
 
-def approve_withdrawal(db: Session, withdrawal_id: str, operator_id: int) -> Withdrawal:
-    withdrawal = db.get(Withdrawal, withdrawal_id)
-    if not withdrawal:
-        raise ValueError("Withdrawal not found")
-    if withdrawal.status != "pending":
-        raise ValueError(f"Withdrawal already {withdrawal.status}")
+def _decide(db: Session, withdrawal_id: str, status: str, operator_id: int):
+    # flip pending -> status in one statement, so of two operators acting at once only one wins
+    row = db.execute(
+        update(Withdrawal)
+        .where(Withdrawal.id == withdrawal_id, Withdrawal.status == "pending")
+        .values(status=status, processed_by=operator_id, processed_at=datetime.utcnow())
+        .returning(Withdrawal.user_id, Withdrawal.amount_manh)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        current = db.execute(select(Withdrawal.status).where(Withdrawal.id == withdrawal_id)).scalar_one_or_none()
+        if current is None:
+            raise ValueError("Withdrawal not found")
+        raise ValueError(f"Withdrawal already {current}")
+    return row
 
-    withdrawal.status = "approved"
-    withdrawal.processed_by = operator_id
-    withdrawal.processed_at = datetime.utcnow()
-    db.add(withdrawal)
+def approve_withdrawal(db: Session, withdrawal_id: str, operator_id: int) -> Withdrawal:
+    _decide(db, withdrawal_id, "approved", operator_id)
     db.commit()
-    db.refresh(withdrawal)
-    return withdrawal
+    return db.get(Withdrawal, withdrawal_id)
 
 def reject_withdrawal(db: Session, withdrawal_id: str, operator_id: int) -> Withdrawal:
-    withdrawal = db.get(Withdrawal, withdrawal_id)
-    if not withdrawal:
-        raise ValueError("Withdrawal not found")
-    if withdrawal.status != "pending":
-        raise ValueError(f"Withdrawal already {withdrawal.status}")
-
-    user = db.get(User, withdrawal.user_id)
-    if user:
-        user.balance_manh += withdrawal.amount_manh
-        db.add(user)
-
-    withdrawal.status = "rejected"
-    withdrawal.processed_by = operator_id
-    withdrawal.processed_at = datetime.utcnow()
-    db.add(withdrawal)
+    row = _decide(db, withdrawal_id, "rejected", operator_id)
+    apply_balance_delta(db, row.user_id, Decimal(str(row.amount_manh)), "withdrawal_refund",
+                        f"Withdrawal {withdrawal_id} rejected", {"withdrawal_id": withdrawal_id})
     db.commit()
-    db.refresh(withdrawal)
-    return withdrawal
+    return db.get(Withdrawal, withdrawal_id)
 
 def complete_withdrawal(db: Session, withdrawal_id: str, tx_hash: str) -> Withdrawal:
     withdrawal = db.get(Withdrawal, withdrawal_id)
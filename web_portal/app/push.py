@@ -0,0 +1,237 @@
+"""
+Live per-user events for the mini app (server-sent events).
+
+Producers call `push_hub.publish(user_id, event, data)` from any thread, or
+`publish_after_commit(db, ...)` inside a transaction so nothing is pushed for
+work that rolls back. Producers are the payment poller (invoice paid), ledger
+writes (balance changed) and the P2P matcher (trades, closed orders, and a
+`book` event to everyone when the order book moves).
+
+Delivery runs on the app's event loop. Every connection has a bounded queue;
+when a slow client falls `buffer` events behind, its queue is cleared and it
+gets a single `resync` event telling it to refetch /api/bootstrap. An idle
+stream gets a comment line every `heartbeat_sec` so proxies keep it open.
+
+With PUSH_REDIS_URL set, events are published to a Redis channel and every
+worker (including the publishing one) delivers what it reads from it, so a
+client connected to any worker sees events produced on all of them. If Redis
+is unavailable, events are delivered locally.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+
+from web_portal.app.p2p.events import OrderClosed, TradeEvent, subscribe as subscribe_p2p, unsubscribe as unsubscribe_p2p
+
+logger = logging.getLogger(__name__)
+
+REDIS_CHANNEL = "tg-guardian:push"
+EVERYONE = 0  # user id for events sent to every connection
+_PENDING_KEY = "push_pending"
+
+
+class _Connection:
+    def __init__(self, user_id: int, buffer: int) -> None:
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer)
+        self.overflowed = False
+
+    def offer(self, frame: str) -> bool:
+        if self.overflowed:
+            return False
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            # the client cannot keep up: drop its backlog, tell it to refetch
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_frame("resync", {}))
+            self.overflowed = True
+            return False
+
+
+def _frame(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, separators=(',', ':'), default=str)}\n\n"
+
+
+class PushHub:
+    def __init__(self, buffer: int = 100, heartbeat_sec: float = 15.0) -> None:
+        self.buffer = buffer
+        self.heartbeat_sec = heartbeat_sec
+        self._conns: dict[int, set[_Connection]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+        self._seq = 0
+        self.counters = {"published": 0, "delivered": 0, "dropped": 0, "redis_errors": 0}
+
+    # ---------- publishing ----------
+    def publish(self, user_id: int, event: str, data: dict) -> None:
+        """Thread-safe; a no-op until `start` has bound the hub to a loop."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        self.counters["published"] += 1
+        msg = {"u": int(user_id), "e": event, "d": data, "ts": time.time()}
+        loop.call_soon_threadsafe(self._route, msg)
+
+    def _route(self, msg: dict) -> None:
+        if self._redis is not None:
+            self._loop.create_task(self._publish_redis(msg))
+        else:
+            self._dispatch(msg)
+
+    async def _publish_redis(self, msg: dict) -> None:
+        try:
+            await self._redis.publish(REDIS_CHANNEL, json.dumps(msg, separators=(",", ":"), default=str))
+        except Exception as e:
+            self.counters["redis_errors"] += 1
+            logger.warning("push: redis publish failed (%s); delivering locally", e)
+            self._dispatch(msg)
+
+    def _dispatch(self, msg: dict) -> None:
+        user_id = msg["u"]
+        targets = [c for conns in self._conns.values() for c in conns] if user_id == EVERYONE \
+            else list(self._conns.get(user_id, ()))
+        if not targets:
+            return
+        self._seq += 1
+        frame = _frame(msg["e"], msg["d"], self._seq)
+        for conn in targets:
+            if conn.offer(frame):
+                self.counters["delivered"] += 1
+            else:
+                self.counters["dropped"] += 1
+
+    # ---------- connections ----------
+    def connect(self, user_id: int) -> _Connection:
+        conn = _Connection(user_id, self.buffer)
+        self._conns.setdefault(user_id, set()).add(conn)
+        return conn
+
+    def disconnect(self, conn: _Connection) -> None:
+        conns = self._conns.get(conn.user_id)
+        if conns is not None:
+            conns.discard(conn)
+            if not conns:
+                del self._conns[conn.user_id]
+
+    async def stream(self, conn: _Connection, is_disconnected=None) -> AsyncIterator[str]:
+        """SSE frames for `conn` until the client goes away; always disconnects it."""
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(conn.queue.get(), timeout=self.heartbeat_sec)
+                except asyncio.TimeoutError:
+                    if is_disconnected is not None and await is_disconnected():
+                        return
+                    yield ": ping\n\n"
+                    continue
+                conn.overflowed = False
+                yield frame
+        finally:
+            self.disconnect(conn)
+
+    # ---------- P2P matcher ----------
+    def _on_p2p(self, event) -> None:
+        if isinstance(event, TradeEvent):
+            trade = {"trade_id": event.trade_id, "amount": str(event.amount_manh), "price": str(event.price_per_manh)}
+            self.publish(event.seller_id, "trade", {**trade, "side": "sell", "order_id": event.sell_order_id})
+            self.publish(event.buyer_id, "trade", {**trade, "side": "buy", "order_id": event.buy_order_id})
+            self.publish(EVERYONE, "book", {"last_price": str(event.price_per_manh)})
+        elif isinstance(event, OrderClosed):
+            self.publish(event.user_id, "order", {"id": event.order_id, "side": event.side,
+                                                  "status": event.reason, "remaining": str(event.remaining)})
+            self.publish(EVERYONE, "book", {})
+
+    # ---------- lifecycle ----------
+    async def _listen(self, pubsub) -> None:
+        while True:
+            try:
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        self._dispatch(json.loads(message["data"]))
+                    except (ValueError, KeyError, TypeError) as e:
+                        logger.warning("push: bad message on %s: %s", REDIS_CHANNEL, e)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.counters["redis_errors"] += 1
+                logger.error("push: redis listener error: %s", e)
+                await asyncio.sleep(5)
+
+    async def start(self, redis_url: str = "", buffer: Optional[int] = None,
+                    heartbeat_sec: Optional[float] = None) -> None:
+        self._loop = asyncio.get_running_loop()
+        if buffer:
+            self.buffer = buffer
+        if heartbeat_sec:
+            self.heartbeat_sec = heartbeat_sec
+        subscribe_p2p(self._on_p2p)
+        if redis_url:
+            try:
+                import redis.asyncio as redis
+                self._redis = redis.from_url(redis_url)
+                pubsub = self._redis.pubsub()
+                await pubsub.subscribe(REDIS_CHANNEL)
+                self._listener = self._loop.create_task(self._listen(pubsub), name="push-redis")
+            except Exception as e:
+                logger.error("push: redis unavailable (%s); delivering in-process only", e)
+                self._redis = None
+
+    async def stop(self) -> None:
+        unsubscribe_p2p(self._on_p2p)
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._redis is not None:
+            try:
+                await self._redis.aclose()
+            except Exception:
+                pass
+            self._redis = None
+        self._loop = None
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "users": len(self._conns),
+            "connections": sum(len(c) for c in self._conns.values()),
+            "redis": self._redis is not None,
+        }
+
+
+push_hub = PushHub()
+
+
+def publish_after_commit(db: Session, user_id: int, event: str, data: dict) -> None:
+    """Queue a push on `db`; it goes out when the transaction commits and is dropped on rollback."""
+    db.info.setdefault(_PENDING_KEY, []).append((user_id, event, data))
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _flush_pending(session: Session) -> None:
+    for user_id, name, data in session.info.pop(_PENDING_KEY, ()):
+        push_hub.publish(user_id, name, data)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _drop_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
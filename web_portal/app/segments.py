@@ -0,0 +1,381 @@
+"""
+Audience segments over CRM tags and user attributes.
+
+A segment is a boolean expression such as
+
+    tag:vip AND NOT tag:churned AND balance>0
+    (tag:trader OR xp>=500) AND NOT blocked
+
+Atoms are `tag:<name>`, comparisons of `balance`, `reserved`, `available`
+(balance - reserved) and `xp` against a number, the `blocked` flag (the user
+blocked the bot) and `all`. They combine with AND, OR, NOT and parentheses.
+
+`SegmentIndex` keeps every user at a dense bit position and one bitset per tag
+(a Python int, so AND/OR/NOT run word-wide in C), plus flat arrays of the
+attributes. Comparisons scan the arrays once and are cached until the
+attributes change. `refresh()` only reads users and tags created or updated
+since the last load; `crm.add_tag`/`remove_tag` update the index directly.
+Tags deleted by another process show up at the next full `rebuild()`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import operator
+import re
+import threading
+from array import array
+from datetime import timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from web_portal.app.database.models import User, UserTag
+
+logger = logging.getLogger(__name__)
+
+ATTRIBUTES = ("balance", "reserved", "available", "xp")
+FLAGS = ("blocked",)
+_OPS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le,
+        "=": operator.eq, "!=": operator.ne}
+_TOKEN = re.compile(
+    r"\s*(?:(?P<paren>[()])"
+    r"|tag:(?P<tag>[\w.\-]+)"
+    r"|(?P<attr>[A-Za-z_]+)\s*(?P<op>>=|<=|!=|=|>|<)\s*(?P<num>-?\d+(?:\.\d+)?)"
+    r"|(?P<word>[A-Za-z_]+))"
+)
+RESULT_CACHE_SIZE = 32
+OVERLAP = timedelta(seconds=5)  # re-read rows this close to the watermark (commit skew)
+
+
+# ---------- expressions ----------
+def _tokens(expr: str) -> list[tuple]:
+    out, pos, expr = [], 0, expr.strip()
+    while pos < len(expr):
+        m = _TOKEN.match(expr, pos)
+        if m is None or m.end() == pos:
+            raise ValueError(f"unexpected input at {pos}: {expr[pos:pos + 20]!r}")
+        pos = m.end()
+        if m.group("paren"):
+            out.append((m.group("paren"),))
+        elif m.group("tag"):
+            out.append(("tag", m.group("tag").lower()))
+        elif m.group("attr"):
+            attr = m.group("attr").lower()
+            if attr not in ATTRIBUTES:
+                raise ValueError(f"unknown attribute {attr!r}; expected one of {list(ATTRIBUTES)}")
+            out.append(("cmp", attr, m.group("op"), float(m.group("num"))))
+        else:
+            word = m.group("word").lower()
+            if word in ("and", "or", "not"):
+                out.append((word,))
+            elif word in FLAGS:
+                out.append(("flag", word))
+            elif word == "all":
+                out.append(("all",))
+            else:
+                raise ValueError(f"unknown word {word!r}")
+    return out
+
+
+def parse(expr: str) -> tuple:
+    """Parse a segment expression into a tuple tree; raises ValueError if malformed."""
+    tokens = _tokens(expr)
+    if not tokens:
+        raise ValueError("empty segment expression")
+    pos = 0
+
+    def peek():
+        return tokens[pos][0] if pos < len(tokens) else None
+
+    def take(kind):
+        nonlocal pos
+        if peek() != kind:
+            found = tokens[pos][0] if pos < len(tokens) else "end of expression"
+            raise ValueError(f"expected {kind!r}, found {found!r}")
+        pos += 1
+        return tokens[pos - 1]
+
+    def either():
+        node = both()
+        while peek() == "or":
+            take("or")
+            node = ("or", node, both())
+        return node
+
+    def both():
+        node = unary()
+        while peek() == "and":
+            take("and")
+            node = ("and", node, unary())
+        return node
+
+    def unary():
+        nonlocal pos
+        kind = peek()
+        if kind == "not":
+            take("not")
+            return ("not", unary())
+        if kind == "(":
+            take("(")
+            node = either()
+            take(")")
+            return node
+        if kind in ("tag", "cmp", "flag", "all"):
+            pos += 1
+            return tokens[pos - 1]
+        raise ValueError(f"expected a tag, comparison or '(', found {kind or 'end of expression'!r}")
+
+    tree = either()
+    if pos != len(tokens):
+        raise ValueError(f"unexpected {tokens[pos][0]!r} after a complete expression")
+    return tree
+
+
+def _bits(positions: Iterable[int], size: int) -> int:
+    buf = bytearray((size + 7) // 8)
+    for p in positions:
+        buf[p >> 3] |= 1 << (p & 7)
+    return int.from_bytes(buf, "little")
+
+
+# ---------- index ----------
+class SegmentIndex:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._clear()
+
+    def _clear(self) -> None:
+        self._pos: dict[int, int] = {}
+        self._ids: list[int] = []
+        self._attrs = {"balance": array("d"), "reserved": array("d"), "xp": array("d")}
+        self._tags: dict[str, int] = {}
+        self._blocked = 0
+        self._universe = 0
+        self._cmp_cache: dict[tuple, int] = {}
+        self._results: dict[str, tuple[int, list[int]]] = {}
+        self._version = 0
+        self._users_seen = None
+        self._tags_seen = None
+        self.loaded = False
+
+    # ---------- loading ----------
+    def rebuild(self, db: Session) -> None:
+        """Reload every user and tag."""
+        users = db.execute(
+            select(User.id, User.balance_manh, User.reserved_manh, User.total_xp,
+                   User.bot_blocked_at, User.created_at, User.updated_at).order_by(User.id)
+        ).all()
+        tags = db.execute(select(UserTag.user_id, UserTag.tag, UserTag.created_at)).all()
+        with self._lock:
+            version = self._version
+            self._clear()
+            self._version = version + 1
+            blocked = []
+            for row in users:
+                pos = self._add_user(row.id)
+                self._set_attrs(pos, row)
+                if row.bot_blocked_at is not None:
+                    blocked.append(pos)
+                self._users_seen = _later(self._users_seen, row.created_at, row.updated_at)
+            size = len(self._ids)
+            self._universe = (1 << size) - 1
+            self._blocked = _bits(blocked, size)
+            per_tag: dict[str, list[int]] = {}
+            for uid, tag, created in tags:
+                pos = self._pos.get(uid)
+                if pos is not None:
+                    per_tag.setdefault(tag.lower(), []).append(pos)
+                self._tags_seen = _later(self._tags_seen, created)
+            self._tags = {tag: _bits(ps, size) for tag, ps in per_tag.items()}
+            self.loaded = True
+        logger.info("segments: indexed %d users, %d tags", size, len(per_tag))
+
+    def refresh(self, db: Session) -> int:
+        """Apply users and tags changed since the last load; returns rows read."""
+        if not self.loaded or self._users_seen is None:
+            self.rebuild(db)
+            return len(self._ids)
+        since_users = self._users_seen - OVERLAP
+        users = db.execute(
+            select(User.id, User.balance_manh, User.reserved_manh, User.total_xp,
+                   User.bot_blocked_at, User.created_at, User.updated_at)
+            .where(or_(User.created_at >= since_users, User.updated_at >= since_users))
+        ).all()
+        q = select(UserTag.user_id, UserTag.tag, UserTag.created_at)
+        if self._tags_seen is not None:
+            q = q.where(UserTag.created_at >= self._tags_seen - OVERLAP)
+        tags = db.execute(q).all()
+        with self._lock:
+            for row in users:
+                pos = self._add_user(row.id)
+                self._set_attrs(pos, row)
+                bit = 1 << pos
+                self._blocked = self._blocked | bit if row.bot_blocked_at is not None else self._blocked & ~bit
+                self._users_seen = _later(self._users_seen, row.created_at, row.updated_at)
+            for uid, tag, created in tags:
+                pos = self._pos.get(uid)
+                if pos is not None:
+                    tag = tag.lower()
+                    self._tags[tag] = self._tags.get(tag, 0) | (1 << pos)
+                self._tags_seen = _later(self._tags_seen, created)
+            if users:
+                self._cmp_cache.clear()
+            if users or tags:
+                self._version += 1
+        return len(users) + len(tags)
+
+    def ensure_loaded(self, db: Session) -> "SegmentIndex":
+        if not self.loaded:
+            self.rebuild(db)
+        return self
+
+    def _add_user(self, user_id: int) -> int:
+        pos = self._pos.get(user_id)
+        if pos is None:
+            pos = self._pos[user_id] = len(self._ids)
+            self._ids.append(user_id)
+            for values in self._attrs.values():
+                values.append(0.0)
+            self._universe |= 1 << pos
+        return pos
+
+    def _set_attrs(self, pos: int, row) -> None:
+        self._attrs["balance"][pos] = float(row.balance_manh or 0)
+        self._attrs["reserved"][pos] = float(row.reserved_manh or 0)
+        self._attrs["xp"][pos] = float(row.total_xp or 0)
+
+    # ---------- in-process updates ----------
+    def add_tag(self, user_id: int, tag: str) -> None:
+        self._set_tag(user_id, tag, True)
+
+    def remove_tag(self, user_id: int, tag: str) -> None:
+        self._set_tag(user_id, tag, False)
+
+    def _set_tag(self, user_id: int, tag: str, present: bool) -> None:
+        if not self.loaded:
+            return
+        with self._lock:
+            pos = self._pos.get(user_id)
+            if pos is None:
+                return  # a user created since the last refresh; picked up with it
+            tag = tag.lower()
+            bits = self._tags.get(tag, 0)
+            self._tags[tag] = bits | (1 << pos) if present else bits & ~(1 << pos)
+            self._version += 1
+
+    # ---------- queries ----------
+    def _compare(self, attr: str, op: str, value: float) -> int:
+        key = (attr, op, value)
+        bits = self._cmp_cache.get(key)
+        if bits is None:
+            test = _OPS[op]
+            if attr == "available":
+                values = (b - r for b, r in zip(self._attrs["balance"], self._attrs["reserved"]))
+            else:
+                values = self._attrs[attr]
+            bits = self._cmp_cache[key] = _bits(
+                (pos for pos, v in enumerate(values) if test(v, value)), len(self._ids)
+            )
+        return bits
+
+    def _eval(self, node: tuple) -> int:
+        kind = node[0]
+        if kind == "tag":
+            return self._tags.get(node[1], 0)
+        if kind == "cmp":
+            return self._compare(*node[1:])
+        if kind == "flag":
+            return self._blocked
+        if kind == "all":
+            return self._universe
+        if kind == "not":
+            return self._universe & ~self._eval(node[1])
+        left, right = self._eval(node[1]), self._eval(node[2])
+        return left & right if kind == "and" else left | right
+
+    def _members(self, bits: int) -> list[int]:
+        ids, out = self._ids, []
+        for i, byte in enumerate(bits.to_bytes((bits.bit_length() + 7) // 8, "little")):
+            while byte:
+                low = byte & -byte
+                out.append(ids[(i << 3) + low.bit_length() - 1])
+                byte ^= low
+        return out
+
+    def count(self, expr: str) -> int:
+        tree = parse(expr)
+        with self._lock:
+            return self._eval(tree).bit_count()
+
+    def resolve(self, expr: str) -> list[int]:
+        """User ids in the segment, ascending."""
+        tree = parse(expr)
+        with self._lock:
+            hit = self._results.get(expr)
+            if hit is not None and hit[0] == self._version:
+                return hit[1]
+            ids = sorted(self._members(self._eval(tree)))
+            if len(self._results) >= RESULT_CACHE_SIZE:
+                self._results.clear()
+            self._results[expr] = (self._version, ids)
+            return ids
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._ids),
+                "tags": {tag: bits.bit_count() for tag, bits in sorted(self._tags.items())},
+                "blocked": self._blocked.bit_count(),
+                "cached_comparisons": len(self._cmp_cache),
+                "version": self._version,
+            }
+
+    # ---------- background refresh ----------
+    async def _loop(self, session_factory, interval_sec: float, full_every: int) -> None:
+        n = 0
+        while True:
+            await asyncio.sleep(interval_sec)
+            n += 1
+            await asyncio.to_thread(self._refresh_with, session_factory, n % full_every == 0)
+
+    def _refresh_with(self, session_factory, full: bool = False) -> None:
+        db = session_factory()
+        try:
+            if full:
+                self.rebuild(db)
+            else:
+                self.refresh(db)
+        except Exception as e:
+            logger.error("segments: refresh failed: %s", e)
+        finally:
+            db.close()
+
+    def start(self, session_factory, interval_sec: float = 60.0, full_every: int = 60) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.get_running_loop().create_task(
+            self._loop(session_factory, interval_sec, max(1, full_every)), name="segment-refresh"
+        )
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def _later(current, *stamps):
+    for ts in stamps:
+        if ts is not None and (current is None or ts > current):
+            current = ts
+    return current
+
+
+segment_index = SegmentIndex()
@@ -0,0 +1,230 @@
+"""
+Resumable broadcast jobs.
+
+A broadcast is a `BroadcastJob` row. Its runner walks the recipients in user-id
+order one keyset page at a time (`id > cursor ORDER BY id LIMIT n`), so memory
+stays flat and no transaction is held open between pages. It sends each page
+with bounded concurrency on the BULK lane of the outbound scheduler, which
+keeps the sends within Telegram's limits. After every page it checkpoints the
+cursor and the counters in one UPDATE. Users who blocked the bot (403) get
+`bot_blocked_at` set and are left out of later broadcasts.
+
+A job's `target` is a segment expression (see `web_portal.app.segments`);
+its members are resolved from the in-memory segment index and paged the same
+way, by user id.
+
+Jobs survive restarts: `resume_jobs()` restarts every job still marked
+running, from its last checkpoint. A crash can resend at most the page that
+was in flight.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from bisect import bisect_right
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from telegram.error import BadRequest, Forbidden, TelegramError
+
+from web_portal.app.database.models import BroadcastJob, User
+from web_portal.app.segments import parse as parse_segment, segment_index
+from web_portal.app.telegram.outbound import Lane, lane_kwargs
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+CONCURRENCY = 20
+
+_running: dict[str, asyncio.Task] = {}
+
+
+def _recipients():
+    """Statement selecting every reachable user id."""
+    return select(User.id).where(User.bot_blocked_at.is_(None))
+
+
+def _page(db: Session, target: Optional[str], cursor: int, batch_size: int) -> tuple[list[int], Optional[int], bool]:
+    """Recipients after `cursor`: (ids, cursor to checkpoint, whether this is the last page)."""
+    if not target:
+        ids = db.execute(
+            _recipients().where(User.id > cursor).order_by(User.id).limit(batch_size)
+        ).scalars().all()
+        return ids, (ids[-1] if ids else None), len(ids) < batch_size
+    members = segment_index.ensure_loaded(db).resolve(target)
+    start = bisect_right(members, cursor)
+    chunk = members[start:start + batch_size]
+    ids = []
+    if chunk:
+        # the index may lag a block by one refresh; the row is authoritative
+        ids = db.execute(
+            _recipients().where(User.id.in_(chunk)).order_by(User.id)
+        ).scalars().all()
+    return ids, (chunk[-1] if chunk else None), start + batch_size >= len(members)
+
+
+def create_job(db: Session, text: str, created_by: Optional[int] = None, target: Optional[str] = None) -> BroadcastJob:
+    """Queue a broadcast; `target` is a segment expression (None = everyone reachable)."""
+    if target:
+        parse_segment(target)  # ValueError before anything is stored
+        total = segment_index.ensure_loaded(db).count(f"({target}) AND NOT blocked")
+    else:
+        total = db.execute(select(func.count()).select_from(_recipients().subquery())).scalar_one()
+    job = BroadcastJob(text=text, target=target, created_by=created_by, status="pending", total=total,
+                       cursor_user_id=0, sent=0, failed=0, blocked=0)
+    db.add(job)
+    db.commit()
+    return job
+
+
+async def _deliver(bot, chat_id: int, text: str) -> str:
+    try:
+        await bot.send_message(chat_id=chat_id, text=text, **lane_kwargs(bot, Lane.BULK))
+        return "sent"
+    except Forbidden:
+        return "blocked"  # blocked the bot or deactivated
+    except BadRequest as e:
+        if "chat not found" in str(e).lower():
+            return "blocked"
+        logger.warning("broadcast: send to %s failed: %s", chat_id, e)
+        return "failed"
+    except TelegramError as e:
+        logger.warning("broadcast: send to %s failed: %s", chat_id, e)
+        return "failed"
+
+
+def _load_page(session_factory, job_id: str, batch_size: int):
+    with session_factory() as db:
+        job = db.get(BroadcastJob, job_id)
+        if job is None or job.status not in ("pending", "running"):
+            return None, [], None, True
+        if job.status == "pending":
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            db.commit()
+        ids, cursor, last = _page(db, job.target, job.cursor_user_id, batch_size)
+        return job.text, ids, cursor, last
+
+
+def _checkpoint(session_factory, job_id: str, cursor: Optional[int], counts: dict[str, int],
+                blocked_ids: list[int], done: bool) -> None:
+    with session_factory() as db:
+        now = datetime.utcnow()
+        if blocked_ids:
+            db.execute(update(User).where(User.id.in_(blocked_ids)).values(bot_blocked_at=now))
+        values = {
+            "sent": BroadcastJob.sent + counts["sent"],
+            "failed": BroadcastJob.failed + counts["failed"],
+            "blocked": BroadcastJob.blocked + counts["blocked"],
+        }
+        if cursor is not None:
+            values["cursor_user_id"] = cursor
+        db.execute(update(BroadcastJob).where(BroadcastJob.id == job_id).values(**values))
+        if done:
+            # a job cancelled meanwhile keeps its status
+            db.execute(update(BroadcastJob)
+                       .where(BroadcastJob.id == job_id, BroadcastJob.status == "running")
+                       .values(status="done", finished_at=now))
+        db.commit()
+
+
+def _mark_failed(session_factory, job_id: str, error: str) -> None:
+    with session_factory() as db:
+        db.execute(update(BroadcastJob).where(BroadcastJob.id == job_id)
+                   .values(status="failed", error=error[:500], finished_at=datetime.utcnow()))
+        db.commit()
+
+
+async def run_job(bot, job_id: str, session_factory, *, batch_size: int = BATCH_SIZE,
+                  concurrency: int = CONCURRENCY) -> None:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def send(chat_id: int, text: str) -> str:
+        async with sem:
+            return await _deliver(bot, chat_id, text)
+
+    try:
+        while True:
+            text, ids, cursor, last_page = await asyncio.to_thread(_load_page, session_factory, job_id, batch_size)
+            if text is None:
+                return  # cancelled or gone
+            results = await asyncio.gather(*(send(uid, text) for uid in ids))
+            counts = _zero()
+            for r in results:
+                counts[r] += 1
+            blocked = [uid for uid, r in zip(ids, results) if r == "blocked"]
+            await asyncio.to_thread(_checkpoint, session_factory, job_id, cursor, counts, blocked, last_page)
+            if last_page:
+                logger.info("broadcast %s: done", job_id)
+                return
+    except Exception as e:
+        logger.error("broadcast %s: failed: %s", job_id, e, exc_info=True)
+        await asyncio.to_thread(_mark_failed, session_factory, job_id, str(e))
+
+
+def _zero() -> dict[str, int]:
+    return {"sent": 0, "failed": 0, "blocked": 0}
+
+
+def start_job(bot, job_id: str, session_factory, **kwargs) -> asyncio.Task:
+    task = _running.get(job_id)
+    if task is not None and not task.done():
+        return task
+    task = asyncio.get_running_loop().create_task(
+        run_job(bot, job_id, session_factory, **kwargs), name=f"broadcast-{job_id[:8]}"
+    )
+    _running[job_id] = task
+    task.add_done_callback(lambda _: _running.pop(job_id, None))
+    return task
+
+
+def resume_jobs(bot, session_factory) -> int:
+    """Restart every job left running or pending by a previous process."""
+    with session_factory() as db:
+        ids = db.execute(
+            select(BroadcastJob.id).where(BroadcastJob.status.in_(("pending", "running")))
+        ).scalars().all()
+    for job_id in ids:
+        logger.info("broadcast %s: resuming", job_id)
+        start_job(bot, job_id, session_factory)
+    return len(ids)
+
+
+def cancel_job(db: Session, job_id: str) -> bool:
+    res = db.execute(
+        update(BroadcastJob)
+        .where(BroadcastJob.id == job_id, BroadcastJob.status.in_(("pending", "running")))
+        .values(status="cancelled", finished_at=datetime.utcnow())
+    )
+    db.commit()
+    task = _running.get(job_id)
+    if task is not None:
+        task.cancel()
+    return res.rowcount > 0
+
+
+def find_job(db: Session, prefix: Optional[str] = None) -> Optional[BroadcastJob]:
+    """The job whose id starts with `prefix`, or the newest one."""
+    q = select(BroadcastJob)
+    if prefix:
+        q = q.where(BroadcastJob.id.startswith(prefix))
+    return db.execute(q.order_by(BroadcastJob.created_at.desc()).limit(1)).scalars().first()
+
+
+def job_progress(job: BroadcastJob) -> dict:
+    done = (job.sent or 0) + (job.failed or 0) + (job.blocked or 0)
+    return {
+        "id": job.id,
+        "status": job.status,
+        "total": job.total,
+        "processed": done,
+        "sent": job.sent,
+        "failed": job.failed,
+        "blocked": job.blocked,
+        "percent": round(100.0 * done / job.total, 1) if job.total else 100.0,
+        "running_here": job.id in _running,
+        "error": job.error,
+    }
@@ -1,37 +1,146 @@
+"""
+Notifications to the admin groups (log, payment, referral, security).
+
+Each group has a digest window (`TG_DIGEST_WINDOWS`). Notifications posted
+within a window are collected and sent as one summary message when it ends,
+so a burst of withdrawals or rate-limit alerts costs the group a message or
+two instead of one message per event. A window of 0 posts every notification
+at once. HIGH severity always goes out immediately; a digest that reaches
+`MAX_DIGEST_ITEMS` is flushed early.
+"""
+
+import asyncio
 import logging
+import time
+from enum import IntEnum
+from typing import Optional
+
 from telegram import Bot
-from web_portal.app.core.settings import settings
+from web_portal.app.core.config import get_config
+from web_portal.app.telegram.outbound import Lane, lane_kwargs
 
 logger = logging.getLogger(__name__)
 
-async def send_to_log_group(bot: Bot, text: str):
+MAX_DIGEST_ITEMS = 50
+MAX_MESSAGE_CHARS = 4096  # Telegram's limit for one message
+
+
+class Severity(IntEnum):
+    LOW = 0
+    NORMAL = 1
+    HIGH = 2  # bypasses the digest
+
+
+class _Digest:
+    def __init__(self) -> None:
+        self.items: list[str] = []
+        self.started = 0.0
+        self.bot: Optional[Bot] = None
+        self.timer: Optional[asyncio.Task] = None
+
+
+def _chunks(header: str, items: list[str]) -> list[str]:
+    """Join the items under `header`, split so each message fits Telegram's limit."""
+    out, current = [], header
+    for item in items:
+        item = item[:MAX_MESSAGE_CHARS - len(header) - 2]
+        if len(current) + len(item) + 2 > MAX_MESSAGE_CHARS:
+            out.append(current)
+            current = header
+        current += "\n\n" + item
+    out.append(current)
+    return out
+
+
+class GroupNotifier:
+    def __init__(self) -> None:
+        self._digests: dict[str, _Digest] = {}
+        self.sent = 0
+        self.coalesced = 0
+
+    def _chat_id(self, group: str) -> Optional[str]:
+        return getattr(get_config(), f"{group}_group", None)
+
+    async def _send(self, bot: Bot, group: str, chat_id, text: str) -> None:
+        try:
+            await bot.send_message(chat_id=int(chat_id), text=text, **lane_kwargs(bot, Lane.NOTIFY))
+            self.sent += 1
+        except Exception as e:
+            logger.error(f"Failed to send to {group} group: {e}")
+
+    async def notify(self, bot: Bot, group: str, text: str, severity: Severity = Severity.NORMAL) -> None:
+        chat_id = self._chat_id(group)
+        if not chat_id:
+            return
+        window = get_config().digest_windows.get(group, 0.0)
+        if severity >= Severity.HIGH or window <= 0:
+            await self._send(bot, group, chat_id, text)
+            return
+        digest = self._digests.setdefault(group, _Digest())
+        if not digest.items:
+            digest.started = time.time()
+            digest.timer = asyncio.get_running_loop().create_task(
+                self._flush_later(group, window), name=f"digest-{group}"
+            )
+        digest.items.append(text)
+        digest.bot = bot
+        self.coalesced += 1
+        if len(digest.items) >= MAX_DIGEST_ITEMS:
+            await self.flush(group)
+
+    async def _flush_later(self, group: str, window: float) -> None:
+        await asyncio.sleep(window)
+        digest = self._digests.get(group)
+        if digest is not None:
+            digest.timer = None  # do not cancel ourselves in flush()
+        await self.flush(group)
+
+    async def flush(self, group: str) -> None:
+        digest = self._digests.get(group)
+        if digest is None or not digest.items:
+            return
+        items, bot = digest.items, digest.bot
+        digest.items = []
+        if digest.timer is not None:
+            digest.timer.cancel()
+            digest.timer = None
+        chat_id = self._chat_id(group)
+        if not chat_id:
+            return
+        if len(items) == 1:
+            await self._send(bot, group, chat_id, items[0])
+            return
+        span = max(1, int(time.time() - digest.started))
+        for text in _chunks(f"Digest: {len(items)} notifications in the last {span}s", items):
+            await self._send(bot, group, chat_id, text)
+
+    async def flush_all(self) -> None:
+        for group in list(self._digests):
+            await self.flush(group)
+
+    def stats(self) -> dict:
+        return {
+            "pending": {g: len(d.items) for g, d in self._digests.items() if d.items},
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+        }
+
+
+notifier = GroupNotifier()
+
+
+async def send_to_log_group(bot: Bot, text: str, severity: Severity = Severity.NORMAL):
     """שולח הודעה לקבוצת הלוגים (אם הוגדרה)."""
-    chat_id = settings.TG_LOG_GROUP
-    if not chat_id:
-        return
-    try:
-        await bot.send_message(chat_id=int(chat_id), text=text)
-    except Exception as e:
-        logger.error(f"Failed to send to log group: {e}")
-
-async def send_to_payment_group(bot: Bot, text: str):
+    await notifier.notify(bot, "log", text, severity)
+
+async def send_to_payment_group(bot: Bot, text: str, severity: Severity = Severity.NORMAL):
     """שולח הודעה לקבוצת התשלומים."""
-    chat_id = settings.TG_PAYMENT_GROUP
-    if not chat_id:
-        return
-    try:
-        await bot.send_message(chat_id=int(chat_id), text=text)
-    except Exception as e:
-        logger.error(f"Failed to send to payment group: {e}")
-
-async def send_to_referral_group(bot: Bot, text: str):
-    """שולח הודעה לקבוצת ההפניות."""
-    chat_id = settings.TG_REFERRAL_GROUP
-    if not chat_id:
-        return
-    try:
-        await bot.send_message(chat_id=int(chat_id), text=text)
-    except Exception as e:
-        logger.error(f"Failed to send to referral group: {e}")
+    await notifier.notify(bot, "payment", text, severity)
 
+async def send_to_referral_group(bot: Bot, text: str, severity: Severity = Severity.NORMAL):
+    """שולח הודעה לקבוצת ההפניות."""
+    await notifier.notify(bot, "referral", text, severity)
 
+async def send_to_security_group(bot: Bot, text: str, severity: Severity = Severity.NORMAL):
+    """Posts to the security group."""
+    await notifier.notify(bot, "security", text, severity)
@@ -0,0 +1,192 @@
+"""
+Cache for media the bot renders itself (referral QR codes, ...).
+
+Rendered bytes are kept in a small in-memory LRU and in a disk directory that
+survives restarts. After the first upload of an item the Telegram `file_id`
+is remembered (per bot, since file ids are only valid for the bot that
+uploaded them). Later sends reuse the `file_id`, so there is no rendering and
+no upload. If Telegram rejects a stored `file_id`, the item is uploaded again
+and the id replaced.
+
+Keys must identify the content: anything that changes the rendered image
+(link, bot username, ...) belongs in the key.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from telegram import InputFile
+from telegram.error import BadRequest
+
+from web_portal.app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MediaCache:
+    def __init__(self, directory: Optional[str] = None, *, max_items: int = 256,
+                 max_bytes: int = 16 * 1024 * 1024, max_disk_bytes: int = 256 * 1024 * 1024) -> None:
+        self.directory = directory
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._mem: OrderedDict[str, bytes] = OrderedDict()
+        self._mem_bytes = 0
+        self._file_ids: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "renders": 0, "file_id_sends": 0, "uploads": 0}
+
+    # ---------- disk tier ----------
+    def _path(self, key: str, suffix: str) -> Optional[str]:
+        if not self.directory:
+            return None
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest() + suffix)
+
+    def _read(self, path: Optional[str]) -> Optional[bytes]:
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning("media cache: reading %s failed: %s", path, e)
+            return None
+
+    def _write(self, path: Optional[str], data: bytes) -> None:
+        if path is None:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("media cache: writing %s failed: %s", path, e)
+            return
+        self._disk_writes += 1
+        if self._disk_writes % 64 == 0:
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """Drop the least recently written files once the directory exceeds max_disk_bytes."""
+        try:
+            entries = [e for e in os.scandir(self.directory) if e.is_file()]
+        except OSError:
+            return
+        stats = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in entries), reverse=True)
+        used = 0
+        for _, size, path in stats:
+            used += size
+            if used > self.max_disk_bytes:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    # ---------- bytes ----------
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._mem.get(key)
+            if data is not None:
+                self._mem.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return data
+        data = self._read(self._path(key, ".bin"))
+        if data is not None:
+            self.counters["disk_hits"] += 1
+            self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        self._remember(key, data)
+        self._write(self._path(key, ".bin"), data)
+
+    def _remember(self, key: str, data: bytes) -> None:
+        with self._lock:
+            old = self._mem.pop(key, None)
+            if old is not None:
+                self._mem_bytes -= len(old)
+            self._mem[key] = data
+            self._mem_bytes += len(data)
+            while self._mem and (len(self._mem) > self.max_items or self._mem_bytes > self.max_bytes):
+                _, dropped = self._mem.popitem(last=False)
+                self._mem_bytes -= len(dropped)
+
+    def get_or_render(self, key: str, render: Callable[[], bytes]) -> bytes:
+        data = self.get(key)
+        if data is None:
+            data = render()
+            self.counters["renders"] += 1
+            self.put(key, data)
+        return data
+
+    # ---------- Telegram file ids ----------
+    def file_id(self, bot_id: int, key: str) -> Optional[str]:
+        scoped = f"{bot_id}:{key}"
+        fid = self._file_ids.get(scoped)
+        if fid is None:
+            raw = self._read(self._path(scoped, ".fid"))
+            if raw:
+                fid = self._file_ids[scoped] = raw.decode("utf-8")
+        return fid
+
+    def set_file_id(self, bot_id: int, key: str, file_id: Optional[str]) -> None:
+        scoped = f"{bot_id}:{key}"
+        if file_id:
+            self._file_ids[scoped] = file_id
+            self._write(self._path(scoped, ".fid"), file_id.encode("utf-8"))
+            return
+        self._file_ids.pop(scoped, None)
+        path = self._path(scoped, ".fid")
+        if path is not None:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    async def reply_photo(self, message, key: str, render: Callable[[], bytes],
+                          filename: str = "image.png", **kwargs):
+        """`message.reply_photo` with the cached file_id, or the cached/rendered bytes."""
+        bot_id = message.get_bot().id
+        fid = self.file_id(bot_id, key)
+        if fid:
+            try:
+                sent = await message.reply_photo(photo=fid, **kwargs)
+                self.counters["file_id_sends"] += 1
+                return sent
+            except BadRequest as e:
+                logger.info("media cache: stored file_id for %s rejected (%s); uploading again", key, e)
+                self.set_file_id(bot_id, key, None)
+        data = await asyncio.to_thread(self.get_or_render, key, render)
+        sent = await message.reply_photo(photo=InputFile(io.BytesIO(data), filename=filename), **kwargs)
+        self.counters["uploads"] += 1
+        photos = getattr(sent, "photo", None)
+        if photos:
+            self.set_file_id(bot_id, key, photos[-1].file_id)  # largest size
+        return sent
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self.counters,
+                "memory_items": len(self._mem),
+                "memory_bytes": self._mem_bytes,
+                "file_ids": len(self._file_ids),
+                "directory": self.directory,
+            }
+
+
+media_cache = MediaCache(settings.MEDIA_CACHE_DIR or os.path.join(tempfile.gettempdir(), "tg-guardian-media"))
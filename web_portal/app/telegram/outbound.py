@@ -0,0 +1,243 @@
+"""
+Outbound message scheduler for the bot.
+
+`OutboundScheduler` is installed as the PTB rate limiter
+(`Application.builder().rate_limiter(...)`), so every Bot API call made
+through the application's bot passes through it - handler replies, group
+notifications, broadcasts and alerts alike. Message-sending endpoints are
+held to Telegram's limits:
+
+- per chat: about 1 msg/s in private chats (small bursts allowed) and
+  20 msg/min in groups and channels, spaced with GCRA slots;
+- globally: a ~30 msg/s token bucket, granted in priority order, so a user
+  waiting on a reply is never queued behind a broadcast.
+
+A 429 `RetryAfter` pauses every send for `retry_after` seconds and the request
+is retried (up to `max_retries`). Other endpoints (callback answers, edits of
+inline keyboards, getMe, ...) only wait out such a pause.
+
+The lane is chosen with `rate_limit_args`; `lane_kwargs(bot, lane)` builds it
+and is a no-op for bots without a rate limiter. Unmarked calls are replies.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from enum import IntEnum
+from typing import Any, Callable, Coroutine, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class Lane(IntEnum):
+    REPLY = 0    # direct answers to a user's command
+    NOTIFY = 1   # trade/payment notices, group alerts
+    BULK = 2     # broadcasts
+
+
+LIMITED_ENDPOINTS = frozenset({
+    "sendMessage", "sendPhoto", "sendDocument", "sendVideo", "sendAnimation", "sendAudio",
+    "sendVoice", "sendSticker", "sendMediaGroup", "sendLocation", "sendContact", "sendPoll",
+    "copyMessage", "copyMessages", "forwardMessage", "forwardMessages",
+})
+
+QUEUE_DEPTH = Gauge("tg_outbound_queue_depth", "Messages waiting for a global send slot", ["lane"])
+SENT = Counter("tg_outbound_sent_total", "Messages handed to the Bot API", ["lane"])
+RETRY_AFTER = Counter("tg_outbound_retry_after_total", "429 RetryAfter responses from Telegram")
+WAIT = Histogram(
+    "tg_outbound_wait_seconds",
+    "Time a message waited for its per-chat and global slots",
+    ["lane"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60),
+)
+
+
+def lane_kwargs(bot, lane: Lane) -> dict:
+    """`rate_limit_args` for a send call, if the bot has a rate limiter to read it."""
+    return {"rate_limit_args": int(lane)} if getattr(bot, "rate_limiter", None) else {}
+
+
+def _is_group(chat_id) -> bool:
+    # group/supergroup/channel ids are negative; "@channel" usernames are channels
+    if isinstance(chat_id, str):
+        return not chat_id.lstrip("-").isdigit() or chat_id.startswith("-")
+    return chat_id < 0
+
+
+class OutboundScheduler(BaseRateLimiter[int]):
+    def __init__(
+        self,
+        *,
+        global_rate: float = 30.0,
+        chat_interval: float = 1.0,
+        chat_burst: int = 3,
+        group_per_minute: int = 20,
+        max_retries: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.global_rate = global_rate
+        self.chat_interval = chat_interval
+        self.chat_burst = max(1, chat_burst)
+        self.group_interval = 60.0 / group_per_minute
+        self.max_retries = max_retries
+        self._clock = clock
+        self._tokens = global_rate
+        self._refilled = clock()
+        self._tat: dict[Any, float] = {}  # per-chat theoretical arrival time (GCRA)
+        self._paused_until = 0.0
+        self._waiting: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.retries = 0
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+        for _, _, fut in self._waiting:
+            if not fut.done():
+                fut.cancel()
+        self._waiting.clear()
+        self._wakeup = None
+
+    # ---------- per chat ----------
+    def _chat_delay(self, chat_id, now: float) -> float:
+        """Reserve the chat's next slot; returns how long to wait for it."""
+        if chat_id is None:
+            return 0.0
+        if _is_group(chat_id):
+            interval, tolerance = self.group_interval, 0.0
+        else:
+            interval, tolerance = self.chat_interval, (self.chat_burst - 1) * self.chat_interval
+        tat = max(self._tat.get(chat_id, now), now)
+        self._tat[chat_id] = tat + interval
+        if len(self._tat) > 10_000:
+            self._tat = {c: t for c, t in self._tat.items() if t > now}
+        return max(0.0, tat - tolerance - now)
+
+    # ---------- global ----------
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.global_rate, self._tokens + (now - self._refilled) * self.global_rate)
+        self._refilled = now
+
+    async def _global_slot(self, lane: int) -> None:
+        now = self._clock()
+        self._refill(now)
+        if not self._waiting and now >= self._paused_until and self._tokens >= 1:
+            self._tokens -= 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (lane, next(self._seq), fut))
+        QUEUE_DEPTH.labels(Lane(lane).name.lower()).inc()
+        self._kick()
+        try:
+            await fut
+        finally:
+            QUEUE_DEPTH.labels(Lane(lane).name.lower()).dec()
+
+    def _kick(self) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch(), name="tg-outbound")
+
+    async def _dispatch(self) -> None:
+        while True:
+            while self._waiting and self._waiting[0][2].done():
+                heapq.heappop(self._waiting)  # cancelled waiter
+            if not self._waiting:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            now = self._clock()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            self._refill(now)
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.global_rate)
+                continue
+            self._tokens -= 1
+            _, _, fut = heapq.heappop(self._waiting)
+            fut.set_result(None)
+
+    async def _wait_pause(self) -> None:
+        delay = self._paused_until - self._clock()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    # ---------- BaseRateLimiter ----------
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Any]],
+        args: Any,
+        kwargs: dict[str, Any],
+        endpoint: str,
+        data: dict[str, Any],
+        rate_limit_args: Optional[int],
+    ):
+        if endpoint not in LIMITED_ENDPOINTS:
+            await self._wait_pause()
+            return await callback(*args, **kwargs)
+
+        lane = int(rate_limit_args) if rate_limit_args is not None else int(Lane.REPLY)
+        label = Lane(lane).name.lower()
+        chat_id = data.get("chat_id")
+        for attempt in range(self.max_retries + 1):
+            start = self._clock()
+            delay = self._chat_delay(chat_id, start)
+            if delay:
+                await asyncio.sleep(delay)
+            await self._global_slot(lane)
+            WAIT.labels(label).observe(self._clock() - start)
+            try:
+                result = await callback(*args, **kwargs)
+            except RetryAfter as e:
+                wait = float(e.retry_after)
+                self.retries += 1
+                RETRY_AFTER.inc()
+                self._paused_until = max(self._paused_until, self._clock() + wait)
+                if chat_id is not None:
+                    self._tat[chat_id] = max(self._tat.get(chat_id, 0.0), self._paused_until)
+                logger.warning("outbound: 429 on %s to %s, pausing %.1fs (attempt %d)",
+                               endpoint, chat_id, wait, attempt + 1)
+                if attempt == self.max_retries:
+                    raise
+                continue
+            self.sent += 1
+            SENT.labels(label).inc()
+            return result
+
+    def stats(self) -> dict:
+        depth = {lane.name.lower(): 0 for lane in Lane}
+        for lane, _, fut in self._waiting:
+            if not fut.done():
+                depth[Lane(lane).name.lower()] += 1
+        return {
+            "queued": depth,
+            "sent": self.sent,
+            "retry_after": self.retries,
+            "paused_for_sec": round(max(0.0, self._paused_until - self._clock()), 2),
+            "tracked_chats": len(self._tat),
+        }
+
+
+outbound = OutboundScheduler()
@@ -0,0 +1,150 @@
+"""
+Paginated listings with Prev/Next inline buttons.
+
+A `Listing` only knows how to fetch one page forward from a cursor
+(`fetch(db, owner_id, arg, cursor, limit) -> Page`) and how to render a row.
+`keyset_fetch` builds that for an ORM model: `WHERE (key, id) < (:key, :id)
+ORDER BY key DESC, id DESC LIMIT n+1` on an index, so page 50 costs what page
+1 costs. The in-memory order book plugs in with its own cursors.
+
+Callback data is limited to 64 bytes, so the buttons carry a short token
+(`pg:<token>`). The token refers to server-side page state: listing, owner,
+argument, cursor and the token of the previous page. Prev walks back along
+that chain, so sources only ever seek forward. Tokens live in a bounded LRU.
+An expired one asks the user to run the command again.
+
+Titles, empty texts and button labels are `i18n` keys, rendered in the
+language the list was opened in.
+"""
+
+from __future__ import annotations
+
+import secrets
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from web_portal.app.i18n import LANG_DEFAULT, t, user_lang
+
+CALLBACK_PREFIX = "pg:"
+PAGE_SIZE = 10
+MAX_TOKENS = 10_000
+
+
+@dataclass(frozen=True)
+class Page:
+    items: list
+    next_cursor: Any = None  # None on the last page
+
+
+@dataclass(frozen=True)
+class Listing:
+    name: str
+    title: str  # i18n key
+    fetch: Callable[[Session, int, Any, Any, int], Page]
+    render: Callable[[Any], str]
+    empty: str = "pg.empty"  # i18n key
+    page_size: int = PAGE_SIZE
+
+
+@dataclass(frozen=True)
+class _State:
+    listing: str
+    owner: int
+    arg: Any
+    cursor: Any
+    prev: Optional[str]
+    number: int
+    lang: str = LANG_DEFAULT
+
+
+def keyset_fetch(model, order: tuple, where: Optional[Callable] = None, descending: bool = True):
+    """A `Listing.fetch` seeking over `order` columns (the last one unique) of `model`.
+
+    `where(owner_id, arg)` returns the filter clause, e.g. the owner's rows only.
+    """
+    cols = tuple(order)
+
+    def fetch(db: Session, owner_id: int, arg, cursor, limit: int) -> Page:
+        q = select(model)
+        if where is not None:
+            q = q.where(where(owner_id, arg))
+        if cursor is not None:
+            key = tuple_(*cols) if len(cols) > 1 else cols[0]
+            after = tuple_(*cursor) if len(cols) > 1 else cursor[0]
+            q = q.where(key < after if descending else key > after)
+        q = q.order_by(*(c.desc() if descending else c.asc() for c in cols)).limit(limit + 1)
+        rows = db.execute(q).scalars().all()
+        if len(rows) <= limit:
+            return Page(list(rows))
+        rows = rows[:limit]
+        return Page(list(rows), tuple(getattr(rows[-1], c.key) for c in cols))
+
+    return fetch
+
+
+class Paginator:
+    def __init__(self, max_tokens: int = MAX_TOKENS) -> None:
+        self.max_tokens = max_tokens
+        self._listings: dict[str, Listing] = {}
+        self._states: OrderedDict[str, _State] = OrderedDict()
+
+    def register(self, listing: Listing) -> Listing:
+        self._listings[listing.name] = listing
+        return listing
+
+    def _store(self, state: _State) -> str:
+        token = secrets.token_urlsafe(6)
+        self._states[token] = state
+        while len(self._states) > self.max_tokens:
+            self._states.popitem(last=False)
+        return token
+
+    def render(self, db: Session, token: str) -> tuple[str, Optional[InlineKeyboardMarkup]]:
+        state = self._states[token]
+        self._states.move_to_end(token)
+        listing = self._listings[state.listing]
+        page = listing.fetch(db, state.owner, state.arg, state.cursor, listing.page_size)
+        lang = state.lang
+        if not page.items and state.number == 1:
+            return t(lang, listing.empty), None
+        lines = [t(lang, listing.title)] + [listing.render(item) for item in page.items]
+        buttons = []
+        if state.prev is not None:
+            buttons.append(InlineKeyboardButton(t(lang, "pg.prev"), callback_data=CALLBACK_PREFIX + state.prev))
+        if page.next_cursor is not None:
+            nxt = self._store(_State(state.listing, state.owner, state.arg, page.next_cursor, token,
+                                     state.number + 1, lang))
+            buttons.append(InlineKeyboardButton(t(lang, "pg.next"), callback_data=CALLBACK_PREFIX + nxt))
+        if buttons:
+            lines.append("\n" + t(lang, "pg.page", number=state.number))
+        return "\n".join(lines), InlineKeyboardMarkup([buttons]) if buttons else None
+
+    async def reply(self, message, db: Session, name: str, owner_id: int, arg: Any = None, cursor: Any = None,
+                    lang: str = LANG_DEFAULT):
+        """Send the first page of listing `name` (from `cursor`, if given) as a reply."""
+        token = self._store(_State(name, owner_id, arg, cursor, None, 1, lang))
+        text, markup = self.render(db, token)
+        return await message.reply_text(text, reply_markup=markup)
+
+    async def handle_callback(self, update, db: Session) -> None:
+        query = update.callback_query
+        token = (query.data or "")[len(CALLBACK_PREFIX):]
+        state = self._states.get(token)
+        if state is None or query.from_user.id != state.owner:
+            lang = user_lang(query.from_user.id, query.from_user.language_code)
+            if state is None:
+                await query.answer(t(lang, "pg.expired"), show_alert=True)
+            else:
+                await query.answer(t(lang, "pg.not_yours"))
+            return
+        await query.answer()
+        text, markup = self.render(db, token)
+        await query.edit_message_text(text, reply_markup=markup)
+
+
+paginator = Paginator()
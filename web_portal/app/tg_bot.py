@@ -25,18 +25,34 @@ from telegram.ext import Application, CommandHandler, ContextTypes, CallbackQuer
 
 from sqlalchemy.orm import Session
 
+from web_portal.app.core.config import get_config
 from web_portal.app.core.settings import settings
 from web_portal.app.db import SessionLocal
-from web_portal.app.database.models import User, Referral, P2POrder, Invoice, SecurityLog
+from web_portal.app.assets import assets
+from web_portal.app.i18n import t, user_lang
+from web_portal.app.database.models import (
+    User, Referral, SellOrder, BuyOrder, Invoice, SecurityLog, Withdrawal, LedgerEvent,
+)
+from web_portal.app.database.event_writer import event_writer
 from web_portal.app.manh.service import get_balance
 from web_portal.app.payments.ton.price_feed import get_ton_ils_cached
-from web_portal.app.payments.ton.service import create_invoice, list_invoices, poll_and_confirm_invoices
-from web_portal.app.payments.ton.withdrawals import create_withdrawal, get_user_withdrawals, approve_withdrawal, reject_withdrawal
+from web_portal.app.payments.ton.service import create_invoice, poll_and_confirm_invoices
+from web_portal.app.payments.ton.withdrawals import create_withdrawal, approve_withdrawal, reject_withdrawal
+from web_portal.app.payments.ton.payouts import build_payout_batches, batch_manifest, confirm_payouts
 from web_portal.app.manh.leaderboard import get_leaderboard
 from web_portal.app.manh.referrals import set_referral_code, get_user_referrals, process_referral
-from web_portal.app.manh.ledger import add_ledger_event
-from web_portal.app.manh.ledger import add_ledger_event
-from web_portal.app.p2p.service import create_sell_order, create_buy_order, get_open_orders, cancel_order, match_orders
+from web_portal.app.manh.balances import apply_balance_delta
+from web_portal.app.p2p.service import place_order, get_open_orders, cancel_order, match_orders
+from web_portal.app.p2p.orderbook import BUY, SELL, order_book
+from web_portal.app.p2p.events import TradeEvent, subscribe as subscribe_p2p
+from web_portal.app.p2p.market import market_data
+from web_portal.app.telegram.outbound import Lane, lane_kwargs, outbound
+from web_portal.app.telegram.media_cache import media_cache
+from web_portal.app.telegram.pagination import CALLBACK_PREFIX, Listing, Page, keyset_fetch, paginator
+from web_portal.app.telegram.groups import notifier, send_to_payment_group, send_to_security_group
+from web_portal.app.segments import segment_index
+from web_portal.app.crm import add_tag, remove_tag
+from web_portal.app.telegram.broadcast import cancel_job, create_job, find_job, job_progress, resume_jobs, start_job
 from web_portal.app.manh.admin_backup import cmd_admin_backup
 
 # ---------- Logging Configuration ----------
@@ -55,6 +71,10 @@ logger.addHandler(console_handler)
 _STARTED: Optional[str] = None
 _LAST_UPDATE: Optional[str] = None
 _application: Optional[Application] = None
+_bot_loop: Optional[asyncio.AbstractEventLoop] = None
+
+ORDERS_DEPTH_LEVELS = 10
+ORDERS_PAGE_SIZE = 20
 
 # -------------------- Redis Client (Rate Limiting) --------------------
 _redis_client: Optional[redis.Redis] = None
@@ -90,6 +110,14 @@ def _safe_decimal(value) -> str:
     except (InvalidOperation, ValueError, TypeError):
         return '0'
 
+def _lang(update: Update) -> str:
+    user = update.effective_user
+    return user_lang(user.id, user.language_code)
+
+def _t(update: Update, key: str, **kw) -> str:
+    """`key` rendered in the language of the user the update came from."""
+    return t(_lang(update), key, **kw)
+
 # ---------- Rate Limiting Decorator ----------
 def rate_limit(key_prefix: str, max_calls: int, period: int):
     def decorator(func):
@@ -109,41 +137,85 @@ def rate_limit(key_prefix: str, max_calls: int, period: int):
             results = await pipe.execute()
             current_calls = results[3]
             if current_calls > max_calls:
-                try:
-                    db = SessionLocal()
-                    log = SecurityLog(
-                        event_type='rate_limit_exceeded',
-                        user_id=user_id,
-                        details={'command': key_prefix, 'calls': current_calls, 'limit': max_calls, 'period': period}
-                    )
-                    db.add(log)
-                    db.commit()
-                    db.close()
-                except Exception as e:
-                    logger.error(f"Failed to log rate limit event: {e}")
-                security_group = os.getenv("TG_SECURITY_GROUP")
-                if security_group:
-                    try:
-                        await context.bot.send_message(
-                            chat_id=security_group,
-                            text=f"Rate limit exceeded: {key_prefix} by user {user_id} ({current_calls} calls in {period}s)"
-                        )
-                    except Exception as e:
-                        logger.error(f"Failed to notify security group: {e}")
-                await update.message.reply_text("Too many requests. Please try again later.")
+                log_security_event(
+                    'rate_limit_exceeded',
+                    user_id=user_id,
+                    details={'command': key_prefix, 'calls': current_calls, 'limit': max_calls, 'period': period}
+                )
+                await send_to_security_group(
+                    context.bot,
+                    f"Rate limit exceeded: {key_prefix} by user {user_id} ({current_calls} calls in {period}s)",
+                )
+                await update.message.reply_text(_t(update, "err.rate_limited"))
                 return
             return await func(update, context, *args, **kwargs)
         return wrapper
     return decorator
 
-async def log_security_event(db, event_type: str, user_id: int = None, details: dict = None):
-    log = SecurityLog(
-        event_type=event_type,
-        user_id=user_id,
-        details=details
+def log_security_event(event_type: str, user_id: int = None, details: dict = None) -> bool:
+    """Queue a security_logs row; the event writer inserts it in the background."""
+    return event_writer.write(SecurityLog.__table__, {
+        'event_type': event_type,
+        'user_id': user_id,
+        'details': details,
+        'created_at': datetime.utcnow(),
+    })
+
+# ---------- Paginated listings ----------
+def _book_fetch(db: Session, owner_id: int, which: str, cursor, limit: int) -> Page:
+    # which: buy, sell, mine (the owner's orders) or all
+    orders, nxt = order_book.ensure_loaded(db).page(
+        which if which in (BUY, SELL) else None,
+        cursor=cursor,
+        limit=limit,
+        user_id=owner_id if which == "mine" else None,
     )
-    db.add(log)
-    db.commit()
+    return Page(orders, nxt)
+
+def _date(value) -> str:
+    return value.strftime('%Y-%m-%d') if value else '?'
+
+paginator.register(Listing(
+    "users", "list.users",
+    keyset_fetch(User, (User.id,), descending=False),
+    lambda u: f"ID: {u.id} | @{u.username} | MANH: {_safe_decimal(u.balance_manh)} | XP: {u.total_xp}",
+    empty="list.users.empty",
+))
+paginator.register(Listing(
+    "book", "list.book",
+    _book_fetch,
+    lambda o: f"  {o.id[:8]}  {o.side}  {o.remaining} MANH @ {o.price} TON",
+    empty="orders.empty", page_size=ORDERS_PAGE_SIZE,
+))
+paginator.register(Listing(
+    "all_orders", "list.all_orders",
+    _book_fetch,
+    lambda o: f"{o.id[:8]} | {o.side} | {o.remaining} MANH @ {o.price} TON | User: {o.user_id}",
+    empty="orders.empty", page_size=ORDERS_PAGE_SIZE,
+))
+paginator.register(Listing(
+    "invoices", "list.invoices",
+    keyset_fetch(Invoice, (Invoice.created_at, Invoice.id), lambda uid, _: Invoice.user_id == uid),
+    lambda inv: f"{inv.id[:8]}: {inv.status} {inv.ils_amount} ILS ({_date(inv.created_at)})",
+    empty="list.invoices.empty",
+))
+paginator.register(Listing(
+    "withdrawals", "list.withdrawals",
+    keyset_fetch(Withdrawal, (Withdrawal.requested_at, Withdrawal.id), lambda uid, _: Withdrawal.user_id == uid),
+    lambda w: f"{w.id[:8]}: {w.amount_manh} MANH to {w.destination_address[:10]}... ({w.status})",
+    empty="list.withdrawals.empty",
+))
+paginator.register(Listing(
+    "history", "list.history",
+    keyset_fetch(LedgerEvent, (LedgerEvent.created_at, LedgerEvent.id), lambda uid, _: LedgerEvent.user_id == uid),
+    lambda e: f"{e.created_at.strftime('%Y-%m-%d %H:%M') if e.created_at else '?'} | {e.event_type} | "
+              f"{e.amount} MANH | {e.description or ''}",
+    empty="list.history.empty",
+))
+
+@_with_db
+async def pagination_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
+    await paginator.handle_callback(update, db)
 
 # ---------- Command Handlers ----------
 @_with_db
@@ -157,6 +229,7 @@ async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Sess
     user = db.get(User, user_id)
     if not user:
         user = User(id=user_id, username=username, first_name=first_name, balance_manh=0, total_xp=0)
+        referrer = None
         if referral_code:
             referrer = db.query(User).filter(User.referral_code == referral_code).first()
             if referrer and referrer.id != user_id:
@@ -164,46 +237,24 @@ async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Sess
                 ref = Referral(id=uuid4().hex, referrer_id=referrer.id, referred_id=user_id,
                                created_at=datetime.utcnow(), reward_given=False)
                 db.add(ref)
-                db.add(referrer)
-                # ????? XP ?????
-                referrer.total_xp += 5
-                add_ledger_event(db, referrer.id, 'referral', 5, f'Referral bonus for inviting user {user_id}')
+            else:
+                referrer = None
         db.add(user)
+        if referrer:
+            db.flush()
+            # a /start referral earns the referrer XP only, no MANH
+            apply_balance_delta(db, referrer.id, Decimal(0), 'referral',
+                                f'Referral bonus (5 XP) for inviting user {user_id}', xp_delta=5)
         db.commit()
-        await update.message.reply_text("Welcome to Telegram Guardian! Use /help to see available commands.")
+        await update.message.reply_text(_t(update, "start.welcome"))
     else:
-        await update.message.reply_text("Welcome back! Use /help to see available commands.")
+        if user.bot_blocked_at is not None:
+            user.bot_blocked_at = None  # talking to us again, so broadcasts reach them
+            db.commit()
+        await update.message.reply_text(_t(update, "start.back"))
 
 async def cmd_help(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    text = (
-        "Available commands:\n"
-        "/start - Start the bot\n"
-        "/help - Show this help\n"
-        "/all - Show all commands\n"
-        "/manh - Show your MANH balance\n"
-        "/leaderboard [daily|weekly] - Show leaderboard\n"
-        "/buy <ILS> - Buy MANH\n"
-        "/invoices - Show your invoices\n"
-        "/poll_confirm - Check for pending payments\n"
-        "/miniapp - Open dashboard\n"
-        "/withdraw <amount> <address> - Request withdrawal\n"
-        "/withdrawals - List your withdrawals\n"
-        "/chatid - Get chat ID\n"
-        "/p2p_buy <amount> <price> - Place P2P buy order\n"
-        "/sell <amount> <price> - Place P2P sell order\n"
-        "/orders - Show open orders\n"
-        "/cancel <id> <sell|buy> - Cancel order\n"
-        "/referral - Get referral link\n"
-        "/referrals - Show referred users\n"
-        "/menu - Open interactive menu\n"
-        "/faq - Frequently asked questions\n"
-        "/admin - Admin panel\n"
-        "/admin_stats - Admin statistics\n"
-        "/admin_users - List users\n"
-        "/admin_orders - All orders\n"
-        "/admin_broadcast - Broadcast message"
-    )
-    await update.message.reply_text(text)
+    await update.message.reply_text(_t(update, "help.text"))
 
 async def cmd_all(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await cmd_help(update, context)
@@ -212,7 +263,7 @@ async def cmd_all(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def cmd_manh(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
     user_id = update.effective_user.id
     balance = get_balance(db, user_id)
-    await update.message.reply_text(f"MANH balance: {_safe_decimal(balance)}")
+    await update.message.reply_text(_t(update, "manh.show", balance=_safe_decimal(balance)))
 
 @_with_db
 async def cmd_leaderboard(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
@@ -220,10 +271,10 @@ async def cmd_leaderboard(update: Update, context: ContextTypes.DEFAULT_TYPE, db
     scope = args[0] if args and args[0] in ("daily", "weekly") else "daily"
     lb = get_leaderboard(db, bucket_scope=scope, bucket_key=scope, limit=10)
     if not lb:
-        await update.message.reply_text(f"Leaderboard ({scope}) is empty right now.")
+        await update.message.reply_text(_t(update, "lb.empty", scope=scope))
         return
     lines = [f"{i+1}. {row.get('username', row['user_id'])}  {row['total_manh']} MANH" for i, row in enumerate(lb)]
-    await update.message.reply_text(f"{scope.capitalize()} Leaderboard:\n" + "\n".join(lines))
+    await update.message.reply_text(_t(update, "lb.title", scope=scope.capitalize()) + "\n" + "\n".join(lines))
 
 @_with_db
 async def cmd_buy(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
@@ -231,7 +282,7 @@ async def cmd_buy(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Sessio
     username = update.effective_user.username
     parts = update.message.text.split()
     if len(parts) < 2:
-        await update.message.reply_text("Usage: /buy <ILS amount>")
+        await update.message.reply_text(_t(update, "buy.usage"))
         return
     try:
         from decimal import Decimal
@@ -250,62 +301,36 @@ async def cmd_buy(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Sessio
             ils_amount=ils_amount,
             ton_ils_rate=ton_per_ils
         )
-        msg = (
-            f"Invoice created!\n"
-            f"ILS amount: {ils_amount}\n"
-            f"TON amount: {inv.ton_amount}\n"
-            f"MANH amount: {inv.manh_amount}\n\n"
-            f"Send to:\n{inv.treasury_address}\n"
-            f"With memo (required): {inv.comment}\n\n"
-            f"After payment, click /poll_confirm for auto-confirmation.\n"
-            f"Current status: pending"
-        )
+        msg = _t(update, "buy.created", ils=ils_amount, ton=inv.ton_amount, manh=inv.manh_amount,
+                 address=inv.treasury_address, memo=inv.comment)
         await update.message.reply_text(msg)
     except Exception as e:
-        await update.message.reply_text(f"Error: {e}")
+        await update.message.reply_text(_t(update, "err.generic", err=e))
 
 @_with_db
 async def cmd_invoices(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
-    user_id = update.effective_user.id
-    invoices = list_invoices(db, user_id=user_id, limit=10)
-    if not invoices:
-        await update.message.reply_text("No invoices found.")
-        return
-    lines = ["Your invoices:"]
-    for inv in invoices:
-        if hasattr(inv, 'id'):
-            inv_id = inv.id[:8] if inv.id else '?'
-            status = inv.status
-            ils = inv.ils_amount
-            date = inv.created_at.date() if inv.created_at else '?'
-        else:
-            inv_id = inv.get('id', '?')[:8]
-            status = inv.get('status', '?')
-            ils = inv.get('ils_amount', 0)
-            date = inv.get('created_at')
-            if hasattr(date, 'date'):
-                date = date.date()
-        lines.append(f"{inv_id}: {status} {ils} ILS ({date})")
-    await update.message.reply_text("\n".join(lines))
+    await paginator.reply(update.message, db, "invoices", update.effective_user.id, lang=_lang(update))
 
 @_with_db
 async def cmd_poll_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
-    await update.message.reply_text("Checking for pending payments...")
+    await update.message.reply_text(_t(update, "poll.checking"))
     result = poll_and_confirm_invoices(db)
     if result.get("confirmed", 0) > 0:
-        await update.message.reply_text(f"{result['confirmed']} payment(s) confirmed.")
+        await update.message.reply_text(_t(update, "poll.confirmed", count=result['confirmed']))
     else:
-        await update.message.reply_text("No new payments found.")
+        await update.message.reply_text(_t(update, "poll.none"))
 
 async def cmd_miniapp(update: Update, context: ContextTypes.DEFAULT_TYPE):
     keyboard = [[
         InlineKeyboardButton(
-            "Open Dashboard",
-            web_app=WebAppInfo(url="https://telegram-guardian-production.up.railway.app/mini_app")
+            _t(update, "miniapp.button"),
+            # the version makes the page cacheable for good; a deploy changes it
+            web_app=WebAppInfo(url="https://telegram-guardian-production.up.railway.app/mini_app"
+                                   f"?v={assets.version('dashboard.html')}")
         )
     ]]
     reply_markup = InlineKeyboardMarkup(keyboard)
-    await update.message.reply_text("Click the button to open dashboard:", reply_markup=reply_markup)
+    await update.message.reply_text(_t(update, "miniapp.prompt"), reply_markup=reply_markup)
 
 @rate_limit("withdraw", 3, 3600)
 @_with_db
@@ -313,190 +338,208 @@ async def cmd_withdraw(update: Update, context: ContextTypes.DEFAULT_TYPE, db: S
     user_id = update.effective_user.id
     parts = update.message.text.split()
     if len(parts) < 3:
-        await update.message.reply_text("Usage: /withdraw <amount MANH> <TON address>")
+        await update.message.reply_text(_t(update, "withdraw.usage"))
         return
     try:
         amount = float(parts[1])
         address = parts[2]
         if not (address.startswith("UQ") or address.startswith("EQ")):
-            await update.message.reply_text("Invalid TON address. Should start with UQ or EQ.")
+            await update.message.reply_text(_t(update, "withdraw.bad_address"))
             return
-        min_amount = float(os.getenv("MIN_BUY_FOR_WITHDRAWAL", "0.000001"))
+        cfg = get_config()
+        min_amount = float(cfg.min_withdrawal_manh)
         if amount < min_amount:
-            await update.message.reply_text(f"Minimum withdrawal is {min_amount} MANH")
+            await update.message.reply_text(_t(update, "withdraw.minimum", amount=min_amount))
             return
         from decimal import Decimal
         amount_decimal = Decimal(str(amount))
         withdrawal = create_withdrawal(db, user_id, amount_decimal, address)
-        msg = f"Withdrawal request created!\nID: {withdrawal.id}\nAmount: {amount} MANH\nAddress: {address}\nStatus: pending"
+        msg = _t(update, "withdraw.created", id=withdrawal.id, amount=amount, address=address)
         await update.message.reply_text(msg)
-        payment_group = os.getenv("TG_PAYMENT_GROUP")
-        if payment_group:
-            try:
-                await context.bot.send_message(
-                    chat_id=payment_group,
-                    text=f"New withdrawal request:\nUser: {user_id}\nAmount: {amount} MANH\nAddress: {address}"
-                )
-            except Exception as e:
-                logger.error(f"Failed to send to payment group: {e}")
+        await send_to_payment_group(
+            context.bot,
+            f"New withdrawal request:\nUser: {user_id}\nAmount: {amount} MANH\nAddress: {address}",
+        )
     except ValueError as e:
-        await update.message.reply_text(f"Error: {e}")
+        await update.message.reply_text(_t(update, "err.generic", err=e))
     except Exception as e:
-        await update.message.reply_text(f"Unexpected error: {e}")
+        await update.message.reply_text(_t(update, "err.unexpected", err=e))
 
 @_with_db
 async def cmd_withdrawals(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
-    user_id = update.effective_user.id
-    withdrawals = get_user_withdrawals(db, user_id)
-    if not withdrawals:
-        await update.message.reply_text("No withdrawal requests found.")
-        return
-    lines = ["Your withdrawals:"]
-    for w in withdrawals[:10]:
-        lines.append(f"{w.id[:8]}: {w.amount_manh} MANH to {w.destination_address[:10]}... ({w.status})")
-    await update.message.reply_text("\n".join(lines))
+    await paginator.reply(update.message, db, "withdrawals", update.effective_user.id, lang=_lang(update))
 
 async def cmd_chatid(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat = update.effective_chat
-    await update.message.reply_text(f"Chat ID: {chat.id}\nType: {chat.type}")
+    await update.message.reply_text(_t(update, "chatid.show", id=chat.id, type=chat.type))
+
+def _parse_order_args(args) -> Optional[tuple[Decimal, Decimal]]:
+    if len(args) != 2:
+        return None
+    try:
+        return Decimal(args[0]), Decimal(args[1])
+    except InvalidOperation:
+        return None
+
+def _placement_text(lang: str, side: str, placement) -> str:
+    amount = placement.order.amount_manh
+    price = placement.order.price_per_manh
+    lines = [t(lang, f"p2p.{side}_created", amount=amount, price=price)]
+    for trade in placement.trades:
+        lines.append(t(lang, "p2p.filled", amount=trade.amount_manh, price=trade.price_per_manh))
+    if placement.trades:
+        lines.append(t(lang, "p2p.resting", amount=placement.resting) if placement.resting > 0 else t(lang, "p2p.full"))
+    return "\n".join(lines)
 
 @rate_limit("p2p_buy", 10, 60)
 @_with_db
 async def cmd_p2p_buy(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
-    args = context.args
-    if len(args) != 2:
-        await update.message.reply_text("Usage: /p2p_buy <amount MANH> <price per MANH in TON>")
+    parsed = _parse_order_args(context.args)
+    if parsed is None:
+        await update.message.reply_text(_t(update, "p2p.buy_usage"))
         return
+    amount, price = parsed
     try:
-        amount = float(args[0])
-        price = float(args[1])
-    except ValueError:
-        await update.message.reply_text("Invalid numbers.")
+        placement = place_order(db, update.effective_user.id, BUY, amount, price)
+    except ValueError as e:
+        await update.message.reply_text(_t(update, "err.generic", err=e))
         return
-    user_id = update.effective_user.id
-    order = P2POrder(
-        id=uuid4().hex,
-        user_id=user_id,
-        type='buy',
-        amount=amount,
-        price=price,
-        status='open',
-        created_at=datetime.utcnow()
-    )
-    db.add(order)
-    db.commit()
-    await update.message.reply_text(f"Buy order created: {amount} MANH @ {price} TON")
+    await update.message.reply_text(_placement_text(_lang(update), BUY, placement))
 
 @rate_limit("sell", 5, 60)
 @_with_db
 async def cmd_sell(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
-    args = context.args
-    if len(args) != 2:
-        await update.message.reply_text("Usage: /sell <amount MANH> <price per MANH in TON>")
+    parsed = _parse_order_args(context.args)
+    if parsed is None:
+        await update.message.reply_text(_t(update, "p2p.sell_usage"))
         return
+    amount, price = parsed
     try:
-        amount = float(args[0])
-        price = float(args[1])
-    except ValueError:
-        await update.message.reply_text("Invalid numbers.")
+        placement = place_order(db, update.effective_user.id, SELL, amount, price)
+    except ValueError as e:
+        msg = _t(update, "p2p.insufficient") if "Insufficient" in str(e) else _t(update, "err.generic", err=e)
+        await update.message.reply_text(msg)
         return
-    user_id = update.effective_user.id
-    user = db.get(User, user_id)
-    if not user or user.balance_manh < amount:
-        await update.message.reply_text("Insufficient MANH balance.")
-        return
-    order = P2POrder(
-        id=uuid4().hex,
-        user_id=user_id,
-        type='sell',
-        amount=amount,
-        price=price,
-        status='open',
-        created_at=datetime.utcnow()
-    )
-    db.add(order)
-    db.commit()
-    await update.message.reply_text(f"Sell order created: {amount} MANH @ {price} TON")
+    await update.message.reply_text(_placement_text(_lang(update), SELL, placement))
 
 @_with_db
 async def cmd_orders(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
-    orders = db.query(P2POrder).filter_by(status='open').all()
-    if not orders:
-        await update.message.reply_text("No open orders.")
-        return
-    buy_lines = ["Buy orders:"]
-    sell_lines = ["Sell orders:"]
-    for o in orders:
-        line = f"  {o.id[:8]}  {o.amount} MANH @ {o.price} TON"
-        if o.type == 'buy':
-            buy_lines.append(line)
-        else:
-            sell_lines.append(line)
-    await update.message.reply_text("\n".join(buy_lines + sell_lines))
+    # depth and pages are bounded, so the reply stays far below Telegram's 4096 chars
+    book = order_book.ensure_loaded(db)
+    args = context.args or []
+    lang = _lang(update)
+    if not len(book):
+        await update.message.reply_text(t(lang, "orders.empty"))
+        return
+    if not args:
+        lines = [t(lang, "orders.buy")]
+        lines += [f"  {l.amount} MANH @ {l.price} TON ({l.count})" for l in book.depth(BUY, ORDERS_DEPTH_LEVELS)]
+        lines.append(t(lang, "orders.sell"))
+        lines += [f"  {l.amount} MANH @ {l.price} TON ({l.count})" for l in book.depth(SELL, ORDERS_DEPTH_LEVELS)]
+        lines.append(t(lang, "orders.hint"))
+        await update.message.reply_text("\n".join(lines))
+        return
+
+    which = args[0].lower()
+    if which not in (BUY, SELL, "mine"):
+        await update.message.reply_text(t(lang, "orders.usage"))
+        return
+    try:
+        await paginator.reply(update.message, db, "book", update.effective_user.id, which,
+                              cursor=args[1] if len(args) > 1 else None, lang=lang)
+    except ValueError:
+        await update.message.reply_text(t(lang, "orders.bad_cursor"))
+
+@_with_db
+async def cmd_market(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
+    s = market_data.summary()
+    book = order_book.ensure_loaded(db)
+    bid, ask = book.best_bid(), book.best_ask()
+    lang = _lang(update)
+    if s["last_price"] is None and bid is None and ask is None:
+        await update.message.reply_text(t(lang, "market.empty"))
+        return
+    lines = [t(lang, "market.last", price=s['last_price'] or '-')]
+    if s["open_24h"] is not None:
+        lines.append(t(lang, "market.day", change=f"{s['change_24h_pct']:+.2f}",
+                       high=f"{s['high_24h']:g}", low=f"{s['low_24h']:g}"))
+        lines.append(t(lang, "market.volume", volume=f"{s['volume_24h']:g}", trades=s['trades_24h']))
+    lines.append(t(lang, "market.quote", bid=bid.price if bid else '-', ask=ask.price if ask else '-'))
+    recent = market_data.trades(5)
+    if recent:
+        lines.append(t(lang, "market.recent"))
+        lines += [f"  {tr['amount']} MANH @ {tr['price']} TON" for tr in recent]
+    await update.message.reply_text("\n".join(lines))
 
 @_with_db
 async def cmd_cancel(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
     args = context.args
-    if len(args) != 2:
-        await update.message.reply_text("Usage: /cancel <order_id> <sell|buy>")
+    if len(args) != 2 or args[1].lower() not in (BUY, SELL):
+        await update.message.reply_text(_t(update, "cancel.usage"))
         return
     order_id_prefix = args[0].strip().replace(':', '').replace(',', '')
     order_type = args[1].lower()
     user_id = update.effective_user.id
-    order = db.query(P2POrder).filter(
-        P2POrder.id.startswith(order_id_prefix),
-        P2POrder.user_id == user_id,
-        P2POrder.type == order_type
+    model = SellOrder if order_type == SELL else BuyOrder
+    order = db.query(model).filter(
+        model.id.startswith(order_id_prefix),
+        model.user_id == user_id,
     ).first()
     if not order:
-        await update.message.reply_text("Order not found or not yours.")
+        await update.message.reply_text(_t(update, "cancel.not_found"))
         return
-    if order.status != 'open':
-        await update.message.reply_text("Order is not open.")
+    if order.status not in ("open", "partial"):
+        await update.message.reply_text(_t(update, "cancel.not_open"))
         return
-    order.status = 'cancelled'
-    db.commit()
-    await update.message.reply_text(f"Order {order.id[:8]} cancelled.")
+    if not cancel_order(db, user_id, order.id, order_type):
+        await update.message.reply_text(_t(update, "cancel.not_open"))
+        return
+    await update.message.reply_text(_t(update, "cancel.done", id=order.id[:8]))
+
+def _render_qr(data: str) -> bytes:
+    qr = qrcode.QRCode(box_size=10, border=4)
+    qr.add_data(data)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+    bio = io.BytesIO()
+    img.save(bio, 'PNG')
+    return bio.getvalue()
 
 @_with_db
 async def cmd_referral(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
     user_id = update.effective_user.id
     user = db.get(User, user_id)
     if not user:
-        await update.message.reply_text("User not found.")
+        await update.message.reply_text(_t(update, "err.user_not_found"))
         return
     if not user.referral_code:
         code = set_referral_code(db, user_id)
     else:
         code = user.referral_code
     link = f"https://t.me/{context.bot.username}?start={code}"
-    qr = qrcode.QRCode(box_size=10, border=4)
-    qr.add_data(link)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-    bio = io.BytesIO()
-    bio.name = 'qr.png'
-    img.save(bio, 'PNG')
-    bio.seek(0)
-    await update.message.reply_photo(photo=InputFile(bio), caption=f"Scan or tap:\n{link}")
+    await media_cache.reply_photo(
+        update.message, f"referral-qr:{link}", functools.partial(_render_qr, link),
+        filename='qr.png', caption=_t(update, "ref.caption", link=link),
+    )
 
 @_with_db
 async def cmd_referrals(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
     user_id = update.effective_user.id
     try:
         referrals = db.query(Referral).filter(Referral.referrer_id == user_id).all()
+        lang = _lang(update)
         if not referrals:
-            await update.message.reply_text("You haven't referred anyone yet.")
+            await update.message.reply_text(t(lang, "ref.none"))
             return
-        lines = ["Your referrals:"]
+        lines = [t(lang, "ref.title")]
         for ref in referrals:
             referred = db.get(User, ref.referred_id)
-            username = f"@{referred.username}" if referred and referred.username else f"User {ref.referred_id}"
-            lines.append(f"{username} - joined {ref.created_at.strftime('%Y-%m-%d')}")
+            username = f"@{referred.username}" if referred and referred.username else t(lang, "ref.user", id=ref.referred_id)
+            lines.append(t(lang, "ref.row", name=username, date=ref.created_at.strftime('%Y-%m-%d')))
         await update.message.reply_text("\n".join(lines))
     except Exception as e:
         logger.error(f"Error in cmd_referrals: {e}", exc_info=True)
-        await update.message.reply_text("An error occurred. Please try again later.")
+        await update.message.reply_text(_t(update, "err.try_later"))
 
 @_with_db
 async def cmd_approve_withdrawal(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
@@ -504,14 +547,14 @@ async def cmd_approve_withdrawal(update: Update, context: ContextTypes.DEFAULT_T
         return
     args = context.args
     if len(args) != 1:
-        await update.message.reply_text("Usage: /approve_withdrawal <withdrawal_id>")
+        await update.message.reply_text(_t(update, "admin.approve_usage"))
         return
     withdrawal_id = args[0]
     try:
         withdrawal = approve_withdrawal(db, withdrawal_id, update.effective_user.id)
-        await update.message.reply_text(f"Withdrawal {withdrawal.id[:8]} approved.")
+        await update.message.reply_text(_t(update, "admin.approved", id=withdrawal.id[:8]))
     except Exception as e:
-        await update.message.reply_text(f"Error: {e}")
+        await update.message.reply_text(_t(update, "err.generic", err=e))
 
 @_with_db
 async def cmd_reject_withdrawal(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
@@ -519,14 +562,46 @@ async def cmd_reject_withdrawal(update: Update, context: ContextTypes.DEFAULT_TY
         return
     args = context.args
     if len(args) != 1:
-        await update.message.reply_text("Usage: /reject_withdrawal <withdrawal_id>")
+        await update.message.reply_text(_t(update, "admin.reject_usage"))
         return
     withdrawal_id = args[0]
     try:
         withdrawal = reject_withdrawal(db, withdrawal_id, update.effective_user.id)
-        await update.message.reply_text(f"Withdrawal {withdrawal.id[:8]} rejected.")
+        await update.message.reply_text(_t(update, "admin.rejected", id=withdrawal.id[:8]))
+    except Exception as e:
+        await update.message.reply_text(_t(update, "err.generic", err=e))
+
+@_with_db
+async def cmd_payout_batch(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
+    if update.effective_user.id not in settings.ADMIN_IDS:
+        return
+    try:
+        rate = get_ton_ils_cached().ton_ils
+        batches = build_payout_batches(db, operator_id=update.effective_user.id, ton_ils_rate=rate)
     except Exception as e:
-        await update.message.reply_text(f"Error: {e}")
+        await update.message.reply_text(_t(update, "err.generic", err=e))
+        return
+    if not batches:
+        await update.message.reply_text(_t(update, "admin.payout_none"))
+        return
+    for batch in batches:
+        manifest = json.dumps(batch_manifest(db, batch.id), indent=2).encode("utf-8")
+        await update.message.reply_document(
+            document=InputFile(io.BytesIO(manifest), filename=f"payout_{batch.id[:12]}.json"),
+            caption=_t(update, "admin.payout_batch", id=batch.id[:12], count=batch.item_count, total=batch.total_manh),
+        )
+
+@_with_db
+async def cmd_payout_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
+    if update.effective_user.id not in settings.ADMIN_IDS:
+        return
+    result = confirm_payouts(db)
+    if not result.get("ok"):
+        await update.message.reply_text(_t(update, "err.generic", err=result.get('error')))
+        return
+    await update.message.reply_text(
+        _t(update, "admin.payout_done", completed=result['completed'], batches=result['batches_confirmed'])
+    )
 
 @_with_db
 async def cmd_admin_stats(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
@@ -534,31 +609,20 @@ async def cmd_admin_stats(update: Update, context: ContextTypes.DEFAULT_TYPE, db
         return
     user_count = db.query(User).count()
     invoice_count = db.query(Invoice).count()
-    order_count = db.query(P2POrder).count()
-    await update.message.reply_text(f"Stats:\nUsers: {user_count}\nInvoices: {invoice_count}\nOrders: {order_count}")
+    order_count = db.query(SellOrder).count() + db.query(BuyOrder).count()
+    await update.message.reply_text(_t(update, "admin.stats", users=user_count, invoices=invoice_count, orders=order_count))
 
 @_with_db
 async def cmd_admin_users(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
     if update.effective_user.id not in settings.ADMIN_IDS:
         return
-    users = db.query(User).limit(10).all()
-    lines = ["Page 1:"]
-    for u in users:
-        lines.append(f"ID: {u.id} | @{u.username} | MANH: {_safe_decimal(u.balance_manh)} | XP: {u.total_xp}")
-    await update.message.reply_text("\n".join(lines))
+    await paginator.reply(update.message, db, "users", update.effective_user.id, lang=_lang(update))
 
 @_with_db
 async def cmd_admin_orders(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
     if update.effective_user.id not in settings.ADMIN_IDS:
         return
-    orders = db.query(P2POrder).filter_by(status='open').all()
-    if not orders:
-        await update.message.reply_text("No open orders.")
-        return
-    lines = ["All open orders:"]
-    for o in orders:
-        lines.append(f"{o.id[:8]} | {o.type} | {o.amount} MANH @ {o.price} TON | User: {o.user_id}")
-    await update.message.reply_text("\n".join(lines))
+    await paginator.reply(update.message, db, "all_orders", update.effective_user.id, "all", lang=_lang(update))
 
 @_with_db
 async def cmd_admin_broadcast(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
@@ -566,29 +630,106 @@ async def cmd_admin_broadcast(update: Update, context: ContextTypes.DEFAULT_TYPE
         return
     msg = ' '.join(context.args)
     if not msg:
-        await update.message.reply_text("Usage: /admin_broadcast <message>")
+        await update.message.reply_text(_t(update, "admin.bc_usage"))
         return
-    users = db.query(User).all()
-    sent = 0
-    for user in users:
-        try:
-            await context.bot.send_message(chat_id=user.id, text=f"Broadcast:\n{msg}")
-            sent += 1
-        except Exception as e:
-            logger.error(f"Failed to send broadcast to {user.id}: {e}")
-    await update.message.reply_text(f"Broadcast sent to {sent}/{len(users)} users.")
+    job = create_job(db, f"Broadcast:\n{msg}", created_by=update.effective_user.id)
+    start_job(context.bot, job.id, SessionLocal)
+    await update.message.reply_text(_t(update, "admin.bc_queued", id=job.id[:8], total=job.total))
+
+@_with_db
+async def cmd_admin_broadcast_to(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
+    if update.effective_user.id not in settings.ADMIN_IDS:
+        return
+    target, sep, msg = ' '.join(context.args).partition('|')
+    target, msg = target.strip(), msg.strip()
+    if not sep or not target or not msg:
+        await update.message.reply_text(_t(update, "admin.bc_to_usage"))
+        return
+    try:
+        job = create_job(db, f"Broadcast:\n{msg}", created_by=update.effective_user.id, target=target)
+    except ValueError as e:
+        await update.message.reply_text(_t(update, "admin.bad_segment", err=e))
+        return
+    start_job(context.bot, job.id, SessionLocal)
+    await update.message.reply_text(_t(update, "admin.bc_to_queued", id=job.id[:8], total=job.total, target=target))
+
+@_with_db
+async def cmd_admin_segment(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
+    if update.effective_user.id not in settings.ADMIN_IDS:
+        return
+    expr = ' '.join(context.args)
+    if not expr:
+        await update.message.reply_text(_t(update, "admin.seg_usage"))
+        return
+    try:
+        ids = segment_index.ensure_loaded(db).resolve(expr)
+    except ValueError as e:
+        await update.message.reply_text(_t(update, "admin.bad_segment", err=e))
+        return
+    sample = ", ".join(str(uid) for uid in ids[:10])
+    if ids:
+        await update.message.reply_text(_t(update, "admin.seg_match_first", count=len(ids), sample=sample))
+    else:
+        await update.message.reply_text(_t(update, "admin.seg_match", count=0))
+
+@_with_db
+async def cmd_admin_tag(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
+    if update.effective_user.id not in settings.ADMIN_IDS:
+        return
+    if len(context.args) != 2 or not context.args[0].isdigit():
+        await update.message.reply_text(_t(update, "admin.tag_usage"))
+        return
+    user_id, tag = int(context.args[0]), context.args[1]
+    if not db.get(User, user_id):
+        await update.message.reply_text(_t(update, "err.user_not_found"))
+        return
+    if tag.startswith('-'):
+        remove_tag(db, user_id, tag[1:])
+        await update.message.reply_text(_t(update, "admin.tag_removed", tag=tag[1:], user=user_id))
+    else:
+        add_tag(db, user_id, tag)
+        await update.message.reply_text(_t(update, "admin.tag_added", user=user_id, tag=tag))
+
+@_with_db
+async def cmd_admin_broadcast_status(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
+    if update.effective_user.id not in settings.ADMIN_IDS:
+        return
+    job = find_job(db, context.args[0] if context.args else None)
+    if job is None:
+        await update.message.reply_text(_t(update, "admin.bc_none"))
+        return
+    p = job_progress(job)
+    text = _t(update, "admin.bc_status", id=p['id'][:8], status=p['status'], processed=p['processed'],
+              total=p['total'], percent=p['percent'], sent=p['sent'], failed=p['failed'], blocked=p['blocked'])
+    if p["error"]:
+        text += "\n" + _t(update, "err.generic", err=p['error'])
+    await update.message.reply_text(text)
+
+@_with_db
+async def cmd_admin_broadcast_cancel(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
+    if update.effective_user.id not in settings.ADMIN_IDS:
+        return
+    job = find_job(db, context.args[0]) if context.args else None
+    if job is None:
+        await update.message.reply_text(_t(update, "admin.bc_cancel_usage"))
+        return
+    if cancel_job(db, job.id):
+        await update.message.reply_text(_t(update, "admin.bc_cancelled", id=job.id[:8]))
+    else:
+        await update.message.reply_text(_t(update, "admin.bc_already", id=job.id[:8], status=job.status))
 
 # ---------- Menu System ----------
 async def cmd_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    lang = _lang(update)
     keyboard = [
-        [InlineKeyboardButton("General", callback_data='menu_general')],
-        [InlineKeyboardButton("MANH", callback_data='menu_manh')],
-        [InlineKeyboardButton("Wallet & Trade", callback_data='menu_wallet')],
+        [InlineKeyboardButton(t(lang, "menu.general"), callback_data='menu_general')],
+        [InlineKeyboardButton(t(lang, "menu.manh"), callback_data='menu_manh')],
+        [InlineKeyboardButton(t(lang, "menu.wallet"), callback_data='menu_wallet')],
     ]
     if update.effective_user.id in settings.ADMIN_IDS:
-        keyboard.append([InlineKeyboardButton("Admin", callback_data='menu_admin')])
+        keyboard.append([InlineKeyboardButton(t(lang, "menu.admin"), callback_data='menu_admin')])
     reply_markup = InlineKeyboardMarkup(keyboard)
-    await update.message.reply_text('Main Menu\nChoose category:', reply_markup=reply_markup)
+    await update.message.reply_text(t(lang, "menu.main"), reply_markup=reply_markup)
 
 
 @_with_db
@@ -596,68 +737,73 @@ async def cmd_level(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Sess
     user_id = update.effective_user.id
     user = db.get(User, user_id)
     if not user:
-        await update.message.reply_text("User not found.")
+        await update.message.reply_text(_t(update, "err.user_not_found"))
         return
     xp = user.total_xp or 0
     # ????? ?????: level = floor(sqrt(xp / 100)) + 1
     level = int((xp / 100) ** 0.5) + 1
     next_level_xp = ((level) ** 2) * 100
     xp_needed = next_level_xp - xp
-    await update.message.reply_text(
-        f"Level: {level}\\n"
-        f"XP: {xp}\\n"
-        f"XP to next level: {xp_needed}"
-    )
+    await update.message.reply_text(_t(update, "level.show", level=level, xp=xp, needed=xp_needed))
 
 
 @_with_db
 async def cmd_history(update: Update, context: ContextTypes.DEFAULT_TYPE, db: Session):
-    user_id = update.effective_user.id
-    from web_portal.app.manh.ledger import get_user_ledger
-    events = get_user_ledger(db, user_id, limit=10)
-    if not events:
-        await update.message.reply_text("No history yet.")
-        return
-    lines = ["Your recent activity:"]
-    for e in events:
-        date = e.created_at.strftime('%Y-%m-%d %H:%M')
-        lines.append(f"{date} | {e.event_type} | {e.amount} MANH | {e.description or ''}")
-    await update.message.reply_text("\n".join(lines))
+    await paginator.reply(update.message, db, "history", update.effective_user.id, lang=_lang(update))
 
 async def cmd_faq(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    text = (
-        "**Frequently Asked Questions**\n\n"
-        "**What is MANH?**\n"
-        "MANH is a digital token based on TON, used within the system.\n\n"
-        "**How to buy MANH?**\n"
-        "Use /buy <ILS amount>. An invoice will be created for payment in TON.\n\n"
-        "**How long does payment confirmation take?**\n"
-        "Usually a few minutes. Check with /poll_confirm.\n\n"
-        "**What is P2P?**\n"
-        "Peer-to-peer trading – you can buy or sell MANH directly with other users."
-    )
-    await update.message.reply_text(text)
+    await update.message.reply_text(_t(update, "faq.text"))
+
+_SUBMENUS = {
+    'menu_general': "menu.general.text",
+    'menu_manh': "menu.manh.text",
+    'menu_wallet': "menu.wallet.text",
+    'menu_admin': "menu.admin.text",
+}
 
 async def menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    data = query.data
-    if data == 'menu_general':
-        text = "/help - Help\n/faq - FAQ\n/start - Start"
-    elif data == 'menu_manh':
-        text = "/manh - Balance\n/leaderboard - Leaderboard\n/buy - Buy\n/sell - Sell"
-    elif data == 'menu_wallet':
-        text = "/invoices - Invoices\n/withdraw - Withdraw\n/withdrawals - Withdrawals\n/p2p_buy - P2P Buy"
-    elif data == 'menu_admin':
-        text = "/admin_stats - Stats\n/admin_users - Users\n/admin_orders - Orders\n/admin_broadcast - Broadcast"
-    else:
-        text = "Unknown option"
+    text = _t(update, _SUBMENUS.get(query.data, "menu.unknown"))
     await query.edit_message_text(text, reply_markup=query.message.reply_markup)
 
+# ---------- P2P trade notifications ----------
+async def _notify_trade(bot, e: TradeEvent):
+    total = e.amount_manh * e.price_per_manh
+    for chat_id, key in ((e.seller_id, "p2p.trade_sold"), (e.buyer_id, "p2p.trade_bought")):
+        try:
+            # not a reply, so the language is whatever this user last talked to us in
+            await bot.send_message(
+                chat_id=chat_id,
+                text=t(user_lang(chat_id), key, trade=e.trade_id[:8], amount=e.amount_manh,
+                       price=e.price_per_manh, total=total),
+                **lane_kwargs(bot, Lane.NOTIFY),
+            )
+        except Exception as ex:
+            logger.warning(f"Trade notification to {chat_id} failed: {ex}")
+
+def _on_p2p_trade(event) -> None:
+    # called synchronously by the matcher, possibly from a worker thread
+    if not isinstance(event, TradeEvent):
+        return
+    app, loop = _application, _bot_loop
+    if app is None or loop is None or loop.is_closed():
+        return
+    coro = _notify_trade(app.bot, event)
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        loop.create_task(coro)
+    else:
+        asyncio.run_coroutine_threadsafe(coro, loop)
+
 async def init_bot():
-    global _STARTED, _application
+    global _STARTED, _application, _bot_loop
     _STARTED = datetime.now().isoformat()
-    app = Application.builder().token(settings.BOT_TOKEN).build()
+    # every send goes through the outbound scheduler (Telegram flood limits, priority lanes)
+    app = Application.builder().token(settings.BOT_TOKEN).rate_limiter(outbound).build()
 
     # Command handlers
     app.add_handler(CommandHandler("start", cmd_start))
@@ -675,15 +821,23 @@ async def init_bot():
     app.add_handler(CommandHandler("p2p_buy", cmd_p2p_buy))
     app.add_handler(CommandHandler("sell", cmd_sell))
     app.add_handler(CommandHandler("orders", cmd_orders))
+    app.add_handler(CommandHandler("market", cmd_market))
     app.add_handler(CommandHandler("cancel", cmd_cancel))
     app.add_handler(CommandHandler("referral", cmd_referral))
     app.add_handler(CommandHandler("referrals", cmd_referrals))
     app.add_handler(CommandHandler("approve_withdrawal", cmd_approve_withdrawal))
     app.add_handler(CommandHandler("reject_withdrawal", cmd_reject_withdrawal))
+    app.add_handler(CommandHandler("payout_batch", cmd_payout_batch))
+    app.add_handler(CommandHandler("payout_confirm", cmd_payout_confirm))
     app.add_handler(CommandHandler("admin_stats", cmd_admin_stats))
     app.add_handler(CommandHandler("admin_users", cmd_admin_users))
+    app.add_handler(CommandHandler("admin_segment", cmd_admin_segment))
+    app.add_handler(CommandHandler("admin_tag", cmd_admin_tag))
     app.add_handler(CommandHandler("admin_orders", cmd_admin_orders))
     app.add_handler(CommandHandler("admin_broadcast", cmd_admin_broadcast))
+    app.add_handler(CommandHandler("admin_broadcast_to", cmd_admin_broadcast_to))
+    app.add_handler(CommandHandler("admin_broadcast_status", cmd_admin_broadcast_status))
+    app.add_handler(CommandHandler("admin_broadcast_cancel", cmd_admin_broadcast_cancel))
     app.add_handler(CommandHandler("menu", cmd_menu))
     app.add_handler(CommandHandler("faq", cmd_faq))
     app.add_handler(CommandHandler("level", cmd_level))
@@ -691,15 +845,22 @@ async def init_bot():
     app.add_handler(CommandHandler("history", cmd_history))
     app.add_handler(CommandHandler("level", cmd_level))
     app.add_handler(CallbackQueryHandler(menu_callback, pattern='^menu_'))
+    app.add_handler(CallbackQueryHandler(pagination_callback, pattern=f'^{CALLBACK_PREFIX}'))
 
     await app.initialize()
     _application = app
+    _bot_loop = asyncio.get_running_loop()
+    subscribe_p2p(_on_p2p_trade)
+    resumed = resume_jobs(app.bot, SessionLocal)
+    if resumed:
+        logger.info(f"Resumed {resumed} broadcast job(s)")
     logger.info("Bot initialized successfully")
     return app
 
 async def shutdown_bot():
     global _application
     if _application:
+        await notifier.flush_all()  # pending group digests
         await _application.shutdown()
         _application = None
         logger.info("Bot shut down")
@@ -1,15 +1,18 @@
-import os
 from typing import Any, Optional
 
 from fastapi import APIRouter, Header, HTTPException
 
+from .core.config import get_config
 from .tg_bot import tg_get_app, process_update, get_last_update_snapshot
+from .telegram.outbound import outbound
+from .telegram.groups import notifier
+from .telegram.media_cache import media_cache
 
 router = APIRouter(prefix="/tg", tags=["tg-ops"])
 
 
 def _require_secret(x_secret: Optional[str]) -> None:
-    expected = (os.getenv("TELEGRAM_WEBHOOK_SECRET") or "").strip()
+    expected = get_config().webhook_secret
     if not expected:
         raise HTTPException(status_code=500, detail="server missing TELEGRAM_WEBHOOK_SECRET")
     if not x_secret or x_secret.strip() != expected:
@@ -24,6 +27,15 @@ async def tg_last(
     return {"ok": True, "last": get_last_update_snapshot()}
 
 
+@router.get("/outbound")
+async def tg_outbound(
+    x_telegram_bot_api_secret_token: Optional[str] = Header(default=None, alias="X-Telegram-Bot-Api-Secret-Token"),
+):
+    _require_secret(x_telegram_bot_api_secret_token)
+    return {"ok": True, "outbound": outbound.stats(), "group_digests": notifier.stats(),
+            "media_cache": media_cache.stats()}
+
+
 @router.post("/ping")
 async def tg_ping(
     chat_id: int,
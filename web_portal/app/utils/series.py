@@ -0,0 +1,146 @@
+"""
+Fixed-size, array-backed time series used for in-memory price history and
+market candles. Nothing here allocates per sample: values live in preallocated
+`array('d')` slots that are overwritten in ring order.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Iterable, Optional
+
+
+class RingBuffer:
+    """Last `capacity` (ts, value) samples, oldest overwritten first."""
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be > 0")
+        self.capacity = capacity
+        self._ts = array("d", bytes(8 * capacity))
+        self._val = array("d", bytes(8 * capacity))
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, ts: float, value: float) -> None:
+        self._ts[self._next] = ts
+        self._val[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def items(self, since: Optional[float] = None, limit: Optional[int] = None) -> list[tuple[float, float]]:
+        """Samples in chronological order, optionally only ts >= since and the newest `limit`."""
+        start = (self._next - self._size) % self.capacity
+        out = []
+        for i in range(self._size):
+            j = (start + i) % self.capacity
+            if since is None or self._ts[j] >= since:
+                out.append((self._ts[j], self._val[j]))
+        if limit is not None:
+            out = out[-limit:] if limit > 0 else []
+        return out
+
+
+class CandleSeries:
+    """
+    OHLCV buckets of `resolution_sec` seconds, keeping the newest `capacity`
+    buckets. Samples update the current bucket in place; a sample in a later
+    bucket opens a new slot. Samples older than the current bucket are dropped.
+    """
+
+    def __init__(self, resolution_sec: int, capacity: int) -> None:
+        if resolution_sec <= 0 or capacity <= 0:
+            raise ValueError("resolution_sec and capacity must be > 0")
+        self.resolution_sec = resolution_sec
+        self.capacity = capacity
+        zeros = bytes(8 * capacity)
+        self._start = array("d", zeros)
+        self._open = array("d", zeros)
+        self._high = array("d", zeros)
+        self._low = array("d", zeros)
+        self._close = array("d", zeros)
+        self._volume = array("d", zeros)
+        self._count = array("l", [0] * capacity)
+        self._head = -1  # slot of the newest bucket
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def bucket_start(self, ts: float) -> float:
+        return float(int(ts // self.resolution_sec) * self.resolution_sec)
+
+    def _open_slot(self, start: float, price: float, volume: float, count: int) -> None:
+        self._head = (self._head + 1) % self.capacity
+        h = self._head
+        self._start[h] = start
+        self._open[h] = self._high[h] = self._low[h] = self._close[h] = price
+        self._volume[h] = volume
+        self._count[h] = count
+        if self._size < self.capacity:
+            self._size += 1
+
+    def update(self, ts: float, price: float, volume: float = 0.0) -> Optional[float]:
+        """Fold one sample in; returns the bucket start it landed in (None if dropped)."""
+        start = self.bucket_start(ts)
+        h = self._head
+        if h >= 0 and start == self._start[h]:
+            if price > self._high[h]:
+                self._high[h] = price
+            if price < self._low[h]:
+                self._low[h] = price
+            self._close[h] = price
+            self._volume[h] += volume
+            self._count[h] += 1
+            return start
+        if h >= 0 and start < self._start[h]:
+            return None
+        self._open_slot(start, price, volume, 1)
+        return start
+
+    def load(self, rows: Iterable[dict]) -> None:
+        """Seed from persisted candles (chronological); later buckets win."""
+        for r in rows:
+            start = float(r["ts"])
+            if self._head >= 0 and start <= self._start[self._head]:
+                continue
+            self._open_slot(start, float(r["open"]), float(r.get("volume", 0.0)), int(r.get("count", 0)))
+            h = self._head
+            self._high[h] = float(r["high"])
+            self._low[h] = float(r["low"])
+            self._close[h] = float(r["close"])
+
+    def _row(self, j: int) -> dict:
+        return {
+            "ts": int(self._start[j]),
+            "open": self._open[j],
+            "high": self._high[j],
+            "low": self._low[j],
+            "close": self._close[j],
+            "volume": self._volume[j],
+            "count": self._count[j],
+        }
+
+    def rows(self, limit: Optional[int] = None, since: Optional[float] = None) -> list[dict]:
+        """Candles in chronological order."""
+        n = self._size if limit is None else max(0, min(limit, self._size))
+        out = []
+        for i in range(n - 1, -1, -1):
+            j = (self._head - i) % self.capacity
+            if since is None or self._start[j] >= since:
+                out.append(self._row(j))
+        return out
+
+    def get(self, start: float) -> Optional[dict]:
+        """The candle for an exact bucket start, if still held."""
+        for i in range(self._size):
+            j = (self._head - i) % self.capacity
+            if self._start[j] == start:
+                return self._row(j)
+            if self._start[j] < start:
+                break
+        return None